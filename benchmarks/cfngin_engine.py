@@ -0,0 +1,595 @@
+"""Benchmark the CFNgin engine with large generated configs.
+
+Generates CFNgin configs with layered dependencies (network, shared and
+application stacks) that use ``output`` and ``default`` lookups, then times
+each phase of a deploy:
+
+- parsing the config (:func:`runway.cfngin.config.render_parse_load`)
+- building the graph of steps
+- ``transitive_reduction`` of the graph
+- resolving variables
+- rendering blueprints
+- walking the graph with no-op steps
+- deploying against an in-memory CloudFormation with simulated latency
+
+Nothing is sent to AWS.
+
+Usage::
+
+    python benchmarks/cfngin_engine.py --stacks 50 500 2000 --latency 0.01
+
+"""
+import argparse
+import copy
+import functools
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import timeit
+
+import botocore.exceptions
+import yaml
+from troposphere import Output, Ref, Tags, s3, ssm
+
+from runway import __version__
+from runway.cfngin.actions import base as actions_base
+from runway.cfngin.actions import build
+from runway.cfngin.blueprints.base import Blueprint
+from runway.cfngin.config import render_parse_load
+from runway.cfngin.context import Context
+from runway.cfngin.plan import Graph, Step
+from runway.cfngin.providers.aws.default import Provider, StackStatusPoller
+from runway.cfngin.status import COMPLETE
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ENVIRONMENT = {"namespace": "bench", "environment": "test"}
+
+
+class Service(Blueprint):
+    """Stack used by every generated stack definition."""
+
+    VARIABLES = {
+        "Name": {"type": str, "description": "Name of the service."},
+        "CidrBlock": {"type": str, "default": ""},
+        "VpcId": {"type": str, "default": ""},
+        "Dependencies": {"type": list, "default": []},
+    }
+
+    def create_template(self):
+        """Create template."""
+        variables = self.get_variables()
+        bucket = self.template.add_resource(
+            s3.Bucket(
+                "Bucket",
+                Tags=Tags(
+                    Name=variables["Name"],
+                    CidrBlock=variables["CidrBlock"] or "none",
+                    VpcId=variables["VpcId"] or "none",
+                ),
+            )
+        )
+        for i, dependency in enumerate(variables["Dependencies"]):
+            self.template.add_resource(
+                ssm.Parameter(
+                    "Dependency%s" % i,
+                    Name="/%s/dependencies/%s" % (variables["Name"], i),
+                    Type="String",
+                    Value=dependency,
+                )
+            )
+        self.template.add_output(Output("Id", Value=Ref(bucket)))
+
+
+class InMemoryCloudFormation(object):
+    """Minimal CloudFormation client that keeps stacks in memory.
+
+    Stacks are in progress for ``stack_time`` seconds after being created
+    or updated. Each call sleeps for ``latency`` seconds.
+
+    Attributes:
+        calls (int): Number of calls made.
+
+    """
+
+    def __init__(self, latency=0.0, stack_time=0.0):
+        """Instantiate class.
+
+        Args:
+            latency (float): Seconds each call takes.
+            stack_time (float): Seconds a stack is in progress for.
+
+        """
+        self._lock = threading.Lock()
+        self._stacks = {}
+        self.calls = 0
+        self.latency = latency
+        self.stack_time = stack_time
+
+    def _call(self):
+        """Simulate the latency of a call."""
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @staticmethod
+    def _error(operation, message, code="ValidationError"):
+        """Create an error like the ones raised by botocore."""
+        return botocore.exceptions.ClientError(
+            {"Error": {"Code": code, "Message": message}}, operation
+        )
+
+    def _get(self, operation, name):
+        """Get a stack, completing it if it is no longer in progress."""
+        stack = self._stacks.get(name)
+        if not stack:
+            raise self._error(operation, "Stack with id %s does not exist" % name)
+        if stack["StackStatus"].endswith("_IN_PROGRESS") and (
+            time.time() >= stack["ReadyAt"]
+        ):
+            stack["StackStatus"] = stack["StackStatus"].replace(
+                "_IN_PROGRESS", "_COMPLETE"
+            )
+        return stack
+
+    @staticmethod
+    def _describe(stack):
+        """Copy a stack as returned by DescribeStacks."""
+        return dict(
+            (k, copy.deepcopy(v))
+            for k, v in stack.items()
+            if k not in ("ReadyAt", "TemplateBody")
+        )
+
+    def _submit(self, stack, status, template_body):
+        """Start creating or updating a stack."""
+        outputs = json.loads(template_body).get("Outputs", {})
+        stack.update(
+            Outputs=[
+                {"OutputKey": key, "OutputValue": "%s-%s" % (stack["StackName"], key)}
+                for key in outputs
+            ],
+            ReadyAt=time.time() + self.stack_time,
+            StackStatus=status,
+            TemplateBody=template_body,
+        )
+
+    def statuses(self):
+        """Get the status of each stack.
+
+        Returns:
+            Dict[str, str]
+
+        """
+        with self._lock:
+            return dict(
+                (name, self._get("DescribeStacks", name)["StackStatus"])
+                for name in self._stacks
+            )
+
+    def create_stack(self, **kwargs):
+        """Create a stack."""
+        self._call()
+        with self._lock:
+            name = kwargs["StackName"]
+            if name in self._stacks:
+                raise self._error(
+                    "CreateStack",
+                    "Stack [%s] already exists" % name,
+                    "AlreadyExistsException",
+                )
+            stack = {
+                "EnableTerminationProtection": kwargs.get(
+                    "EnableTerminationProtection", False
+                ),
+                "Parameters": kwargs.get("Parameters", []),
+                "StackId": "arn:aws:cloudformation:::stack/%s" % name,
+                "StackName": name,
+                "Tags": kwargs.get("Tags", []),
+            }
+            self._submit(stack, "CREATE_IN_PROGRESS", kwargs["TemplateBody"])
+            self._stacks[name] = stack
+            return {"StackId": stack["StackId"]}
+
+    def update_stack(self, **kwargs):
+        """Update a stack."""
+        self._call()
+        with self._lock:
+            stack = self._get("UpdateStack", kwargs["StackName"])
+            if (
+                stack["TemplateBody"] == kwargs["TemplateBody"]
+                and stack["Parameters"] == kwargs.get("Parameters", [])
+                and stack["Tags"] == kwargs.get("Tags", [])
+            ):
+                raise self._error("UpdateStack", "No updates are to be performed.")
+            stack.update(
+                Parameters=kwargs.get("Parameters", []), Tags=kwargs.get("Tags", [])
+            )
+            self._submit(stack, "UPDATE_IN_PROGRESS", kwargs["TemplateBody"])
+            return {"StackId": stack["StackId"]}
+
+    def describe_stacks(self, StackName=None, **_):  # noqa: N803
+        """Describe one or all stacks."""
+        self._call()
+        with self._lock:
+            if StackName:
+                return {
+                    "Stacks": [self._describe(self._get("DescribeStacks", StackName))]
+                }
+            return {
+                "Stacks": [
+                    self._describe(self._get("DescribeStacks", name))
+                    for name in sorted(self._stacks)
+                ]
+            }
+
+    def get_paginator(self, operation):
+        """Get a paginator that returns every stack on a single page."""
+        client = self
+
+        class _Paginator(object):  # pylint: disable=too-few-public-methods
+            def paginate(self, **kwargs):
+                """Paginate."""
+                return [getattr(client, operation)(**kwargs)]
+
+        return _Paginator()
+
+    def get_template(self, StackName, **_):  # noqa: N803
+        """Get the template of a stack."""
+        self._call()
+        with self._lock:
+            return {"TemplateBody": self._get("GetTemplate", StackName)["TemplateBody"]}
+
+    def update_termination_protection(
+        self, EnableTerminationProtection, StackName  # noqa: N803
+    ):
+        """Update the termination protection of a stack."""
+        self._call()
+        with self._lock:
+            stack = self._get("UpdateTerminationProtection", StackName)
+            stack["EnableTerminationProtection"] = EnableTerminationProtection
+
+
+class InMemorySession(object):  # pylint: disable=too-few-public-methods
+    """Session that only creates in-memory CloudFormation clients."""
+
+    def __init__(self, client):
+        """Instantiate class.
+
+        Args:
+            client (InMemoryCloudFormation): Client returned by :meth:`client`.
+
+        """
+        self._client = client
+
+    def client(self, service_name, **_):
+        """Get a client."""
+        if service_name != "cloudformation":
+            raise ValueError("only CloudFormation is simulated")
+        return self._client
+
+
+class InMemoryProviderBuilder(object):
+    """Builds a provider that uses an in-memory CloudFormation client."""
+
+    def __init__(self, client, poll_interval=0.0):
+        """Instantiate class.
+
+        Args:
+            client (InMemoryCloudFormation): Client used by the provider.
+            poll_interval (float): Seconds between checks of the stacks
+                being waited on by the stack status poller of the provider.
+
+        """
+        self.poll_interval = poll_interval
+        self.region = "us-east-1"
+        self.provider = Provider(InMemorySession(client), region=self.region)
+        self.set_stack_status_poller_factory(None)
+
+    def build(self, region=None, profile=None):  # pylint: disable=unused-argument
+        """Get the provider."""
+        return self.provider
+
+    def set_stack_status_poller_factory(self, factory=None):
+        """Set how the stack status poller of the provider is created.
+
+        The poller checks on stacks every ``poll_interval`` seconds rather
+        than :data:`runway.cfngin.providers.aws.default.STACK_STATUS_POLL_INTERVAL`.
+
+        Args:
+            factory (Optional[Callable[..., StackStatusPoller]]): Called with
+                the CloudFormation client of the provider and the interval.
+
+        """
+        factory = factory or functools.partial(
+            StackStatusPoller, max_calls_per_second=0
+        )
+        self.provider.stack_status_poller = factory(
+            self.provider.cloudformation, interval=self.poll_interval
+        )
+
+
+def generate_config(stacks, seed=0):
+    """Generate a CFNgin config with layered dependencies.
+
+    About 5% of the stacks are network stacks with no dependencies, 20% are
+    shared stacks that use an output of a network stack and the rest are
+    application stacks that use outputs of a network stack and one to three
+    shared stacks. Application stacks also explicitly require their network
+    stack, which is redundant with the dependency through their shared
+    stacks.
+
+    Args:
+        stacks (int): Number of stacks in the config.
+        seed (int): Seed of the random choices.
+
+    Returns:
+        str: The raw config.
+
+    """
+    rand = random.Random(seed)
+    networks = max(stacks // 20, 1)
+    shared = max(stacks // 5, 1)
+    definitions = []
+    class_path = "cfngin_engine.Service"
+    for i in range(networks):
+        definitions.append(
+            {
+                "name": "network-%s" % i,
+                "class_path": class_path,
+                "variables": {
+                    "Name": "${namespace}-network-%s" % i,
+                    "CidrBlock": "10.%s.0.0/16" % (i % 256),
+                },
+            }
+        )
+    for i in range(shared):
+        network = rand.randrange(networks)
+        definitions.append(
+            {
+                "name": "shared-%s" % i,
+                "class_path": class_path,
+                "variables": {
+                    "Name": "${default shared_name::${namespace}-shared-%s}" % i,
+                    "VpcId": "${output network-%s::Id}" % network,
+                },
+            }
+        )
+    for i in range(stacks - networks - shared):
+        network = rand.randrange(networks)
+        dependencies = rand.sample(range(shared), min(rand.randint(1, 3), shared))
+        definitions.append(
+            {
+                "name": "app-%s" % i,
+                "class_path": class_path,
+                "requires": ["network-%s" % network],
+                "variables": {
+                    "Name": "${namespace}-app-%s" % i,
+                    "VpcId": "${output network-%s::Id}" % network,
+                    "Dependencies": [
+                        "${output shared-%s::Id}" % j for j in dependencies
+                    ],
+                },
+            }
+        )
+    return yaml.safe_dump(
+        {
+            "namespace": "${namespace}",
+            "cfngin_bucket": "",
+            "sys_path": BENCHMARK_DIR,
+            "stacks": definitions,
+        },
+        default_flow_style=False,
+    )
+
+
+def timed(func, *args):
+    """Call a function, timing it.
+
+    Returns:
+        Tuple[float, Any]: Seconds taken and the result of the function.
+
+    """
+    start = timeit.default_timer()
+    result = func(*args)
+    return timeit.default_timer() - start, result
+
+
+def run_phases(raw_config):
+    """Run and time each phase of a deploy that does not call CloudFormation.
+
+    Args:
+        raw_config (str): Config generated by :func:`generate_config`.
+
+    Returns:
+        Dict[str, float]: Seconds taken by each phase.
+
+    """
+    timings = {}
+    timings["parse"], config = timed(render_parse_load, raw_config, ENVIRONMENT)
+    context = Context(config=config, environment=ENVIRONMENT)
+
+    def build_graph():
+        """Build the graph of steps like an action does."""
+        return Graph.from_steps([Step(stack) for stack in context.get_stacks()])
+
+    timings["graph build"], graph = timed(build_graph)
+    timings["transitive_reduction"], _ = timed(graph.dag.copy().transitive_reduction)
+
+    stacks = context.get_stacks()
+    for stack in stacks:
+        stack.set_outputs({"Id": "%s-Id" % stack.fqn})
+
+    def resolve():
+        """Resolve the variables of every stack."""
+        for stack in stacks:
+            stack.resolve(context, None)
+
+    def render():
+        """Render the blueprint of every stack."""
+        return [stack.blueprint.rendered for stack in stacks]
+
+    timings["variable resolution"], _ = timed(resolve)
+    timings["rendering"], _ = timed(render)
+    timings["walk (no-op steps)"], _ = timed(
+        graph.walk,
+        actions_base.build_walker(0),
+        lambda step: step.set_status(COMPLETE) or True,
+    )
+    return timings
+
+
+def run_deploy(  # pylint: disable=too-many-arguments
+    raw_config, latency, stack_time, concurrency, executor, poll_interval=0.0
+):
+    """Deploy a config against an in-memory CloudFormation.
+
+    Args:
+        raw_config (str): Config generated by :func:`generate_config`.
+        latency (float): Seconds each CloudFormation call takes.
+        stack_time (float): Seconds each stack is in progress for.
+        concurrency (int): Max number of stacks deployed at once.
+        executor (str): CFNgin executor.
+        poll_interval (float): Seconds between checks of stacks that are in
+            progress.
+
+    Returns:
+        Dict[str, float]: Seconds taken, stacks deployed per second and
+        number of CloudFormation calls made.
+
+    """
+    client = InMemoryCloudFormation(latency=latency, stack_time=stack_time)
+    context = Context(
+        config=render_parse_load(raw_config, ENVIRONMENT), environment=ENVIRONMENT
+    )
+    action = build.Action(
+        context, provider_builder=InMemoryProviderBuilder(client, poll_interval)
+    )
+    seconds, _ = timed(
+        lambda: action.execute(concurrency=concurrency, executor=executor)
+    )
+    stacks = len(context.get_stacks())
+    statuses = client.statuses()
+    if len(statuses) != stacks or set(statuses.values()) != {"CREATE_COMPLETE"}:
+        raise RuntimeError("deploy did not complete: %s" % statuses)
+    return {
+        "calls": client.calls,
+        "seconds": seconds,
+        "stacks_per_second": stacks / seconds,
+    }
+
+
+def main(args=None):
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--stacks",
+        default=[50, 500, 2000],
+        nargs="+",
+        type=int,
+        help="Number of stacks of each config.",
+    )
+    parser.add_argument(
+        "--repeat", default=3, type=int, help="Number of times to run each phase."
+    )
+    parser.add_argument(
+        "--latency",
+        default=0.01,
+        type=float,
+        help="Seconds each in-memory CloudFormation call takes.",
+    )
+    parser.add_argument(
+        "--stack-time",
+        default=0.0,
+        type=float,
+        help="Seconds each in-memory stack is in progress for.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default=0,
+        type=int,
+        help="Max number of stacks deployed at once (0 is unlimited).",
+    )
+    parser.add_argument(
+        "--executor",
+        default="threads",
+        choices=["threads", "events", "asyncio"],
+        help="CFNgin executor used to deploy.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        default=0.01,
+        type=float,
+        help="Seconds between checks of in-memory stacks that are in progress.",
+    )
+    parser.add_argument(
+        "--no-deploy",
+        action="store_true",
+        help="Skip deploying against the in-memory CloudFormation.",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    options = parser.parse_args(args)
+
+    logging.getLogger("runway").setLevel(logging.ERROR)
+    # in-memory stacks are polled every --poll-interval seconds by each
+    # executor; the pollers are configured by InMemoryProviderBuilder
+    actions_base.STACK_POLL_TIME = options.poll_interval
+    if BENCHMARK_DIR not in sys.path:
+        sys.path.insert(0, BENCHMARK_DIR)
+
+    results = {
+        "parameters": {
+            "concurrency": options.concurrency,
+            "executor": options.executor,
+            "latency": options.latency,
+            "poll_interval": options.poll_interval,
+            "repeat": options.repeat,
+            "stack_time": options.stack_time,
+        },
+        "platform": {
+            "python": platform.python_version(),
+            "runway": __version__,
+            "system": platform.platform(),
+        },
+        "results": {},
+    }
+    for stacks in options.stacks:
+        raw_config = generate_config(stacks)
+        runs = [run_phases(raw_config) for _ in range(options.repeat)]
+        result = {"timings": dict((k, min(i[k] for i in runs)) for k in runs[0])}
+        print("%s stacks" % stacks)
+        for name, seconds in sorted(result["timings"].items()):
+            print("  %-26s %10.6fs" % (name, seconds))
+        if not options.no_deploy:
+            result["deploy"] = run_deploy(
+                raw_config,
+                options.latency,
+                options.stack_time,
+                options.concurrency,
+                options.executor,
+                options.poll_interval,
+            )
+            print(
+                "  %-26s %10.6fs (%.1f stacks/s, %s calls)"
+                % (
+                    "deploy",
+                    result["deploy"]["seconds"],
+                    result["deploy"]["stacks_per_second"],
+                    result["deploy"]["calls"],
+                )
+            )
+        results["results"][str(stacks)] = result
+
+    if options.output:
+        with open(options.output, "w") as stream:
+            json.dump(results, stream, indent=4, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
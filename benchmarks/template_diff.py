@@ -0,0 +1,170 @@
+"""Benchmark diffing a large generated CloudFormation template.
+
+Compares :func:`runway.cfngin.actions.diff.diff_templates` against a
+recursive key-by-key diff of the same templates and against comparing them
+as dicts, which is how ``--fast-diff`` checks whether a template changed
+(templates are only hashed to summarize their differences).
+
+Usage::
+
+    python benchmarks/template_diff.py --resources 5000 --changes 1
+
+"""
+import argparse
+import copy
+import json
+import sys
+import timeit
+
+from runway.cfngin.actions.diff import TemplateNode, diff_templates
+
+
+def generate_template(resources):
+    """Generate a template with the given number of resources.
+
+    Args:
+        resources (int): Number of resources in the template.
+
+    Returns:
+        Dict[str, Any]: The template.
+
+    """
+    template = {
+        "AWSTemplateFormatVersion": "2010-09-09",
+        "Description": "Generated template with %s resources." % resources,
+        "Parameters": {"Environment": {"Type": "String", "Default": "test"}},
+        "Resources": {},
+        "Outputs": {},
+    }
+    for i in range(resources):
+        logical_id = "Bucket%s" % i
+        template["Resources"][logical_id] = {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {
+                "BucketName": {"Fn::Sub": "bucket-%s-${Environment}" % i},
+                "LifecycleConfiguration": {
+                    "Rules": [
+                        {
+                            "ExpirationInDays": 30 + i % 60,
+                            "Id": "expire",
+                            "Status": "Enabled",
+                        }
+                    ]
+                },
+                "Tags": [
+                    {"Key": "Index", "Value": str(i)},
+                    {"Key": "Environment", "Value": {"Ref": "Environment"}},
+                ],
+                "VersioningConfiguration": {"Status": "Enabled"},
+            },
+        }
+        template["Outputs"]["%sArn" % logical_id] = {
+            "Value": {"Fn::GetAtt": [logical_id, "Arn"]}
+        }
+    return template
+
+
+def modify_template(template, changes):
+    """Copy a template, modifying some of its resources.
+
+    Args:
+        template (Dict[str, Any]): The template to copy.
+        changes (int): Number of resources to modify.
+
+    Returns:
+        Dict[str, Any]: The modified copy.
+
+    """
+    result = copy.deepcopy(template)
+    resources = sorted(result["Resources"])
+    step = max(len(resources) // max(changes, 1), 1)
+    for logical_id in resources[::step][:changes]:
+        result["Resources"][logical_id]["Properties"]["VersioningConfiguration"][
+            "Status"
+        ] = "Suspended"
+    return result
+
+
+def recursive_diff(old, new, path=""):
+    """Diff two values key-by-key, descending into every subtree.
+
+    Args:
+        old (Any): Old value.
+        new (Any): New value.
+        path (str): Path of the values.
+
+    Returns:
+        List[str]: Paths that differ.
+
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        paths = []
+        for key in sorted(set(old) | set(new)):
+            key_path = path + "." + key if path else key
+            if key not in old or key not in new:
+                paths.append(key_path)
+            else:
+                paths.extend(recursive_diff(old[key], new[key], key_path))
+        return paths
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        paths = []
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            paths.extend(recursive_diff(old_item, new_item, "%s[%s]" % (path, i)))
+        return paths
+    return [] if old == new else [path]
+
+
+def main(args=None):
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--resources", default=5000, type=int, help="Number of resources."
+    )
+    parser.add_argument(
+        "--changes", default=1, type=int, help="Number of resources to modify."
+    )
+    parser.add_argument(
+        "--repeat", default=5, type=int, help="Number of times to run each case."
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    options = parser.parse_args(args)
+
+    old = generate_template(options.resources)
+    new = modify_template(old, options.changes)
+    unchanged = copy.deepcopy(old)
+    old_node = TemplateNode(old)
+    new_node = TemplateNode(new)
+
+    cases = [
+        ("compare dicts", lambda: old == new),
+        ("compare dicts (unchanged)", lambda: old == unchanged),
+        ("recursive diff", lambda: recursive_diff(old, new)),
+        ("hash templates", lambda: (TemplateNode(old), TemplateNode(new))),
+        ("diff_templates", lambda: diff_templates(old, new)),
+        ("diff_templates (hashed)", lambda: diff_templates(old_node, new_node)),
+    ]
+    results = {
+        "changes": options.changes,
+        "resources": options.resources,
+        "template_size": len(json.dumps(old)),
+        "timings": {},
+    }
+    print(
+        "%s resources (%s bytes), %s modified"
+        % (options.resources, results["template_size"], options.changes)
+    )
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=options.repeat))
+        results["timings"][name] = best
+        print("  %-26s %10.6fs" % (name, best))
+    for change in diff_templates(old_node, new_node)[:10]:
+        print("  %s" % change)
+
+    if options.output:
+        with open(options.output, "w") as stream:
+            json.dump(results, stream, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,46 @@
 """``runway deploy`` command."""
 # docs: file://./../../../docs/source/commands.rst
 import logging
-from typing import Any, Tuple  # pylint: disable=W
+from typing import Any, Optional, Tuple  # pylint: disable=W
 
 import click
 
+from ...cfngin.instrumentation import API_CALLS, TRACER
 from ...core import Runway
 from .. import options
-from ..utils import select_deployments
+from ..utils import api_cassette, select_deployments
 
 LOGGER = logging.getLogger(__name__.replace("._", "."))
 
 
 @click.command("deploy", short_help="deploy things")
+@options.api_stats
+@options.api_stats_json
+@options.cfngin_executor
 @options.ci
 @options.debug
 @options.deploy_environment
 @options.no_color
+@options.record_api
+@options.replay_api
+@options.replay_api_latency
 @options.tags
+@options.trace
 @options.verbose
 @click.pass_context
-def deploy(ctx, tags, **_):  # noqa: D301
-    # type: (click.Context, Tuple[str, ...], Any) -> None
+def deploy(
+    ctx,  # type: click.Context
+    api_stats,  # type: bool
+    api_stats_json,  # type: Optional[str]
+    cfngin_executor,  # type: Optional[str]
+    record_api,  # type: Optional[str]
+    replay_api,  # type: Optional[str]
+    replay_api_latency,  # type: bool
+    tags,  # type: Tuple[str, ...]
+    trace,  # type: Optional[str]
+    **_  # type: Any
+):  # noqa: D301
+    # type: (...) -> None
     """Deploy infrastructure as code.
 
     \b
@@ -37,5 +56,13 @@ def deploy(ctx, tags, **_):  # noqa: D301
     3. Deploys selected in the order defined.
 
     """
-    deployments = select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
-    Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).deploy(deployments)
+    if cfngin_executor:
+        ctx.obj.env.cfngin_executor = cfngin_executor
+    with TRACER.tracing(trace), api_cassette(
+        record_api, replay_api, replay_api_latency
+    ):
+        deployments = select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
+        with API_CALLS.recording(api_stats or bool(api_stats_json), api_stats_json):
+            Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).deploy(
+                deployments
+            )
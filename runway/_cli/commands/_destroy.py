@@ -1,27 +1,46 @@
 """``runway destroy`` command."""
 # docs: file://./../../../docs/source/commands.rst
 import logging
-from typing import Any, Tuple  # pylint: disable=W
+from typing import Any, Optional, Tuple  # pylint: disable=W
 
 import click
 
+from ...cfngin.instrumentation import API_CALLS, TRACER
 from ...core import Runway
 from .. import options
-from ..utils import select_deployments
+from ..utils import api_cassette, select_deployments
 
 LOGGER = logging.getLogger(__name__.replace("._", "."))
 
 
 @click.command("destroy", short_help="destroy things")
+@options.api_stats
+@options.api_stats_json
+@options.cfngin_executor
 @options.ci
 @options.debug
 @options.deploy_environment
 @options.no_color
+@options.record_api
+@options.replay_api
+@options.replay_api_latency
 @options.tags
+@options.trace
 @options.verbose
 @click.pass_context
-def destroy(ctx, tags, **_):  # noqa: D301
-    # type: (click.Context, Tuple[str, ...], Any) -> None
+def destroy(
+    ctx,  # type: click.Context
+    api_stats,  # type: bool
+    api_stats_json,  # type: Optional[str]
+    cfngin_executor,  # type: Optional[str]
+    record_api,  # type: Optional[str]
+    replay_api,  # type: Optional[str]
+    replay_api_latency,  # type: bool
+    tags,  # type: Tuple[str, ...]
+    trace,  # type: Optional[str]
+    **_  # type: Any
+):  # noqa: D301
+    # type: (...) -> None
     """Destroy infrastructure as code.
 
     \b
@@ -37,6 +56,8 @@ def destroy(ctx, tags, **_):  # noqa: D301
     3. Destroys selected in reverse the order defined.
 
     """
+    if cfngin_executor:
+        ctx.obj.env.cfngin_executor = cfngin_executor
     if not ctx.obj.env.ci:
         click.secho(
             "[WARNING] Runway is about to be run in DESTROY mode. " "[WARNING]",
@@ -51,7 +72,13 @@ def destroy(ctx, tags, **_):  # noqa: D301
         if not click.confirm("\nProceed?"):
             ctx.exit(0)
         click.echo("")
-    deployments = Runway.reverse_deployments(
-        select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
-    )
-    Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).destroy(deployments)
+    with TRACER.tracing(trace), api_cassette(
+        record_api, replay_api, replay_api_latency
+    ):
+        deployments = Runway.reverse_deployments(
+            select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
+        )
+        with API_CALLS.recording(api_stats or bool(api_stats_json), api_stats_json):
+            Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).destroy(
+                deployments
+            )
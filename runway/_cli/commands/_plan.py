@@ -1,27 +1,53 @@
 """``runway plan`` command."""
 # docs: file://./../../../docs/source/commands.rst
 import logging
-from typing import Any, Tuple  # pylint: disable=W
+from typing import Any, Optional, Tuple  # pylint: disable=W
 
 import click
 
 from ...core import Runway
 from .. import options
-from ..utils import select_deployments
+from ..utils import api_cassette, select_deployments
 
 LOGGER = logging.getLogger(__name__.replace("._", "."))
 
 
 @click.command("plan", short_help="plan things")
+@options.cfngin_executor
 @options.ci
 @options.debug
 @options.deploy_environment
+@click.option(
+    "--fast-diff",
+    default=False,
+    envvar="RUNWAY_CFNGIN_FAST_DIFF",
+    is_flag=True,
+    help="Compare deployed CloudFormation stacks locally, only creating "
+    "change sets for stacks that differ.",
+)
 @options.no_color
+@options.record_api
+@options.replay_api
+@options.replay_api_latency
 @options.tags
 @options.verbose
 @click.pass_context
-def plan(ctx, tags, **_):
-    # type: (click.Context, Tuple[str, ...], Any) -> None
+def plan(
+    ctx,  # type: click.Context
+    cfngin_executor,  # type: Optional[str]
+    fast_diff,  # type: bool
+    record_api,  # type: Optional[str]
+    replay_api,  # type: Optional[str]
+    replay_api_latency,  # type: bool
+    tags,  # type: Tuple[str, ...]
+    **_  # type: Any
+):
+    # type: (...) -> None
     """Determine what infrastructure changes will occur during the next deploy."""
-    deployments = select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
-    Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).plan(deployments)
+    if cfngin_executor:
+        ctx.obj.env.cfngin_executor = cfngin_executor
+    if fast_diff:
+        ctx.obj.env.cfngin_fast_diff = True
+    with api_cassette(record_api, replay_api, replay_api_latency):
+        deployments = select_deployments(ctx, ctx.obj.runway_config.deployments, tags)
+        Runway(ctx.obj.runway_config, ctx.obj.get_runway_context()).plan(deployments)
@@ -12,11 +12,18 @@ LOGGER = logging.getLogger(__name__.replace("._", "."))
 
 
 @click.command("takeoff", short_help="alias of deploy")
+@options.api_stats
+@options.api_stats_json
+@options.cfngin_executor
 @options.ci
 @options.debug
 @options.deploy_environment
 @options.no_color
+@options.record_api
+@options.replay_api
+@options.replay_api_latency
 @options.tags
+@options.trace
 @options.verbose
 @click.pass_context
 def takeoff(ctx, **kwargs):
@@ -2,12 +2,13 @@
 import argparse
 import logging
 import os
-from typing import Any, Dict  # pylint: disable=W
+from typing import Any, Dict, Optional  # pylint: disable=W
 
 import click
 
 from runway import __version__
 
+from ..cfngin.instrumentation import PROFILER
 from . import commands, options
 from .logs import setup_logging
 from .utils import CliContext
@@ -64,10 +65,11 @@ class _CliGroup(click.Group):  # pylint: disable=too-few-public-methods
 @click.version_option(__version__, message="%(version)s")
 @options.debug
 @options.no_color
+@options.profile
 @options.verbose
 @click.pass_context
-def cli(ctx, **_):
-    # type: (click.Context, Any) -> None
+def cli(ctx, profile=None, **_):
+    # type: (click.Context, Optional[str], Any) -> None
     """Runway CLI.
 
     Full documentation available at https://docs.onica.com/projects/runway/.
@@ -78,6 +80,9 @@ def cli(ctx, **_):
         debug=opts["debug"], no_color=opts["no_color"], verbose=opts["verbose"]
     )
     ctx.obj = CliContext(**opts)
+    if profile:
+        PROFILER.start(profile)
+        ctx.call_on_close(PROFILER.stop)
 
 
 # register all the other commands from the importable modules defined
@@ -2,6 +2,34 @@
 # pylint: disable=invalid-name
 import click
 
+api_stats = click.option(
+    "--api-stats",
+    default=False,
+    envvar="RUNWAY_API_STATS",
+    is_flag=True,
+    help="Record the AWS API calls made by CFNgin and log a summary once done.",
+)
+
+api_stats_json = click.option(
+    "--api-stats-json",
+    envvar="RUNWAY_API_STATS_JSON",
+    metavar="<file>",
+    type=click.Path(dir_okay=False),
+    help="Record the AWS API calls made by CFNgin and write them to a JSON file.",
+)
+
+cfngin_executor = click.option(
+    "--cfngin-executor",
+    envvar="RUNWAY_CFNGIN_EXECUTOR",
+    type=click.Choice(["threads", "events", "asyncio"]),
+    help="How CFNgin runs the stacks of a plan. "
+    '"threads" (default for deploy and destroy) uses a thread per stack. '
+    '"events" (default for plan) uses a small pool of threads that are '
+    "released while stacks or change sets are in progress. "
+    '"asyncio" runs stacks on an event loop, offloading blocking work to a '
+    "small pool of threads.",
+)
+
 ci = click.option(
     "--ci",
     default=False,
@@ -34,6 +62,42 @@ no_color = click.option(
     help="Disable color in Runway's logs.",
 )
 
+profile = click.option(
+    "--profile",
+    envvar="RUNWAY_PROFILE",
+    metavar="<dir>",
+    type=click.Path(file_okay=False),
+    help="Profile config parsing, lookups, blueprint rendering, hooks and "
+    "module execution, writing a .pstats file for each to a directory.",
+)
+
+record_api = click.option(
+    "--record-api",
+    envvar="RUNWAY_RECORD_API",
+    metavar="<file>",
+    type=click.Path(dir_okay=False),
+    help="Record the AWS API calls made by Runway and CFNgin to a cassette "
+    "file (secrets are redacted).",
+)
+
+replay_api = click.option(
+    "--replay-api",
+    envvar="RUNWAY_REPLAY_API",
+    metavar="<file>",
+    type=click.Path(dir_okay=False, exists=True),
+    help="Answer AWS API calls from a cassette file written by --record-api "
+    "instead of AWS.",
+)
+
+replay_api_latency = click.option(
+    "--replay-api-latency/--no-replay-api-latency",
+    default=True,
+    envvar="RUNWAY_REPLAY_API_LATENCY",
+    help="Whether replayed AWS API calls take as long as they did when "
+    "recorded or return immediately.",
+    show_default=True,
+)
+
 tags = click.option(
     "--tag",
     "tags",
@@ -46,6 +110,15 @@ tags = click.option(
     " with BOTH tags).",
 )
 
+trace = click.option(
+    "--trace",
+    envvar="RUNWAY_TRACE",
+    metavar="<file>",
+    type=click.Path(dir_okay=False),
+    help="Write a Chrome trace of the run (config loading, hooks, "
+    "CFNgin stacks and AWS API calls) to a file.",
+)
+
 verbose = click.option(
     "--verbose",
     default=False,
@@ -1,4 +1,5 @@
 """CLI utils."""
+import contextlib
 import logging
 import os
 import sys
@@ -8,6 +9,8 @@ import click
 import yaml
 from six.moves.collections_abc import MutableMapping  # pylint: disable=E
 
+from ..cfngin.cassette import CASSETTE
+from ..cfngin.instrumentation import PROFILER, TRACER
 from ..config import (  # noqa pylint: disable=W
     Config,
     DeploymentDefinition,
@@ -66,7 +69,10 @@ class CliContext(MutableMapping):
     def runway_config(self):
         # type: () -> Config
         """Runway config."""
-        config = Config.load_from_file(self.runway_config_path)
+        with TRACER.span("load config", path=self.runway_config_path), PROFILER.phase(
+            "config"
+        ):
+            config = Config.load_from_file(self.runway_config_path)
         self.env.ignore_git_branch = config.ignore_git_branch
         return config
 
@@ -197,6 +203,27 @@ class CliContext(MutableMapping):
         return "CliContext({})".format(self.__dict__)  # cov: ignore
 
 
+@contextlib.contextmanager
+def api_cassette(record=None, replay=None, latency=True):
+    # type: (Optional[str], Optional[str], bool) -> Iterator[None]
+    """Record AWS API calls to or replay them from a cassette.
+
+    Args:
+        record: Path of a cassette to record to.
+        replay: Path of a cassette to replay from.
+        latency: Whether replayed calls take as long as they did when
+            recorded.
+
+    Raises:
+        click.UsageError: Both recording and replaying.
+
+    """
+    if record and replay:
+        raise click.UsageError("--record-api and --replay-api are mutually exclusive")
+    with CASSETTE.recording(record), CASSETTE.replaying(replay, latency):
+        yield
+
+
 def select_deployments(
     ctx,  # type: click.Context
     deployments,  # type: List[DeploymentDefinition]
@@ -1,4 +1,7 @@
 """CFNgin base action."""
+import contextlib
+import copy
+import functools
 import logging
 import os
 import sys
@@ -6,10 +9,12 @@ import threading
 
 import botocore.exceptions
 
-from ..dag import ThreadedWalker, UnlimitedSemaphore, walk
+from ..dag import AsyncioWalker, EventWalker, ThreadedWalker, UnlimitedSemaphore, walk
 from ..exceptions import PlanFailed
-from ..plan import Graph, Plan, Step, merge_graphs
-from ..status import COMPLETE
+from ..instrumentation import TRACER
+from ..plan import Graph, Plan, Step
+from ..rate_limit import RATE_LIMITER
+from ..status import COMPLETE, PENDING, SUBMITTED, WAITING
 from ..util import ensure_s3_bucket, get_s3_endpoint, stack_template_key_name
 
 LOGGER = logging.getLogger(__name__)
@@ -23,8 +28,12 @@ LOGGER = logging.getLogger(__name__)
 # This can be controlled via an environment variable, mostly for testing.
 STACK_POLL_TIME = int(os.environ.get("CFNGIN_STACK_POLL_TIME", 30))
 
+# Number of threads used to run steps when using the "events" or "asyncio"
+# executor.
+EVENT_WALKER_WORKERS = 10
 
-def build_walker(concurrency):
+
+def build_walker(concurrency, executor=None, setup=None):
     """Return a function for waling a graph.
 
     Passed to :class:`runway.cfngin.plan.Plan` for walking the graph.
@@ -38,13 +47,41 @@ def build_walker(concurrency):
     If concurrency is greater than 1, it will return a walker that will only
     execute a maximum of concurrency steps at any given time.
 
+    If executor is ``events``, steps are run by a small pool of threads that
+    is released while steps are waiting on their stacks (see
+    :class:`runway.cfngin.dag.EventWalker`). Concurrency limits the number
+    of steps in progress at any given time.
+
+    If executor is ``asyncio``, steps are walked on an event loop (see
+    :class:`runway.cfngin.dag.AsyncioWalker`), offloading each step to a
+    small pool of threads. Concurrency limits the number of steps in
+    progress at any given time.
+
     Args:
         concurrency (int): Number of threads to use while walking.
+        executor (Optional[str]): ``threads`` (default), ``events`` or
+            ``asyncio``.
+        setup (Optional[Callable[[asyncio.AbstractEventLoop], Any]]): Passed
+            to :class:`runway.cfngin.dag.AsyncioWalker`.
 
     Returns:
         Callable[..., Any]: Function to walk a :class:`runway.cfngin.dag.DAG`.
 
     """
+    if executor == "events":
+        return EventWalker(
+            max_workers=min(concurrency or EVENT_WALKER_WORKERS, EVENT_WALKER_WORKERS),
+            max_in_flight=concurrency,
+        ).walk
+    if executor == "asyncio":
+        if sys.version_info.major < 3:
+            raise NotImplementedError("the asyncio executor requires Python 3")
+        return AsyncioWalker(
+            max_workers=min(concurrency or EVENT_WALKER_WORKERS, EVENT_WALKER_WORKERS),
+            max_in_flight=concurrency,
+            setup=setup,
+        ).walk
+
     if concurrency == 1:
         return walk
 
@@ -73,6 +110,48 @@ def stack_template_url(bucket_name, blueprint, endpoint):
     return "%s/%s/%s" % (endpoint, bucket_name, key_name)
 
 
+def deferrable(func):
+    """Decorate a stack action to support :meth:`runway.cfngin.plan.Step.run_deferred`.
+
+    When the action is called with ``deferred=True`` and returns a submitted
+    or waiting status, the status is returned with a ``waiter`` from the
+    provider of the stack. The waiter is done once the stack is no longer in
+    progress so the step can be resumed instead of polling.
+
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, stack, **kwargs):
+        """Call the action, adding a waiter to the status it returns."""
+        status = func(self, stack, **kwargs)
+        if kwargs.get("deferred") and (status == SUBMITTED or status is WAITING):
+            waiter = self.build_provider(stack).get_stack_waiter(stack.fqn)
+            if waiter:
+                status = copy.copy(status)
+                status.waiter = waiter
+        return status
+
+    return wrapper
+
+
+def get_wait_time(status):
+    """Get the time to wait before checking on a stack.
+
+    Args:
+        status (Optional[:class:`runway.cfngin.status.Status`]): The current
+            status of the step.
+
+    Returns:
+        int: ``0`` if the step has not started yet or its stack is known to
+        no longer be in progress, otherwise :data:`STACK_POLL_TIME`.
+
+    """
+    waiter = getattr(status, "waiter", None)
+    if status is PENDING or (waiter and waiter.done.is_set()):
+        return 0
+    return STACK_POLL_TIME
+
+
 class BaseAction(object):
     """Actions perform the actual work of each Command.
 
@@ -149,13 +228,50 @@ class BaseAction(object):
         """
         return self.provider_builder.build(region=stack.region, profile=stack.profile)
 
+    @contextlib.contextmanager
+    def use_event_loop(self, loop, transport=None):
+        """Poll the status of stacks from an event loop.
+
+        Used as the ``setup`` of the ``asyncio`` executor. While active,
+        providers wait on stacks using
+        :class:`runway.cfngin.providers.aws.default.AsyncStackStatusPoller`.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Event loop walking the plan.
+            transport (Optional[Any]): Used to make calls to CloudFormation.
+                Defaults to
+                :class:`runway.cfngin.providers.aws.default.ThreadTransport`.
+
+        """
+        # imported here to avoid a circular import with actions.diff
+        from ..providers.aws.default import (  # pylint: disable=import-outside-toplevel
+            AsyncStackStatusPoller,
+        )
+
+        if not hasattr(self.provider_builder, "set_stack_status_poller_factory"):
+            yield
+            return
+        self.provider_builder.set_stack_status_poller_factory(
+            functools.partial(AsyncStackStatusPoller, loop=loop, transport=transport)
+        )
+        try:
+            yield
+        finally:
+            self.provider_builder.set_stack_status_poller_factory(None)
+
     def ensure_cfn_bucket(self):
         """CloudFormation bucket where templates will be stored."""
         if self.bucket_name:
             ensure_s3_bucket(self.s3_conn, self.bucket_name, self.bucket_region)
 
     def execute(self, **kwargs):
-        """Run the action with pre and post steps."""
+        """Run the action with pre and post steps.
+
+        Once done, a summary of the AWS API calls made by the action is
+        logged.
+
+        """
+        api_stats = RATE_LIMITER.stats()
         try:
             self.pre_run(**kwargs)
             self.run(**kwargs)
@@ -163,6 +279,8 @@ class BaseAction(object):
         except PlanFailed as err:
             LOGGER.error(str(err))
             sys.exit(1)
+        finally:
+            RATE_LIMITER.log_summary(since=api_stats)
 
     def pre_run(self, **kwargs):
         """Perform steps before running the action."""
@@ -184,29 +302,30 @@ class BaseAction(object):
             str: URL to the template in S3.
 
         """
-        key_name = stack_template_key_name(blueprint)
+        key_name = stack_template_key_name(blueprint)  # renders the blueprint
         template_url = self.stack_template_url(blueprint)
-        try:
-            template_exists = (
-                self.s3_conn.head_object(Bucket=self.bucket_name, Key=key_name)
-                is not None
+        with TRACER.span("upload", "stack", blueprint=blueprint.name):
+            try:
+                template_exists = (
+                    self.s3_conn.head_object(Bucket=self.bucket_name, Key=key_name)
+                    is not None
+                )
+            except botocore.exceptions.ClientError as err:
+                if err.response["Error"]["Code"] == "404":
+                    template_exists = False
+                else:
+                    raise
+
+            if template_exists and not force:
+                LOGGER.debug("CloudFormation template already exists: %s", template_url)
+                return template_url
+            self.s3_conn.put_object(
+                Bucket=self.bucket_name,
+                Key=key_name,
+                Body=blueprint.rendered,
+                ServerSideEncryption="AES256",
+                ACL="bucket-owner-full-control",
             )
-        except botocore.exceptions.ClientError as err:
-            if err.response["Error"]["Code"] == "404":
-                template_exists = False
-            else:
-                raise
-
-        if template_exists and not force:
-            LOGGER.debug("CloudFormation template already exists: %s", template_url)
-            return template_url
-        self.s3_conn.put_object(
-            Bucket=self.bucket_name,
-            Key=key_name,
-            Body=blueprint.rendered,
-            ServerSideEncryption="AES256",
-            ACL="bucket-owner-full-control",
-        )
         LOGGER.debug("blueprint %s pushed to %s", blueprint.name, template_url)
         return template_url
 
@@ -252,14 +371,23 @@ class BaseAction(object):
             """Target function."""
             return COMPLETE
 
+        if reverse:
+            # stacks that depend on the targeted stacks are part of the plan
+            stacks = self.context.get_stacks()
+            targets = self.context.get_targets()
+        else:
+            stacks = self.context.get_targeted_stacks()
+            targets = self.context.get_targeted_targets()
+
         steps = [
-            Step(stack, fn=self._stack_action, watch_func=tail)
-            for stack in self.context.get_stacks()
+            Step(stack, fn=self._stack_action, watch_func=tail) for stack in stacks
         ]
 
-        steps += [Step(target, fn=target_fn) for target in self.context.get_targets()]
+        steps += [Step(target, fn=target_fn) for target in targets]
 
-        graph = Graph.from_steps(steps)
+        graph = Graph.from_steps(
+            steps, partial=bool(self.context.stack_names and not reverse)
+        )
 
         if include_persistent_graph and self.context.persistent_graph:
             persist_steps = Step.from_persistent_graph(
@@ -268,8 +396,7 @@ class BaseAction(object):
                 fn=self._stack_action,
                 watch_func=tail,
             )
-            persist_graph = Graph.from_steps(persist_steps)
-            graph = merge_graphs(graph, persist_graph)
+            graph.merge(Graph.from_steps(persist_steps))
 
         return Plan(
             context=self.context,
@@ -1,4 +1,6 @@
 """CFNgin build action."""
+import hashlib
+import json
 import logging
 
 from ..exceptions import (
@@ -8,24 +10,25 @@ from ..exceptions import (
     StackDoesNotExist,
 )
 from ..hooks import utils
+from ..instrumentation import TRACER
 from ..plan import Graph, Plan, Step
 from ..providers.base import Template
 from ..status import (
     COMPLETE,
     INTERRUPTED,
-    PENDING,
     SUBMITTED,
     WAITING,
     CompleteStatus,
     DidNotChangeStatus,
     FailedStatus,
+    InputsUnchangedStatus,
     NotSubmittedStatus,
     NotUpdatedStatus,
     SkippedStatus,
 )
 from ..status import StackDoesNotExist as StackDoesNotExistStatus
 from ..status import SubmittedStatus
-from .base import STACK_POLL_TIME, BaseAction, build_walker
+from .base import BaseAction, build_walker, deferrable, get_wait_time
 
 LOGGER = logging.getLogger(__name__)
 
@@ -38,6 +41,46 @@ def build_stack_tags(stack):
     return [{"Key": t[0], "Value": t[1]} for t in stack.tags.items()]
 
 
+def stack_fingerprint(stack, upstream=None):
+    """Create a fingerprint of the inputs of a stack.
+
+    The fingerprint covers the rendered template, the resolved values of the
+    CloudFormation Parameters (as they are submitted), the stack definition
+    and the fingerprints of upstream stacks. Since the template is rendered,
+    changes to any code used by the blueprint or to the resolved variables
+    (including lookups and the outputs of other stacks) are included.
+
+    The stack must be resolved before its fingerprint can be created.
+
+    Args:
+        stack (:class:`runway.cfngin.stack.Stack`): A resolved CFNgin stack.
+        upstream (Optional[Dict[str, str]]): Fingerprints of the stacks that
+            this stack requires.
+
+    Returns:
+        Optional[str]: The fingerprint. ``None`` if the inputs of the stack
+        could not be serialized.
+
+    """
+    parameters = _resolve_parameters(stack.parameter_values, stack.blueprint)
+    data = {
+        "definition": stack.definition.to_primitive(),
+        "fqn": stack.fqn,
+        "parameters": {key: str(value) for key, value in parameters.items()},
+        "stack_policy": stack.stack_policy,
+        "tags": stack.tags,
+        "template": hashlib.sha256(
+            stack.blueprint.rendered.encode("utf-8")
+        ).hexdigest(),
+        "upstream": upstream or {},
+    }
+    try:
+        content = json.dumps(data, separators=(",", ":"), sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 def should_update(stack):
     """Test whether a stack should be submitted for updates to CloudFormation.
 
@@ -212,6 +255,53 @@ class Action(BaseAction):
     DESCRIPTION = "Create/Update stacks"
     NAME = "build"
 
+    def __init__(self, context, provider_builder=None, cancel=None):
+        """Instantiate class.
+
+        Args:
+            context (:class:`runway.cfngin.context.Context`): The context for
+                the current run.
+            provider_builder (Optional[:class:`BaseProviderBuilder`]):
+                An object that will build a provider that will be interacted
+                with in order to perform the necessary actions.
+            cancel (threading.Event): Cancel handler.
+
+        """
+        super(Action, self).__init__(context, provider_builder, cancel)
+        self.fingerprints = {}
+
+    def _check_fingerprint(self, stack):
+        """Resolve a stack and create the fingerprint of its inputs.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): Stack being launched.
+
+        Returns:
+            bool: The inputs of the stack are unchanged since it was last
+            built. The stack's outputs are set from the last build.
+
+        """
+        LOGGER.debug("%s:resolving stack", stack.fqn)
+        stack.resolve(self.context, self.provider)
+        fingerprint = stack_fingerprint(
+            stack, dict((name, self.fingerprints.get(name)) for name in stack.requires),
+        )
+        self.fingerprints[stack.name] = fingerprint
+        previous = self.context.stack_fingerprints.get(stack.name, {})
+        if stack.force or not fingerprint or fingerprint != previous.get("fingerprint"):
+            return False
+        stack.set_outputs(previous.get("outputs") or {})
+        return True
+
+    def _record_fingerprint(self, stack):
+        """Store the fingerprint of a stack that was successfully built."""
+        fingerprint = self.fingerprints.get(stack.name)
+        if fingerprint:
+            self.context.stack_fingerprints[stack.name] = {
+                "fingerprint": fingerprint,
+                "outputs": stack.outputs or {},
+            }
+
     @staticmethod
     def build_parameters(stack, provider_stack=None):
         """Build the CloudFormation Parameters for our stack.
@@ -244,6 +334,7 @@ class Action(BaseAction):
 
         return param_list
 
+    @deferrable
     def _destroy_stack(  # pylint: disable=too-many-return-statements
         self, stack, **kwargs
     ):
@@ -257,7 +348,7 @@ class Action(BaseAction):
 
         """
         stack_status = kwargs.get("status")
-        wait_time = 0 if stack_status is PENDING else STACK_POLL_TIME
+        wait_time = get_wait_time(stack_status)
         if self.cancel.wait(wait_time):
             return INTERRUPTED
 
@@ -291,6 +382,7 @@ class Action(BaseAction):
             return SkippedStatus(reason="canceled execution")
 
     # TODO refactor long if, elif, else block
+    @deferrable
     def _launch_stack(self, stack, **kwargs):  # pylint: disable=R
         """Handle the creating or updating of a stack in CloudFormation.
 
@@ -302,13 +394,23 @@ class Action(BaseAction):
 
         """
         old_status = kwargs.get("status")
-        wait_time = 0 if old_status is PENDING else STACK_POLL_TIME
+        wait_time = get_wait_time(old_status)
         if self.cancel.wait(wait_time):
             return INTERRUPTED
 
         if not should_submit(stack):
             return NotSubmittedStatus()
 
+        resolved = False
+        if (
+            old_status != SUBMITTED
+            and self.context.stack_fingerprints_location
+            and should_update(stack)
+        ):
+            if self._check_fingerprint(stack):
+                return InputsUnchangedStatus()
+            resolved = True
+
         provider = self.build_provider(stack)
 
         try:
@@ -361,12 +463,14 @@ class Action(BaseAction):
 
             elif provider.is_stack_completed(provider_stack):
                 stack.set_outputs(provider.get_output_dict(provider_stack))
+                self._record_fingerprint(stack)
                 return CompleteStatus(old_status.reason)
             else:
                 return old_status
 
-        LOGGER.debug("%s:resolving stack", stack.fqn)
-        stack.resolve(self.context, self.provider)
+        if not resolved:
+            LOGGER.debug("%s:resolving stack", stack.fqn)
+            stack.resolve(self.context, self.provider)
 
         LOGGER.debug("%s:launching stack now", stack.fqn)
         template = self._template(stack.blueprint)
@@ -377,26 +481,28 @@ class Action(BaseAction):
 
         if recreate:
             LOGGER.debug("%s:re-creating stack", stack.fqn)
-            provider.create_stack(
-                stack.fqn,
-                template,
-                parameters,
-                tags,
-                stack_policy=stack_policy,
-                termination_protection=stack.termination_protection,
-            )
+            with TRACER.span("submit", "stack", stack=stack.fqn):
+                provider.create_stack(
+                    stack.fqn,
+                    template,
+                    parameters,
+                    tags,
+                    stack_policy=stack_policy,
+                    termination_protection=stack.termination_protection,
+                )
             return SubmittedStatus("re-creating stack")
         if not provider_stack:
             LOGGER.debug("%s:creating new stack", stack.fqn)
-            provider.create_stack(
-                stack.fqn,
-                template,
-                parameters,
-                tags,
-                force_change_set,
-                stack_policy=stack_policy,
-                termination_protection=stack.termination_protection,
-            )
+            with TRACER.span("submit", "stack", stack=stack.fqn):
+                provider.create_stack(
+                    stack.fqn,
+                    template,
+                    parameters,
+                    tags,
+                    force_change_set,
+                    stack_policy=stack_policy,
+                    termination_protection=stack.termination_protection,
+                )
             return SubmittedStatus("creating new stack")
 
         try:
@@ -405,17 +511,18 @@ class Action(BaseAction):
                 return WAITING
             if provider.prepare_stack_for_update(provider_stack, tags):
                 existing_params = provider_stack.get("Parameters", [])
-                provider.update_stack(
-                    stack.fqn,
-                    template,
-                    existing_params,
-                    parameters,
-                    tags,
-                    force_interactive=stack.protected,
-                    force_change_set=force_change_set,
-                    stack_policy=stack_policy,
-                    termination_protection=stack.termination_protection,
-                )
+                with TRACER.span("submit", "stack", stack=stack.fqn):
+                    provider.update_stack(
+                        stack.fqn,
+                        template,
+                        existing_params,
+                        parameters,
+                        tags,
+                        force_interactive=stack.protected,
+                        force_change_set=force_change_set,
+                        stack_policy=stack_policy,
+                        termination_protection=stack.termination_protection,
+                    )
 
                 LOGGER.debug("%s:updating existing stack", stack.fqn)
                 return SubmittedStatus("updating existing stack")
@@ -425,6 +532,7 @@ class Action(BaseAction):
             return SkippedStatus(reason="canceled execution")
         except StackDidNotChange:
             stack.set_outputs(provider.get_output_dict(provider_stack))
+            self._record_fingerprint(stack)
             return DidNotChangeStatus()
 
     @property
@@ -477,7 +585,7 @@ class Action(BaseAction):
             return self._generate_plan(tail)
 
         graph = Graph()
-        config_stack_names = [stack.name for stack in self.context.get_stacks()]
+        config_stack_names = [stack.name for stack in self.context.config.stacks or []]
         inverse_steps = []
         persist_graph = self.context.persistent_graph.transposed()
 
@@ -508,12 +616,14 @@ class Action(BaseAction):
                 fn=self._launch_stack,
                 watch_func=(self._tail_stack if tail else None),
             )
-            for stack in self.context.get_stacks()
+            for stack in self.context.get_targeted_stacks()
         ]
 
-        steps += [Step(target, fn=target_fn) for target in self.context.get_targets()]
+        steps += [
+            Step(target, fn=target_fn) for target in self.context.get_targeted_targets()
+        ]
 
-        graph.add_steps(steps)
+        graph.add_steps(steps, partial=bool(self.context.stack_names))
 
         return Plan(context=self.context, description=self.DESCRIPTION, graph=graph)
 
@@ -541,10 +651,15 @@ class Action(BaseAction):
             plan.outline(logging.DEBUG)
             self.context.lock_persistent_graph(plan.lock_code)
             LOGGER.debug("launching stacks: %s", ", ".join(plan.keys()))
-            walker = build_walker(kwargs.get("concurrency", 0))
+            walker = build_walker(
+                kwargs.get("concurrency", 0),
+                kwargs.get("executor"),
+                setup=self.use_event_loop,
+            )
             try:
                 plan.execute(walker)
             finally:
+                self.context.put_stack_fingerprints()
                 # always unlock the graph at the end
                 self.context.unlock_persistent_graph(plan.lock_code)
         else:
@@ -3,10 +3,11 @@ import logging
 
 from ..exceptions import StackDoesNotExist
 from ..hooks.utils import handle_hooks
-from ..status import INTERRUPTED, PENDING, SUBMITTED, CompleteStatus
+from ..instrumentation import TRACER
+from ..status import INTERRUPTED, SUBMITTED, CompleteStatus
 from ..status import StackDoesNotExist as StackDoesNotExistStatus
 from ..status import SubmittedStatus
-from .base import STACK_POLL_TIME, BaseAction, build_walker
+from .base import BaseAction, build_walker, deferrable, get_wait_time
 
 LOGGER = logging.getLogger(__name__)
 
@@ -35,9 +36,10 @@ class Action(BaseAction):
         """Run against a step."""
         return self._destroy_stack
 
+    @deferrable
     def _destroy_stack(self, stack, **kwargs):
         old_status = kwargs.get("status")
-        wait_time = 0 if old_status is PENDING else STACK_POLL_TIME
+        wait_time = get_wait_time(old_status)
         if self.cancel.wait(wait_time):
             return INTERRUPTED
 
@@ -64,7 +66,8 @@ class Action(BaseAction):
         if provider.is_stack_in_progress(provider_stack):
             return DESTROYING_STATUS
         LOGGER.debug("%s:destroying stack", stack.fqn)
-        provider.destroy_stack(provider_stack)
+        with TRACER.span("submit", "stack", stack=stack.fqn):
+            provider.destroy_stack(provider_stack)
         return DESTROYING_STATUS
 
     def pre_run(self, **kwargs):
@@ -90,7 +93,11 @@ class Action(BaseAction):
             # steps to COMPLETE in order to log them
             plan.outline(logging.DEBUG)
             self.context.lock_persistent_graph(plan.lock_code)
-            walker = build_walker(kwargs.get("concurrency", 0))
+            walker = build_walker(
+                kwargs.get("concurrency", 0),
+                kwargs.get("executor"),
+                setup=self.use_event_loop,
+            )
             try:
                 plan.execute(walker)
             finally:
@@ -1,11 +1,18 @@
 """CFNgin diff action."""
+import hashlib
+import json
 import logging
 import sys
+import threading
+from json.encoder import encode_basestring
 from operator import attrgetter
 
 from botocore.exceptions import ClientError
+from six.moves import queue
 
+from ..._logging import LogLevels
 from ...core.providers.aws.s3 import Bucket
+from ...util import JsonEncoder
 from .. import exceptions
 from ..status import (
     COMPLETE,
@@ -15,6 +22,8 @@ from ..status import (
     SkippedStatus,
 )
 from ..status import StackDoesNotExist as StackDoesNotExistStatus
+from ..status import SubmittedStatus
+from ..util import parse_cloudformation_template
 from . import build
 from .base import build_walker
 
@@ -151,6 +160,397 @@ def diff_parameters(old_params, new_params):
     return diff
 
 
+class TemplateNode(object):
+    """Subtree of a template with a digest of its content.
+
+    The digest of the template and of each of its sections is derived from
+    the digests of their children (Merkle-style) so that identical sections
+    and items (e.g. resources) can be compared in constant time once hashed.
+    Items are digested from their canonical JSON and are only expanded into
+    child nodes when they are descended into.
+
+    Attributes:
+        digest (str): Digest of the subtree.
+        value (Any): The value this node was created from.
+
+    """
+
+    MERKLE_DEPTH = 2  # the template and its sections
+
+    __slots__ = ("_children", "digest", "value")
+
+    def __init__(self, value, depth=0):
+        """Instantiate class.
+
+        Args:
+            value (Any): A parsed template or a subtree of one.
+            depth (int): Depth of the subtree within the template.
+
+        """
+        self._children = None
+        self.value = value
+        if depth < self.MERKLE_DEPTH and isinstance(value, dict):
+            self._children = {
+                str(key): TemplateNode(child, depth + 1) for key, child in value.items()
+            }
+            content = "{" + ",".join(
+                encode_basestring(key) + ":" + node.digest
+                for key, node in sorted(self._children.items())
+            )
+        else:
+            content = json.dumps(
+                value, cls=JsonEncoder, separators=(",", ":"), sort_keys=True
+            )
+        self.digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    @property
+    def children(self):
+        """Child nodes of a dict or list.
+
+        Returns:
+            Union[Dict[str, TemplateNode], List[TemplateNode], None]: ``None``
+            for scalar values.
+
+        """
+        if self._children is None:
+            if isinstance(self.value, dict):
+                self._children = {
+                    str(key): TemplateNode(child, self.MERKLE_DEPTH)
+                    for key, child in self.value.items()
+                }
+            elif isinstance(self.value, list):
+                self._children = [
+                    TemplateNode(child, self.MERKLE_DEPTH) for child in self.value
+                ]
+        return self._children
+
+    def __eq__(self, other):
+        """Compare if self is equal to another object."""
+        return isinstance(other, TemplateNode) and self.digest == other.digest
+
+    def __ne__(self, other):
+        """Compare if self is not equal to another object."""
+        return not self == other
+
+    def __hash__(self):
+        """Hash of the node."""
+        return hash(self.digest)
+
+
+class TemplateChange(object):
+    """Change to a top-level item of a template section (e.g. a resource).
+
+    Attributes:
+        action (str): One of ``ADDED``, ``REMOVED`` or ``MODIFIED``.
+        logical_id (Optional[str]): Logical ID of the item within the
+            section. ``None`` when the section is a single value
+            (e.g. ``Description``).
+        paths (List[str]): Dotted paths within the item that were modified.
+        section (str): Template section (e.g. ``Resources``).
+
+    """
+
+    ADDED = "ADDED"
+    REMOVED = "REMOVED"
+    MODIFIED = "MODIFIED"
+
+    SYMBOLS = {ADDED: "+", REMOVED: "-", MODIFIED: "~"}
+
+    def __init__(self, section, logical_id, action, paths=None):
+        """Instantiate class."""
+        self.action = action
+        self.logical_id = logical_id
+        self.paths = paths or []
+        self.section = section
+
+    def __eq__(self, other):
+        """Compare if self is equal to another object."""
+        return self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        """Return object representation."""
+        return "TemplateChange(%r, %r, %r, %r)" % (
+            self.section,
+            self.logical_id,
+            self.action,
+            self.paths,
+        )
+
+    def __str__(self):
+        """Return a single line summary of the change."""
+        name = self.section
+        if self.logical_id is not None:
+            name += "." + self.logical_id
+        if self.paths:
+            return "%s %s (%s)" % (
+                self.SYMBOLS[self.action],
+                name,
+                ", ".join(self.paths),
+            )
+        return "%s %s" % (self.SYMBOLS[self.action], name)
+
+
+def _changed_paths(old_node, new_node, prefix=""):
+    """Find the paths that differ between two subtrees.
+
+    Args:
+        old_node (TemplateNode): Old subtree.
+        new_node (TemplateNode): New subtree.
+        prefix (str): Path of the subtrees.
+
+    Returns:
+        List[str]: Dotted paths that differ. Lists and scalar values are
+        reported as a whole.
+
+    """
+    if old_node.digest == new_node.digest:
+        return []
+    if not (
+        isinstance(old_node.children, dict) and isinstance(new_node.children, dict)
+    ):
+        return [prefix]
+    paths = []
+    for key in sorted(set(old_node.children) | set(new_node.children)):
+        path = prefix + "." + key if prefix else key
+        if key not in old_node.children or key not in new_node.children:
+            paths.append(path)
+        else:
+            paths.extend(
+                _changed_paths(old_node.children[key], new_node.children[key], path)
+            )
+    return paths
+
+
+def diff_templates(old_template, new_template):
+    """Calculate the changes between two templates.
+
+    Each template is hashed once; sections and items with matching digests
+    are skipped without being compared.
+
+    Args:
+        old_template (Union[Dict[str, Any], TemplateNode]): Old template.
+        new_template (Union[Dict[str, Any], TemplateNode]): New template.
+
+    Returns:
+        List[TemplateChange]: Changes sorted by section and logical ID.
+
+    """
+    old = (
+        old_template
+        if isinstance(old_template, TemplateNode)
+        else TemplateNode(old_template)
+    )
+    new = (
+        new_template
+        if isinstance(new_template, TemplateNode)
+        else TemplateNode(new_template)
+    )
+    if old.digest == new.digest:
+        return []
+
+    changes = []
+    for section in sorted(set(old.children) | set(new.children)):
+        old_section = old.children.get(section)
+        new_section = new.children.get(section)
+        if old_section is not None and old_section == new_section:
+            continue
+        old_items = old_section.children if old_section else {}
+        new_items = new_section.children if new_section else {}
+        if not isinstance(old_items, dict) or not isinstance(new_items, dict):
+            if old_section is None:
+                action = TemplateChange.ADDED
+            elif new_section is None:
+                action = TemplateChange.REMOVED
+            else:
+                action = TemplateChange.MODIFIED
+            changes.append(TemplateChange(section, None, action))
+            continue
+        for logical_id in sorted(set(old_items) | set(new_items)):
+            if logical_id not in old_items:
+                changes.append(
+                    TemplateChange(section, logical_id, TemplateChange.ADDED)
+                )
+            elif logical_id not in new_items:
+                changes.append(
+                    TemplateChange(section, logical_id, TemplateChange.REMOVED)
+                )
+            elif old_items[logical_id] != new_items[logical_id]:
+                changes.append(
+                    TemplateChange(
+                        section,
+                        logical_id,
+                        TemplateChange.MODIFIED,
+                        _changed_paths(old_items[logical_id], new_items[logical_id]),
+                    )
+                )
+    return changes
+
+
+def format_template_diff(changes):
+    """Handle the formatting of a list of template changes.
+
+    Args:
+        changes (List[TemplateChange]): Changes returned by
+            :func:`diff_templates`.
+
+    Returns:
+        str: A formatted string that represents the template diff.
+
+    """
+    return "\n".join(str(change) for change in changes)
+
+
+def _normalize_template(template):
+    """Parse a JSON or YAML template into a comparable dict.
+
+    Values are round tripped through JSON so that a local template compares
+    equal to the deployed copy returned by
+    :meth:`runway.cfngin.providers.aws.default.Provider.get_stack_info`.
+
+    Args:
+        template (str): The template body.
+
+    Returns:
+        Dict[str, Any]: The parsed template.
+
+    """
+    return json.loads(
+        json.dumps(parse_cloudformation_template(template), cls=JsonEncoder)
+    )
+
+
+class _DeployedStack(object):
+    """A deployed stack being fetched by :class:`DeployedStackFetcher`."""
+
+    def __init__(self):
+        """Instantiate class."""
+        self.done = threading.Event()
+        self.error = None
+        self.parameters = None
+        self.stack = None
+        self.template = None
+
+    @property
+    def tags(self):
+        """Tags of the deployed stack.
+
+        Returns:
+            Dict[str, str]
+
+        """
+        return {tag["Key"]: tag["Value"] for tag in self.stack.get("Tags", [])}
+
+    def result(self):
+        """Wait for the stack to be fetched.
+
+        Returns:
+            _DeployedStack: This object once it has been populated.
+
+        Raises:
+            Exception: Any error encountered while fetching the stack.
+
+        """
+        self.done.wait()
+        if self.error:
+            raise self.error  # pylint: disable=raising-bad-type
+        return self
+
+
+class DeployedStackFetcher(object):
+    """Fetch the deployed stack, template and parameters in the background.
+
+    Allows all ``describe_stacks`` and ``get_template`` calls required by a
+    fast diff to be made up front, by a bounded number of worker threads,
+    instead of as each stack is reached while walking the graph.
+
+    Worker threads run until :meth:`close` is called.
+
+    """
+
+    def __init__(self, max_workers=10):
+        """Instantiate class.
+
+        Args:
+            max_workers (int): Maximum number of stacks to fetch concurrently.
+
+        """
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._queue = queue.Queue()
+        self._workers = []
+
+    def get(self, provider, fqn):
+        """Get a deployed stack, waiting for it to be fetched if needed.
+
+        Args:
+            provider (:class:`runway.cfngin.providers.base.BaseProvider`):
+                Provider used to fetch the stack.
+            fqn (str): Fully qualified name of the stack.
+
+        Returns:
+            _DeployedStack: The deployed stack.
+
+        Raises:
+            StackDoesNotExist: The stack has not been deployed.
+
+        """
+        return self.submit(provider, fqn).result()
+
+    def submit(self, provider, fqn):
+        """Queue a stack to be fetched.
+
+        Args:
+            provider (:class:`runway.cfngin.providers.base.BaseProvider`):
+                Provider used to fetch the stack.
+            fqn (str): Fully qualified name of the stack.
+
+        Returns:
+            _DeployedStack: Object that will be populated once the stack
+            has been fetched. Submitting the same stack more than once
+            returns the same object.
+
+        """
+        with self._lock:
+            if fqn in self._pending:
+                return self._pending[fqn]
+            pending = self._pending[fqn] = _DeployedStack()
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._run, name="deployed-stack-fetcher"
+                )
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+        self._queue.put((provider, fqn, pending))
+        return pending
+
+    def close(self):
+        """Stop the worker threads once the queued stacks are fetched."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def _run(self):
+        """Fetch queued stacks until :meth:`close` is called."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            provider, fqn, pending = item
+            try:
+                pending.stack = provider.get_stack(fqn)
+                template, pending.parameters = provider.get_stack_info(pending.stack)
+                pending.template = json.loads(template)
+            except Exception as err:  # pylint: disable=broad-except
+                pending.error = err
+            finally:
+                pending.done.set()
+
+
 class Action(build.Action):
     """Responsible for diffing CloudFormation stacks in AWS and locally.
 
@@ -161,20 +561,110 @@ class Action(build.Action):
     The plan is then used to create a changeset for a stack using a
     generated template based on the current config.
 
+    When run with ``fast_diff``, the deployed template, parameters and tags
+    of each stack are compared locally first. A changeset is only created
+    for stacks that differ.
+
     """
 
     DESCRIPTION = "Diff stacks"
     NAME = "diff"
 
+    def __init__(self, *args, **kwargs):
+        """Instantiate class."""
+        super(Action, self).__init__(*args, **kwargs)
+        self.deployed_stacks = None
+
+    def _deployed_stack_matches(self, stack, provider, parameters, tags):
+        """Compare a stack to the deployed stack without using a changeset.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): Resolved stack.
+            provider (:class:`runway.cfngin.providers.base.BaseProvider`):
+                Provider for the stack.
+            parameters (List[Dict[str, Any]]): Parameters from
+                :meth:`build_parameters`.
+            tags (List[Dict[str, str]]): Tags from
+                :func:`runway.cfngin.actions.build.build_stack_tags`.
+
+        Returns:
+            Optional[_DeployedStack]: The deployed stack if its template,
+            parameters and tags match the local stack.
+
+        """
+        try:
+            deployed = self.deployed_stacks.get(provider, stack.fqn)
+        except exceptions.StackDoesNotExist:
+            return None
+        if not provider.is_stack_completed(deployed.stack):
+            LOGGER.debug(
+                "%s:deployed stack is not in a complete state", stack.fqn,
+            )
+            return None
+
+        # the templates are compared as dicts which is faster than hashing
+        # both of them; they are only hashed to summarize their differences
+        template = _normalize_template(stack.blueprint.rendered)
+        if template != deployed.template:
+            if LOGGER.isEnabledFor(LogLevels.VERBOSE):
+                LOGGER.verbose(
+                    "%s:template differs from deployed stack:\n%s",
+                    stack.fqn,
+                    format_template_diff(diff_templates(deployed.template, template)),
+                )
+            return None
+
+        new_params = {}
+        for key, definition in template.get("Parameters", {}).items():
+            if "Default" in definition:
+                new_params[key] = definition["Default"]
+        for param in parameters:
+            if param.get("UsePreviousValue"):
+                new_params[param["ParameterKey"]] = deployed.parameters.get(
+                    param["ParameterKey"]
+                )
+            else:
+                new_params[param["ParameterKey"]] = param["ParameterValue"]
+        if diff_parameters(deployed.parameters, new_params):
+            LOGGER.debug("%s:parameters differ from deployed stack", stack.fqn)
+            return None
+
+        changes, _ = diff_dictionaries(
+            deployed.tags, {tag["Key"]: tag["Value"] for tag in tags}
+        )
+        if changes:
+            LOGGER.debug("%s:tags differ from deployed stack", stack.fqn)
+            return None
+        return deployed
+
     @property
     def _stack_action(self):
         """Run against a step."""
         return self._diff_stack
 
-    def _diff_stack(
-        self, stack, **_kwargs
-    ):  # pylint: disable=too-many-return-statements
-        """Handle diffing a stack in CloudFormation vs our config."""
+    def _diff_stack(  # pylint: disable=too-many-return-statements
+        self, stack, status=None, deferred=False, **_kwargs
+    ):
+        """Handle diffing a stack in CloudFormation vs our config.
+
+        When ``deferred``, the ChangeSet of the stack is created and a
+        submitted status is returned with a ``waiter`` that is done once the
+        ChangeSet is complete. The step is then resumed to get the changes
+        instead of blocking its thread while CloudFormation creates the
+        ChangeSet.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): The stack to diff.
+            status (Optional[:class:`runway.cfngin.status.Status`]): The
+                current status of the step.
+            deferred (bool): Whether the step can be resumed once the
+                ChangeSet is complete.
+
+        """
+        waiter = getattr(status, "waiter", None)
+        if waiter:
+            return self._diff_submitted_stack(stack, waiter)
+
         if self.cancel.wait(0):
             return INTERRUPTED
 
@@ -192,6 +682,20 @@ class Action(build.Action):
         try:
             stack.resolve(self.context, provider)
             parameters = self.build_parameters(stack)
+            if self.deployed_stacks:
+                deployed = self._deployed_stack_matches(
+                    stack, provider, parameters, tags
+                )
+                if deployed:
+                    LOGGER.info("%s:no changes", stack.fqn)
+                    stack.set_outputs(provider.get_output_dict(deployed.stack))
+                    return COMPLETE
+            if deferred and hasattr(provider, "submit_stack_changes"):
+                status = SubmittedStatus("creating change set")
+                status.waiter = provider.submit_stack_changes(
+                    stack, self._template(stack.blueprint), parameters, tags
+                )
+                return status
             outputs = provider.get_stack_changes(
                 stack, self._template(stack.blueprint), parameters, tags
             )
@@ -226,8 +730,38 @@ class Action(build.Action):
             raise
         return COMPLETE
 
+    def _diff_submitted_stack(self, stack, waiter):
+        """Get the changes of a stack once its ChangeSet is complete.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): The stack to diff.
+            waiter (Any): ``waiter`` of the status returned when the
+                ChangeSet was created.
+
+        """
+        provider = self.build_provider(stack)
+        try:
+            stack.set_outputs(provider.get_submitted_stack_changes(stack, waiter))
+        except exceptions.StackDidNotChange:
+            LOGGER.info("%s:no changes", stack.fqn)
+            stack.set_outputs(provider.get_outputs(stack.fqn))
+        return COMPLETE
+
     def run(self, **kwargs):
-        """Kicks off the diffing of the stacks in the stack_definitions."""
+        """Kicks off the diffing of the stacks in the stack_definitions.
+
+        Keyword Args:
+            concurrency (int): Max number of stacks to diff concurrently.
+            executor (Optional[str]): How stacks are walked (see
+                :func:`runway.cfngin.actions.base.build_walker`). With
+                ``events`` (the default) or ``asyncio``, steps are released
+                while their ChangeSet is being created. With ``threads``,
+                each step blocks its thread until its ChangeSet is complete.
+            fast_diff (bool): Compare the deployed template, parameters and
+                tags of each stack locally, only creating a changeset for
+                stacks that differ.
+
+        """
         plan = self._generate_plan(
             require_unlocked=False, include_persistent_graph=True
         )
@@ -236,8 +770,24 @@ class Action(build.Action):
             LOGGER.info("diffing stacks: %s", ", ".join(plan.keys()))
         else:
             LOGGER.warning("no stacks detected (error in config?)")
-        walker = build_walker(kwargs.get("concurrency", 0))
-        plan.execute(walker)
+        if kwargs.get("fast_diff"):
+            self.deployed_stacks = DeployedStackFetcher()
+            for step in plan.steps:
+                if step.stack.enabled and (not step.stack.locked or step.stack.force):
+                    self.deployed_stacks.submit(
+                        self.build_provider(step.stack), step.stack.fqn
+                    )
+        walker = build_walker(
+            kwargs.get("concurrency", 0),
+            kwargs.get("executor") or "events",
+            setup=self.use_event_loop,
+        )
+        try:
+            plan.execute(walker)
+        finally:
+            if self.deployed_stacks:
+                self.deployed_stacks.close()
+                self.deployed_stacks = None
 
     def pre_run(self, **kwargs):
         """Any steps that need to be taken prior to running the action.
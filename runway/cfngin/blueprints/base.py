@@ -17,6 +17,7 @@ from ..exceptions import (
     ValidatorError,
     VariableTypeRequired,
 )
+from ..instrumentation import PROFILER, TRACER
 from ..util import read_value_from_path
 from .variables.types import CFNType, TroposphereType
 
@@ -485,12 +486,15 @@ class Blueprint(object):
 
     def render_template(self):
         """Render the Blueprint to a CloudFormation template."""
-        self.import_mappings()
-        self.create_template()
-        if self.description:
-            self.set_template_description(self.description)
-        self.setup_parameters()
-        rendered = self.template.to_json(indent=self.context.template_indent)
+        with TRACER.span("render", "stack", blueprint=self.name), PROFILER.phase(
+            "render"
+        ):
+            self.import_mappings()
+            self.create_template()
+            if self.description:
+                self.set_template_description(self.description)
+            self.setup_parameters()
+            rendered = self.template.to_json(indent=self.context.template_indent)
         version = hashlib.md5(rendered.encode()).hexdigest()[:8]
         return version, rendered
 
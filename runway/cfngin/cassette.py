@@ -0,0 +1,397 @@
+"""Record AWS API calls to a cassette file and replay them offline.
+
+When recording, every call made by clients of sessions created by
+:func:`runway.cfngin.session_cache.get_session` is written to a JSON
+cassette with its parameters, response and latency. Values that look like
+secrets are redacted before being written.
+
+When replaying, calls are answered from a cassette instead of AWS, either
+taking as long as they did when recorded or returning immediately. This
+makes slow runs reproducible without AWS access.
+
+"""
+import base64
+import contextlib
+import datetime
+import io
+import json
+import logging
+import re
+import threading
+import time
+
+import six
+from botocore.awsrequest import AWSResponse
+from botocore.response import StreamingBody
+from dateutil.parser import parse as parse_date
+
+from .exceptions import UnrecordedApiCall
+
+LOGGER = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+RECORD = "record"
+REPLAY = "replay"
+REDACTED = "**REDACTED**"
+# Keys of values that are redacted when recording (e.g. SecretAccessKey,
+# SessionToken, SecretString, Password).
+SECRET_KEY_PATTERN = re.compile(
+    r"(secret|password|passphrase|privatekey|plaintext|sessiontoken|"
+    r"authorizationtoken|accesstoken|refreshtoken|idtoken)",
+    re.IGNORECASE,
+)
+# Keys added to the request context of each call.
+_PARAMS_KEY = "runway_cassette_params"
+_START_KEY = "runway_cassette_start"
+
+
+def _is_secret(key):
+    """Whether the value of a key should be redacted."""
+    return bool(SECRET_KEY_PATTERN.search(key))
+
+
+def redact(value):
+    """Redact secrets from the parameters or response of a call.
+
+    Values are redacted if their key looks like it holds a secret, if they
+    are the value of an SSM ``SecureString`` parameter or if they are the
+    value of a CloudFormation parameter whose name looks like it holds a
+    secret.
+
+    Args:
+        value (Any): Value to redact.
+
+    Returns:
+        Any: Copy of the value with secrets replaced by :data:`REDACTED`.
+
+    """
+    if isinstance(value, list):
+        return [redact(i) for i in value]
+    if not isinstance(value, dict):
+        return value
+    secret_keys = set(key for key in value if _is_secret(str(key)))
+    if value.get("Type") == "SecureString":
+        secret_keys.add("Value")
+    if _is_secret(str(value.get("ParameterKey", ""))):
+        secret_keys.add("ParameterValue")
+    return dict(
+        (key, REDACTED if key in secret_keys and val else redact(val))
+        for key, val in value.items()
+    )
+
+
+def _encode(value):
+    """Convert a value to something that can be written as JSON."""
+    if isinstance(value, dict):
+        return dict((str(k), _encode(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_encode(i) for i in value]
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if value is None or isinstance(
+        value, (bool, float) + six.integer_types + six.string_types
+    ):
+        return value
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    # e.g. files uploaded to S3; only their type is kept
+    return "<%s>" % type(value).__name__
+
+
+def _decode(value):
+    """Reverse :func:`_encode`."""
+    if isinstance(value, list):
+        return [_decode(i) for i in value]
+    if not isinstance(value, dict):
+        return value
+    if "__datetime__" in value:
+        return parse_date(value["__datetime__"])
+    if "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return dict((k, _decode(v)) for k, v in value.items())
+
+
+def _operation_name(event_name):
+    """Get ``<service>.<operation>`` from an event name."""
+    return ".".join(event_name.split(".")[1:3])
+
+
+class Cassette(object):
+    """Records or replays AWS API calls made by clients of registered sessions.
+
+    Attributes:
+        interactions (List[Dict[str, Any]]): Calls recorded or loaded.
+        latency (bool): When replaying, whether calls take as long as they
+            did when recorded.
+        mode (Optional[str]): :data:`RECORD`, :data:`REPLAY` or ``None``.
+        path (Optional[str]): Path of the cassette.
+
+    """
+
+    def __init__(self):
+        """Instantiate class."""
+        self._lock = threading.Lock()
+        self._by_operation = {}
+        self._by_params = {}
+        self._used = set()
+        self.interactions = []
+        self.latency = True
+        self.mode = None
+        self.path = None
+
+    @property
+    def state(self):
+        """State needed to record or replay in another process.
+
+        Returns:
+            Optional[Dict[str, Any]]: Keyword arguments of :meth:`reset` or
+            ``None`` if not recording or replaying.
+
+        """
+        if not self.mode:
+            return None
+        return {"latency": self.latency, "mode": self.mode, "path": self.path}
+
+    def reset(self, mode=None, path=None, latency=True):
+        """Remove all recorded or loaded calls.
+
+        Args:
+            mode (Optional[str]): :data:`RECORD` or :data:`REPLAY` calls made
+                by sessions created afterwards.
+            path (Optional[str]): Path of the cassette. Loaded if replaying.
+            latency (bool): When replaying, whether calls take as long as
+                they did when recorded.
+
+        """
+        interactions = []
+        if mode == REPLAY:
+            with open(path) as stream:
+                interactions = json.load(stream)["interactions"]
+        with self._lock:
+            self._by_operation = {}
+            self._by_params = {}
+            self._used = set()
+            self.interactions = interactions
+            self.latency = latency
+            self.mode = mode
+            self.path = path
+            for index, interaction in enumerate(interactions):
+                self._by_operation.setdefault(interaction["operation"], []).append(
+                    index
+                )
+                self._by_params.setdefault(self._key(interaction), []).append(index)
+
+    @contextlib.contextmanager
+    def recording(self, path=None):
+        """Record API calls to a cassette.
+
+        Args:
+            path (Optional[str]): Path of the cassette. If not provided,
+                nothing is recorded.
+
+        """
+        if not path:
+            yield
+            return
+        self.reset(mode=RECORD, path=path)
+        try:
+            yield
+        finally:
+            self.write(path)
+            self.reset()
+
+    @contextlib.contextmanager
+    def replaying(self, path=None, latency=True):
+        """Replay API calls from a cassette.
+
+        Args:
+            path (Optional[str]): Path of the cassette. If not provided,
+                nothing is replayed.
+            latency (bool): Whether calls take as long as they did when
+                recorded.
+
+        """
+        if not path:
+            yield
+            return
+        self.reset(mode=REPLAY, path=path, latency=latency)
+        try:
+            yield
+        finally:
+            LOGGER.info(
+                "replayed AWS API calls from %s; %s of %s recorded calls used",
+                path,
+                len(self._used),
+                len(self.interactions),
+            )
+            self.reset()
+
+    def register(self, session):
+        """Record or replay calls made by clients of a botocore session.
+
+        Does nothing unless recording or replaying. Must be called before
+        clients are created from the session.
+
+        Args:
+            session (:class:`botocore.session.Session`): Session to register
+                event handlers with.
+
+        """
+        if not self.mode:
+            return
+        handlers = [
+            ("before-parameter-build", self._before_parameter_build),
+            ("after-call", self._after_call)
+            if self.mode == RECORD
+            else ("before-call", self._replay),
+        ]
+        for event, handler in handlers:
+            session.register(event, handler, unique_id="runway-cassette-" + event)
+
+    def dump(self):
+        """Get the recorded calls.
+
+        Returns:
+            List[Dict[str, Any]]
+
+        """
+        with self._lock:
+            return list(self.interactions)
+
+    def merge(self, interactions):
+        """Merge calls recorded by another process.
+
+        Args:
+            interactions (List[Dict[str, Any]]): Returned by :meth:`dump`.
+
+        """
+        with self._lock:
+            self.interactions.extend(interactions)
+
+    def write(self, path):
+        """Write the recorded calls to a cassette.
+
+        Calls are sorted by when they started. Start times are written
+        relative to the first call.
+
+        Args:
+            path (str): Path of the cassette.
+
+        """
+        interactions = sorted(self.dump(), key=lambda i: i["start"])
+        first = interactions[0]["start"] if interactions else 0
+        with open(path, "w") as stream:
+            json.dump(
+                {
+                    "interactions": [
+                        dict(i, start=round(i["start"] - first, 6))
+                        for i in interactions
+                    ],
+                    "version": CASSETTE_VERSION,
+                },
+                stream,
+                indent=2,
+                sort_keys=True,
+            )
+        LOGGER.info("%s AWS API calls recorded to %s", len(interactions), path)
+
+    @staticmethod
+    def _key(interaction):
+        """Key used to find a call with the same parameters."""
+        return (
+            interaction["operation"],
+            json.dumps(interaction["params"], sort_keys=True),
+        )
+
+    @staticmethod
+    def _before_parameter_build(params=None, context=None, **_):
+        """Keep the redacted parameters of a call and when it started."""
+        if context is not None:
+            context[_PARAMS_KEY] = _encode(redact(params or {}))
+            context[_START_KEY] = time.time()
+
+    def _after_call(
+        self, event_name, context=None, http_response=None, parsed=None, **_
+    ):
+        """Record a call that got a response (including error responses)."""
+        if not context or _START_KEY not in context:
+            return  # started before recording
+        start = context[_START_KEY]
+        parsed = parsed if parsed is not None else {}
+        body = parsed.get("Body")
+        if isinstance(body, StreamingBody):
+            # read the body so it can be recorded, leaving a copy for the caller
+            data = body.read()
+            parsed["Body"] = StreamingBody(io.BytesIO(data), len(data))
+            parsed = dict(parsed, Body=data)
+        interaction = {
+            "elapsed": round(time.time() - start, 6),
+            "operation": _operation_name(event_name),
+            "params": context.get(_PARAMS_KEY, {}),
+            "response": _encode(redact(parsed)),
+            "start": start,
+            "status_code": getattr(http_response, "status_code", 200),
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def _find(self, operation, params):
+        """Find the recorded call that answers a call.
+
+        The first unused call with the same operation and parameters is
+        used. Once they are all used, the last one is repeated (e.g. the
+        final status of a stack being polled). Otherwise, the first unused
+        call of the same operation is used since some parameters (e.g.
+        ``ClientRequestToken``) differ each run.
+
+        Returns:
+            Optional[Dict[str, Any]]
+
+        """
+        key = self._key({"operation": operation, "params": params})
+        with self._lock:
+            for candidates, repeat in [
+                (self._by_params.get(key, []), True),
+                (self._by_operation.get(operation, []), False),
+            ]:
+                for index in candidates:
+                    if index not in self._used:
+                        self._used.add(index)
+                        return self.interactions[index]
+                if candidates and repeat:
+                    return self.interactions[candidates[-1]]
+        return None
+
+    def _replay(self, event_name, context=None, **_):
+        """Answer a call from the cassette.
+
+        Returns:
+            Tuple[:class:`botocore.awsrequest.AWSResponse`, Dict[str, Any]]:
+            The response of the call, short-circuiting the request.
+
+        Raises:
+            UnrecordedApiCall: No recorded call answers the call.
+
+        """
+        operation = _operation_name(event_name)
+        params = (context or {}).get(_PARAMS_KEY, {})
+        interaction = self._find(operation, params)
+        if not interaction:
+            raise UnrecordedApiCall(operation, params, self.path)
+        if self.latency:
+            time.sleep(interaction["elapsed"])
+        parsed = _decode(interaction["response"])
+        if isinstance(parsed.get("Body"), bytes):
+            parsed["Body"] = StreamingBody(
+                io.BytesIO(parsed["Body"]), len(parsed["Body"])
+            )
+        return (
+            AWSResponse(
+                "https://replay.invalid/", interaction["status_code"], {}, None
+            ),
+            parsed,
+        )
+
+
+# Shared by all sessions created by runway.cfngin.session_cache.get_session.
+CASSETTE = Cassette()
@@ -13,6 +13,7 @@ from .actions import build, destroy, diff
 from .config import render_parse_load as load_config
 from .context import Context as CFNginContext
 from .environment import parse_environment
+from .instrumentation import PROFILER, TRACER
 from .providers.aws.default import ProviderBuilder
 
 # explicitly name logger so its not redundant
@@ -30,6 +31,9 @@ class CFNgin(object):
         concurrency (int): Max number of CFNgin stacks that can be deployed
             concurrently. If the value is ``0``, will be constrained based on
             the underlying graph.
+        executor (Optional[str]): How the stacks of a plan are run
+            (``threads``, ``events`` or ``asyncio``). ``None`` to use the
+            default of each action.
         interactive (bool): Wether or not to prompt the user before taking
             action.
         parameters (MutableMap): Combination of the parameters provided when
@@ -58,6 +62,7 @@ class CFNgin(object):
         self.__ctx = ctx
         self._env_file_name = None
         self.concurrency = ctx.env.max_concurrent_cfngin_stacks
+        self.executor = ctx.env.cfngin_executor
         self.interactive = ctx.is_interactive
         self.parameters = MutableMap()
         self.recreate_failed = ctx.is_noninteractive
@@ -128,7 +133,11 @@ class CFNgin(object):
                             ctx.config.service_role
                         ),
                     )
-                    action.execute(concurrency=self.concurrency, tail=self.tail)
+                    action.execute(
+                        concurrency=self.concurrency,
+                        executor=self.executor,
+                        tail=self.tail,
+                    )
                 logger.success("deploy (complete)")
 
     def destroy(self, force=False, sys_path=None):
@@ -162,7 +171,10 @@ class CFNgin(object):
                         ),
                     )
                     action.execute(
-                        concurrency=self.concurrency, force=True, tail=self.tail
+                        concurrency=self.concurrency,
+                        executor=self.executor,
+                        force=True,
+                        tail=self.tail,
                     )
                 logger.success("destroy (complete)")
 
@@ -178,8 +190,11 @@ class CFNgin(object):
         """
         LOGGER.debug("loading CFNgin config: %s", os.path.basename(config_path))
         try:
-            config = self._get_config(config_path)
-            return self._get_context(config, config_path)
+            with TRACER.span("load config", "cfngin", path=config_path), PROFILER.phase(
+                "config"
+            ):
+                config = self._get_config(config_path)
+                return self._get_context(config, config_path)
         except ConstructorError as err:
             if err.problem.startswith(
                 "could not determine a constructor " "for the tag '!"
@@ -220,7 +235,10 @@ class CFNgin(object):
                             ctx.config.service_role
                         ),
                     )
-                    action.execute()
+                    action.execute(
+                        executor=self.executor,
+                        fast_diff=self.__ctx.env.cfngin_fast_diff,
+                    )
                 logger.success("plan (complete)")
 
     def should_skip(self, force=False):
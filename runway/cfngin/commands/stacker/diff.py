@@ -28,12 +28,19 @@ class Diff(BaseCommand):
             "will be diffed, even if it is locked in "
             "the config.",
         )
+        parser.add_argument(
+            "--fast-diff",
+            action="store_true",
+            help="Compare the deployed template, parameters and tags of "
+            "each stack locally, only creating a changeset for stacks "
+            "that differ.",
+        )
 
     def run(self, options):
         """Run the command."""
         super(Diff, self).run(options)
         action = diff.Action(options.context, provider_builder=options.provider_builder)
-        action.execute()
+        action.execute(fast_diff=options.fast_diff)
 
     def get_context_kwargs(self, options):
         """Return a dictionary of kwargs that will be used with the Context.
@@ -453,6 +453,12 @@ class Config(Model):
         namespace_delimiter (StringType): Character used to separate
             ``namespace`` and anything it prepends.
         package_sources (ModelType): Remote source locations.
+        persistent_graph_fingerprints (BooleanType): Store a fingerprint of
+            the inputs of each stack alongside the persistent graph and skip
+            stacks whose inputs have not changed since they were last built.
+        persistent_graph_journal (BooleanType): Store changes to the
+            persistent graph as append-only delta objects that are
+            periodically compacted into the persistent graph object.
         persistent_graph_key (str): S3 object key were the persistent graph
             is stored.
         post_build (ListType): Hooks to run after a build action.
@@ -488,6 +494,8 @@ class Config(Model):
     namespace = StringType(required=True)
     namespace_delimiter = StringType(serialize_when_none=False)
     package_sources = ModelType(PackageSources, serialize_when_none=False)
+    persistent_graph_fingerprints = BooleanType(serialize_when_none=False)
+    persistent_graph_journal = BooleanType(serialize_when_none=False)
     persistent_graph_key = StringType(serialize_when_none=False)
     post_build = ListType(ModelType(Hook), serialize_when_none=False)
     post_destroy = ListType(ModelType(Hook), serialize_when_none=False)
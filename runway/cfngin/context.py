@@ -11,6 +11,7 @@ from .exceptions import (
     PersistentGraphCannotUnlock,
     PersistentGraphLockCodeMissmatch,
     PersistentGraphLocked,
+    PersistentGraphModified,
     PersistentGraphUnlocked,
 )
 from .plan import Graph
@@ -24,6 +25,9 @@ LOGGER = logging.getLogger(__name__)
 
 DEFAULT_NAMESPACE_DELIMITER = "-"
 DEFAULT_TEMPLATE_INDENT = 4
+# number of persistent graph journal deltas written before they are
+# compacted into the persistent graph object
+PERSISTENT_GRAPH_JOURNAL_COMPACT_AFTER = 50
 
 
 def get_fqn(base_fqn, delimiter, name=None):
@@ -39,7 +43,7 @@ def get_fqn(base_fqn, delimiter, name=None):
     return delimiter.join([_f for _f in [base_fqn, name] if _f])
 
 
-class Context(object):
+class Context(object):  # pylint: disable=too-many-instance-attributes
     """The context under which the current stacks are being executed.
 
     The CFNgin Context is responsible for translating the values passed in
@@ -78,9 +82,15 @@ class Context(object):
         self.__boto3_credentials = boto3_credentials
         self._bucket_name = None
         self._persistent_graph = None
+        self._persistent_graph_etag = None
+        self._persistent_graph_journal = []
+        self._persistent_graph_journal_stale = False
+        self._persistent_graph_persisted = {}
         self._persistent_graph_lock_code = None
         self._persistent_graph_lock_tag = "cfngin_lock_code"
         self._s3_bucket_verified = None
+        self._stack_cache = {}
+        self._stack_fingerprints = None
         self._stacks = None
         self._targets = None
         self._upload_to_s3 = None
@@ -174,27 +184,32 @@ class Context(object):
                         "getting persistent graph from s3:\n%s",
                         json.dumps(self.persistent_graph_location, indent=4),
                     )
-                    content = (
-                        self.s3_conn.get_object(
-                            ResponseContentType="application/json",
-                            **self.persistent_graph_location
-                        )["Body"]
-                        .read()
-                        .decode("utf-8")
+                    response = self.s3_conn.get_object(
+                        ResponseContentType="application/json",
+                        **self.persistent_graph_location
                     )
+                    content = response["Body"].read().decode("utf-8")
+                    self._persistent_graph_etag = response.get("ETag")
                 except self.s3_conn.exceptions.NoSuchKey:
                     self.logger.info(
                         "persistant graph object does not exist in s3; "
                         "creating one now..."
                     )
-                    self.s3_conn.put_object(
+                    response = self.s3_conn.put_object(
                         Body=content,
                         ServerSideEncryption="AES256",
                         ACL="bucket-owner-full-control",
                         ContentType="application/json",
                         **self.persistent_graph_location
                     )
-            self.persistent_graph = json.loads(content)
+                    self._persistent_graph_etag = response.get("ETag")
+            graph_dict = json.loads(content)
+            if self.config.persistent_graph_journal and self.s3_bucket_verified:
+                graph_dict = self._replay_persistent_graph_journal(graph_dict)
+                self._persistent_graph_persisted = {
+                    name: set(deps) for name, deps in graph_dict.items()
+                }
+            self.persistent_graph = graph_dict
 
         return self._persistent_graph
 
@@ -226,6 +241,19 @@ class Context(object):
             ),
         }
 
+    @property
+    def persistent_graph_journal_prefix(self):
+        """Prefix of the persistent graph journal delta objects in s3.
+
+        Returns:
+            str
+
+        """
+        if not self.persistent_graph_location:
+            return ""
+        key = self.persistent_graph_location["Key"]
+        return key[: -len(".json")] + ".journal/"
+
     @property
     def persistent_graph_lock_code(self):
         """Code used to lock the persistent graph S3 object.
@@ -274,6 +302,52 @@ class Context(object):
             self._s3_bucket_verified = True
         return self._s3_bucket_verified
 
+    @property
+    def stack_fingerprints(self):
+        """Input fingerprints and outputs of stacks from their last build.
+
+        Loaded from s3 the first time it is accessed if
+        **persistent_graph_fingerprints** is enabled.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Stack name mapped to a dict containing
+            the ``fingerprint`` and ``outputs`` of the stack.
+
+        """
+        if self._stack_fingerprints is None:
+            self._stack_fingerprints = {}
+            if self.stack_fingerprints_location and self.s3_bucket_verified:
+                try:
+                    response = self.s3_conn.get_object(
+                        ResponseContentType="application/json",
+                        **self.stack_fingerprints_location
+                    )
+                    self._stack_fingerprints = json.loads(
+                        response["Body"].read().decode("utf-8")
+                    )
+                except self.s3_conn.exceptions.NoSuchKey:
+                    self.logger.debug("stack fingerprints object does not exist")
+        return self._stack_fingerprints
+
+    @property
+    def stack_fingerprints_location(self):
+        """Location of the stack input fingerprints in s3.
+
+        Returns:
+            Dict[str, str] Bucket and Key for the object in S3.
+
+        """
+        if (
+            not self.config.persistent_graph_fingerprints
+            or not self.persistent_graph_location
+        ):
+            return {}
+        return {
+            "Bucket": self.persistent_graph_location["Bucket"],
+            "Key": self.persistent_graph_location["Key"][: -len(".json")]
+            + ".fingerprints.json",
+        }
+
     @property
     def tags(self):
         """Return ``tags`` from config."""
@@ -365,6 +439,32 @@ class Context(object):
             )
         return get_session(region=region or self.region, **kwargs)
 
+    def _get_stack(self, stack_def):
+        """Get the :class:`runway.cfngin.stack.Stack` for a stack definition.
+
+        Stacks are only created the first time they are needed.
+
+        Args:
+            stack_def (:class:`runway.cfngin.config.Stack`): Stack definition.
+
+        Returns:
+            :class:`runway.cfngin.stack.Stack`
+
+        """
+        stack = self._stack_cache.get(stack_def.name)
+        if not stack:
+            stack = Stack(
+                definition=stack_def,
+                context=self,
+                mappings=self.mappings,
+                force=stack_def.name in self.force_stacks,
+                locked=stack_def.locked,
+                enabled=stack_def.enabled,
+                protected=stack_def.protected,
+            )
+            self._stack_cache[stack_def.name] = stack
+        return stack
+
     def get_stack(self, name):
         """Get a stack by name.
 
@@ -372,9 +472,9 @@ class Context(object):
             name (str): Name of a stack to retrieve.
 
         """
-        for stack in self.get_stacks():
-            if stack.name == name:
-                return stack
+        for stack_def in self._get_stack_definitions() or []:
+            if stack_def.name == name:
+                return self._get_stack(stack_def)
         return None
 
     def get_stacks(self):
@@ -388,22 +488,84 @@ class Context(object):
 
         """
         if not self._stacks:
-            stacks = []
-            definitions = self._get_stack_definitions()
-            for stack_def in definitions:
-                stack = Stack(
-                    definition=stack_def,
-                    context=self,
-                    mappings=self.mappings,
-                    force=stack_def.name in self.force_stacks,
-                    locked=stack_def.locked,
-                    enabled=stack_def.enabled,
-                    protected=stack_def.protected,
-                )
-                stacks.append(stack)
-            self._stacks = stacks
+            self._stacks = [
+                self._get_stack(stack_def)
+                for stack_def in self._get_stack_definitions() or []
+            ]
         return self._stacks
 
+    def get_required_names(self, names):
+        """Get the names of the stacks and targets needed to run the given ones.
+
+        The subgraph is computed by walking the dependencies of the stack and
+        target definitions outward from ``names``. Only stacks that are part
+        of the subgraph are created (to find the dependencies of their output
+        lookups). Their blueprints are not loaded and their variables are not
+        resolved.
+
+        Args:
+            names (List[str]): Names of stacks or targets.
+
+        Returns:
+            Set[str]: Names of the stacks and targets, including ``names``.
+
+        """
+        stack_defs = dict(
+            (stack_def.name, stack_def)
+            for stack_def in self._get_stack_definitions() or []
+        )
+        targets = dict((target.name, target) for target in self.get_targets())
+        required_by = {}
+        for definition in list(stack_defs.values()) + list(targets.values()):
+            for parent in definition.required_by or []:
+                required_by.setdefault(parent, set()).add(definition.name)
+
+        required = set()
+        queue = list(names)
+        while queue:
+            name = queue.pop()
+            if name in required:
+                continue
+            required.add(name)
+            if name in stack_defs:
+                queue.extend(self._get_stack(stack_defs[name]).requires)
+            elif name in targets:
+                queue.extend(targets[name].requires)
+            queue.extend(required_by.get(name, []))
+        return required
+
+    def get_targeted_stacks(self):
+        """Get the stacks needed to run the stacks named in ``stack_names``.
+
+        If ``stack_names`` is empty, this is the same as :meth:`get_stacks`.
+
+        Returns:
+            list: a list of :class:`runway.cfngin.stack.Stack` objects
+
+        """
+        if not self.stack_names:
+            return self.get_stacks()
+        required = self.get_required_names(self.stack_names)
+        return [
+            self._get_stack(stack_def)
+            for stack_def in self._get_stack_definitions() or []
+            if stack_def.name in required
+        ]
+
+    def get_targeted_targets(self):
+        """Get the targets needed to run the stacks named in ``stack_names``.
+
+        If ``stack_names`` is empty, this is the same as :meth:`get_targets`.
+
+        Returns:
+            list: a list of :class:`runway.cfngin.target.Target` objects
+
+        """
+        if not self.stack_names:
+            return self.get_targets()
+        required = self.get_required_names(self.stack_names)
+        return [target for target in self.get_targets() if target.name in required]
+
     def get_stacks_dict(self):
         """Construct a dict of {stack.fqn: stack} for easy access to stacks."""
         return dict((stack.fqn, stack) for stack in self.get_stacks())
@@ -456,22 +618,159 @@ class Context(object):
         except self.s3_conn.exceptions.NoSuchKey:
             raise PersistentGraphCannotLock("s3 object does not exist")
 
+    def _check_persistent_graph_etag(self):
+        """Ensure the persistent graph in S3 has not been modified elsewhere.
+
+        Compares the ETag of the object in S3 to the ETag of the object last
+        read or written by this session. Lock tags do not change the ETag.
+
+        Raises:
+            :class:`runway.cfngin.exceptions.PersistentGraphModified`
+
+        """
+        if not self._persistent_graph_etag:
+            return
+        try:
+            s3_etag = self.s3_conn.head_object(**self.persistent_graph_location).get(
+                "ETag"
+            )
+        except self.s3_conn.exceptions.ClientError as err:
+            if err.response["Error"]["Code"] not in ["404", "NoSuchKey"]:
+                raise
+            s3_etag = None
+        if s3_etag != self._persistent_graph_etag:
+            raise PersistentGraphModified(self._persistent_graph_etag, s3_etag)
+
+    def _delete_persistent_graph_journal(self):
+        """Delete the persistent graph journal delta objects from s3."""
+        keys = self._persistent_graph_journal
+        for i in range(0, len(keys), 1000):
+            self.s3_conn.delete_objects(
+                Bucket=self.persistent_graph_location["Bucket"],
+                Delete={
+                    "Objects": [{"Key": key} for key in keys[i : i + 1000]],
+                    "Quiet": True,
+                },
+            )
+        self._persistent_graph_journal = []
+        self._persistent_graph_journal_stale = False
+
+    def _put_persistent_graph_delta(self):
+        """Append the changes made to the persistent graph to the journal.
+
+        Only steps whose dependencies differ from what is persisted in s3
+        are written. Each delta records the ETag of the persistent graph
+        object it applies to.
+
+        """
+        current = {
+            name: set(deps) for name, deps in self.persistent_graph.to_dict().items()
+        }
+        delta = {
+            "base": self._persistent_graph_etag,
+            "remove": sorted(set(self._persistent_graph_persisted) - set(current)),
+            "set": {
+                name: sorted(deps)
+                for name, deps in current.items()
+                if self._persistent_graph_persisted.get(name) != deps
+            },
+        }
+        if not delta["remove"] and not delta["set"]:
+            return
+        sequence = 1
+        if self._persistent_graph_journal:
+            sequence += int(
+                self._persistent_graph_journal[-1].rsplit("/", 1)[-1].split(".")[0]
+            )
+        key = "%s%010d.json" % (self.persistent_graph_journal_prefix, sequence)
+        self.s3_conn.put_object(
+            Body=json.dumps(delta, separators=(",", ":")),
+            ServerSideEncryption="AES256",
+            ACL="bucket-owner-full-control",
+            ContentType="application/json",
+            Bucket=self.persistent_graph_location["Bucket"],
+            Key=key,
+        )
+        self._persistent_graph_journal.append(key)
+        self._persistent_graph_persisted = current
+        self.logger.debug("persistent graph journal updated: %s", key)
+
+    def _replay_persistent_graph_journal(self, graph_dict):
+        """Apply the persistent graph journal to a persistent graph.
+
+        Deltas written for another version of the persistent graph object
+        (e.g. left behind when a compaction failed to delete them) are
+        ignored. They are deleted the next time the object is written.
+
+        Args:
+            graph_dict (Dict[str, List[str]]): Persistent graph snapshot.
+
+        Returns:
+            Dict[str, List[str]]: The persistent graph with all deltas from
+            the journal applied.
+
+        """
+        keys = []
+        paginator = self.s3_conn.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.persistent_graph_location["Bucket"],
+            Prefix=self.persistent_graph_journal_prefix,
+        ):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        for key in sorted(keys):
+            delta = json.loads(
+                self.s3_conn.get_object(
+                    Bucket=self.persistent_graph_location["Bucket"], Key=key
+                )["Body"]
+                .read()
+                .decode("utf-8")
+            )
+            if delta.get("base") != self._persistent_graph_etag:
+                self.logger.debug(
+                    "ignoring persistent graph journal delta of another "
+                    "version of the persistent graph: %s",
+                    key,
+                )
+                self._persistent_graph_journal_stale = True
+                continue
+            for name in delta.get("remove", []):
+                graph_dict.pop(name, None)
+            graph_dict.update(delta.get("set", {}))
+        self._persistent_graph_journal = sorted(keys)
+        return graph_dict
+
     def put_persistent_graph(self, lock_code):
         """Upload persistent graph to s3.
 
+        The graph is serialized compactly. The upload is refused if the
+        object in S3 has been modified since it was last read or written by
+        this session.
+
+        When **persistent_graph_journal** is enabled, only the changes since
+        the last upload are written to a new journal delta object. Once
+        :data:`PERSISTENT_GRAPH_JOURNAL_COMPACT_AFTER` deltas have been
+        written (or if the journal contains deltas of another version of the
+        object), the journal is compacted into the persistent graph object.
+        The journal is deleted whenever the object is written.
+
         Args:
             lock_code (str): The code that will be used to lock the S3 object.
 
         Raises:
             :class:`runway.cfngin.exceptions.PersistentGraphUnlocked`
             :class:`runway.cfngin.exceptions.PersistentGraphLockCodeMissmatch`
+            :class:`runway.cfngin.exceptions.PersistentGraphModified`
 
         """
         if not self.persistent_graph:
             return
 
         if not self.persistent_graph.to_dict():
+            self._check_persistent_graph_etag()
             self.s3_conn.delete_object(**self.persistent_graph_location)
+            self._persistent_graph_etag = None
+            self._delete_persistent_graph_journal()
+            self._persistent_graph_persisted = {}
             self.logger.debug("removed empty persistent graph object from S3")
             return
 
@@ -485,17 +784,56 @@ class Context(object):
                 lock_code, self.persistent_graph_lock_code
             )
 
-        self.s3_conn.put_object(
-            Body=self.persistent_graph.dumps(4),
+        self._check_persistent_graph_etag()
+        if (
+            self.config.persistent_graph_journal
+            and not self._persistent_graph_journal_stale
+            and len(self._persistent_graph_journal)
+            < PERSISTENT_GRAPH_JOURNAL_COMPACT_AFTER
+        ):
+            self._put_persistent_graph_delta()
+            return
+        response = self.s3_conn.put_object(
+            Body=self.persistent_graph.dumps(separators=(",", ":")),
             ServerSideEncryption="AES256",
             ACL="bucket-owner-full-control",
             ContentType="application/json",
             Tagging="{}={}".format(self._persistent_graph_lock_tag, lock_code),
             **self.persistent_graph_location
         )
-        self.logger.debug(
-            "persistent graph updated:\n%s", self.persistent_graph.dumps(indent=4)
+        self._persistent_graph_etag = response.get("ETag")
+        self._delete_persistent_graph_journal()
+        self._persistent_graph_persisted = {
+            name: set(deps) for name, deps in self.persistent_graph.to_dict().items()
+        }
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "persistent graph updated:\n%s", self.persistent_graph.dumps(indent=4)
+            )
+
+    def put_stack_fingerprints(self):
+        """Upload the stack input fingerprints to s3.
+
+        Stacks that are no longer in the config are removed.
+
+        """
+        if not self.stack_fingerprints_location:
+            return
+        names = set(stack_def.name for stack_def in self._get_stack_definitions() or [])
+        fingerprints = dict(
+            (name, value)
+            for name, value in self.stack_fingerprints.items()
+            if name in names
+        )
+        self.s3_conn.put_object(
+            Body=json.dumps(fingerprints, sort_keys=True, separators=(",", ":")),
+            ServerSideEncryption="AES256",
+            ACL="bucket-owner-full-control",
+            ContentType="application/json",
+            **self.stack_fingerprints_location
         )
+        self._stack_fingerprints = fingerprints
+        self.logger.debug("stack fingerprints updated")
 
     def set_hook_data(self, key, data):
         """Set hook data for the given key.
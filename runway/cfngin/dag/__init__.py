@@ -1,9 +1,15 @@
 """CFNgin directed acyclic graph (DAG) implementation."""
 import collections
+import contextlib
 import logging
+import sys
 from collections import OrderedDict, deque
 from copy import copy, deepcopy
-from threading import Thread
+from threading import Condition, Thread
+
+if sys.version_info.major > 2:
+    import asyncio
+    import concurrent.futures
 
 LOGGER = logging.getLogger(__name__)
 
@@ -109,6 +115,108 @@ class DAG(object):
         else:
             raise DAGValidationError(message)
 
+    def add_edges(self, edges):
+        """Add multiple edges (dependencies), validating them together.
+
+        Edges that already exist are ignored. Rather than validating the
+        entire graph, only the nodes reachable from the new edges (the only
+        part of the graph where a new cycle could be formed) are checked.
+
+        Args:
+            edges (Iterable[Tuple[str, str]]): Pairs of independent and
+                dependent nodes.
+
+        Raises:
+            KeyError: A node of an edge does not exist.
+            DAGValidationError: Raised if the resulting graph is invalid.
+                None of the edges are added.
+
+        """
+        graph = self.graph
+        new_edges = []
+        for ind_node, dep_node in edges:
+            if ind_node not in graph:
+                raise KeyError("independent node %s does not exist" % ind_node)
+            if dep_node not in graph:
+                raise KeyError("dependent node %s does not exist" % dep_node)
+            if dep_node not in graph[ind_node]:
+                graph[ind_node].add(dep_node)
+                new_edges.append((ind_node, dep_node))
+        if new_edges and self._has_cycle_from(dep for _, dep in new_edges):
+            for ind_node, dep_node in new_edges:
+                graph[ind_node].discard(dep_node)
+            raise DAGValidationError("graph is not acyclic")
+
+    def _has_cycle_from(self, nodes):
+        """Check for a cycle reachable from any of the given nodes.
+
+        Args:
+            nodes (Iterable[str]): Nodes to start searching from.
+
+        Returns:
+            bool
+
+        """
+        graph = self.graph
+        finished = set()
+        for start in nodes:
+            if start in finished:
+                continue
+            in_progress = set([start])
+            stack = [(start, iter(graph[start]))]
+            while stack:
+                node, edges = stack[-1]
+                for edge in edges:
+                    if edge in in_progress:
+                        return True
+                    if edge not in finished:
+                        in_progress.add(edge)
+                        stack.append((edge, iter(graph[edge])))
+                        break
+                else:
+                    stack.pop()
+                    in_progress.discard(node)
+                    finished.add(node)
+        return False
+
+    def copy(self):
+        """Create a copy of the DAG that can be modified independently.
+
+        Returns:
+            :class:`DAG`
+
+        """
+        result = DAG()
+        result.graph = OrderedDict(
+            (node, set(edges)) for node, edges in self.graph.items()
+        )
+        return result
+
+    def merge(self, other):
+        """Merge the nodes of another DAG that are missing from this one.
+
+        Missing nodes are added along with their edges. The edges of nodes
+        already in this DAG are left unchanged.
+
+        Args:
+            other (:class:`DAG`): The DAG to merge into this one.
+
+        Raises:
+            DAGValidationError: Raised if the resulting graph is invalid.
+
+        """
+        new_nodes = [node for node in other.graph if node not in self.graph]
+        for node in new_nodes:
+            self.graph[node] = set()
+        try:
+            self.add_edges(
+                (node, edge) for node in new_nodes for edge in other.graph[node]
+            )
+        except DAGValidationError:
+            for node in new_nodes:
+                self.graph.pop(node)
+            raise
+
     def delete_edge(self, ind_node, dep_node):
         """Delete an edge from the graph.
 
@@ -487,3 +595,271 @@ class ThreadedWalker(object):  # pylint: disable=too-few-public-methods
 
         # Wait for all threads to complete executing.
         wait_for(nodes)
+
+
+class Deferred(object):  # pylint: disable=too-few-public-methods
+    """Returned by a walk function that is waiting on something to finish.
+
+    Used with :class:`EventWalker` to release the thread walking a node until
+    ``waiter`` is done, at which point ``resume`` is called to continue.
+
+    Attributes:
+        resume (Callable[[], Any]): Called to continue walking the node. It
+            can return another :class:`Deferred`.
+        waiter (Any): Object with an ``add_done_callback`` method that takes
+            a function to call once it is done.
+
+    """
+
+    def __init__(self, waiter, resume):
+        """Instantiate class.
+
+        Args:
+            waiter (Any): Object with an ``add_done_callback`` method.
+            resume (Callable[[], Any]): Called to continue walking the node.
+
+        """
+        self.resume = resume
+        self.waiter = waiter
+
+
+class EventWalker(object):  # pylint: disable=too-few-public-methods
+    """Walk a DAG using a small pool of threads.
+
+    Nodes are started once all of their dependencies are done. If the walk
+    function returns a :class:`Deferred`, the thread is released and the node
+    is resumed by the pool once the :class:`Deferred` is done. This allows a
+    few threads to drive many nodes that spend most of their time waiting.
+
+    """
+
+    def __init__(self, max_workers=10, max_in_flight=0):
+        """Instantiate class.
+
+        Args:
+            max_workers (int): Number of threads used to run walk functions.
+            max_in_flight (int): Maximum number of nodes that can be started
+                but not done at any given time. ``0`` for no limit.
+
+        """
+        self.max_in_flight = max_in_flight
+        self.max_workers = max_workers
+
+    def walk(self, dag, walk_func):
+        """Walk each node of the graph, in parallel if it can.
+
+        The walk_func is only called when the nodes dependencies have been
+        satisfied.
+
+        """
+        graph = dag.graph
+        remaining = dict((node, len(edges)) for node, edges in graph.items())
+        dependants = dict((node, []) for node in graph)
+        for node, edges in graph.items():
+            for edge in edges:
+                dependants[edge].append(node)
+
+        condition = Condition()
+        waiting = deque(
+            node for node in dag.topological_sort()[::-1] if not remaining[node]
+        )
+        runnable = deque()
+        state = {"done": 0, "in_flight": 0}
+
+        def start_waiting():
+            """Queue waiting nodes while below ``max_in_flight``."""
+            while waiting and (
+                not self.max_in_flight or state["in_flight"] < self.max_in_flight
+            ):
+                node = waiting.popleft()
+                state["in_flight"] += 1
+                runnable.append((node, lambda node_=node: walk_func(node_)))
+            condition.notify_all()
+
+        def resume(node, deferred):
+            """Queue a deferred node to be resumed."""
+            with condition:
+                runnable.append((node, deferred.resume))
+                condition.notify_all()
+
+        def finish(node):
+            """Mark a node as done and queue nodes that depend on it."""
+            with condition:
+                state["done"] += 1
+                state["in_flight"] -= 1
+                for parent in dependants[node]:
+                    remaining[parent] -= 1
+                    if not remaining[parent]:
+                        waiting.append(parent)
+                start_waiting()
+
+        def worker():
+            """Run walk functions until every node is done."""
+            while True:
+                with condition:
+                    while not runnable and state["done"] < len(graph):
+                        condition.wait()
+                    if state["done"] >= len(graph):
+                        return
+                    node, func = runnable.popleft()
+                try:
+                    result = func()
+                except Exception:  # pylint: disable=broad-except
+                    LOGGER.exception("%s failed", node)
+                    result = None
+                if isinstance(result, Deferred):
+                    LOGGER.debug("%s waiting", node)
+                    result.waiter.add_done_callback(
+                        lambda node_=node, deferred=result: resume(node_, deferred)
+                    )
+                else:
+                    finish(node)
+
+        with condition:
+            start_waiting()
+        threads = [
+            Thread(target=worker, name="walker-%s" % i)
+            for i in range(max(min(self.max_workers, len(graph)), 1))
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+
+    walk.deferred = True
+
+
+class AsyncioWalker(object):  # pylint: disable=too-few-public-methods
+    """Walk a DAG on an asyncio event loop.
+
+    Nodes are started once all of their dependencies are done. Walk
+    functions are synchronous (they run hooks, lookups, etc) so they are
+    offloaded to the thread pool of the loop. If a walk function returns a
+    :class:`Deferred`, the node is resumed from the loop once the
+    :class:`Deferred` is done so no thread is held while it waits.
+
+    Requires Python 3.
+
+    """
+
+    def __init__(self, max_workers=10, max_in_flight=0, setup=None):
+        """Instantiate class.
+
+        Args:
+            max_workers (int): Number of threads used to run walk functions.
+            max_in_flight (int): Maximum number of nodes that can be started
+                but not done at any given time. ``0`` for no limit.
+            setup (Optional[Callable[[asyncio.AbstractEventLoop], Any]]):
+                Called with the event loop before walking the graph. Must
+                return a context manager that is exited once the graph has
+                been walked.
+
+        """
+        self.max_in_flight = max_in_flight
+        self.max_workers = max_workers
+        self.setup = setup
+
+    def walk(self, dag, walk_func):
+        """Walk each node of the graph, in parallel if it can.
+
+        The walk_func is only called when the nodes dependencies have been
+        satisfied.
+
+        """
+        loop = asyncio.new_event_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        loop.set_default_executor(executor)
+        try:
+            with contextlib.ExitStack() as stack:
+                if self.setup:
+                    stack.enter_context(self.setup(loop))
+                loop.run_until_complete(
+                    _LoopWalk(loop, dag, walk_func, self.max_in_flight).start()
+                )
+        finally:
+            executor.shutdown(wait=True)
+            loop.close()
+
+    walk.deferred = True
+
+
+class _LoopWalk(object):  # pylint: disable=too-few-public-methods
+    """State of a single :meth:`AsyncioWalker.walk`.
+
+    All methods other than :meth:`start` are called from the event loop so
+    no locking is needed.
+
+    """
+
+    def __init__(self, loop, dag, walk_func, max_in_flight=0):
+        """Instantiate class."""
+        self.dag = dag
+        self.done = loop.create_future()
+        self.finished = 0
+        self.in_flight = 0
+        self.loop = loop
+        self.max_in_flight = max_in_flight
+        self.walk_func = walk_func
+        self.remaining = dict((node, len(edges)) for node, edges in dag.graph.items())
+        self.dependants = dict((node, []) for node in dag.graph)
+        for node, edges in dag.graph.items():
+            for edge in edges:
+                self.dependants[edge].append(node)
+        self.waiting = deque(
+            node for node in dag.topological_sort()[::-1] if not self.remaining[node]
+        )
+
+    def start(self):
+        """Start walking the graph.
+
+        Returns:
+            asyncio.Future: Done once every node has been walked.
+
+        """
+        if not self.dag.graph:
+            self.done.set_result(None)
+        self._start_waiting()
+        return self.done
+
+    def _start_waiting(self):
+        """Start waiting nodes while below ``max_in_flight``."""
+        while self.waiting and (
+            not self.max_in_flight or self.in_flight < self.max_in_flight
+        ):
+            node = self.waiting.popleft()
+            self.in_flight += 1
+            self._run(node, self.walk_func, node)
+
+    def _run(self, node, func, *args):
+        """Run a function for a node in the thread pool of the loop."""
+        future = self.loop.run_in_executor(None, func, *args)
+        future.add_done_callback(lambda future_: self._handle(node, future_))
+
+    def _handle(self, node, future):
+        """Handle the result of running a function for a node."""
+        try:
+            result = future.result()
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("%s failed", node)
+            result = None
+        if isinstance(result, Deferred):
+            LOGGER.debug("%s waiting", node)
+            result.waiter.add_done_callback(
+                lambda: self.loop.call_soon_threadsafe(self._run, node, result.resume)
+            )
+        else:
+            self._finish(node)
+
+    def _finish(self, node):
+        """Mark a node as done and start nodes that depend on it."""
+        self.finished += 1
+        self.in_flight -= 1
+        for parent in self.dependants[node]:
+            self.remaining[parent] -= 1
+            if not self.remaining[parent]:
+                self.waiting.append(parent)
+        self._start_waiting()
+        if self.finished >= len(self.dag.graph):
+            self.done.set_result(None)
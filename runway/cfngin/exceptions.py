@@ -344,6 +344,23 @@ class PersistentGraphLockCodeMissmatch(Exception):
         super(PersistentGraphLockCodeMissmatch, self).__init__(message)
 
 
+class PersistentGraphModified(Exception):
+    """Raised when the persistent graph in S3 was modified by another session.
+
+    The object in S3 no longer matches the ETag of the object last read or
+    written by this session.
+
+    """
+
+    def __init__(self, expected_etag, s3_etag):
+        """Instantiate class."""
+        message = (
+            "Persistent graph was modified outside of this session; "
+            "expected ETag %s but found %s" % (expected_etag, s3_etag)
+        )
+        super(PersistentGraphModified, self).__init__(message)
+
+
 class PersistentGraphUnlocked(Exception):
     """Raised when the persistent graph in S3 is unlock.
 
@@ -520,6 +537,26 @@ class UnknownLookupType(Exception):
         super(UnknownLookupType, self).__init__(message, *args, **kwargs)
 
 
+class UnrecordedApiCall(Exception):
+    """Raised when replaying an AWS API call that was not recorded."""
+
+    def __init__(self, operation, params, path, *args, **kwargs):
+        """Instantiate class.
+
+        Args:
+            operation (str): ``<service>.<operation>`` of the call.
+            params (Dict[str, Any]): Parameters of the call.
+            path (str): Path of the cassette being replayed.
+
+        """
+        self.operation = operation
+        self.params = params
+        message = "{} was not recorded in {} (parameters: {})".format(
+            operation, path, params
+        )
+        super(UnrecordedApiCall, self).__init__(message, *args, **kwargs)
+
+
 class UnresolvedVariable(Exception):
     """Raised when trying to use a variable before it has been resolved."""
 
@@ -1,44 +1,93 @@
 """AWS Lambda hook."""  # pylint: disable=too-many-lines
 from __future__ import absolute_import  # TODO remove when dropping python 2 support
 
+import contextlib
+import functools
 import hashlib
 import json
 import logging
+import multiprocessing
 import os
+import platform
+import posixpath
+import re
+import shlex
 import shutil
 import stat
 import subprocess
 import sys
+import uuid
 from distutils.util import strtobool  # pylint: disable=E
-from io import BytesIO as StringIO
 from shutil import copyfile
-from types import GeneratorType
-from zipfile import ZIP_DEFLATED, ZipFile
+from tempfile import SpooledTemporaryFile
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
 
 # pylint import order false alerts appear to be specific to py2 on Windows
 import botocore
 import docker
 import formic  # pylint: disable=wrong-import-order
+from formic.formic import MatchType  # pylint: disable=wrong-import-order
 from six import string_types  # pylint: disable=wrong-import-order
+from six.moves.urllib.parse import urlparse  # pylint: disable=E
+from six.moves.urllib.request import url2pathname  # pylint: disable=E
 from troposphere.awslambda import Code  # pylint: disable=wrong-import-order
 
+from .. import instrumentation
 from ..exceptions import InvalidDockerizePipConfiguration, PipenvError, PipError
 from ..session_cache import get_session
 from ..util import ensure_s3_bucket
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None  # pylint: disable=invalid-name
+
 if sys.version_info.major < 3:
     from backports import tempfile  # pylint: disable=E
     from pathlib2 import Path  # pylint: disable=E
 else:
+    import concurrent.futures
     import tempfile  # pylint: disable=E
     from pathlib import Path  # pylint: disable=E
 
 # mask to retrieve only UNIX file permissions from the external attributes
 # field of a ZIP entry.
 ZIP_PERMS_MASK = (stat.S_IRWXU | stat.S_IRWXG | stat.S_IRWXO) << 16
+# timestamp of every ZIP entry (the earliest a ZIP file can store) so archives
+# do not depend on when their files were checked out or installed
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# "create system" of every ZIP entry (UNIX) so permissions are read from the
+# external attributes regardless of the platform the archive is built on
+ZIP_CREATE_SYSTEM = 3
+# size a ZIP file can grow to in memory before it is moved to a temporary file
+ZIP_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# size of the chunks files are read in
+READ_CHUNK_SIZE = 1024 * 1024
+# ioctl cloning a file on Linux filesystems supporting copy-on-write (e.g.
+# btrfs and XFS)
+FICLONE = 0x40049409
 
 LOGGER = logging.getLogger(__name__)
 
+# directory of ~/.runway_cache containing the dependencies installed for each
+# combination of requirements, python and pip options
+DEPENDENCY_CACHE_DIR = "lambda_dependencies"
+# docker volume used as the pip cache of DockerPipBuilder by default
+DOCKER_PIP_CACHE_VOLUME = "runway-lambda-pip-cache"
+# options of a requirements file that refer to other files or directories
+REQUIREMENT_OPTIONS = (
+    "--requirement",
+    "--constraint",
+    "--editable",
+    "--find-links",
+    "-r",
+    "-c",
+    "-e",
+    "-f",
+)
+# local files installed by pip from a requirements file
+REQUIREMENT_ARCHIVE_EXTENSIONS = (".whl", ".zip", ".tar.gz", ".tgz", ".tar.bz2")
+
 # list from python tags of https://hub.docker.com/r/lambci/lambda/tags
 SUPPORTED_RUNTIMES = [
     # Python 2.7 reached end-of-life on January 1st, 2020.
@@ -52,11 +101,17 @@ SUPPORTED_RUNTIMES = [
 ]
 
 
-def copydir(source, destination, includes, excludes=None, follow_symlinks=False):
+def copydir(
+    source, destination, includes, excludes=None, follow_symlinks=False, files=None
+):
     """Extend the functionality of shutil.
 
     Correctly copies files and directories in a source directory.
 
+    Files are hard linked, or cloned if the filesystem supports copy-on-write,
+    when possible (see :func:`_link_or_copy`) so they must not be modified in
+    place in the destination.
+
     Args:
         source (str): Source directory.
         destination (str): Destination directory.
@@ -64,9 +119,12 @@ def copydir(source, destination, includes, excludes=None, follow_symlinks=False)
         excludes (List[str]): Glob patterns for files to exclude.
         follow_symlinks (bool): If true, symlinks will be included in the
             resulting zip file.
+        files (Optional[List[str]]): Files to copy, relative to ``source``,
+            if they were already found from the patterns.
 
     """
-    files = _find_files(source, includes, excludes, follow_symlinks)
+    if files is None:
+        files = _find_files(source, includes, excludes, follow_symlinks)
 
     def _mkdir(dir_name):
         """Recursively create directories."""
@@ -79,13 +137,84 @@ def copydir(source, destination, includes, excludes=None, follow_symlinks=False)
     for file_name in files:
         src = os.path.join(source, file_name)
         dest = os.path.join(destination, file_name)
+        if not os.path.isdir(os.path.dirname(dest)):
+            _mkdir(os.path.dirname(dest))
+        LOGGER.debug('copying file "%s" to "%s"', src, dest)
+        _link_or_copy(src, dest, follow_symlinks=True)
+
+
+def _clone_file(source, destination):
+    """Clone a file on a filesystem supporting copy-on-write (reflink).
+
+    Args:
+        source (str): File to clone.
+        destination (str): Path of the clone.
+
+    Returns:
+        bool: Whether the file was cloned.
+
+    """
+    if not fcntl or not sys.platform.startswith("linux"):
+        return False
+    with open(source, "rb") as src, open(destination, "wb") as dest:
         try:
-            LOGGER.debug('copying file "%s" to "%s"', src, dest)
-            copyfile(src, dest)
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
         # python2 raises an IOError here
         except (IOError, OSError):
-            _mkdir(os.path.dirname(dest))
-            copyfile(src, dest)
+            return False
+    shutil.copystat(source, destination)
+    return True
+
+
+def _link_or_copy(source, destination, follow_symlinks=False):
+    """Hard link a file, cloning or copying it if it can't be linked.
+
+    Files are cloned if they can't be linked (e.g. across devices) and the
+    filesystem supports copy-on-write. Otherwise, they are copied.
+
+    Args:
+        source (str): File to link.
+        destination (str): Path of the link.
+        follow_symlinks (bool): Link the file a symlink points to instead of
+            recreating the symlink.
+
+    """
+    if os.path.islink(source):
+        if not follow_symlinks:
+            os.symlink(os.readlink(source), destination)
+            return
+        source = os.path.realpath(source)
+    try:
+        os.link(source, destination)
+    # not supported by the platform (AttributeError on python2 for Windows),
+    # across devices or by the filesystem
+    except (AttributeError, OSError):
+        if not _clone_file(source, destination):
+            shutil.copy2(source, destination)
+
+
+def link_tree(source, destination):
+    """Link every file of a directory into another.
+
+    Files that already exist in the destination are kept.
+
+    Args:
+        source (str): Directory to link files from.
+        destination (str): Directory to link files into.
+
+    """
+    for dir_path, dir_names, file_names in os.walk(source):
+        dest_dir = os.path.join(destination, os.path.relpath(dir_path, source))
+        if not os.path.isdir(dest_dir):
+            os.makedirs(dest_dir)
+        # os.walk lists symlinks to directories as directories
+        for name in dir_names + file_names:
+            src = os.path.join(dir_path, name)
+            dest = os.path.join(dest_dir, name)
+            if (name in file_names or os.path.islink(src)) and not os.path.lexists(
+                dest
+            ):
+                _link_or_copy(src, dest)
 
 
 def find_requirements(root):
@@ -133,12 +262,110 @@ def should_use_docker(dockerize_pip=None):
     return False
 
 
+def _is_executable(file_path):
+    """Whether a file is user-executable.
+
+    Args:
+        file_path (str): Path of the file.
+
+    Returns:
+        bool
+
+    """
+    return bool(os.stat(file_path).st_mode & stat.S_IXUSR)
+
+
+def _hash_file_header(file_name, file_path):
+    """Get what is hashed before the contents of a file.
+
+    Executable files are marked since they are stored in archives with
+    different permissions.
+
+    Args:
+        file_name (str): Name of the file.
+        file_path (str): Path of the file.
+
+    Returns:
+        bytes
+
+    """
+    if _is_executable(file_path):
+        return (file_name + "\0+x\0").encode()
+    return (file_name + "\0").encode()
+
+
+def _zip_info(file_path, file_name):
+    """Create the ZIP entry of a file.
+
+    The UNIX permissions of the entry are forced to 755 or 644 (depending on
+    whether the file is user-executable in the source filesystem). Its
+    timestamp is always :data:`ZIP_DATE_TIME`.
+
+    Args:
+        file_path (str): Path of the file.
+        file_name (str): Name of the file in the archive.
+
+    Returns:
+        ZipInfo
+
+    """
+    file_stat = os.stat(file_path)
+    # normalized like ZipFile.write (e.g. "./lib/a.py" is stored as "lib/a.py")
+    arcname = os.path.normpath(os.path.splitdrive(file_name)[1]).lstrip(
+        os.sep + (os.altsep or "")
+    )
+    zip_info = ZipInfo(arcname, ZIP_DATE_TIME)
+    zip_info.create_system = ZIP_CREATE_SYSTEM
+    perms = 0o755 if file_stat.st_mode & stat.S_IXUSR else 0o644
+    if stat.S_IMODE(file_stat.st_mode) != perms:
+        LOGGER.debug(
+            "fixing perms: %s: %o => %o",
+            file_name,
+            stat.S_IMODE(file_stat.st_mode),
+            perms,
+        )
+    zip_info.external_attr = (stat.S_IFREG | perms) << 16
+    zip_info.compress_type = ZIP_DEFLATED
+    zip_info.file_size = file_stat.st_size
+    return zip_info
+
+
+def _write_zip_entry(zip_file, zip_info, source, callback):
+    """Write a file to a ZIP file, passing each chunk read to a callback.
+
+    Args:
+        zip_file (ZipFile): Archive to write to.
+        zip_info (ZipInfo): Entry of the file.
+        source (BinaryIO): File to read.
+        callback (Callable[[bytes], Any]): Called with each chunk read.
+
+    """
+    if sys.version_info < (3, 6):
+        # ZipFile.open can't write before python 3.6
+        data = source.read()
+        callback(data)
+        zip_file.writestr(zip_info, data)
+        return
+    with zip_file.open(zip_info, "w") as dest:
+        for chunk in iter(lambda: source.read(READ_CHUNK_SIZE), b""):
+            callback(chunk)
+            dest.write(chunk)
+
+
 def _zip_files(files, root):
-    """Generate a ZIP file in-memory from a list of files.
+    """Generate a ZIP file from a list of files.
 
-    Files will be stored in the archive with relative names, and have their
-    UNIX permissions forced to 755 or 644 (depending on whether they are
-    user-executable in the source filesystem).
+    Files will be stored in the archive with relative names, sorted, and have
+    their UNIX permissions forced to 755 or 644 (depending on whether they are
+    user-executable in the source filesystem) and their timestamps fixed.
+    The archive is therefore the same, byte for byte, for the same files
+    wherever and whenever it is built (with the same zlib) so the hash of the
+    files identifies it.
+
+    Each file is read once, feeding both the archive and the hash of the
+    files (the same hash as :func:`_calculate_hash`). The archive is kept in
+    memory until it grows larger than :data:`ZIP_SPOOL_MAX_SIZE`, then moved
+    to a temporary file.
 
     Args:
         files (List[str]): file names to add to the archive, relative to
@@ -146,44 +373,32 @@ def _zip_files(files, root):
         root (str): base directory to retrieve files from.
 
     Returns:
-        Tuple[str, str]: Content of the ZIP file as a byte string and
-        calculated hash of all the files
+        Tuple[SpooledTemporaryFile, str]: ZIP file, positioned at its start,
+        and calculated hash of all the files. The caller must close the ZIP
+        file.
 
     """
-    zip_data = StringIO()
-    if isinstance(files, GeneratorType):
-        # if file list is a generator, save the contents so it can be reused
-        # since generators are empty after the first iteration and cannot be
-        # rewound.
-        LOGGER.debug("converting file generater to list for reuse...")
-        files = list(files)
-    with ZipFile(zip_data, "w", ZIP_DEFLATED) as zip_file:
-        for file_name in files:
-            zip_file.write(os.path.join(root, file_name), file_name)
-
-        # Fix file permissions to avoid any issues - only care whether a file
-        # is executable or not, choosing between modes 755 and 644 accordingly.
-        for zip_entry in zip_file.filelist:
-            perms = (zip_entry.external_attr & ZIP_PERMS_MASK) >> 16
-            if perms & stat.S_IXUSR != 0:
-                new_perms = 0o755
-            else:
-                new_perms = 0o644
-
-            if new_perms != perms:
-                LOGGER.debug(
-                    "fixing perms: %s: %o => %o", zip_entry.filename, perms, new_perms
-                )
-                new_attr = (zip_entry.external_attr & ~ZIP_PERMS_MASK) | (
-                    new_perms << 16
-                )
-                zip_entry.external_attr = new_attr
-
-    contents = zip_data.getvalue()
-    zip_data.close()
-    content_hash = _calculate_hash(files, root)
-
-    return contents, content_hash
+    zip_data = SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+    file_hash = hashlib.md5()
+    try:
+        with ZipFile(zip_data, "w", ZIP_DEFLATED) as zip_file:
+            # sorted to hash files in the same order as _calculate_hash
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                file_hash.update(_hash_file_header(file_name, file_path))
+                with open(file_path, "rb") as source:
+                    _write_zip_entry(
+                        zip_file,
+                        _zip_info(file_path, file_name),
+                        source,
+                        file_hash.update,
+                    )
+                file_hash.update("\0".encode())
+    except Exception:
+        zip_data.close()
+        raise
+    zip_data.seek(0)
+    return zip_data, file_hash.hexdigest()
 
 
 def _calculate_hash(files, root):
@@ -201,7 +416,7 @@ def _calculate_hash(files, root):
     file_hash = hashlib.md5()
     for file_name in sorted(files):
         file_path = os.path.join(root, file_name)
-        file_hash.update((file_name + "\0").encode())
+        file_hash.update(_hash_file_header(file_name, file_path))
         with open(file_path, "rb") as file_:
             for chunk in iter(lambda: file_.read(4096), ""):  # pylint: disable=W
                 if not chunk:
@@ -212,6 +427,37 @@ def _calculate_hash(files, root):
     return file_hash.hexdigest()
 
 
+def _walk_pruned(top, excluded_dirs, followlinks=False):
+    """Walk a directory like :func:`os.walk`, skipping excluded directories.
+
+    formic only stops walking a directory that is excluded (e.g. ``.git``,
+    ``node_modules/``) once it is listed. Here, it is never listed.
+
+    Args:
+        top (str): Directory to walk.
+        excluded_dirs (List[formic.Pattern]): Exclusion patterns matching all
+            files.
+        followlinks (bool): Walk into symlinks to directories.
+
+    Yields:
+        Tuple[str, List[str], List[str]]: Like :func:`os.walk`.
+
+    """
+    for dir_path, dir_names, file_names in os.walk(top, followlinks=followlinks):
+        relative = os.path.relpath(dir_path, top)
+        path_elements = [] if relative == os.curdir else relative.split(os.sep)
+        dir_names[:] = [
+            name
+            for name in dir_names
+            if not any(
+                pattern.match_directory(path_elements + [name])
+                == MatchType.MATCH_ALL_SUBDIRECTORIES
+                for pattern in excluded_dirs
+            )
+        ]
+        yield dir_path, dir_names, file_names
+
+
 def _find_files(root, includes, excludes=None, follow_symlinks=False):
     """List files inside a directory based on include and exclude rules.
 
@@ -238,15 +484,28 @@ def _find_files(root, includes, excludes=None, follow_symlinks=False):
     """
     root = os.path.abspath(root)
     file_set = formic.FileSet(
-        directory=root, include=includes, exclude=excludes, symlinks=follow_symlinks,
+        directory=root,
+        include=includes,
+        exclude=excludes,
+        symlinks=follow_symlinks,
+        walk=functools.partial(
+            _walk_pruned,
+            excluded_dirs=[
+                pattern
+                for pattern in formic.FileSet(
+                    include="**", exclude=excludes
+                ).exclude.iter()
+                if pattern.all_files()
+            ],
+        ),
     )
 
     for filename in file_set.qualified_files(absolute=False):
         yield filename
 
 
-def _zip_from_file_patterns(root, includes, excludes, follow_symlinks):
-    """Generate a ZIP file in-memory from file search patterns.
+def _find_payload_files(root, includes, excludes, follow_symlinks):
+    """List the files of a Lambda payload from file search patterns.
 
     Args:
         root (str): Base directory to list files from.
@@ -258,28 +517,22 @@ def _zip_from_file_patterns(root, includes, excludes, follow_symlinks):
         follow_symlinks (bool): If true, symlinks will be included in the
             resulting zip file
 
-    See Also:
-        :func:`_zip_files`, :func:`_find_files`.
+    Returns:
+        List[str]: Files relative to ``root``.
 
-    Raises:
-        RuntimeError: when the generated archive would be empty.
+    See Also:
+        :func:`_find_files`.
 
     """
     LOGGER.info("base directory: %s", root)
 
     files = list(_find_files(root, includes, excludes, follow_symlinks))
-    if not files:
-        raise RuntimeError(
-            "Empty list of files for Lambda payload. Check "
-            "your include/exclude options for errors."
-        )
-
-    LOGGER.info("adding %d files:", len(files))
+    LOGGER.info("found %d files:", len(files))
 
     for file_name in files:
         LOGGER.debug(" + %s", file_name)
 
-    return _zip_files(files, root)
+    return files
 
 
 def handle_requirements(
@@ -357,6 +610,9 @@ def _handle_use_pipenv(package_root, dest_path, python_path=None, timeout=300):
         sys.exit(1)
     LOGGER.info("creating requirements.txt from Pipfile...")
     req_path = os.path.join(dest_path, "requirements.txt")
+    if os.path.lexists(req_path):
+        # may be a hard link to the requirements of the package (see copydir)
+        os.remove(req_path)
     cmd = ["pipenv", "lock", "--requirements", "--keep-outdated"]
     if python_path:
         cmd.insert(0, python_path)
@@ -381,42 +637,23 @@ def _handle_use_pipenv(package_root, dest_path, python_path=None, timeout=300):
         raise PipenvError
 
 
-def dockerized_pip(
-    work_dir, client=None, runtime=None, docker_file=None, docker_image=None, **_kwargs
-):
-    """Run pip with docker.
+def _docker_image(client, runtime=None, docker_file=None, docker_image=None):
+    """Get the docker image used to run pip.
 
     Args:
-        work_dir (str): Work directory for docker.
-        client (Optional[docker.DockerClient]): Custom docker client.
-        runtime (Optional[str]): Lambda runtime. Must provide one of
-            ``runtime``, ``docker_file``, or ``docker_image``.
+        client (docker.DockerClient): Docker client.
+        runtime (Optional[str]): Lambda runtime.
         docker_file (Optional[str]): Path to a Dockerfile to build an image.
-            Must provide one of ``runtime``, ``docker_file``, or
-            ``docker_image``.
         docker_image (Optional[str]): Local or remote docker image to use.
-            Must provide one of ``runtime``, ``docker_file``, or
-            ``docker_image``.
-        kwargs (Any): Advanced options for docker. See source code to
-            determine what is supported.
 
     Returns:
-        Tuple[str, str]: Content of the ZIP file as a byte string and
-        calculated hash of all the files
+        str: Name or ID of the image.
 
-    """
-    # TODO use kwargs to pass args to docker for advanced config
-    if bool(docker_file) + bool(docker_image) + bool(runtime) != 1:
-        # exactly one of these is needed. converting to bool will give us a
-        # 'False' (0) for 'None' and 'True' (1) for anything else.
-        raise InvalidDockerizePipConfiguration(
-            "exactly only one of [docker_file, docker_file, runtime] must be "
-            "provided"
-        )
-
-    if not client:
-        client = docker.from_env()
+    Raises:
+        ValueError: The Dockerfile can't be found or the runtime is not
+            supported.
 
+    """
     if docker_file:
         if not os.path.isfile(docker_file):
             raise ValueError('could not find docker_file "%s"' % docker_file)
@@ -447,6 +684,65 @@ def dockerized_pip(
         LOGGER.debug(
             'selected docker image "%s" based on provided runtime', docker_image
         )
+    return docker_image
+
+
+def dockerized_pip(
+    work_dir,
+    client=None,
+    runtime=None,
+    docker_file=None,
+    docker_image=None,
+    docker_builder=None,
+    **_kwargs
+):
+    """Run pip with docker.
+
+    Args:
+        work_dir (str): Work directory for docker.
+        client (Optional[docker.DockerClient]): Custom docker client.
+        runtime (Optional[str]): Lambda runtime. Must provide one of
+            ``runtime``, ``docker_file``, or ``docker_image``.
+        docker_file (Optional[str]): Path to a Dockerfile to build an image.
+            Must provide one of ``runtime``, ``docker_file``, or
+            ``docker_image``.
+        docker_image (Optional[str]): Local or remote docker image to use.
+            Must provide one of ``runtime``, ``docker_file``, or
+            ``docker_image``.
+        docker_builder (Optional[DockerPipBuilder]): Run pip in the
+            long-lived container of this builder if ``work_dir`` is available
+            to it, instead of in a new container.
+        kwargs (Any): Advanced options for docker. See source code to
+            determine what is supported.
+
+    Returns:
+        Tuple[str, str]: Content of the ZIP file as a byte string and
+        calculated hash of all the files
+
+    """
+    # TODO use kwargs to pass args to docker for advanced config
+    if bool(docker_file) + bool(docker_image) + bool(runtime) != 1:
+        # exactly one of these is needed. converting to bool will give us a
+        # 'False' (0) for 'None' and 'True' (1) for anything else.
+        raise InvalidDockerizePipConfiguration(
+            "exactly only one of [docker_file, docker_file, runtime] must be "
+            "provided"
+        )
+
+    if docker_builder and docker_builder.can_install(work_dir):
+        docker_builder.install(
+            work_dir,
+            runtime=runtime,
+            docker_file=docker_file,
+            docker_image=docker_image,
+            python_dontwritebytecode=_kwargs.get("python_dontwritebytecode"),
+        )
+        return
+
+    if not client:
+        client = docker.from_env()
+
+    docker_image = _docker_image(client, runtime, docker_file, docker_image)
 
     if sys.platform.lower() == "win32":
         LOGGER.debug("formatted docker mount path for Windows")
@@ -479,6 +775,230 @@ def dockerized_pip(
         LOGGER.info(log.decode().strip())
 
 
+class DockerPipBuilder(object):
+    """Long-lived docker containers that run pip for a run of the hook.
+
+    A container is started the first time an image is used and pip is run
+    in it for every payload built with the image, instead of starting a new
+    container for each. Images are only built or pulled once per process.
+
+    The directory containing the build directories of payloads is mounted
+    in the containers, as is a pip cache (a docker volume or a directory)
+    that persists between runs so wheels are not downloaded or built again.
+
+    Builders can be passed to worker processes. Containers are found by name
+    so each process uses the same ones. They are removed by :meth:`close`.
+
+    Attributes:
+        builder_id (str): Unique ID of the builder, used to name and label
+            its containers.
+        mount_root (str): Directory mounted in the containers. Only build
+            directories inside it can be installed to.
+        pip_cache (str): Name of a docker volume or absolute path of a
+            directory used as the pip cache.
+        used (bool): Whether containers may have been started (by this or a
+            worker process).
+
+    """
+
+    LABEL = "runway.cfngin.hooks.aws_lambda.builder"
+    MOUNT_TARGET = "/var/runway"
+    PIP_CACHE_TARGET = "/var/runway_pip_cache"
+
+    def __init__(self, mount_root, pip_cache=None, client=None):
+        """Instantiate class.
+
+        Args:
+            mount_root (str): Directory mounted in the containers.
+            pip_cache (Optional[str]): Name of a docker volume or absolute
+                path of a directory used as the pip cache.
+            client (Optional[docker.DockerClient]): Custom docker client.
+
+        """
+        self.builder_id = uuid.uuid4().hex[:12]
+        self.mount_root = os.path.abspath(mount_root)
+        self.pip_cache = pip_cache or DOCKER_PIP_CACHE_VOLUME
+        self.used = False
+        self._client = client
+        self._containers = {}
+        self._images = {}
+
+    def __getstate__(self):
+        """Get the state of the builder without its docker client."""
+        state = dict(self.__dict__)
+        state.update(_client=None, _containers={}, _images={})
+        return state
+
+    @property
+    def client(self):
+        """Docker client.
+
+        Returns:
+            docker.DockerClient
+
+        """
+        if not self._client:
+            self._client = docker.from_env()
+        return self._client
+
+    def can_install(self, work_dir):
+        """Whether a build directory is available to the containers.
+
+        Args:
+            work_dir (str): Build directory.
+
+        Returns:
+            bool
+
+        """
+        relative = os.path.relpath(os.path.abspath(work_dir), self.mount_root)
+        return relative != os.pardir and not relative.startswith(os.pardir + os.sep)
+
+    def image(self, runtime=None, docker_file=None, docker_image=None):
+        """Get the image used to run pip, building or pulling it once.
+
+        Args:
+            runtime (Optional[str]): Lambda runtime.
+            docker_file (Optional[str]): Path to a Dockerfile to build an
+                image.
+            docker_image (Optional[str]): Local or remote docker image to
+                use.
+
+        Returns:
+            str: Name or ID of the image.
+
+        """
+        key = (runtime, docker_file, docker_image)
+        if key not in self._images:
+            image = _docker_image(self.client, runtime, docker_file, docker_image)
+            try:
+                self.client.images.get(image)
+            except docker.errors.ImageNotFound:
+                LOGGER.info('pulling docker image "%s"...', image)
+                repository, tag = docker.utils.parse_repository_tag(image)
+                self.client.images.pull(repository, tag=tag or "latest")
+            self._images[key] = image
+        return self._images[key]
+
+    def container(self, image):
+        """Get the container of an image, starting it if needed.
+
+        Args:
+            image (str): Name or ID of the image.
+
+        Returns:
+            docker.models.containers.Container
+
+        """
+        if image in self._containers:
+            return self._containers[image]
+        self.used = True
+        name = "runway-lambda-builder-{}-{}".format(
+            self.builder_id, hashlib.md5(image.encode()).hexdigest()[:8]
+        )
+        try:
+            container = self.client.containers.get(name)
+        except docker.errors.NotFound:
+            pip_cache_type = "bind" if os.path.isabs(self.pip_cache) else "volume"
+            if pip_cache_type == "bind" and not os.path.isdir(self.pip_cache):
+                os.makedirs(self.pip_cache)
+            LOGGER.info('starting docker container "%s" to run pip...', name)
+            try:
+                container = self.client.containers.run(
+                    image=image,
+                    command=["/bin/sh", "-c", "while true; do sleep 3600; done"],
+                    auto_remove=True,
+                    detach=True,
+                    environment={"PIP_CACHE_DIR": self.PIP_CACHE_TARGET},
+                    labels={self.LABEL: self.builder_id},
+                    mounts=[
+                        docker.types.Mount(
+                            target=self.MOUNT_TARGET,
+                            source=self._docker_path(self.mount_root),
+                            type="bind",
+                        ),
+                        docker.types.Mount(
+                            target=self.PIP_CACHE_TARGET,
+                            source=self._docker_path(self.pip_cache),
+                            type=pip_cache_type,
+                        ),
+                    ],
+                    name=name,
+                )
+            except docker.errors.APIError as err:
+                if err.status_code != 409:
+                    raise
+                # started by another process
+                container = self.client.containers.get(name)
+        self._containers[image] = container
+        return container
+
+    def install(self, work_dir, python_dontwritebytecode=False, **kwargs):
+        """Run pip in a container to install the requirements of a directory.
+
+        Args:
+            work_dir (str): Build directory containing ``requirements.txt``.
+                Must be inside :attr:`mount_root`.
+            python_dontwritebytecode (bool): Don't write bytecode.
+            kwargs (Any): Arguments of :meth:`image`.
+
+        Raises:
+            PipError: Non-zero exit code returned by pip.
+
+        """
+        container = self.container(self.image(**kwargs))
+        target = posixpath.join(
+            self.MOUNT_TARGET,
+            *os.path.relpath(os.path.abspath(work_dir), self.mount_root).split(os.sep)
+        )
+        environment = {"PIP_CACHE_DIR": self.PIP_CACHE_TARGET}
+        if python_dontwritebytecode:
+            environment["PYTHONDONTWRITEBYTECODE"] = "1"
+        LOGGER.info(
+            'using docker container "%s" to build deployment package...',
+            container.name,
+        )
+        exec_id = self.client.api.exec_create(
+            container.id,
+            [
+                "python",
+                "-m",
+                "pip",
+                "install",
+                "-t",
+                target,
+                "-r",
+                posixpath.join(target, "requirements.txt"),
+            ],
+            environment=environment,
+        )["Id"]
+        for log in self.client.api.exec_start(exec_id, stream=True):
+            LOGGER.info(log.decode().strip())
+        if self.client.api.exec_inspect(exec_id)["ExitCode"]:
+            raise PipError
+
+    def close(self):
+        """Remove the containers of the builder (of all processes)."""
+        if not self.used:
+            return
+        for container in self.client.containers.list(
+            all=True, filters={"label": "{}={}".format(self.LABEL, self.builder_id)}
+        ):
+            LOGGER.debug('removing docker container "%s"', container.name)
+            try:
+                container.remove(force=True)
+            except docker.errors.NotFound:
+                pass  # already removed
+        self._containers = {}
+
+    @staticmethod
+    def _docker_path(path):
+        """Format a host path for docker."""
+        if sys.platform.lower() == "win32":
+            return path.replace("\\", "/")
+        return path
+
+
 def _pip_has_no_color_option(python_path):
     """Return boolean on whether pip is new enough to have --no-color option.
 
@@ -516,6 +1036,419 @@ def _pip_has_no_color_option(python_path):
     return False
 
 
+def _python_version(python_path=None):
+    """Get the version and platform of a python interpreter.
+
+    Only the major and minor version are included since dependencies built
+    by interpreters of the same minor version, platform and machine are
+    interchangeable.
+
+    Args:
+        python_path (Optional[str]): Explicit python interpreter. If not
+            provided, the current interpreter is used.
+
+    Returns:
+        str: e.g. ``3.8 linux x86_64``.
+
+    """
+    if not python_path:
+        return "{}.{} {} {}".format(
+            sys.version_info[0], sys.version_info[1], sys.platform, platform.machine()
+        )
+    try:
+        version = subprocess.check_output(
+            [
+                python_path,
+                "-c",
+                "from __future__ import print_function;"
+                "import platform, sys;"
+                "print('%d.%d' % sys.version_info[:2], sys.platform, "
+                "platform.machine())",
+            ]
+        )
+    except (OSError, subprocess.CalledProcessError):
+        LOGGER.debug("error checking the version of %s", python_path)
+        return python_path
+    if sys.version_info[0] > 2 and isinstance(version, bytes):
+        version = version.decode()
+    return version.strip()
+
+
+def _hash_update(key, name, value):
+    """Add a named value to a hash.
+
+    Args:
+        key (Any): Object returned by a :mod:`hashlib` constructor.
+        name (str): Name of the value.
+        value (Any): Value to add. Converted to a string if not bytes.
+
+    """
+    if not isinstance(value, bytes):
+        value = str(value).encode()
+    key.update(name.encode() + b"\0" + value + b"\0")
+
+
+def _local_requirement_path(value, base_dir):
+    """Get the local path a requirement or option value refers to.
+
+    Args:
+        value (str): Requirement (e.g. ``./package``, ``dist/app.whl`` or
+            ``file:///tmp/app``) or value of an option.
+        base_dir (str): Directory relative paths are resolved from.
+
+    Returns:
+        Optional[str]: Absolute path. ``None`` if the value is not a path.
+
+    """
+    if value.startswith("file:"):
+        return url2pathname(urlparse(value).path)
+    if "://" in value or not (
+        value.startswith((".", "~", "/"))
+        or "/" in value
+        or os.sep in value
+        or value.endswith(REQUIREMENT_ARCHIVE_EXTENSIONS)
+    ):
+        return None
+    return os.path.abspath(os.path.join(base_dir, os.path.expanduser(value)))
+
+
+def _requirement_inputs(requirements_path, seen=None):
+    """Find the local files a requirements file installs from.
+
+    ``-r``/``-c`` includes are followed (relative to the file including
+    them) and local archives (e.g. wheels) are found so their content can be
+    hashed along with the requirements file.
+
+    Args:
+        requirements_path (str): Path of a requirements file.
+        seen (Optional[Set[str]]): Included files already found.
+
+    Returns:
+        Optional[List[str]]: Paths of the included requirement files and
+        local archives. ``None`` if anything is installed from a local
+        directory (e.g. an editable install), a remote requirements file or
+        a path that does not exist, since those can change without the key
+        changing.
+
+    """
+    base_dir = os.path.dirname(os.path.abspath(requirements_path))
+    if seen is None:
+        seen = set([os.path.abspath(requirements_path)])
+    found = []
+    with open(requirements_path) as stream:
+        content = stream.read()
+    for line in content.replace("\\\n", " ").splitlines():
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if not line:
+            continue
+        try:
+            tokens = shlex.split(line)
+        except ValueError:
+            tokens = line.split()
+        option, value = None, None
+        for name in REQUIREMENT_OPTIONS:
+            if tokens[0] == name:
+                option, value = name, " ".join(tokens[1:2])
+            elif tokens[0].startswith(name + "=") or (
+                len(name) == 2 and tokens[0].startswith(name)
+            ):
+                option, value = name, tokens[0][len(name) :].lstrip("=")
+            else:
+                continue
+            break
+        if option in ("-r", "--requirement", "-c", "--constraint"):
+            if "://" in value and not value.startswith("file:"):
+                return None
+            path = _local_requirement_path(value, base_dir) or os.path.abspath(
+                os.path.join(base_dir, value)
+            )
+            if not value or path in seen:
+                continue
+            seen.add(path)
+            found.append(path)
+            included = _requirement_inputs(path, seen)
+            if included is None:
+                return None
+            found.extend(included)
+            continue
+        values = [value] if option else [i for i in tokens if not i.startswith("-")]
+        for i in values:
+            path = _local_requirement_path(i, base_dir)
+            if path is None:
+                continue
+            if not os.path.isfile(path):
+                return None  # a directory (e.g. -e .) or missing
+            found.append(path)
+    return found
+
+
+def _hash_environment(
+    key,
+    dockerize_pip=False,
+    python_path=None,
+    docker_file=None,
+    docker_image=None,
+    runtime=None,
+    **kwargs
+):
+    """Add what dependencies are installed with to a hash.
+
+    Args:
+        key (Any): Object returned by a :mod:`hashlib` constructor.
+        dockerize_pip (bool): Whether docker is used to run pip.
+        python_path (Optional[str]): Explicit python interpreter to be used.
+        docker_file (Optional[str]): Path to a Dockerfile to build an image.
+        docker_image (Optional[str]): Local or remote docker image to use.
+        runtime (Optional[str]): Lambda runtime.
+        kwargs (Any): Advanced options for subprocess and docker.
+
+    """
+    if dockerize_pip:
+        _hash_update(key, "docker_image", docker_image or runtime)
+        if docker_file:
+            with open(docker_file, "rb") as stream:
+                _hash_update(key, "docker_file", stream.read())
+    else:
+        _hash_update(key, "python", _python_version(python_path))
+    _hash_update(
+        key, "python_dontwritebytecode", bool(kwargs.get("python_dontwritebytecode"))
+    )
+
+
+def _dependency_cache_key(package_root, requirements_path, **kwargs):
+    """Get the key of the dependencies installed from a requirements file.
+
+    The key changes whenever the installed dependencies could: the content of
+    the requirements file, of the files it includes and of the local
+    archives it installs, Pipfile.lock, the python version and platform or
+    docker image used to install them and the options passed to pip.
+
+    Args:
+        package_root (str): Base directory of the package.
+        requirements_path (str): Path of the requirements file to install.
+        kwargs (Any): Options used to install the dependencies. See
+            :func:`_hash_environment`.
+
+    Returns:
+        Optional[str]: Hex digest of the key. ``None`` if the dependencies
+        can't be cached (see :func:`_requirement_inputs`).
+
+    """
+    inputs = _requirement_inputs(requirements_path)
+    if inputs is None:
+        return None
+    key = hashlib.sha256()
+    with open(requirements_path, "rb") as stream:
+        _hash_update(key, "requirements", stream.read())
+    for path in inputs:
+        with open(path, "rb") as stream:
+            _hash_update(key, os.path.basename(path), stream.read())
+    lock_file = os.path.join(package_root, "Pipfile.lock")
+    if os.path.isfile(lock_file):
+        with open(lock_file, "rb") as stream:
+            _hash_update(key, "Pipfile.lock", hashlib.sha256(stream.read()).hexdigest())
+    _hash_environment(key, **kwargs)
+    return key.hexdigest()
+
+
+def _calculate_payload_hash(root, files, requirements_files=None, **kwargs):
+    """Return a hash of everything a Lambda payload is built from.
+
+    Unlike the hash returned by :func:`_zip_files`, this is calculated before
+    the payload is built so building can be skipped when a payload with the
+    same hash was already uploaded.
+
+    Without requirement files, this is the hash of the files of the payload.
+    Otherwise, the requirement files (including ``-r``/``-c`` includes and
+    local archives), the python major.minor version and platform or docker
+    image and the options used to install them are added to it.
+
+    Args:
+        root (str): Base directory of the package.
+        files (List[str]): Files copied into the payload, relative to
+            ``root``.
+        requirements_files (Optional[Dict[str, bool]]): Map of requirement
+            file names and whether they exist.
+        kwargs (Any): Options of the function. See
+            :func:`upload_lambda_functions`.
+
+    Returns:
+        Optional[str]: md5 hash of the payload. ``None`` if the requirements
+        install from something that can't be hashed (see
+        :func:`_requirement_inputs`), in which case the payload is identified
+        by the hash of the archive once it is built.
+
+    """
+    content_hash = _calculate_hash(files, root)
+    found = sorted(
+        name for name, exists in (requirements_files or {}).items() if exists
+    )
+    if not found:
+        return content_hash
+
+    key = hashlib.md5()
+    _hash_update(key, "files", content_hash)
+    for name in found:
+        with open(os.path.join(root, name), "rb") as stream:
+            _hash_update(key, name, stream.read())
+    if "requirements.txt" in found:
+        inputs = _requirement_inputs(os.path.join(root, "requirements.txt"))
+        if inputs is None:
+            return None
+        for path in inputs:
+            with open(path, "rb") as stream:
+                _hash_update(key, os.path.basename(path), stream.read())
+    options = dict(kwargs, dockerize_pip=should_use_docker(kwargs.get("dockerize_pip")))
+    _hash_environment(key, **options)
+    for option in [
+        "python_exclude_bin_dir",
+        "python_exclude_setuptools_dirs",
+        "use_pipenv",
+    ]:
+        _hash_update(key, option, bool(kwargs.get(option)))
+    return key.hexdigest()
+
+
+def _pip_install(target, requirements_path, python_path=None, **kwargs):
+    """Install requirements into a directory with pip.
+
+    Args:
+        target (str): Directory to install to.
+        requirements_path (str): Path of the requirements file to install.
+        python_path (Optional[str]): Explicit python interpreter to be used.
+        kwargs (Any): Advanced options for subprocess.
+
+    Raises:
+        PipError: Non-zero exit code returned by pip.
+
+    """
+    tmp_script = Path(target) / "__runway_run_pip_install.py"
+    pip_cmd = [
+        python_path or sys.executable,
+        "-m",
+        "pip",
+        "install",
+        "--target",
+        target,
+        "--requirement",
+        requirements_path,
+        "--no-color",
+    ]
+
+    subprocess_args = {}
+    if kwargs.get("python_dontwritebytecode"):
+        subprocess_args["env"] = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    # Pyinstaller build or explicit python path
+    if getattr(sys, "frozen", False) and not python_path:
+        script_contents = os.linesep.join(
+            [
+                "import runpy",
+                "from runway.util import argv",
+                "with argv(*{}):".format(json.dumps(pip_cmd[2:])),
+                '   runpy.run_module("pip", run_name="__main__")\n',
+            ]
+        )
+        # TODO remove python 2 logic when dropping python 2
+        tmp_script.write_text(
+            script_contents
+            if sys.version_info.major > 2
+            else script_contents.decode("UTF-8")
+        )
+        cmd = [sys.executable, "run-python", str(tmp_script)]
+    else:
+        if not _pip_has_no_color_option(pip_cmd[0]):
+            pip_cmd.remove("--no-color")
+        cmd = pip_cmd
+
+    LOGGER.info(
+        "The following output from pip may include incompatibility errors. "
+        "These can generally be ignored (pip will erroneously warn "
+        "about conflicts between the packages in your Lambda zip and "
+        "your host system)."
+    )
+
+    try:
+        subprocess.check_call(cmd, **subprocess_args)
+    except subprocess.CalledProcessError:
+        raise PipError
+    finally:
+        if tmp_script.is_file():
+            tmp_script.unlink()
+
+
+def _install_dependencies(
+    package_root,
+    work_dir,
+    requirements_path,
+    cache_root=None,
+    dockerize_pip=False,
+    **kwargs
+):
+    """Install the dependencies of a package into its build directory.
+
+    If ``cache_root`` is provided, dependencies are installed into a
+    directory of it named after :func:`_dependency_cache_key` and linked
+    into ``work_dir``. They are only installed again when the key changes.
+
+    Args:
+        package_root (str): Base directory of the package.
+        work_dir (str): Build directory of the package.
+        requirements_path (str): Path of the requirements file to install.
+        cache_root (Optional[str]): Directory containing cached dependencies.
+        dockerize_pip (bool): Whether to use docker to run pip.
+        kwargs (Any): Options passed to :func:`_pip_install` or
+            :func:`dockerized_pip`.
+
+    """
+
+    def _install(target):
+        """Install dependencies into a directory."""
+        if not dockerize_pip:
+            _pip_install(target, requirements_path, **kwargs)
+            return
+        # dockerized_pip installs the requirements.txt of its work directory
+        docker_requirements = os.path.join(target, "requirements.txt")
+        if not os.path.isfile(docker_requirements):
+            copyfile(requirements_path, docker_requirements)
+        dockerized_pip(target, **kwargs)
+        if target != work_dir:
+            os.remove(docker_requirements)
+
+    cache_key = cache_root and _dependency_cache_key(
+        package_root, requirements_path, dockerize_pip=dockerize_pip, **kwargs
+    )
+    if not cache_key:
+        if cache_root:
+            LOGGER.info(
+                "not caching dependencies installed from local directories "
+                "or remote requirement files"
+            )
+        _install(work_dir)
+        return
+
+    cache_dir = os.path.join(cache_root, cache_key)
+    if os.path.isdir(cache_dir):
+        LOGGER.info("using cached dependencies: %s", cache_dir)
+    else:
+        if not os.path.isdir(cache_root):
+            os.makedirs(cache_root)
+        install_dir = "{}.{}.tmp".format(cache_dir, uuid.uuid4().hex)
+        os.mkdir(install_dir)
+        try:
+            _install(install_dir)
+            LOGGER.debug("caching dependencies: %s", cache_dir)
+            os.rename(install_dir, cache_dir)
+        except OSError:
+            if not os.path.isdir(cache_dir):
+                raise
+            # cached by another process while installing
+        finally:
+            if os.path.isdir(install_dir):
+                shutil.rmtree(install_dir)
+    link_tree(cache_dir, work_dir)
+
+
 def _zip_package(
     package_root,
     includes,
@@ -525,9 +1458,10 @@ def _zip_package(
     python_path=None,
     requirements_files=None,
     use_pipenv=False,
+    files=None,
     **kwargs
 ):
-    """Create zip file in memory with package dependencies.
+    """Create zip file with package dependencies.
 
     Args:
         package_root (str): Base directory to copy files from.
@@ -546,12 +1480,14 @@ def _zip_package(
             wether they exist.
         use_pipenv (bool): Wether to use pipenv to export a Pipfile as
             requirements.txt.
+        files (Optional[List[str]]): Files of the package if they were
+            already found from the patterns (see :func:`copydir`).
         kwargs (Any): Advanced options for subprocess and docker. See source
             code to determine what is supported.
 
     Returns:
-        Tuple[str, str]: Content of the ZIP file as a byte string and
-        calculated hash of all the files
+        Tuple[SpooledTemporaryFile, str]: ZIP file and calculated hash of all
+        the files (see :func:`_zip_files`).
 
     """
     kwargs.setdefault("pipenv_timeout", 300)
@@ -565,7 +1501,7 @@ def _zip_package(
 
     with tempfile.TemporaryDirectory(prefix="cfngin", dir=temp_root) as tmpdir:
         tmp_req = os.path.join(tmpdir, "requirements.txt")
-        copydir(package_root, tmpdir, includes, excludes, follow_symlinks)
+        copydir(package_root, tmpdir, includes, excludes, follow_symlinks, files)
         tmp_req = handle_requirements(
             package_root=package_root,
             dest_path=tmpdir,
@@ -575,62 +1511,17 @@ def _zip_package(
             pipenv_timeout=kwargs["pipenv_timeout"],
         )
 
-        if should_use_docker(dockerize_pip):
-            dockerized_pip(tmpdir, **kwargs)
-        else:
-            tmp_script = Path(tmpdir) / "__runway_run_pip_install.py"
-            pip_cmd = [
-                python_path or sys.executable,
-                "-m",
-                "pip",
-                "install",
-                "--target",
-                tmpdir,
-                "--requirement",
-                tmp_req,
-                "--no-color",
-            ]
-
-            subprocess_args = {}
-            if kwargs.get("python_dontwritebytecode"):
-                subprocess_args["env"] = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
-
-            # Pyinstaller build or explicit python path
-            if getattr(sys, "frozen", False) and not python_path:
-                script_contents = os.linesep.join(
-                    [
-                        "import runpy",
-                        "from runway.util import argv",
-                        "with argv(*{}):".format(json.dumps(pip_cmd[2:])),
-                        '   runpy.run_module("pip", run_name="__main__")\n',
-                    ]
-                )
-                # TODO remove python 2 logic when dropping python 2
-                tmp_script.write_text(
-                    script_contents
-                    if sys.version_info.major > 2
-                    else script_contents.decode("UTF-8")
-                )
-                cmd = [sys.executable, "run-python", str(tmp_script)]
-            else:
-                if not _pip_has_no_color_option(pip_cmd[0]):
-                    pip_cmd.remove("--no-color")
-                cmd = pip_cmd
-
-            LOGGER.info(
-                "The following output from pip may include incompatibility errors. "
-                "These can generally be ignored (pip will erroneously warn "
-                "about conflicts between the packages in your Lambda zip and "
-                "your host system)."
-            )
-
-            try:
-                subprocess.check_call(cmd, **subprocess_args)
-            except subprocess.CalledProcessError:
-                raise PipError
-            finally:
-                if tmp_script.is_file():
-                    tmp_script.unlink()
+        _install_dependencies(
+            package_root,
+            tmpdir,
+            tmp_req,
+            cache_root=os.path.join(temp_root, DEPENDENCY_CACHE_DIR)
+            if kwargs.get("cache_dependencies", True)
+            else None,
+            dockerize_pip=should_use_docker(dockerize_pip),
+            python_path=python_path,
+            **kwargs
+        )
 
         if kwargs.get("python_exclude_bin_dir") and os.path.isdir(
             os.path.join(tmpdir, "bin")
@@ -672,12 +1563,36 @@ def _head_object(s3_conn, bucket, key):
         raise
 
 
-def _upload_code(s3_conn, bucket, prefix, name, contents, content_hash, payload_acl):
+def _payload_key(prefix, name, content_hash):
+    """Get the S3 key of a Lambda payload.
+
+    Args:
+        prefix (str): S3 prefix to prepend to the key.
+        name (str): Name of the Lambda function.
+        content_hash (str): md5 hash of the payload.
+
+    Returns:
+        str: S3 key of the payload.
+
+    """
+    return "{}lambda-{}-{}.zip".format(prefix, name, content_hash)
+
+
+def _upload_code(
+    s3_conn,
+    bucket,
+    prefix,
+    name,
+    contents,
+    content_hash,
+    payload_acl,
+    check_exists=True,
+):
     """Upload a ZIP file to S3 for use by Lambda.
 
     The key used for the upload will be unique based on the checksum of the
     contents. No changes will be made if the contents in S3 already match the
-    expected contents.
+    expected contents. Large files are uploaded in parts.
 
     Args:
         s3_conn (botocore.client.S3): S3 connection to use for operations.
@@ -686,10 +1601,12 @@ def _upload_code(s3_conn, bucket, prefix, name, contents, content_hash, payload_
             the uploaded file
         name (str): desired name of the Lambda function. Will be used to
             construct a key name for the uploaded file.
-        contents (str): byte string with the content of the file upload.
+        contents (BinaryIO): ZIP file to upload.
         content_hash (str): md5 hash of the contents to be uploaded.
         payload_acl (str): The canned S3 object ACL to be applied to the
             uploaded payload
+        check_exists (bool): Whether to skip uploading if the key already
+            exists.
 
     Returns:
         troposphere.awslambda.Code: CloudFormation Lambda Code object,
@@ -701,18 +1618,17 @@ def _upload_code(s3_conn, bucket, prefix, name, contents, content_hash, payload_
 
     """
     LOGGER.debug("ZIP hash: %s", content_hash)
-    key = "{}lambda-{}-{}.zip".format(prefix, name, content_hash)
+    key = _payload_key(prefix, name, content_hash)
 
-    if _head_object(s3_conn, bucket, key):
+    if check_exists and _head_object(s3_conn, bucket, key):
         LOGGER.info("object already exists; not uploading: %s", key)
     else:
         LOGGER.info("uploading object: %s", key)
-        s3_conn.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=contents,
-            ContentType="application/zip",
-            ACL=payload_acl,
+        s3_conn.upload_fileobj(
+            contents,
+            bucket,
+            key,
+            ExtraArgs={"ACL": payload_acl, "ContentType": "application/zip"},
         )
 
     return Code(S3Bucket=bucket, S3Key=key)
@@ -756,11 +1672,219 @@ def _check_pattern_list(patterns, key, default=None):
     )
 
 
+class _PrefixFilter(logging.Filter):  # pylint: disable=too-few-public-methods
+    """Prefixes the messages of log records like :class:`PrefixAdaptor`."""
+
+    def __init__(self, prefix):
+        """Instantiate class.
+
+        Args:
+            prefix (str): Message prefix.
+
+        """
+        super(_PrefixFilter, self).__init__()
+        self.prefix = prefix
+
+    def filter(self, record):
+        """Prefix the message of a record."""
+        record.msg = "{}:{}".format(self.prefix, record.msg)
+        return True
+
+
+@contextlib.contextmanager
+def _log_prefix(prefix):
+    """Prefix the messages logged by this module.
+
+    Only used while the messages logged by this module are for a single
+    function (e.g. in a worker process).
+
+    Args:
+        prefix (str): Message prefix.
+
+    """
+    log_filter = _PrefixFilter(prefix)
+    LOGGER.addFilter(log_filter)
+    try:
+        yield
+    finally:
+        LOGGER.removeFilter(log_filter)
+
+
+def _prepare_payload(name, options, follow_symlinks, sys_path):
+    """Find the files of a Lambda payload and calculate its hash.
+
+    Args:
+        name (str): Name of the Lambda function.
+        options (Dict[str, Any]): Configuration for how to build the payload.
+            See :func:`_upload_function`.
+        follow_symlinks (bool): If true, symlinks will be included in the
+            resulting zip file
+        sys_path (str): Path that all actions are relative to.
+
+    Returns:
+        Dict[str, Any]: The base directory (``root``), ``includes``,
+        ``excludes``, ``files``, ``requirements_files`` and ``content_hash``
+        of the payload (see :func:`_calculate_payload_hash`).
+
+    Raises:
+        ValueError: If any configuration is invalid.
+        RuntimeError: When the payload would be empty.
+
+    """
+    try:
+        root = os.path.expanduser(options["path"])
+    except KeyError as err:
+        raise ValueError(
+            "missing required property '{}' in function '{}'".format(err.args[0], name)
+        )
+
+    includes = _check_pattern_list(options.get("include"), "include", default=["**"])
+    excludes = _check_pattern_list(options.get("exclude"), "exclude", default=[])
+
+    LOGGER.debug("processing function: %s", name)
+
+    # os.path.join will ignore other parameters if the right-most one is an
+    # absolute path, which is exactly what we want.
+    if not os.path.isabs(root):
+        root = os.path.abspath(os.path.join(sys_path, root))
+    requirements_files = find_requirements(root)
+    files = _find_payload_files(
+        root,
+        includes,
+        # exclude potential virtual environments in the package
+        excludes + [".venv/"] if requirements_files else excludes,
+        follow_symlinks,
+    )
+    if not files and not requirements_files:
+        raise RuntimeError(
+            "Empty list of files for Lambda payload. Check "
+            "your include/exclude options for errors."
+        )
+
+    return {
+        "content_hash": _calculate_payload_hash(
+            root, files, requirements_files, **options
+        ),
+        "excludes": excludes,
+        "files": files,
+        "includes": includes,
+        "requirements_files": requirements_files,
+        "root": root,
+    }
+
+
+def _find_uploaded_payload(s3_conn, bucket, prefix, name, content_hash, force_rebuild):
+    """Find a payload that was already uploaded.
+
+    Args:
+        s3_conn (botocore.client.S3): S3 connection to use for operations.
+        bucket (str): name of the bucket to upload to.
+        prefix (str): S3 prefix to prepend to the key.
+        name (str): Name of the Lambda function.
+        content_hash (Optional[str]): md5 hash of the payload. ``None`` if it
+            can only be known once the payload is built.
+        force_rebuild (bool): Ignore payloads that were already uploaded.
+
+    Returns:
+        Optional[troposphere.awslambda.Code]: CloudFormation AWS Lambda Code
+        object pointing to the payload if it was already uploaded.
+
+    """
+    if not content_hash:
+        LOGGER.debug("payload must be built to calculate its hash")
+        return None
+    key = _payload_key(prefix, name, content_hash)
+    if force_rebuild:
+        LOGGER.info("forcing rebuild of payload: %s", key)
+    elif _head_object(s3_conn, bucket, key):
+        LOGGER.info("object already exists; not building: %s", key)
+        return Code(S3Bucket=bucket, S3Key=key)
+    return None
+
+
+def _build_payload(payload, options, follow_symlinks, docker_builder=None):
+    """Build a Lambda payload.
+
+    Args:
+        payload (Dict[str, Any]): Returned by :func:`_prepare_payload`.
+        options (Dict[str, Any]): Configuration for how to build the payload.
+            See :func:`_upload_function`.
+        follow_symlinks (bool): If true, symlinks will be included in the
+            resulting zip file
+        docker_builder (Optional[DockerPipBuilder]): Used to run pip with
+            docker.
+
+    Returns:
+        Tuple[SpooledTemporaryFile, str]: ZIP file and its hash. The caller
+        must close the file.
+
+    """
+    if payload["requirements_files"]:
+        return _zip_package(
+            payload["root"],
+            includes=payload["includes"],
+            excludes=list(payload["excludes"]),
+            follow_symlinks=follow_symlinks,
+            requirements_files=payload["requirements_files"],
+            files=payload["files"],
+            docker_builder=docker_builder,
+            **options
+        )
+    return _zip_files(payload["files"], payload["root"])
+
+
+def _build_payload_file(
+    path, name, payload, options, follow_symlinks, docker_builder=None
+):
+    """Build a Lambda payload in a worker process.
+
+    Args:
+        path (str): Path to write the ZIP file to.
+        name (str): Name of the Lambda function. Prefixes log messages.
+        payload (Dict[str, Any]): Returned by :func:`_prepare_payload`.
+        options (Dict[str, Any]): Configuration for how to build the payload.
+            See :func:`_upload_function`.
+        follow_symlinks (bool): If true, symlinks will be included in the
+            resulting zip file
+        docker_builder (Optional[DockerPipBuilder]): Used to run pip with
+            docker.
+
+    Returns:
+        Tuple[str, str]: Path of the ZIP file and its hash.
+
+    """
+    with _log_prefix(name):
+        zip_contents, content_hash = _build_payload(
+            payload, options, follow_symlinks, docker_builder
+        )
+        try:
+            with open(path, "wb") as stream:
+                shutil.copyfileobj(zip_contents, stream, READ_CHUNK_SIZE)
+        finally:
+            zip_contents.close()
+    return path, content_hash
+
+
 def _upload_function(
-    s3_conn, bucket, prefix, name, options, follow_symlinks, payload_acl, sys_path
+    s3_conn,
+    bucket,
+    prefix,
+    name,
+    options,
+    follow_symlinks,
+    payload_acl,
+    sys_path,
+    force_rebuild=False,
+    docker_builder=None,
 ):
     """Build a Lambda payload from user configuration and uploads it to S3.
 
+    The hash of the payload is calculated before it is built (see
+    :func:`_calculate_payload_hash`). If a payload with the same hash was
+    already uploaded, it is not built again unless ``force_rebuild``. When
+    the hash can't be calculated before building, the payload is built and
+    uploaded under the hash of the archive unless it already exists.
+
     Args:
         s3_conn (botocore.client.S3): S3 connection to use for operations.
         bucket (str): name of the bucket to upload to.
@@ -784,6 +1908,10 @@ def _upload_function(
         payload_acl (str): The canned S3 object ACL to be applied to the
             uploaded payload
         sys_path (str): Path that all actions are relative to.
+        force_rebuild (bool): Build and upload the payload even if it was
+            already uploaded.
+        docker_builder (Optional[DockerPipBuilder]): Used to run pip with
+            docker.
 
     Returns:
         troposphere.awslambda.Code: CloudFormation AWS Lambda Code object,
@@ -791,44 +1919,171 @@ def _upload_function(
 
     Raises:
         ValueError: If any configuration is invalid.
+        RuntimeError: When the payload would be empty.
         botocore.exceptions.ClientError: Any error from boto3 is passed
             through.
 
     """
+    payload = _prepare_payload(name, options, follow_symlinks, sys_path)
+    code = _find_uploaded_payload(
+        s3_conn, bucket, prefix, name, payload["content_hash"], force_rebuild
+    )
+    if code:
+        return code
+
+    zip_contents, zip_hash = _build_payload(
+        payload, options, follow_symlinks, docker_builder
+    )
     try:
-        root = os.path.expanduser(options["path"])
-    except KeyError as err:
-        raise ValueError(
-            "missing required property '{}' in function '{}'".format(err.args[0], name)
+        return _upload_code(
+            s3_conn,
+            bucket,
+            prefix,
+            name,
+            zip_contents,
+            payload["content_hash"] or zip_hash,
+            payload_acl,
+            check_exists=not payload["content_hash"],
         )
+    finally:
+        zip_contents.close()
 
-    includes = _check_pattern_list(options.get("include"), "include", default=["**"])
-    excludes = _check_pattern_list(options.get("exclude"), "exclude", default=[])
 
-    LOGGER.debug("processing function: %s", name)
+def _upload_payload_file(
+    s3_conn, bucket, prefix, name, path, content_hash, payload_acl, check_exists=False
+):
+    """Upload a ZIP file built by :func:`_build_payload_file`.
 
-    # os.path.join will ignore other parameters if the right-most one is an
-    # absolute path, which is exactly what we want.
-    if not os.path.isabs(root):
-        root = os.path.abspath(os.path.join(sys_path, root))
-    requirements_files = find_requirements(root)
-    if requirements_files:
-        zip_contents, content_hash = _zip_package(
-            root,
-            includes=includes,
-            excludes=excludes,
-            follow_symlinks=follow_symlinks,
-            requirements_files=requirements_files,
-            **options
-        )
-    else:
-        zip_contents, content_hash = _zip_from_file_patterns(
-            root, includes, excludes, follow_symlinks
+    Returns:
+        troposphere.awslambda.Code: CloudFormation AWS Lambda Code object,
+        pointing to the uploaded object in S3.
+
+    """
+    try:
+        with open(path, "rb") as zip_contents:
+            return _upload_code(
+                s3_conn,
+                bucket,
+                prefix,
+                name,
+                zip_contents,
+                content_hash,
+                payload_acl,
+                check_exists=check_exists,
+            )
+    finally:
+        os.remove(path)
+
+
+def _upload_functions(  # pylint: disable=too-many-arguments,too-many-locals
+    s3_conn,
+    bucket,
+    prefix,
+    functions,
+    follow_symlinks,
+    payload_acl,
+    sys_path,
+    force_rebuild=False,
+    max_concurrent_builds=1,
+    max_concurrent_uploads=1,
+    docker_builder=None,
+):
+    """Build Lambda payloads concurrently and upload them to S3.
+
+    Payloads are hashed and checked one at a time (see
+    :func:`_upload_function`). Those that need to be built are then built in
+    a process pool and each is uploaded as soon as it is built, with at most
+    ``max_concurrent_uploads`` uploads at a time.
+
+    Args:
+        s3_conn (botocore.client.S3): S3 connection to use for operations.
+        bucket (str): name of the bucket to upload to.
+        prefix (str): S3 prefix to prepend to the constructed key name for
+            the uploaded files.
+        functions (Dict[str, Dict[str, Any]]): Configuration of each function.
+            See :func:`_upload_function`.
+        follow_symlinks (bool): If true, symlinks will be included in the
+            resulting zip files.
+        payload_acl (str): The canned S3 object ACL to be applied to the
+            uploaded payloads.
+        sys_path (str): Path that all actions are relative to.
+        force_rebuild (bool): Build and upload payloads even if they were
+            already uploaded.
+        max_concurrent_builds (int): Number of payloads built at a time.
+        max_concurrent_uploads (int): Number of payloads uploaded at a time.
+        docker_builder (Optional[DockerPipBuilder]): Used to run pip with
+            docker. Passed to the worker processes.
+
+    Returns:
+        Dict[str, troposphere.awslambda.Code]: CloudFormation AWS Lambda Code
+        object of each function.
+
+    """
+    results = {}
+    payloads = {}
+    for name, options in functions.items():
+        with _log_prefix(name):
+            payload = _prepare_payload(name, options, follow_symlinks, sys_path)
+            code = _find_uploaded_payload(
+                s3_conn, bucket, prefix, name, payload["content_hash"], force_rebuild
+            )
+        if code:
+            results[name] = code
+        else:
+            payloads[name] = payload
+
+    if payloads:
+        if docker_builder:
+            docker_builder.used = True  # may be started by worker processes
+        LOGGER.info(
+            "building %s payloads (%s at a time)",
+            len(payloads),
+            min(max_concurrent_builds, len(payloads)),
         )
+        with tempfile.TemporaryDirectory(prefix="cfngin") as tmpdir:
+            build_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(max_concurrent_builds, len(payloads))
+            )
+            upload_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_concurrent_uploads
+            )
+            try:
+                builds = {}
+                for index, (name, payload) in enumerate(payloads.items()):
+                    future = instrumentation.submit(
+                        build_executor,
+                        _build_payload_file,
+                        os.path.join(tmpdir, "{}.zip".format(index)),
+                        name,
+                        payload,
+                        functions[name],
+                        follow_symlinks,
+                        docker_builder,
+                    )
+                    builds[future] = name
+                uploads = {}
+                for future in concurrent.futures.as_completed(builds):
+                    name = builds[future]
+                    path, zip_hash = instrumentation.result(future)
+                    content_hash = payloads[name]["content_hash"]
+                    uploads[name] = upload_executor.submit(
+                        _upload_payload_file,
+                        s3_conn,
+                        bucket,
+                        prefix,
+                        name,
+                        path,
+                        content_hash or zip_hash,
+                        payload_acl,
+                        check_exists=not content_hash,
+                    )
+                for name, future in uploads.items():
+                    results[name] = future.result()
+            finally:
+                build_executor.shutdown()
+                upload_executor.shutdown()
 
-    return _upload_code(
-        s3_conn, bucket, prefix, name, zip_contents, content_hash, payload_acl
-    )
+    return dict((name, results[name]) for name in functions)
 
 
 def select_bucket_region(
@@ -874,7 +2129,9 @@ def upload_lambda_functions(context, provider, **kwargs):
 
     Payloads are uploaded to either a custom bucket or the CFNgin default
     bucket, with the key containing it's checksum, to allow repeated uploads
-    to be skipped in subsequent runs.
+    to be skipped in subsequent runs. The checksum is calculated from the
+    source files and requirements before building so building is also
+    skipped.
 
     The configuration settings are documented as keyword arguments below.
 
@@ -898,11 +2155,31 @@ def upload_lambda_functions(context, provider, **kwargs):
             ``False``)
         payload_acl (Optional[str]): The canned S3 object ACL to be applied
             to the uploaded payload. (*default: private*)
+        force_rebuild (Optional[bool]): Build and upload payloads even if a
+            payload with the same hash was already uploaded (e.g. to pick up
+            new releases of unpinned requirements). (*default:* ``False``)
+        max_concurrent_builds (Optional[int]): Number of payloads built at a
+            time, each in its own process. (*default:* number of CPUs, up to
+            ``61``)
+        max_concurrent_uploads (Optional[int]): Number of payloads uploaded
+            to S3 at a time. (*default:* ``4``)
+        docker_pip_cache (Optional[str]): Name of a docker volume or absolute
+            path of a directory used as the pip cache of functions using
+            ``dockerize_pip``. It persists between runs so wheels are not
+            downloaded or built again. (*default:*
+            ``runway-lambda-pip-cache`` volume)
         functions (Dict[str, Any]): Configurations of desired payloads to
             build. Keys correspond to function names, used to derive key
             names for the payload. Each value should itself be a dictionary,
             with the following data:
 
+            **cache_dependencies (Optional[bool])**
+                Whether to cache the dependencies installed from the
+                requirements file in ``~/.runway_cache/lambda_dependencies``.
+                Dependencies are only installed again when the requirements,
+                ``Pipfile.lock``, python interpreter (or Docker image) or
+                ``python_dontwritebytecode`` change. (*default:* ``True``)
+
             **docker_file (Optional[str])**
                 Path to a local DockerFile that will be built and used for
                 ``dockerize_pip``. Must provide exactly one of ``docker_file``,
@@ -1053,6 +2330,10 @@ def upload_lambda_functions(context, provider, **kwargs):
     # https://docs.aws.amazon.com/AmazonS3/latest/dev/acl-overview.html#canned-acl
     payload_acl = kwargs.get("payload_acl", "private")
 
+    force_rebuild = kwargs.get("force_rebuild", False)
+    if not isinstance(force_rebuild, bool):
+        raise ValueError("force_rebuild option must be a boolean")
+
     # Always use the global client for s3
     session = get_session(bucket_region)
     s3_client = session.client("s3")
@@ -1061,22 +2342,63 @@ def upload_lambda_functions(context, provider, **kwargs):
 
     prefix = kwargs.get("prefix", "")
 
-    results = {}
-    for name, options in kwargs["functions"].items():
-        sys_path = (
-            os.path.dirname(context.config_path)
-            if os.path.isfile(context.config_path)
-            else context.config_path
-        )
-        results[name] = _upload_function(
-            s3_client,
-            bucket_name,
-            prefix,
-            name,
-            options,
-            follow_symlinks,
-            payload_acl,
-            sys_path,
+    functions = kwargs["functions"]
+    sys_path = (
+        os.path.dirname(context.config_path)
+        if os.path.isfile(context.config_path)
+        else context.config_path
+    )
+    # TODO update to `os.cpu_count()` when dropping python2
+    max_concurrent_builds = int(
+        kwargs.get("max_concurrent_builds") or min(61, multiprocessing.cpu_count())
+    )
+    max_concurrent_uploads = int(kwargs.get("max_concurrent_uploads") or 4)
+
+    docker_builder = None
+    if any(should_use_docker(i.get("dockerize_pip")) for i in functions.values()):
+        docker_builder = DockerPipBuilder(
+            # contains the build directories of payloads (see _zip_package)
+            os.path.join(os.path.expanduser("~"), ".runway_cache"),
+            pip_cache=kwargs.get("docker_pip_cache"),
         )
 
-    return results
+    try:
+        # process pools are only used with python 3 (see runway.context.Context)
+        if (
+            sys.version_info.major > 2
+            and len(functions) > 1
+            and max_concurrent_builds > 1
+        ):
+            return _upload_functions(
+                s3_client,
+                bucket_name,
+                prefix,
+                functions,
+                follow_symlinks,
+                payload_acl,
+                sys_path,
+                force_rebuild=force_rebuild,
+                max_concurrent_builds=max_concurrent_builds,
+                max_concurrent_uploads=max_concurrent_uploads,
+                docker_builder=docker_builder,
+            )
+
+        results = {}
+        for name, options in functions.items():
+            with _log_prefix(name):
+                results[name] = _upload_function(
+                    s3_client,
+                    bucket_name,
+                    prefix,
+                    name,
+                    options,
+                    follow_symlinks,
+                    payload_acl,
+                    sys_path,
+                    force_rebuild=force_rebuild,
+                    docker_builder=docker_builder,
+                )
+        return results
+    finally:
+        if docker_builder:
+            docker_builder.close()
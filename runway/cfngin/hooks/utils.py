@@ -10,6 +10,7 @@ from runway.variables import Variable, resolve_variables
 
 from ..blueprints.base import Blueprint
 from ..exceptions import FailedVariableLookup
+from ..instrumentation import PROFILER, TRACER
 
 LOGGER = logging.getLogger(__name__)
 
@@ -91,12 +92,13 @@ def handle_hooks(  # pylint: disable=too-many-statements
             kwargs = hook.args or {}
 
         try:
-            if isinstance(method, FunctionType):
-                result = method(context=context, provider=provider, **kwargs)
-            else:
-                result = getattr(
-                    method(context=context, provider=provider, **kwargs), stage
-                )()
+            with TRACER.span(hook.path, "hook", stage=stage), PROFILER.phase("hooks"):
+                if isinstance(method, FunctionType):
+                    result = method(context=context, provider=provider, **kwargs)
+                else:
+                    result = getattr(
+                        method(context=context, provider=provider, **kwargs), stage
+                    )()
         except Exception:  # pylint: disable=broad-except
             LOGGER.exception("method %s threw an exception", hook.path)
             if required:
@@ -0,0 +1,809 @@
+"""CFNgin instrumentation of AWS API calls and plan execution.
+
+When enabled, every session created by
+:func:`runway.cfngin.session_cache.get_session` records the AWS API calls
+made by its clients: counts, latency, retries and throttles per operation and
+per stack (:data:`API_CALLS`) and/or a span per call in a Chrome trace
+(:data:`TRACER`). Major phases of Runway and CFNgin can also be profiled
+(:data:`PROFILER`).
+
+"""
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+
+from .cassette import CASSETTE, RECORD
+from .rate_limit import THROTTLE_ERROR_CODES
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (in seconds) of the buckets of latency histograms. Calls slower
+# than the last bound go into an extra bucket.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Keys added to the request context of each call.
+_START_KEY = "runway_api_start"
+_STACK_KEY = "runway_api_stack"
+_THROTTLES_KEY = "runway_api_throttles"
+_TRACE_START_KEY = "runway_trace_start"
+# Number of functions listed for each phase in the summary of a profile.
+PROFILE_SUMMARY_LENGTH = 10
+
+
+def _new_stats(histogram=False):
+    """Create empty statistics for an operation or stack."""
+    stats = {"calls": 0, "errors": 0, "retries": 0, "throttles": 0, "time": 0.0}
+    if histogram:
+        stats["max"] = 0.0
+        stats["histogram"] = [0] * (len(LATENCY_BUCKETS) + 1)
+    return stats
+
+
+def _percentile(stats, percent):
+    """Estimate a latency percentile from a histogram.
+
+    Args:
+        stats (Dict[str, Any]): Statistics of an operation.
+        percent (float): Percentile to estimate (e.g. ``90``).
+
+    Returns:
+        float: Upper bound of the bucket containing the percentile, limited
+        by the slowest call.
+
+    """
+    target = stats["calls"] * percent / 100.0
+    count = 0
+    for bound, bucket_count in zip(LATENCY_BUCKETS, stats["histogram"]):
+        count += bucket_count
+        if count >= target:
+            return min(bound, stats["max"])
+    return stats["max"]
+
+
+def _call_instrumented(func, api_calls, trace, profile, cassette, *args):
+    """Call a function in a worker process, instrumenting it.
+
+    Args:
+        func (Callable[..., Any]): Function to call.
+        api_calls (bool): Record API calls made by the function.
+        trace (bool): Trace the function.
+        profile (Optional[str]): Directory to write profiles of the function
+            to.
+        cassette (Optional[Dict[str, Any]]): State of
+            :data:`runway.cfngin.cassette.CASSETTE` to record or replay API
+            calls made by the function.
+        *args: Passed to the function.
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: The result of the function and the data
+        recorded while it ran (see :meth:`ApiCallRecorder.dump`,
+        :meth:`Tracer.dump`, :meth:`Profiler.write` and
+        :meth:`runway.cfngin.cassette.Cassette.dump`).
+
+    """
+    # forked workers inherit the data recorded by the parent
+    API_CALLS.reset(enabled=api_calls)
+    TRACER.reset(enabled=trace)
+    PROFILER.reset(profile)
+    CASSETTE.reset(**(cassette or {}))
+    try:
+        value = func(*args)
+    finally:
+        profiles = PROFILER.write(suffix=str(os.getpid())) if profile else None
+        PROFILER.reset()
+    return (
+        value,
+        {
+            "api_calls": API_CALLS.dump() if api_calls else None,
+            "cassette": CASSETTE.dump() if CASSETTE.mode == RECORD else None,
+            "profiles": profiles,
+            "trace": TRACER.dump() if trace else None,
+        },
+    )
+
+
+def _instrumenting():
+    """Whether anything is being recorded that workers need to record too."""
+    return bool(
+        API_CALLS.enabled or TRACER.enabled or PROFILER.enabled or CASSETTE.mode
+    )
+
+
+def submit(executor, func, *args):
+    """Submit a function to a process pool.
+
+    If recording API calls, tracing, profiling or recording or replaying a
+    cassette, the worker does the same and the data it recorded is returned
+    with the result of the function to be merged by :func:`result`.
+
+    Args:
+        executor (:class:`concurrent.futures.Executor`): Pool to submit to.
+        func (Callable[..., Any]): Function to submit.
+        *args: Passed to the function.
+
+    Returns:
+        :class:`concurrent.futures.Future`
+
+    """
+    if not _instrumenting():
+        return executor.submit(func, *args)
+    return executor.submit(
+        _call_instrumented,
+        func,
+        API_CALLS.enabled,
+        TRACER.enabled,
+        PROFILER.directory,
+        CASSETTE.state,
+        *args
+    )
+
+
+def result(future):
+    """Get the result of a future returned by :func:`submit`.
+
+    Args:
+        future (:class:`concurrent.futures.Future`): Returned by
+            :func:`submit`.
+
+    Returns:
+        Any: Result of the function that was submitted.
+
+    """
+    if not _instrumenting():
+        return future.result()
+    value, data = future.result()
+    if data["api_calls"]:
+        API_CALLS.merge(data["api_calls"])
+    if data["cassette"]:
+        CASSETTE.merge(data["cassette"])
+    if data["profiles"]:
+        PROFILER.merge(data["profiles"])
+    if data["trace"]:
+        TRACER.merge(data["trace"])
+    return value
+
+
+class ApiCallRecorder(object):
+    """Records AWS API calls made by clients of registered sessions.
+
+    Attributes:
+        enabled (bool): Whether sessions are being registered.
+        operations (Dict[str, Dict[str, Any]]): Statistics per operation
+            (``<service>.<operation>``).
+        stacks (Dict[str, Dict[str, Any]]): Statistics per stack.
+
+    """
+
+    def __init__(self):
+        """Instantiate class."""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.operations = {}
+        self.stacks = {}
+
+    @property
+    def current_stack(self):
+        """Name of the stack being run by the current thread.
+
+        Returns:
+            Optional[str]
+
+        """
+        return getattr(self._local, "stack", None)
+
+    @contextlib.contextmanager
+    def stack(self, name):
+        """Attribute API calls made by the current thread to a stack.
+
+        Args:
+            name (str): Name of the stack.
+
+        """
+        previous = self.current_stack
+        self._local.stack = name
+        try:
+            yield
+        finally:
+            self._local.stack = previous
+
+    def reset(self, enabled=False):
+        """Remove all recorded calls.
+
+        Args:
+            enabled (bool): Whether sessions created afterwards are recorded.
+
+        """
+        with self._lock:
+            self.enabled = enabled
+            self.operations = {}
+            self.stacks = {}
+
+    @contextlib.contextmanager
+    def recording(self, enabled=True, json_path=None):
+        """Record API calls, logging a summary once done.
+
+        Args:
+            enabled (bool): If ``False``, nothing is recorded.
+            json_path (Optional[str]): Also write the recorded calls as JSON
+                to this file.
+
+        """
+        if not enabled:
+            yield
+            return
+        self.reset(enabled=True)
+        try:
+            yield
+        finally:
+            self.enabled = False
+            self.log_summary()
+            if json_path:
+                self.write_json(json_path)
+
+    def register(self, session):
+        """Record calls made by clients of a botocore session.
+
+        Does nothing unless recording is enabled. Must be called before
+        clients are created from the session.
+
+        Args:
+            session (:class:`botocore.session.Session`): Session to register
+                event handlers with.
+
+        """
+        if not self.enabled:
+            return
+        for event, handler in [
+            ("before-call", self._before_call),
+            ("needs-retry", self._needs_retry),
+            ("after-call", self._after_call),
+            ("after-call-error", self._after_call_error),
+        ]:
+            session.register(event, handler, unique_id="runway-api-calls-" + event)
+
+    def dump(self):
+        """Get the recorded calls.
+
+        Returns:
+            Dict[str, Any]: JSON serializable.
+
+        """
+        with self._lock:
+            return json.loads(
+                json.dumps(
+                    {
+                        "latency_buckets": LATENCY_BUCKETS,
+                        "operations": self.operations,
+                        "stacks": self.stacks,
+                    }
+                )
+            )
+
+    def merge(self, data):
+        """Add calls recorded elsewhere (e.g. by a worker process).
+
+        Args:
+            data (Dict[str, Any]): Returned by :meth:`dump`.
+
+        """
+        with self._lock:
+            for attr in ["operations", "stacks"]:
+                current = getattr(self, attr)
+                for key, stats in data.get(attr, {}).items():
+                    target = current.setdefault(key, _new_stats("histogram" in stats))
+                    for name, value in stats.items():
+                        if name == "histogram":
+                            target[name] = [i + j for i, j in zip(target[name], value)]
+                        elif name == "max":
+                            target[name] = max(target[name], value)
+                        else:
+                            target[name] += value
+
+    def log_summary(self):
+        """Log a table of the recorded calls."""
+        data = self.dump()
+        if not data["operations"]:
+            LOGGER.info("no AWS API calls were recorded")
+            return
+        LOGGER.info(
+            "%-45s %6s %6s %7s %9s %9s %8s %8s %8s",
+            "AWS API calls",
+            "calls",
+            "errors",
+            "retries",
+            "throttles",
+            "total (s)",
+            "avg (ms)",
+            "p90 (ms)",
+            "max (ms)",
+        )
+        for name, stats in sorted(
+            data["operations"].items(), key=lambda i: -i[1]["time"]
+        ):
+            LOGGER.info(
+                "%-45s %6d %6d %7d %9d %9.2f %8.0f %8.0f %8.0f",
+                name,
+                stats["calls"],
+                stats["errors"],
+                stats["retries"],
+                stats["throttles"],
+                stats["time"],
+                stats["time"] / stats["calls"] * 1000,
+                _percentile(stats, 90) * 1000,
+                stats["max"] * 1000,
+            )
+        if not data["stacks"]:
+            return
+        LOGGER.info(
+            "%-45s %6s %6s %7s %9s %9s",
+            "stack",
+            "calls",
+            "errors",
+            "retries",
+            "throttles",
+            "total (s)",
+        )
+        for name, stats in sorted(data["stacks"].items(), key=lambda i: -i[1]["time"]):
+            LOGGER.info(
+                "%-45s %6d %6d %7d %9d %9.2f",
+                name,
+                stats["calls"],
+                stats["errors"],
+                stats["retries"],
+                stats["throttles"],
+                stats["time"],
+            )
+
+    def write_json(self, path):
+        """Write the recorded calls to a file as JSON.
+
+        Args:
+            path (str): Path of the file.
+
+        """
+        with open(path, "w") as stream:
+            json.dump(self.dump(), stream, indent=4, sort_keys=True)
+        LOGGER.info("AWS API calls written to %s", path)
+
+    def _before_call(self, context=None, **_):
+        """Record when a call starts and the stack making it."""
+        if context is not None:
+            context[_START_KEY] = time.time()
+            context[_STACK_KEY] = self.current_stack
+            context[_THROTTLES_KEY] = 0
+
+    @staticmethod
+    def _needs_retry(response=None, request_dict=None, **_):
+        """Count throttled attempts."""
+        if not response:
+            return
+        context = (request_dict or {}).get("context", {})
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if _THROTTLES_KEY in context and (
+            code in THROTTLE_ERROR_CODES or http_response.status_code == 429
+        ):
+            context[_THROTTLES_KEY] += 1
+
+    def _after_call(
+        self, event_name, context=None, http_response=None, parsed=None, **_
+    ):
+        """Record a call that got a response (including error responses)."""
+        retries = (parsed or {}).get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        error = getattr(http_response, "status_code", 200) >= 300
+        self._record(event_name, context, retries, error=error)
+
+    def _after_call_error(self, event_name, context=None, exception=None, **_):
+        """Record a call that failed without a response."""
+        response = getattr(exception, "response", None) or {}
+        retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        self._record(event_name, context, retries, error=True)
+
+    def _record(self, event_name, context, retries, error=False):
+        """Record a call.
+
+        Args:
+            event_name (str): ``<event>.<service>.<operation>``.
+            context (Dict[str, Any]): Request context of the call.
+            retries (int): Number of times the call was retried.
+            error (bool): Whether the call failed.
+
+        """
+        if not context or _START_KEY not in context:
+            return  # started before recording or short-circuited
+        elapsed = time.time() - context[_START_KEY]
+        name = ".".join(event_name.split(".")[1:3])
+        with self._lock:
+            targets = [self.operations.setdefault(name, _new_stats(histogram=True))]
+            if context[_STACK_KEY]:
+                targets.append(
+                    self.stacks.setdefault(context[_STACK_KEY], _new_stats())
+                )
+            for stats in targets:
+                stats["calls"] += 1
+                stats["errors"] += int(error)
+                stats["retries"] += retries
+                stats["throttles"] += context[_THROTTLES_KEY]
+                stats["time"] += elapsed
+            stats = targets[0]
+            stats["max"] = max(stats["max"], elapsed)
+            index = len(LATENCY_BUCKETS)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    index = i
+                    break
+            stats["histogram"][index] += 1
+
+
+class Tracer(object):
+    """Records spans of work as Chrome trace events.
+
+    The resulting file can be viewed in ``chrome://tracing`` or Perfetto.
+    Timestamps are wall clock times so spans recorded by worker processes
+    line up with those of the parent.
+
+    Attributes:
+        enabled (bool): Whether spans are being recorded.
+        events (List[Dict[str, Any]]): Recorded trace events.
+
+    """
+
+    def __init__(self):
+        """Instantiate class."""
+        self._lock = threading.Lock()
+        self._threads = {}
+        self.enabled = False
+        self.events = []
+
+    def reset(self, enabled=False):
+        """Remove all recorded spans.
+
+        Args:
+            enabled (bool): Whether spans are recorded afterwards.
+
+        """
+        with self._lock:
+            self._threads = {}
+            self.enabled = enabled
+            self.events = []
+
+    @contextlib.contextmanager
+    def tracing(self, path=None):
+        """Record spans, writing them to a file once done.
+
+        Args:
+            path (Optional[str]): Path of the trace file. If not provided,
+                nothing is recorded.
+
+        """
+        if not path:
+            yield
+            return
+        self.reset(enabled=True)
+        try:
+            yield
+        finally:
+            self.enabled = False
+            self.write(path)
+
+    @contextlib.contextmanager
+    def span(self, name, category="runway", **args):
+        """Record the time spent in a block as a span.
+
+        Args:
+            name (str): Name of the span.
+            category (str): Category of the span.
+            **args: Added to the span.
+
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.time(), **args)
+
+    def add(self, name, category, start, end, **args):
+        """Record a span of the current thread.
+
+        Args:
+            name (str): Name of the span.
+            category (str): Category of the span.
+            start (float): When the span started (seconds since the epoch).
+            end (float): When the span ended (seconds since the epoch).
+            **args: Added to the span.
+
+        """
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            "cat": category,
+            "dur": int((end - start) * 1e6),
+            "name": name,
+            "ph": "X",
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "ts": int(start * 1e6),
+        }
+        if args:
+            event["args"] = dict((k, str(v)) for k, v in args.items())
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault((event["pid"], event["tid"]), thread.name)
+
+    def register(self, session):
+        """Record a span for each call made by clients of a botocore session.
+
+        Does nothing unless tracing is enabled. Must be called before
+        clients are created from the session.
+
+        Args:
+            session (:class:`botocore.session.Session`): Session to register
+                event handlers with.
+
+        """
+        if not self.enabled:
+            return
+        for event, handler in [
+            ("before-call", self._before_call),
+            ("after-call", self._after_call),
+            ("after-call-error", self._after_call),
+        ]:
+            session.register(event, handler, unique_id="runway-trace-" + event)
+
+    def dump(self):
+        """Get the recorded spans.
+
+        Returns:
+            Dict[str, Any]: JSON serializable.
+
+        """
+        with self._lock:
+            return {
+                "events": list(self.events),
+                "threads": [list(k) + [v] for k, v in self._threads.items()],
+            }
+
+    def merge(self, data):
+        """Add spans recorded elsewhere (e.g. by a worker process).
+
+        Args:
+            data (Dict[str, Any]): Returned by :meth:`dump`.
+
+        """
+        with self._lock:
+            self.events.extend(data["events"])
+            for pid, tid, name in data["threads"]:
+                self._threads.setdefault((pid, tid), name)
+
+    def write(self, path):
+        """Write the recorded spans to a Chrome trace file.
+
+        Args:
+            path (str): Path of the file.
+
+        """
+        data = self.dump()
+        events = [
+            {
+                "args": {"name": "runway" if pid == os.getpid() else "worker"},
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+            }
+            for pid in sorted(set(i[0] for i in data["threads"]))
+        ]
+        events.extend(
+            {
+                "args": {"name": name},
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+            }
+            for pid, tid, name in data["threads"]
+        )
+        events.extend(sorted(data["events"], key=lambda i: i["ts"]))
+        with open(path, "w") as stream:
+            json.dump({"displayTimeUnit": "ms", "traceEvents": events}, stream)
+        LOGGER.info("trace written to %s", path)
+
+    @staticmethod
+    def _before_call(context=None, **_):
+        """Record when a call starts."""
+        if context is not None:
+            context[_TRACE_START_KEY] = time.time()
+
+    def _after_call(self, event_name, context=None, http_response=None, **_):
+        """Record a span for a call that completed or failed."""
+        if not context or _TRACE_START_KEY not in context:
+            return  # started before tracing or short-circuited
+        args = {"region": context.get("client_region")}
+        if http_response is not None:
+            args["status"] = http_response.status_code
+        self.add(
+            ".".join(event_name.split(".")[1:3]),
+            "aws",
+            context[_TRACE_START_KEY],
+            time.time(),
+            **args
+        )
+
+
+class Profiler(object):
+    """Profiles major phases of Runway and CFNgin with :mod:`cProfile`.
+
+    A phase is profiled in the thread that runs it. Nested phases are
+    exclusive: while an inner phase runs, the outer phase is paused so time
+    is only counted once. Profiles of the same phase are combined and
+    written to ``<directory>/<phase>.pstats`` (``<phase>.<pid>.pstats`` for
+    worker processes).
+
+    Attributes:
+        directory (Optional[str]): Directory profiles are written to. Phases
+            are only profiled when this is set.
+
+    """
+
+    def __init__(self):
+        """Instantiate class."""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._worker_profiles = {}
+        self.directory = None
+
+    @property
+    def enabled(self):
+        """Whether phases are being profiled.
+
+        Returns:
+            bool
+
+        """
+        return bool(self.directory)
+
+    def reset(self, directory=None):
+        """Remove all profiles.
+
+        Args:
+            directory (Optional[str]): Directory to write profiles to. If not
+                provided, phases are not profiled afterwards.
+
+        """
+        # forked workers inherit the profiles active in the parent's thread
+        for profile in getattr(self._local, "profiles", []):
+            profile.disable()
+        with self._lock:
+            self._local = threading.local()
+            self._stats = {}
+            self._worker_profiles = {}
+            self.directory = directory
+
+    def start(self, directory):
+        """Start profiling phases.
+
+        Args:
+            directory (str): Directory to write profiles to.
+
+        """
+        self.reset(directory)
+
+    def stop(self):
+        """Stop profiling, write the profiles and log a summary."""
+        if not self.enabled:
+            return
+        profiles = self.write()
+        self.directory = None
+        for phase in sorted(set(profiles) | set(self._worker_profiles)):
+            self.log_summary(
+                phase, profiles.get(phase, []) + self._worker_profiles.get(phase, [])
+            )
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Profile a block as part of a phase.
+
+        Args:
+            name (str): Name of the phase (e.g. ``hooks``).
+
+        """
+        if not self.enabled:
+            yield
+            return
+        if not hasattr(self._local, "profiles"):
+            self._local.profiles = []
+        active = self._local.profiles
+        if active:
+            active[-1].disable()
+        profile = cProfile.Profile()
+        active.append(profile)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            active.pop()
+            # collecting stats disables whatever profiler is active
+            with self._lock:
+                if name in self._stats:
+                    self._stats[name].add(profile)
+                else:
+                    self._stats[name] = pstats.Stats(profile)
+            if active:
+                active[-1].enable()
+
+    def merge(self, profiles):
+        """Add profiles written by a worker process to the summary.
+
+        Args:
+            profiles (Dict[str, List[str]]): Returned by :meth:`write`.
+
+        """
+        with self._lock:
+            for phase, paths in profiles.items():
+                self._worker_profiles.setdefault(phase, []).extend(paths)
+
+    def write(self, suffix=None):
+        """Write the profile of each phase to a ``.pstats`` file.
+
+        Args:
+            suffix (Optional[str]): Added to the name of each file.
+
+        Returns:
+            Dict[str, List[str]]: Paths of the files written for each phase.
+
+        """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        profiles = {}
+        with self._lock:
+            for phase, stats in self._stats.items():
+                path = os.path.join(
+                    self.directory,
+                    ".".join(
+                        [phase, suffix, "pstats"] if suffix else [phase, "pstats"]
+                    ),
+                )
+                stats.dump_stats(path)
+                profiles[phase] = [path]
+        return profiles
+
+    @staticmethod
+    def log_summary(phase, paths):
+        """Log the functions that took the most time during a phase.
+
+        Args:
+            phase (str): Name of the phase.
+            paths (List[str]): Profiles of the phase.
+
+        """
+        stats = pstats.Stats(*paths)
+        LOGGER.info(
+            "profile of %s (%.3fs): %s", phase, stats.total_tt, ", ".join(paths)
+        )
+        LOGGER.info("%10s %10s %7s  %s", "tottime", "cumtime", "calls", "function")
+        for func, (_, calls, tottime, cumtime, _) in sorted(
+            stats.stats.items(), key=lambda i: -i[1][2]
+        )[:PROFILE_SUMMARY_LENGTH]:
+            LOGGER.info(
+                "%9.3fs %9.3fs %7d  %s",
+                tottime,
+                cumtime,
+                calls,
+                pstats.func_std_string(func),
+            )
+
+
+# Shared by all sessions created by runway.cfngin.session_cache.get_session.
+API_CALLS = ApiCallRecorder()
+TRACER = Tracer()
+PROFILER = Profiler()
@@ -1,4 +1,5 @@
 """CFNgin plan, plan componenets, and functions for interacting with a plan."""
+# pylint: disable=too-many-lines
 import json
 import logging
 import os
@@ -8,8 +9,17 @@ import uuid
 
 from runway._logging import LogLevels, PrefixAdaptor
 
-from .dag import DAG, DAGValidationError, walk
-from .exceptions import CancelExecution, GraphError, PersistentGraphLocked, PlanFailed
+from .dag import DAG, DAGValidationError, Deferred, walk
+from .exceptions import (
+    CancelExecution,
+    GraphError,
+    PersistentGraphLockCodeMissmatch,
+    PersistentGraphLocked,
+    PersistentGraphModified,
+    PersistentGraphUnlocked,
+    PlanFailed,
+)
+from .instrumentation import API_CALLS, TRACER
 from .status import (
     COMPLETE,
     FAILED,
@@ -20,7 +30,7 @@ from .status import (
     SkippedStatus,
 )
 from .ui import ui
-from .util import merge_map, stack_template_key_name
+from .util import stack_template_key_name
 
 LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +53,8 @@ def json_serial(obj):
 def merge_graphs(graph1, graph2):
     """Combine two Graphs into one, retaining steps.
 
+    Neither graph is modified. Use :meth:`Graph.merge` to merge in place.
+
     Args:
         graph1 (:class:`Graph`): Graph that ``graph2`` will
             be merged into.
@@ -53,12 +65,7 @@ def merge_graphs(graph1, graph2):
         :class:`Graph`: A combined graph.
 
     """
-    merged_graph_dict = merge_map(graph1.to_dict().copy(), graph2.to_dict())
-    steps = [
-        graph1.steps.get(name, graph2.steps.get(name))
-        for name in merged_graph_dict.keys()
-    ]
-    return Graph.from_steps(steps)
+    return graph1.copy().merge(graph2)
 
 
 class Step(object):
@@ -97,6 +104,9 @@ class Step(object):
         self.logger = PrefixAdaptor(self.stack.name, LOGGER)
         self.fn = fn
         self.watch_func = watch_func
+        self._stop_watcher_event = None
+        self._submitted_at = None
+        self._watcher = None
 
     def run(self):
         """Run this step until it has completed or been skipped.
@@ -105,38 +115,78 @@ class Step(object):
             bool
 
         """
-        stop_watcher = threading.Event()
-        watcher = None
-        if self.watch_func:
-            watcher = threading.Thread(
-                target=self.watch_func, args=(self.stack, stop_watcher)
-            )
-            watcher.start()
-
+        self._start_watcher()
         try:
             while not self.done:
                 self._run_once()
         finally:
-            if watcher:
-                stop_watcher.set()
-                watcher.join()
+            self._stop_watcher()
+        return self.ok
+
+    def run_deferred(self):
+        """Run this step until it is done or waiting on a stack.
+
+        ``fn`` is called with ``deferred=True``. If the status it returns has
+        a ``waiter``, a :class:`runway.cfngin.dag.Deferred` is returned
+        instead of calling ``fn`` again so the thread can be released until
+        the ``waiter`` is done.
+
+        Returns:
+            Union[bool, :class:`runway.cfngin.dag.Deferred`]
+
+        """
+        self._start_watcher()
+        while not self.done:
+            status = self._run_once(deferred=True)
+            if status.waiter and not self.done:
+                return Deferred(status.waiter, self.run_deferred)
+        self._stop_watcher()
         return self.ok
 
-    def _run_once(self):
+    def _start_watcher(self):
+        """Start a thread running ``watch_func`` if there is not one."""
+        if self.watch_func and not self._watcher:
+            self._stop_watcher_event = threading.Event()
+            self._watcher = threading.Thread(
+                target=self.watch_func, args=(self.stack, self._stop_watcher_event)
+            )
+            self._watcher.start()
+
+    def _stop_watcher(self):
+        """Stop the thread running ``watch_func``."""
+        if self._watcher:
+            self._stop_watcher_event.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _run_once(self, **kwargs):
         """Run a step exactly once.
 
+        Args:
+            **kwargs: Passed to ``fn``.
+
         Returns:
             str
 
         """
+        start = time.time()
         try:
-            status = self.fn(self.stack, status=self.status)
+            with API_CALLS.stack(self.stack.name):
+                status = self.fn(self.stack, status=self.status, **kwargs)
         except CancelExecution:
             status = SkippedStatus("canceled execution")
         except Exception as err:  # pylint: disable=broad-except
             LOGGER.exception(err)
             status = FailedStatus(reason=str(err))
+        now = time.time()
+        TRACER.add(self.name, "step", start, now, status=status.name)
         self.set_status(status)
+        if status == SUBMITTED and not self._submitted_at:
+            self._submitted_at = now
+        elif self.done and self._submitted_at:
+            # time spent waiting on CloudFormation once submitted
+            TRACER.add("wait", "step", self._submitted_at, now, stack=self.name)
+            self._submitted_at = None
         return status
 
     @property
@@ -435,11 +485,14 @@ class Graph(object):
                 except GraphError:
                     continue
 
-    def add_steps(self, steps):
+    def add_steps(self, steps, partial=False):
         """Add a list of steps.
 
         Args:
             steps (List[:class:`Step`]): The step to be added.
+            partial (bool): The steps are only part of the config (e.g. the
+                subgraph needed for targeted stacks). Steps named in
+                ``required_by`` that are not in the graph are skipped.
 
         """
         for step in steps:
@@ -450,8 +503,41 @@ class Graph(object):
                 self.connect(step.name, dep)
 
             for parent in step.required_by:
+                if partial and parent not in self.steps:
+                    continue
                 self.connect(parent, step.name)
 
+    def copy(self):
+        """Create a copy of the graph that can be modified independently.
+
+        Steps are shared with the copy.
+
+        Returns:
+            :class:`Graph`
+
+        """
+        return self.__class__(steps=dict(self.steps), dag=self.dag.copy())
+
+    def merge(self, other):
+        """Merge the steps of another graph that are missing from this one.
+
+        Steps already in this graph are retained along with their
+        dependencies. Missing steps are added along with their dependencies
+        from ``other``. Only the part of the graph affected by the added
+        dependencies is validated.
+
+        Args:
+            other (:class:`Graph`): Graph to merge into this one.
+
+        Returns:
+            :class:`Graph`: This graph.
+
+        """
+        self.dag.merge(other.dag)
+        for name, step in other.steps.items():
+            self.steps.setdefault(name, step)
+        return self
+
     def pop(self, step, default=None):
         """Remove a step from the graph.
 
@@ -550,17 +636,21 @@ class Graph(object):
         """Return the underlying DAG as a dictionary."""
         return self.dag.graph
 
-    def dumps(self, indent=None):
+    def dumps(self, indent=None, separators=None):
         """Output the graph as a json seralized string for storage.
 
         Args:
             indent (Optional[int]): Number of spaces for each indentation.
+            separators (Optional[Tuple[str, str]]): Item and key separators.
+                ``(",", ":")`` produces the most compact output.
 
         Returns:
             str
 
         """
-        return json.dumps(self.to_dict(), default=json_serial, indent=indent)
+        return json.dumps(
+            self.to_dict(), default=json_serial, indent=indent, separators=separators
+        )
 
     @classmethod
     def from_dict(cls, graph_dict, context):
@@ -579,18 +669,21 @@ class Graph(object):
         return cls.from_steps(Step.from_persistent_graph(graph_dict, context))
 
     @classmethod
-    def from_steps(cls, steps):
+    def from_steps(cls, steps, partial=False):
         """Create a Graph from Steps.
 
         Args:
             steps (List[:class:`Step`]): Steps used to create the graph.
+            partial (bool): The steps are only part of the config. Steps
+                named in ``required_by`` that are not in the graph are
+                skipped.
 
         Returns:
             :class:`Graph`
 
         """
         graph = cls()
-        graph.add_steps(steps)
+        graph.add_steps(steps, partial=partial)
         return graph
 
     def __str__(self):
@@ -598,6 +691,178 @@ class Graph(object):
         return self.dumps()
 
 
+class PersistentGraphWriter(object):
+    """Coalesce uploads of the persistent graph while a plan is executed.
+
+    Rather than uploading the persistent graph each time it is modified,
+    uploads are requested with :meth:`schedule` and made by a background
+    thread once no further requests have been made for ``delay`` seconds
+    (or ``max_delay`` seconds have passed since the oldest pending request).
+    At most one upload is in flight at a time; modifications made during an
+    upload are included in the next one. Changes that fail to upload stay
+    pending and are retried, waiting twice as long after each consecutive
+    failure (up to ``max_delay`` seconds). Errors that retrying can't fix
+    (the persistent graph was modified, unlocked or locked by another
+    session) stop further uploads and are raised by :meth:`close`, which
+    otherwise makes the final upload.
+
+    Attributes:
+        context (:class:`runway.cfngin.context.Context`): Context object.
+        delay (float): Seconds without a new request before uploading.
+        lock (threading.Lock): Must be held while modifying the persistent
+            graph. Held by the writer while it is being uploaded.
+        lock_code (str): Code used to lock the persistent graph.
+        max_delay (float): Max seconds a request can be pending.
+        uploads (int): Number of uploads made.
+
+    """
+
+    #: Errors uploading the persistent graph that retrying can't fix.
+    FATAL_ERRORS = (
+        PersistentGraphLockCodeMissmatch,
+        PersistentGraphModified,
+        PersistentGraphUnlocked,
+    )
+
+    def __init__(self, context, lock_code, delay=1.0, max_delay=10.0):
+        """Instantiate class.
+
+        Args:
+            context (:class:`runway.cfngin.context.Context`): Context object.
+            lock_code (str): Code used to lock the persistent graph.
+            delay (float): Seconds without a new request before uploading.
+            max_delay (float): Max seconds a request can be pending.
+
+        """
+        self._condition = threading.Condition()
+        self._error = None
+        self._failures = 0
+        self._first_request = None
+        self._last_request = None
+        self._retry_at = 0
+        self._stopped = False
+        self._thread = None
+        self.context = context
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.lock_code = lock_code
+        self.max_delay = max_delay
+        self.uploads = 0
+
+    @property
+    def pending(self):
+        """Whether there are changes waiting to be uploaded.
+
+        Returns:
+            bool
+
+        """
+        return self._first_request is not None
+
+    def close(self, raise_errors=True):
+        """Stop the background thread and upload any pending changes.
+
+        No upload is made if an error that retrying can't fix was
+        encountered; that error is raised instead.
+
+        Args:
+            raise_errors (bool): Raise an error that stopped uploads or was
+                encountered during the final upload. When ``False``, the
+                error is logged instead so that it does not replace an
+                exception that is already being raised.
+
+        Raises:
+            Exception: An error that stopped uploads or was encountered
+                during the final upload.
+
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+        try:
+            if self._error:
+                raise self._error
+            if self.pending:
+                self._upload()
+        except Exception as err:  # pylint: disable=broad-except
+            if raise_errors:
+                raise
+            LOGGER.error("failed to update the persistent graph: %s", err)
+
+    def schedule(self):
+        """Request an upload of the persistent graph."""
+        with self._condition:
+            now = time.time()
+            self._last_request = now
+            if self._first_request is None:
+                self._first_request = now
+            if not self._thread and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name="persistent-graph-writer"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        """Upload the persistent graph as requests come in."""
+        while True:
+            with self._condition:
+                while not self.pending and not self._stopped:
+                    self._condition.wait()
+                while not self._stopped:
+                    remaining = (
+                        max(
+                            min(
+                                self._last_request + self.delay,
+                                self._first_request + self.max_delay,
+                            ),
+                            self._retry_at,
+                        )
+                        - time.time()
+                    )
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopped:
+                    return  # the final upload is made by close
+            try:
+                self._upload()
+            except self.FATAL_ERRORS as err:
+                LOGGER.error("failed to update the persistent graph: %s", err)
+                self._error = err
+                return
+            except Exception as err:  # pylint: disable=broad-except
+                with self._condition:
+                    self._failures += 1
+                    retry_delay = min(self.delay * 2 ** self._failures, self.max_delay)
+                    LOGGER.warning(
+                        "failed to update the persistent graph; "
+                        "retrying in %.1f seconds: %s",
+                        retry_delay,
+                        err,
+                    )
+                    now = time.time()
+                    self._retry_at = now + retry_delay
+                    self._last_request = now
+                    if self._first_request is None:
+                        self._first_request = now
+            else:
+                with self._condition:
+                    self._failures = 0
+                    self._retry_at = 0
+
+    def _upload(self):
+        """Upload the persistent graph."""
+        with self.lock:
+            with self._condition:
+                self._first_request = self._last_request = None
+            self.context.put_persistent_graph(self.lock_code)
+            self.uploads += 1
+
+
 class Plan(object):
     """A convenience class for working on a Graph.
 
@@ -734,11 +999,19 @@ class Plan(object):
     def walk(self, walker):
         """Walk each step in the underlying graph, in topological order.
 
+        If the walker supports deferred execution (e.g.
+        :meth:`runway.cfngin.dag.EventWalker.walk`), steps are run with
+        :meth:`Step.run_deferred`.
+
         Args:
             walker (func): a walker function to be passed to
                 :class:`runway.cfngin.dag.DAG` to walk the graph.
 
         """
+        writer = None
+        if self.context and self.context.persistent_graph:
+            writer = PersistentGraphWriter(self.context, self.lock_code)
+        deferred = getattr(walker, "deferred", False)
 
         def walk_func(step):
             """Execute a :class:`Step` wile walking the graph.
@@ -760,31 +1033,59 @@ class Plan(object):
                     step.set_status(FailedStatus("dependency has failed"))
                     return step.ok
 
-            result = step.run()
+            if deferred:
+                return step_done(step, step.run_deferred())
+            return step_done(step, step.run())
+
+        def step_done(step, result):
+            """Update the persistent graph once a step is done.
 
-            if not self.context or not self.context.persistent_graph:
+            Args:
+                step (:class:`Step`): :class:`Step` that was executed.
+                result (Union[bool, :class:`runway.cfngin.dag.Deferred`]):
+                    Result of running the step.
+
+            Returns:
+                Union[bool, :class:`runway.cfngin.dag.Deferred`]
+
+            """
+            if isinstance(result, Deferred):
+                return Deferred(result.waiter, lambda: step_done(step, result.resume()))
+
+            if not writer:
                 return result
 
             if step.completed or (
                 step.skipped
                 and step.status.reason == ("does not exist in cloudformation")
             ):
-                if step.fn.__name__ == "_destroy_stack":
-                    self.context.persistent_graph.pop(step)
-                    LOGGER.debug(
-                        "removed step '%s' from the persistent graph", step.name
-                    )
-                elif step.fn.__name__ == "_launch_stack":
-                    self.context.persistent_graph.add_step_if_not_exists(
-                        step, add_dependencies=True, add_dependants=True
-                    )
-                    LOGGER.debug("added step '%s' to the persistent graph", step.name)
-                else:
-                    return result
-                self.context.put_persistent_graph(self.lock_code)
+                with writer.lock:
+                    if step.fn.__name__ == "_destroy_stack":
+                        self.context.persistent_graph.pop(step)
+                        LOGGER.debug(
+                            "removed step '%s' from the persistent graph", step.name
+                        )
+                    elif step.fn.__name__ == "_launch_stack":
+                        self.context.persistent_graph.add_step_if_not_exists(
+                            step, add_dependencies=True, add_dependants=True
+                        )
+                        LOGGER.debug(
+                            "added step '%s' to the persistent graph", step.name
+                        )
+                    else:
+                        return result
+                writer.schedule()
             return result
 
-        return self.graph.walk(walker, walk_func)
+        try:
+            result = self.graph.walk(walker, walk_func)
+        except BaseException:
+            if writer:
+                writer.close(raise_errors=False)
+            raise
+        if writer:
+            writer.close()
+        return result
 
     @property
     def lock_code(self):
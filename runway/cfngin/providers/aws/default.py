@@ -1,9 +1,12 @@
 """Default AWS Provider."""
 # pylint: disable=too-many-lines,too-many-public-methods
+import functools
 import json
 import logging
 import sys
+import threading
 import time
+from collections import OrderedDict
 from threading import Lock  # thread safe, memoize, provider builder.
 
 import botocore.exceptions
@@ -16,11 +19,15 @@ from runway.util import DOC_SITE, JsonEncoder
 from ... import exceptions
 from ...actions.diff import DictValue, diff_parameters
 from ...actions.diff import format_params_diff as format_diff
+from ...rate_limit import TokenBucket
 from ...session_cache import get_session
 from ...ui import ui
 from ...util import parse_cloudformation_template
 from ..base import BaseProvider
 
+if sys.version_info.major > 2:
+    import asyncio
+
 LOGGER = logging.getLogger(__name__)
 
 # This value controls the maximum number of times a CloudFormation API call
@@ -48,6 +55,20 @@ MAX_ATTEMPTS = 10
 MAX_TAIL_RETRIES = 15
 TAIL_RETRY_SLEEP = 1
 GET_EVENTS_SLEEP = 1
+# Maximum number of ``describe_change_set`` calls per second made by a
+# ChangeSetPoller. All stacks diffed using the same provider (region/profile)
+# share this budget rather than each polling on their own.
+CHANGE_SET_POLL_RATE = 10
+# Maximum number of ``create_change_set`` calls per second made through a
+# ChangeSetPoller. Change sets of stacks diffed using the same provider share
+# this budget regardless of how many steps are being walked at once.
+CHANGE_SET_CREATE_RATE = 5
+# Seconds between checks of the stacks being waited on by a StackStatusPoller.
+STACK_STATUS_POLL_INTERVAL = 5
+# When at least this many stacks are being waited on, a StackStatusPoller
+# lists all stacks with paginated ``describe_stacks`` calls instead of
+# describing each stack on its own.
+STACK_STATUS_BATCH_THRESHOLD = 20
 DEFAULT_CAPABILITIES = ["CAPABILITY_NAMED_IAM", "CAPABILITY_AUTO_EXPAND"]
 
 
@@ -328,7 +349,653 @@ def wait_till_change_set_complete(
     return response
 
 
-def create_change_set(
+class _PendingChangeSet(object):  # pylint: disable=too-few-public-methods
+    """Change set being waited on by a :class:`ChangeSetPoller`."""
+
+    def __init__(self, change_set_id, sleep_time):
+        """Instantiate class.
+
+        Args:
+            change_set_id (str): The unique changeset id to wait for.
+            sleep_time (float): Initial time to wait between checks.
+
+        """
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.change_set_id = change_set_id
+        self.done = threading.Event()
+        self.error = None
+        self.next_poll = time.time()
+        self.response = None
+        self.sleep_time = sleep_time
+
+    def add_done_callback(self, func):
+        """Call a function (without arguments) once the change set is done.
+
+        If the change set is already done, the function is called immediately.
+
+        Args:
+            func (Callable[[], Any]): Function to call.
+
+        """
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(func)
+                return
+        func()
+
+    def set_done(self):
+        """Mark the change set as done and call any callbacks."""
+        with self._lock:
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for func in callbacks:
+            func()
+
+    def result(self):
+        """Block until the change set is in a complete state.
+
+        Returns:
+            Dict[str, Any]: The response from CloudFormation for the
+            ``describe_change_set`` call.
+
+        Raises:
+            ChangesetDidNotStabilize: The change set was not in a complete
+                state after the maximum number of checks.
+
+        """
+        self.done.wait()
+        if self.error:
+            raise self.error  # pylint: disable=raising-bad-type
+        return self.response
+
+
+class _PendingStackChanges(object):  # pylint: disable=too-few-public-methods
+    """ChangeSet created to get the changes of a stack.
+
+    Can be used as the ``waiter`` of a status so a step is resumed once the
+    ChangeSet is complete instead of blocking its thread.
+
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, change_set, change_type, old_params, old_template, parameters
+    ):
+        """Instantiate class.
+
+        Args:
+            change_set (_PendingChangeSet): ChangeSet being waited on.
+            change_type (str): ``CREATE`` or ``UPDATE``.
+            old_params (Dict[str, Any]): Parameters of the deployed stack.
+            old_template (Dict[str, Any]): Template of the deployed stack.
+            parameters (List[Dict[str, Any]]): Parameters of the ChangeSet.
+
+        """
+        self.change_set = change_set
+        self.change_type = change_type
+        self.done = change_set.done
+        self.old_params = old_params
+        self.old_template = old_template
+        self.parameters = parameters
+
+    def add_done_callback(self, func):
+        """Call a function (without arguments) once the ChangeSet is done.
+
+        Args:
+            func (Callable[[], Any]): Function to call.
+
+        """
+        self.change_set.add_done_callback(func)
+
+
+class ChangeSetPoller(object):
+    """Wait for many change sets to complete using a single thread.
+
+    Instead of each stack sleeping in its own ``describe_change_set`` loop,
+    change sets are registered with the poller which checks on all of them in
+    turn. Each change set still uses the exponential backoff of
+    :func:`wait_till_change_set_complete` but API calls made by the poller are
+    paced to stay within ``max_calls_per_second``. Change sets created through
+    the poller (see :meth:`create`) share a budget of
+    ``max_creates_per_second``.
+
+    The polling thread is only running while there are change sets being
+    waited on.
+
+    """
+
+    def __init__(
+        self,
+        cfn_client,
+        try_count=25,
+        sleep_time=0.5,
+        max_sleep=3,
+        max_calls_per_second=CHANGE_SET_POLL_RATE,
+        max_creates_per_second=CHANGE_SET_CREATE_RATE,
+    ):
+        """Instantiate class.
+
+        Args:
+            cfn_client (:class:`botocore.client.Client`): Used to query
+                CloudFormation.
+            try_count (int): Number of times to check each change set.
+            sleep_time (float): Initial time to wait between checks of a
+                change set.
+            max_sleep (float): Max time to wait between checks of a change set.
+            max_calls_per_second (float): Maximum rate of
+                ``describe_change_set`` calls made by the poller.
+            max_creates_per_second (float): Maximum rate of
+                ``create_change_set`` calls made through the poller. ``0`` for
+                no limit.
+
+        """
+        self.cfn_client = cfn_client
+        self.create_limit = (
+            TokenBucket(
+                rate=max_creates_per_second,
+                min_rate=max_creates_per_second,
+                max_rate=max_creates_per_second,
+            )
+            if max_creates_per_second
+            else None
+        )
+        self.max_sleep = max_sleep
+        self.min_interval = 1.0 / max_calls_per_second if max_calls_per_second else 0
+        self.sleep_time = sleep_time
+        self.try_count = try_count
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._thread = None
+        self._wakeup = threading.Event()
+
+    def create(self, **kwargs):
+        """Create a change set, waiting for the budget of the poller.
+
+        Args:
+            **kwargs: Passed to ``create_change_set``.
+
+        Returns:
+            Dict[str, Any]: The response from CloudFormation.
+
+        """
+        if self.create_limit:
+            self.create_limit.acquire()
+        return self.cfn_client.create_change_set(**kwargs)
+
+    def submit(self, change_set_id):
+        """Register a change set to be polled.
+
+        Args:
+            change_set_id (str): The unique changeset id to wait for.
+
+        Returns:
+            _PendingChangeSet: Object that will be updated when the change set
+            reaches a complete state.
+
+        """
+        with self._lock:
+            pending = self._pending.get(change_set_id)
+            if not pending:
+                pending = _PendingChangeSet(change_set_id, self.sleep_time)
+                self._pending[change_set_id] = pending
+                self._wakeup.set()
+            if not self._thread:
+                self._thread = threading.Thread(
+                    target=self._run, name="change-set-poller"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        return pending
+
+    def wait(self, change_set_id):
+        """Block until a change set is in a complete state.
+
+        Args:
+            change_set_id (str): The unique changeset id to wait for.
+
+        Returns:
+            Dict[str, Any]: The response from CloudFormation for the
+            ``describe_change_set`` call.
+
+        Raises:
+            ChangesetDidNotStabilize: The change set was not in a complete
+                state after ``try_count`` checks.
+
+        """
+        return self.submit(change_set_id).result()
+
+    def _finish(self, pending):
+        """Stop polling a change set and notify anything waiting on it."""
+        with self._lock:
+            self._pending.pop(pending.change_set_id, None)
+        pending.set_done()
+
+    def _poll(self, pending):
+        """Check the status of a single change set."""
+        try:
+            response = self.cfn_client.describe_change_set(
+                ChangeSetName=pending.change_set_id
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            pending.error = err
+            return self._finish(pending)
+        pending.attempts += 1
+        if response["Status"] in ("FAILED", "CREATE_COMPLETE"):
+            pending.response = response
+            return self._finish(pending)
+        if pending.attempts >= self.try_count:
+            pending.error = exceptions.ChangesetDidNotStabilize(pending.change_set_id)
+            return self._finish(pending)
+        if pending.sleep_time == self.max_sleep:
+            LOGGER.debug(
+                "waiting on changeset %s for another %s seconds",
+                pending.change_set_id,
+                pending.sleep_time,
+            )
+        pending.next_poll = time.time() + pending.sleep_time
+        # exponential backoff with max
+        pending.sleep_time = min(pending.sleep_time * 2, self.max_sleep)
+        return None
+
+    def _run(self):
+        """Poll registered change sets until there are none left."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._wakeup.clear()
+                now = time.time()
+                due = sorted(
+                    (p for p in self._pending.values() if p.next_poll <= now),
+                    key=lambda p: p.next_poll,
+                )
+                next_poll = min(p.next_poll for p in self._pending.values())
+            if not due:
+                # woken early if another change set is submitted
+                self._wakeup.wait(next_poll - now)
+                continue
+            for pending in due:
+                self._poll(pending)
+                time.sleep(self.min_interval)
+
+
+class _PendingStack(object):
+    """Stack being waited on by a :class:`StackStatusPoller`."""
+
+    def __init__(self, stack_name):
+        """Instantiate class.
+
+        Args:
+            stack_name (str): Name of the stack being waited on.
+
+        """
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.done = threading.Event()
+        self.error = None
+        self.next_poll = 0
+        self.stack_name = stack_name
+        self.status = None
+
+    def add_done_callback(self, func):
+        """Call a function (without arguments) once the stack is done.
+
+        If the stack is already done, the function is called immediately.
+
+        Args:
+            func (Callable[[], Any]): Function to call.
+
+        """
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(func)
+                return
+        func()
+
+    def set_done(self):
+        """Mark the stack as done and call any callbacks."""
+        with self._lock:
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for func in callbacks:
+            func()
+
+
+class StackStatusPoller(object):
+    """Notify waiters when stacks are no longer in progress using one thread.
+
+    Rather than each step of a plan sleeping and describing its stack in a
+    loop, stacks that have been submitted are registered with the poller.
+    It checks on each of them as soon as it is submitted and then every
+    ``interval`` seconds, marking each as done once it reaches a status that
+    is not in progress (or no longer exists). Stacks that are due at the same
+    time are checked together.
+
+    The polling thread is only running while there are stacks being waited
+    on.
+
+    """
+
+    def __init__(
+        self,
+        cfn_client,
+        interval=STACK_STATUS_POLL_INTERVAL,
+        batch_threshold=STACK_STATUS_BATCH_THRESHOLD,
+        max_calls_per_second=CHANGE_SET_POLL_RATE,
+    ):
+        """Instantiate class.
+
+        Args:
+            cfn_client (:class:`botocore.client.Client`): Used to query
+                CloudFormation.
+            interval (float): Seconds between checks of the stacks.
+            batch_threshold (int): Number of stacks being waited on before
+                all stacks are listed instead of describing each one.
+            max_calls_per_second (float): Maximum rate of ``describe_stacks``
+                calls made by the poller.
+
+        """
+        self.batch_threshold = batch_threshold
+        self.cfn_client = cfn_client
+        self.interval = interval
+        self.min_interval = 1.0 / max_calls_per_second if max_calls_per_second else 0
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._thread = None
+        self._wakeup = threading.Event()
+
+    @staticmethod
+    def is_in_progress(status):
+        """Whether a stack status is in progress.
+
+        Args:
+            status (Optional[str]): Stack status.
+
+        Returns:
+            bool
+
+        """
+        return bool(
+            status
+            and status.endswith("_IN_PROGRESS")
+            and status != Provider.REVIEW_STATUS
+        )
+
+    def submit(self, stack_name):
+        """Register a stack to be waited on.
+
+        Args:
+            stack_name (str): Name of the stack.
+
+        Returns:
+            _PendingStack: Object that will be marked as done when the stack
+            is no longer in progress.
+
+        """
+        with self._lock:
+            pending = self._pending.get(stack_name)
+            if not pending:
+                pending = _PendingStack(stack_name)
+                self._pending[stack_name] = pending
+                self._wakeup.set()
+            if not self._thread:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-status-poller"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        return pending
+
+    def _describe(self, pending):
+        """Get the status of each stack being waited on.
+
+        Args:
+            pending (List[_PendingStack]): Stacks being waited on.
+
+        Returns:
+            Dict[str, Optional[str]]: Stack name mapped to its status.
+            ``None`` if the stack does not exist.
+
+        """
+        if len(pending) >= self.batch_threshold:
+            statuses = dict((i.stack_name, None) for i in pending)
+            paginator = self.cfn_client.get_paginator("describe_stacks")
+            for page in paginator.paginate():
+                for stack in page.get("Stacks", []):
+                    if stack["StackName"] in statuses:
+                        statuses[stack["StackName"]] = stack["StackStatus"]
+            return statuses
+        statuses = {}
+        for i in pending:
+            try:
+                response = self.cfn_client.describe_stacks(StackName=i.stack_name)
+                statuses[i.stack_name] = response["Stacks"][0]["StackStatus"]
+            except botocore.exceptions.ClientError as err:
+                if "does not exist" not in str(err):
+                    raise
+                statuses[i.stack_name] = None
+            time.sleep(self.min_interval)
+        return statuses
+
+    def _finish(self, pending):
+        """Stop waiting on a stack and notify anything waiting on it."""
+        with self._lock:
+            self._pending.pop(pending.stack_name, None)
+        pending.set_done()
+
+    def _update(self, pending, statuses=None, error=None):
+        """Finish waiting on stacks that are no longer in progress.
+
+        Args:
+            pending (List[_PendingStack]): Stacks that were checked.
+            statuses (Optional[Dict[str, Optional[str]]]): Stack name mapped
+                to its status.
+            error (Optional[Exception]): Error raised while checking the
+                stacks. All of them are finished so the steps waiting on
+                them can check on their stacks themselves.
+
+        """
+        for i in pending:
+            if error:
+                i.error = error
+                self._finish(i)
+                continue
+            status = statuses.get(i.stack_name)
+            if not self.is_in_progress(status):
+                i.status = status
+                self._finish(i)
+
+    def _run(self):
+        """Poll registered stacks until there are none left."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._wakeup.clear()
+                now = time.time()
+                due = [i for i in self._pending.values() if i.next_poll <= now]
+                next_poll = min(i.next_poll for i in self._pending.values())
+            if not due:
+                # woken early if another stack is submitted
+                self._wakeup.wait(next_poll - now)
+                continue
+            for i in due:
+                i.next_poll = now + self.interval
+            try:
+                self._update(due, self._describe(due))
+            except Exception as err:  # pylint: disable=broad-except
+                self._update(due, error=err)
+
+
+class ThreadTransport(object):  # pylint: disable=too-few-public-methods
+    """Make botocore calls for an event loop using the thread pool of the loop.
+
+    This is the default transport of :class:`AsyncStackStatusPoller`, which
+    only uses it to poll stack status. Any object with a ``call`` method
+    that has the same signature and returns an :class:`asyncio.Future`
+    (e.g. one using an asynchronous AWS client) can be used instead.
+
+    """
+
+    def __init__(self, loop):
+        """Instantiate class.
+
+        Args:
+            loop (asyncio.AbstractEventLoop): Event loop the calls are made
+                for.
+
+        """
+        self.loop = loop
+
+    def call(self, client, operation, **kwargs):
+        """Call an operation of a botocore client.
+
+        Args:
+            client (:class:`botocore.client.Client`): Client to use.
+            operation (str): Name of the client method to call
+                (e.g. ``describe_stacks``).
+
+        Returns:
+            asyncio.Future: Result of the call.
+
+        """
+        return self.loop.run_in_executor(
+            None, functools.partial(getattr(client, operation), **kwargs)
+        )
+
+
+class AsyncStackStatusPoller(StackStatusPoller):
+    """:class:`StackStatusPoller` that polls from an asyncio event loop.
+
+    Rather than running a thread, polling is scheduled on the loop and
+    ``describe_stacks`` calls are issued through an asynchronous transport.
+    Stacks can be submitted from any thread.
+
+    Only these status calls go through the transport. Stack-level calls
+    (e.g. ``create_stack``, ``update_stack``, ``delete_stack`` and change
+    sets) are made synchronously by the thread running the step.
+
+    Requires Python 3.
+
+    """
+
+    def __init__(
+        self,
+        cfn_client,
+        loop,
+        transport=None,
+        interval=STACK_STATUS_POLL_INTERVAL,
+        batch_threshold=STACK_STATUS_BATCH_THRESHOLD,
+    ):
+        """Instantiate class.
+
+        Args:
+            cfn_client (:class:`botocore.client.Client`): Used to query
+                CloudFormation.
+            loop (asyncio.AbstractEventLoop): Event loop to poll from.
+            transport (Optional[Any]): Used to make calls with the client.
+                Defaults to :class:`ThreadTransport`.
+            interval (float): Seconds between checks of the stacks.
+            batch_threshold (int): Number of stacks being waited on before
+                all stacks are listed instead of describing each one.
+
+        """
+        super(AsyncStackStatusPoller, self).__init__(
+            cfn_client,
+            interval=interval,
+            batch_threshold=batch_threshold,
+            max_calls_per_second=0,
+        )
+        self.loop = loop
+        self.transport = transport or ThreadTransport(loop)
+        self._running = False
+
+    def submit(self, stack_name):
+        """Register a stack to be waited on.
+
+        Args:
+            stack_name (str): Name of the stack.
+
+        Returns:
+            _PendingStack: Object that will be marked as done when the stack
+            is no longer in progress.
+
+        """
+        with self._lock:
+            pending = self._pending.get(stack_name)
+            if not pending:
+                pending = _PendingStack(stack_name)
+                self._pending[stack_name] = pending
+            if not self._running:
+                self._running = True
+                self.loop.call_soon_threadsafe(self._poll)
+        return pending
+
+    def _poll(self):
+        """Check on the stacks being waited on."""
+        with self._lock:
+            if not self._pending:
+                self._running = False
+                return
+            pending = list(self._pending.values())
+        if len(pending) >= self.batch_threshold:
+            self._list(pending, dict((i.stack_name, None) for i in pending))
+            return
+        asyncio.gather(
+            *[
+                self.transport.call(
+                    self.cfn_client, "describe_stacks", StackName=i.stack_name
+                )
+                for i in pending
+            ],
+            return_exceptions=True
+        ).add_done_callback(functools.partial(self._described, pending))
+
+    def _described(self, pending, future):
+        """Handle the responses of describing each stack."""
+        error = None
+        statuses = {}
+        for i, result in zip(pending, future.result()):
+            if not isinstance(result, Exception):
+                statuses[i.stack_name] = result["Stacks"][0]["StackStatus"]
+            elif "does not exist" in str(result):
+                statuses[i.stack_name] = None
+            else:
+                error = result
+        self._polled(pending, statuses, error)
+
+    def _list(self, pending, statuses, next_token=None):
+        """List all stacks, one page at a time."""
+        kwargs = {"NextToken": next_token} if next_token else {}
+        self.transport.call(
+            self.cfn_client, "describe_stacks", **kwargs
+        ).add_done_callback(functools.partial(self._listed, pending, statuses))
+
+    def _listed(self, pending, statuses, future):
+        """Handle a page of stacks."""
+        try:
+            response = future.result()
+        except Exception as err:  # pylint: disable=broad-except
+            self._polled(pending, error=err)
+            return
+        for stack in response.get("Stacks", []):
+            if stack["StackName"] in statuses:
+                statuses[stack["StackName"]] = stack["StackStatus"]
+        if response.get("NextToken"):
+            self._list(pending, statuses, response["NextToken"])
+        else:
+            self._polled(pending, statuses)
+
+    def _polled(self, pending, statuses=None, error=None):
+        """Update stacks that were checked and schedule the next check."""
+        self._update(pending, statuses, error)
+        self.loop.call_later(self.interval, self._poll)
+
+
+def submit_change_set(
     cfn_client,
     fqn,
     template,
@@ -336,8 +1003,30 @@ def create_change_set(
     tags,
     change_set_type="UPDATE",
     service_role=None,
+    poller=None,
 ):
-    """Create CloudFormation change set."""
+    """Create CloudFormation change set without waiting for it to complete.
+
+    Args:
+        cfn_client (:class:`botocore.client.Client`): Used to query
+            CloudFormation.
+        fqn (str): The fully qualified name of the Cloudformation stack.
+        template (:class:`runway.cfngin.providers.base.Template`): A Template
+            object to use when creating the change set.
+        parameters (List[Dict[str, Any]]): A list of dictionaries that defines
+            the parameter list to be applied to the Cloudformation stack.
+        tags (List[Dict[str, str]]): A list of dictionaries that defines the
+            tags that should be applied to the Cloudformation stack.
+        change_set_type (str): Type of change set to create.
+        service_role (Optional[str]): An optional service role to use when
+            interacting with Cloudformation.
+        poller (Optional[ChangeSetPoller]): Shared poller whose budget the
+            change set is created within.
+
+    Returns:
+        str: ID of the change set.
+
+    """
     LOGGER.debug(
         "attempting to create change set of type %s for stack: %s", change_set_type, fqn
     )
@@ -350,8 +1039,9 @@ def create_change_set(
         service_role=service_role,
         change_set_name=get_change_set_name(),
     )
+    create = poller.create if poller else cfn_client.create_change_set
     try:
-        response = cfn_client.create_change_set(**args)
+        response = create(**args)
     except botocore.exceptions.ClientError as err:
         if err.response["Error"]["Message"] == (
             "TemplateURL must reference a valid S3 object to which you have access."
@@ -361,14 +1051,33 @@ def create_change_set(
                 template,
                 parameters,
                 tags,
-                cfn_client.create_change_set,
+                create,
                 get_change_set_name(),
                 service_role,
             )
         else:
             raise
-    change_set_id = response["Id"]
-    response = wait_till_change_set_complete(cfn_client, change_set_id)
+    return response["Id"]
+
+
+def get_change_set_changes(cfn_client, fqn, response):
+    """Get the changes of a complete change set.
+
+    Args:
+        cfn_client (:class:`botocore.client.Client`): Used to query
+            CloudFormation.
+        fqn (str): The fully qualified name of the Cloudformation stack.
+        response (Dict[str, Any]): The response from CloudFormation for the
+            ``describe_change_set`` call of the complete change set.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Changes and ID of the change set.
+
+    Raises:
+        StackDidNotChange: The change set contains no changes. It is deleted.
+
+    """
+    change_set_id = response["ChangeSetId"]
     status = response["Status"]
     if status == "FAILED":
         status_reason = response["StatusReason"]
@@ -399,6 +1108,58 @@ def create_change_set(
     return changes, change_set_id
 
 
+def create_change_set(
+    cfn_client,
+    fqn,
+    template,
+    parameters,
+    tags,
+    change_set_type="UPDATE",
+    service_role=None,
+    poller=None,
+):
+    """Create CloudFormation change set.
+
+    Args:
+        cfn_client (:class:`botocore.client.Client`): Used to query
+            CloudFormation.
+        fqn (str): The fully qualified name of the Cloudformation stack.
+        template (:class:`runway.cfngin.providers.base.Template`): A Template
+            object to use when creating the change set.
+        parameters (List[Dict[str, Any]]): A list of dictionaries that defines
+            the parameter list to be applied to the Cloudformation stack.
+        tags (List[Dict[str, str]]): A list of dictionaries that defines the
+            tags that should be applied to the Cloudformation stack.
+        change_set_type (str): Type of change set to create.
+        service_role (Optional[str]): An optional service role to use when
+            interacting with Cloudformation.
+        poller (Optional[ChangeSetPoller]): Shared poller used to create the
+            change set and wait for it to complete. If not provided, the
+            change set is polled by the current thread.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Changes and ID of the change set.
+
+    """
+    change_set_id = submit_change_set(
+        cfn_client,
+        fqn,
+        template,
+        parameters,
+        tags,
+        change_set_type=change_set_type,
+        service_role=service_role,
+        poller=poller,
+    )
+    if poller:
+        response = poller.wait(change_set_id)
+    else:
+        response = wait_till_change_set_complete(cfn_client, change_set_id)
+    return get_change_set_changes(
+        cfn_client, fqn, dict(response, ChangeSetId=change_set_id)
+    )
+
+
 def check_tags_contain(actual, expected):
     """Check if a set of AWS resource tags is contained in another.
 
@@ -523,6 +1284,26 @@ class ProviderBuilder(object):  # pylint: disable=too-few-public-methods
         self.kwargs = kwargs
         self.providers = {}
         self.lock = Lock()
+        self.stack_status_poller_factory = None
+
+    def set_stack_status_poller_factory(self, factory=None):
+        """Set how the stack status poller of each provider is created.
+
+        Applies to providers that have already been built and any built
+        afterwards.
+
+        Args:
+            factory (Optional[Callable[[Any], StackStatusPoller]]): Called
+                with the CloudFormation client of a provider. If not
+                provided, :class:`StackStatusPoller` is used.
+
+        """
+        with self.lock:
+            self.stack_status_poller_factory = factory
+            for provider in self.providers.values():
+                provider.stack_status_poller = (factory or StackStatusPoller)(
+                    provider.cloudformation
+                )
 
     def build(self, region=None, profile=None):
         """Get or create the provider for the given region and profile."""
@@ -545,6 +1326,10 @@ class ProviderBuilder(object):  # pylint: disable=too-few-public-methods
                     **self.kwargs
                 )
                 provider = self.providers[key]
+                if self.stack_status_poller_factory:
+                    provider.stack_status_poller = self.stack_status_poller_factory(
+                        provider.cloudformation
+                    )
 
         return provider
 
@@ -609,6 +1394,8 @@ class Provider(BaseProvider):
         self._outputs = {}
         self.region = region
         self.cloudformation = get_cloudformation_client(session)
+        self.change_set_poller = ChangeSetPoller(self.cloudformation)
+        self.stack_status_poller = StackStatusPoller(self.cloudformation)
         self.interactive = interactive
         # replacements only is only used in interactive mode
         self.replacements_only = interactive and replacements_only
@@ -632,6 +1419,18 @@ class Provider(BaseProvider):
         """Get stack status."""
         return stack["StackStatus"]
 
+    def get_stack_waiter(self, stack_name):
+        """Get an object that is done once a stack is no longer in progress.
+
+        Args:
+            stack_name (str): Name of the stack.
+
+        Returns:
+            _PendingStack: Shared by everything waiting on the stack.
+
+        """
+        return self.stack_status_poller.submit(stack_name)
+
     def is_stack_being_destroyed(  # pylint: disable=unused-argument
         self, stack, **kwargs
     ):
@@ -1394,6 +2193,29 @@ class Provider(BaseProvider):
         Returns:
             Dict[str, Any]: Stack outputs with inferred changes.
 
+        """
+        return self.get_submitted_stack_changes(
+            stack, self.submit_stack_changes(stack, template, parameters, tags)
+        )
+
+    def submit_stack_changes(self, stack, template, parameters, tags):
+        """Create a ChangeSet to get the changes of a stack without waiting.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): The stack to get
+                changes.
+            template (:class:`runway.cfngin.providers.base.Template`):
+                A Template object to compaired to.
+            parameters (List[Dict[str, Any]]): A list of dictionaries that
+                defines the parameter list to be applied to the Cloudformation
+                stack.
+            tags (List[Dict[str, Any]]): A list of dictionaries that defines
+                the tags that should be applied to the Cloudformation stack.
+
+        Returns:
+            _PendingStackChanges: Done once the ChangeSet is complete. Passed
+            to :meth:`get_submitted_stack_changes` to get the changes.
+
         """
         try:
             stack_details = self.get_stack(stack.fqn)
@@ -1408,7 +2230,7 @@ class Provider(BaseProvider):
             old_template = {}
             change_type = "CREATE"
 
-        changes, change_set_id = create_change_set(
+        change_set_id = submit_change_set(
             self.cloudformation,
             stack.fqn,
             template,
@@ -1416,6 +2238,42 @@ class Provider(BaseProvider):
             tags,
             change_type,
             service_role=self.service_role,
+            poller=self.change_set_poller,
+        )
+        return _PendingStackChanges(
+            self.change_set_poller.submit(change_set_id),
+            change_type,
+            old_params,
+            old_template,
+            parameters,
+        )
+
+    def get_submitted_stack_changes(self, stack, pending):
+        """Get the changes from a ChangeSet created by :meth:`submit_stack_changes`.
+
+        Blocks until the ChangeSet is complete.
+
+        Args:
+            stack (:class:`runway.cfngin.stack.Stack`): The stack to get
+                changes.
+            pending (_PendingStackChanges): Returned by
+                :meth:`submit_stack_changes`.
+
+        Returns:
+            Dict[str, Any]: Stack outputs with inferred changes.
+
+        """
+        change_type = pending.change_type
+        old_params = pending.old_params
+        old_template = pending.old_template
+        parameters = pending.parameters
+        changes, change_set_id = get_change_set_changes(
+            self.cloudformation,
+            stack.fqn,
+            dict(
+                pending.change_set.result(),
+                ChangeSetId=pending.change_set.change_set_id,
+            ),
         )
         new_parameters_as_dict = self.params_as_dict(
             [
@@ -38,6 +38,14 @@ class BaseProvider(object):
         """Abstract method."""
         not_implemented("get_stack_status")
 
+    def get_stack_waiter(self, stack_name):
+        """Get an object that is done once a stack is no longer in progress.
+
+        Providers that do not support this return ``None``.
+
+        """
+        return None
+
     def get_outputs(self, stack_name, *args, **kwargs):
         """Abstract method."""
         not_implemented("get_outputs")
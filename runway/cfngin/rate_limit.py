@@ -0,0 +1,319 @@
+"""CFNgin client-side rate limiting of AWS API calls.
+
+All sessions created by :func:`runway.cfngin.session_cache.get_session`
+(used by CFNgin providers, lookups and hooks) share a token bucket per
+(credentials, region, service) for the services in
+:data:`SERVICE_MAX_RATES`. The rate of each bucket adapts to the responses it
+sees: it increases additively while calls succeed and decreases
+multiplicatively when a call is throttled (AIMD). ``CFNGIN_API_RATE`` sets
+the rate buckets start at (``0`` disables rate limiting).
+
+"""
+import logging
+import os
+import threading
+import time
+
+from runway._logging import LogLevels
+
+LOGGER = logging.getLogger(__name__)
+
+# Requests per second each bucket starts at.
+INITIAL_RATE = 10.0
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+# Services whose clients are used by CFNgin providers, lookups and hooks that
+# are rate limited and the highest rate each can be increased to, based on
+# their default API quotas. Calls to other services (e.g. S3 transfers) are
+# not limited.
+SERVICE_MAX_RATES = {
+    "acm": 10.0,
+    "cloudformation": MAX_RATE,
+    "cloudfront": 10.0,
+    "cognito-idp": 20.0,
+    "dynamodb": MAX_RATE,
+    "ec2": MAX_RATE,
+    "ecr": 20.0,
+    "ecs": 20.0,
+    "iam": 10.0,
+    "kms": MAX_RATE,
+    "route53": 5.0,
+    "ssm": 40.0,
+}
+# Requests per second added each second while calls are succeeding.
+RATE_INCREASE = 0.5
+# Multiplier applied to the rate when a call is throttled.
+RATE_DECREASE = 0.5
+# Seconds after a decrease during which further throttles do not decrease
+# the rate again. Calls that were in flight when the first throttle was seen
+# are likely to be throttled as well.
+THROTTLE_COOLDOWN = 1.0
+THROTTLE_ERROR_CODES = frozenset(
+    [
+        "BandwidthLimitExceeded",
+        "EC2ThrottledException",
+        "PriorRequestNotComplete",
+        "ProvisionedThroughputExceededException",
+        "RequestLimitExceeded",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "SlowDown",
+        "ThrottledException",
+        "Throttling",
+        "ThrottlingException",
+        "TooManyRequestsException",
+    ]
+)
+
+
+class TokenBucket(object):
+    """Token bucket with a rate that adapts to throttling.
+
+    Attributes:
+        rate (float): Requests per second currently allowed.
+        requests (int): Number of requests that acquired a token.
+        throttles (int): Number of requests that were throttled.
+        waited (float): Total seconds spent waiting for tokens.
+
+    """
+
+    def __init__(
+        self,
+        rate=INITIAL_RATE,
+        min_rate=MIN_RATE,
+        max_rate=MAX_RATE,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        """Instantiate class.
+
+        Args:
+            rate (float): Requests per second to start at.
+            min_rate (float): Lowest the rate can be decreased to.
+            max_rate (float): Highest the rate can be increased to.
+            clock (Callable[[], float]): Returns the current time.
+            sleep (Callable[[float], Any]): Used to wait for tokens.
+
+        """
+        self._clock = clock
+        self._last_decrease = None
+        self._lock = threading.Lock()
+        self._sleep = sleep
+        self._tokens = 1.0
+        self._updated = clock()
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.requests = 0
+        self.throttles = 0
+        self.waited = 0.0
+
+    def acquire(self):
+        """Wait until a request can be made.
+
+        Tokens are reserved in order so callers are served fairly.
+
+        Returns:
+            float: Seconds waited.
+
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.rate, max(self.rate, 1.0)
+            )
+            self._updated = now
+            self._tokens -= 1
+            self.requests += 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += wait
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Increase the rate after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE / self.rate)
+
+    def on_throttle(self):
+        """Decrease the rate after a throttled request."""
+        with self._lock:
+            self.throttles += 1
+            now = self._clock()
+            if (
+                self._last_decrease is not None
+                and now - self._last_decrease < THROTTLE_COOLDOWN
+            ):
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+
+    def stats(self):
+        """Get the statistics of the bucket.
+
+        Returns:
+            Dict[str, Union[float, int]]
+
+        """
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "requests": self.requests,
+                "throttles": self.throttles,
+                "waited": self.waited,
+            }
+
+
+class RateLimiter(object):
+    """Shared token buckets per (credentials, region, service)."""
+
+    def __init__(self, rate=INITIAL_RATE, services=None, **kwargs):
+        """Instantiate class.
+
+        Args:
+            rate (float): Requests per second each bucket starts at. ``0`` to
+                disable rate limiting.
+            services (Optional[Dict[str, float]]): Services to rate limit
+                mapped to the highest rate of their buckets. Defaults to
+                :data:`SERVICE_MAX_RATES`.
+            **kwargs: Passed to :class:`TokenBucket`.
+
+        """
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.bucket_kwargs = kwargs
+        self.rate = rate
+        self.services = dict(SERVICE_MAX_RATES if services is None else services)
+
+    def get_bucket(self, identity, region, service):
+        """Get the bucket for a combination of credentials, region and service.
+
+        Args:
+            identity (str): Identifies the credentials being used
+                (e.g. profile name or access key).
+            region (Optional[str]): AWS region.
+            service (str): AWS service (e.g. ``cloudformation``).
+
+        Returns:
+            TokenBucket
+
+        """
+        key = (identity, region, service)
+        with self._lock:
+            if key not in self._buckets:
+                kwargs = dict(self.bucket_kwargs)
+                kwargs.setdefault("max_rate", self.services.get(service, MAX_RATE))
+                self._buckets[key] = TokenBucket(
+                    rate=min(self.rate, kwargs["max_rate"]), **kwargs
+                )
+            return self._buckets[key]
+
+    def register(self, session, identity):
+        """Rate limit clients of the services being limited.
+
+        Must be called before clients are created from the session.
+
+        Args:
+            session (:class:`botocore.session.Session`): Session to register
+                event handlers with.
+            identity (str): Identifies the credentials of the session.
+
+        """
+        if not self.rate or not self.services:
+            return
+        session.register(
+            "before-sign",
+            lambda **kwargs: self._before_sign(identity, **kwargs),
+            unique_id="cfngin-rate-limit-before-sign",
+        )
+        session.register(
+            "needs-retry",
+            lambda **kwargs: self._needs_retry(identity, **kwargs),
+            unique_id="cfngin-rate-limit-needs-retry",
+        )
+
+    def stats(self):
+        """Get the statistics of each bucket.
+
+        Returns:
+            Dict[Tuple[str, Optional[str], str], Dict[str, Union[float, int]]]
+
+        """
+        with self._lock:
+            buckets = dict(self._buckets)
+        return dict((key, bucket.stats()) for key, bucket in buckets.items())
+
+    def log_summary(self, since=None):
+        """Log the requests, throttles and rate of each bucket that was used.
+
+        Buckets with throttled requests are logged at ``INFO``, others at
+        ``VERBOSE``.
+
+        Args:
+            since (Optional[Dict[Tuple[str, Optional[str], str], Dict[str, Any]]]):
+                Statistics returned by :meth:`stats`. Only requests made
+                after they were collected are counted.
+
+        """
+        since = since or {}
+        for key, stats in sorted(self.stats().items(), key=str):
+            previous = since.get(key, {})
+            requests = stats["requests"] - previous.get("requests", 0)
+            if not requests:
+                continue
+            throttles = stats["throttles"] - previous.get("throttles", 0)
+            LOGGER.log(
+                logging.INFO if throttles else LogLevels.VERBOSE,
+                "%s (%s): %s API calls, %s throttled, %.1fs waited; "
+                "rate limit %.1f calls/second",
+                key[2],
+                key[1],
+                requests,
+                throttles,
+                stats["waited"] - previous.get("waited", 0.0),
+                stats["rate"],
+            )
+
+    def _before_sign(self, identity, event_name, request=None, **_):
+        """Wait for a token before each request (including retries)."""
+        bucket = self._get_request_bucket(identity, event_name, request.context)
+        if bucket:
+            bucket.acquire()
+
+    def _needs_retry(self, identity, event_name, response=None, request_dict=None, **_):
+        """Adjust the rate of a bucket based on the response of a request."""
+        if not response:
+            return  # connection errors are not throttling
+        http_response, parsed = response
+        bucket = self._get_request_bucket(
+            identity, event_name, request_dict.get("context", {})
+        )
+        if not bucket:
+            return
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_ERROR_CODES or http_response.status_code == 429:
+            bucket.on_throttle()
+        elif http_response.status_code < 400:
+            bucket.on_success()
+
+    def _get_request_bucket(self, identity, event_name, context):
+        """Get the bucket of a request from its event name and context.
+
+        Returns:
+            Optional[TokenBucket]: ``None`` if the service is not limited.
+
+        """
+        # event names are "<event>.<service>.<operation>"
+        service = event_name.split(".")[1]
+        if service not in self.services:
+            return None
+        return self.get_bucket(identity, (context or {}).get("client_region"), service)
+
+
+# Shared by all sessions created by runway.cfngin.session_cache.get_session.
+# CFNGIN_API_RATE overrides the requests per second each bucket starts at;
+# "0" disables rate limiting.
+RATE_LIMITER = RateLimiter(
+    rate=float(os.environ.get("CFNGIN_API_RATE") or INITIAL_RATE)
+)
@@ -7,6 +7,9 @@ import boto3
 
 from runway.aws_sso_botocore.session import Session
 
+from .cassette import CASSETTE
+from .instrumentation import API_CALLS, TRACER
+from .rate_limit import RATE_LIMITER
 from .ui import ui
 
 LOGGER = logging.getLogger(__name__)
@@ -27,6 +30,12 @@ def get_session(
 ):
     """Create a thread-safe boto3 session.
 
+    Calls made by clients of the session are rate limited by
+    :data:`runway.cfngin.rate_limit.RATE_LIMITER` and, if enabled, recorded
+    by :data:`runway.cfngin.instrumentation.API_CALLS`, traced by
+    :data:`runway.cfngin.instrumentation.TRACER` and recorded to or replayed
+    from :data:`runway.cfngin.cassette.CASSETTE`.
+
     Args:
         region (Optional[str]): The region for the session.
         profile (Optional[str]): The profile for the session.
@@ -64,6 +73,11 @@ def get_session(
         region_name=region,
         profile_name=profile,
     )
+    RATE_LIMITER.register(session._session, profile or access_key or "default")
+    API_CALLS.register(session._session)
+    TRACER.register(session._session)
+    # registered last so replayed calls are still recorded and traced
+    CASSETTE.register(session._session)
     cred_provider = session._session.get_component("credential_provider")
     provider = cred_provider.get_provider("assume-role")
     provider.cache = CREDENTIAL_CACHE
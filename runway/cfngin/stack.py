@@ -5,6 +5,7 @@ from runway.util import load_object_from_string
 from runway.variables import Variable, resolve_variables
 
 from .blueprints.raw import RawTemplateBlueprint
+from .instrumentation import TRACER
 
 
 def _initialize_variables(stack_def, variables=None):
@@ -240,8 +241,9 @@ class Stack(object):
                 Subclass of the base provider.
 
         """
-        resolve_variables(self.variables, context, provider)
-        self.blueprint.resolve_variables(self.variables)
+        with TRACER.span("resolve variables", "stack", stack=self.fqn):
+            resolve_variables(self.variables, context, provider)
+            self.blueprint.resolve_variables(self.variables)
 
     def set_outputs(self, outputs):
         """Set stack outputs to the provided value.
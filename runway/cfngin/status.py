@@ -9,9 +9,15 @@ class Status(object):
         name (str): Name of the status.
         code (int): Status code.
         reason (Optional[str]): Reason for the status.
+        waiter (Any): Set on a submitted or waiting status by actions that
+            support deferred execution. Object with ``done`` (threading.Event)
+            and ``add_done_callback`` that is done once the stack is no longer
+            in progress.
 
     """
 
+    waiter = None
+
     def __init__(self, name, code, reason=None):
         """Instantiate class.
 
@@ -169,6 +175,12 @@ class DidNotChangeStatus(SkippedStatus):  # pylint: disable=too-few-public-metho
     reason = "nochange"
 
 
+class InputsUnchangedStatus(SkippedStatus):  # pylint: disable=too-few-public-methods
+    """Skipped status with a reason of 'inputs unchanged'."""
+
+    reason = "inputs unchanged"
+
+
 class NotSubmittedStatus(SkippedStatus):  # pylint: disable=too-few-public-methods
     """Skipped status with a reason of 'disabled'."""
 
@@ -136,6 +136,49 @@ class DeployEnvironment(object):
         else:
             self.vars.pop("CI", None)
 
+    @property
+    def cfngin_executor(self):
+        # type: () -> Optional[str]
+        """How CFNgin runs the stacks of a plan.
+
+        This property can be set by exporting ``RUNWAY_CFNGIN_EXECUTOR``.
+
+        Returns:
+            Optional[str]: Value from environment variable or ``None`` to use
+            the default of each action (``events`` for plan, otherwise
+            ``threads``).
+
+        """
+        return self.vars.get("RUNWAY_CFNGIN_EXECUTOR") or None
+
+    @cfngin_executor.setter
+    def cfngin_executor(self, value):
+        # type: (str) -> None
+        """Set RUNWAY_CFNGIN_EXECUTOR."""
+        self._update_vars({"RUNWAY_CFNGIN_EXECUTOR": value})
+
+    @property
+    def cfngin_fast_diff(self):
+        # type: () -> bool
+        """Whether CFNgin plan should compare deployed stacks locally.
+
+        This property can be set by exporting ``RUNWAY_CFNGIN_FAST_DIFF``.
+
+        Returns:
+            bool
+
+        """
+        return "RUNWAY_CFNGIN_FAST_DIFF" in self.vars
+
+    @cfngin_fast_diff.setter
+    def cfngin_fast_diff(self, value):
+        # type: (Any) -> None
+        """Set the value of RUNWAY_CFNGIN_FAST_DIFF."""
+        if value:
+            self._update_vars({"RUNWAY_CFNGIN_FAST_DIFF": "1"})
+        else:
+            self.vars.pop("RUNWAY_CFNGIN_FAST_DIFF", None)
+
     @property
     def debug(self):
         # type: () -> bool
@@ -13,6 +13,7 @@ from typing import (  # noqa pylint: disable=W
 import six
 
 from ..._logging import PrefixAdaptor
+from ...cfngin import instrumentation
 from ...cfngin.exceptions import UnresolvedVariable
 from ...config import FutureDefinition, VariablesDefinition
 from ...util import cached_property, merge_dicts, merge_nested_environment_dicts
@@ -311,11 +312,12 @@ class Deployment(object):
             max_workers=self.ctx.env.max_concurrent_regions
         )
         futures = [
-            executor.submit(self.run, *[action, region]) for region in self.regions
+            instrumentation.submit(executor, self.run, *[action, region])
+            for region in self.regions
         ]
         concurrent.futures.wait(futures)
         for job in futures:
-            job.result()  # raise exceptions / exit as needed
+            instrumentation.result(job)  # raise exceptions / exit as needed
 
     def __sync(self, action):
         # type: (str) -> None
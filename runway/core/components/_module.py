@@ -15,6 +15,7 @@ import six
 import yaml
 
 from ..._logging import PrefixAdaptor
+from ...cfngin import instrumentation
 from ...config import FutureDefinition, VariablesDefinition
 from ...path import Path as ModulePath
 from ...runway_module_type import RunwayModuleType
@@ -224,7 +225,8 @@ class Module(object):
                 context=self.ctx, path=self.path.module_root, options=self.payload
             )
             if hasattr(inst, action):
-                inst[action]()
+                with instrumentation.PROFILER.phase("modules"):
+                    inst[action]()
             else:
                 self.logger.error('"%s" is missing method "%s"', inst, action)
                 sys.exit(1)
@@ -250,11 +252,12 @@ class Module(object):
             max_workers=self.ctx.env.max_concurrent_modules
         )
         futures = [
-            executor.submit(child.run, *[action]) for child in self.child_modules
+            instrumentation.submit(executor, child.run, *[action])
+            for child in self.child_modules
         ]
         concurrent.futures.wait(futures)
         for job in futures:
-            job.result()  # raise exceptions / exit as needed
+            instrumentation.result(job)  # raise exceptions / exit as needed
 
     def __sync(self, action):
         # type: (str) -> None
@@ -0,0 +1,265 @@
+"""Sync a directory to an S3 bucket."""
+import fnmatch
+import hashlib
+import logging
+import mimetypes
+import os
+import sys
+
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+if sys.version_info.major > 2:
+    import concurrent.futures
+
+LOGGER = logging.getLogger(__name__)
+
+# Maximum number of keys deleted by a single ``delete_objects`` call.
+DELETE_BATCH_SIZE = 1000
+# Files at least this large are uploaded in parts of this size (the awscli
+# default) so the ETag of an object uploaded in parts can be calculated
+# locally.
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+# Default number of requests made at a time (the awscli default).
+MAX_CONCURRENT_REQUESTS = 10
+
+
+def calculate_etag(file_path, chunksize=MULTIPART_CHUNKSIZE):
+    """Calculate the ETag S3 gives a file when it is uploaded.
+
+    Files smaller than ``chunksize`` are uploaded in a single request and
+    their ETag is their MD5. Larger files are uploaded in parts of
+    ``chunksize`` and their ETag is the MD5 of the MD5 of each part
+    followed by the number of parts.
+
+    Args:
+        file_path (str): Path of the file.
+        chunksize (int): Size of each part of a multipart upload.
+
+    Returns:
+        str: ETag of the file without quotes.
+
+    """
+    file_hash = hashlib.md5()
+    part_digests = []
+    with open(file_path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(chunksize), b""):
+            file_hash.update(chunk)
+            part_digests.append(hashlib.md5(chunk).digest())
+    if os.path.getsize(file_path) < chunksize:
+        return file_hash.hexdigest()
+    return "%s-%d" % (
+        hashlib.md5(b"".join(part_digests)).hexdigest(),
+        len(part_digests),
+    )
+
+
+def get_cache_control(key, cache_control=None):
+    """Get the ``Cache-Control`` header of an object.
+
+    Args:
+        key (str): Key of the object.
+        cache_control (Optional[List[Dict[str, str]]]): Rules with a
+            ``pattern`` (glob matched against the key) and the ``value`` of
+            the header. The first rule that matches is used.
+
+    Returns:
+        Optional[str]: Value of the header or ``None`` if no rule matches.
+
+    """
+    for rule in cache_control or []:
+        if fnmatch.fnmatchcase(key, rule["pattern"]):
+            return rule["value"]
+    return None
+
+
+def is_excluded(key, exclude=None):
+    """Whether a key matches any of the exclude patterns.
+
+    Args:
+        key (str): Key of an object.
+        exclude (Optional[List[str]]): Glob patterns matched against the key.
+
+    Returns:
+        bool
+
+    """
+    return any(fnmatch.fnmatchcase(key, pattern) for pattern in exclude or [])
+
+
+def find_local_files(directory, exclude=None):
+    """Find the files of a directory to sync, following symlinks.
+
+    Args:
+        directory (str): Directory to sync.
+        exclude (Optional[List[str]]): Glob patterns of keys that are not
+            synced.
+
+    Returns:
+        Dict[str, str]: Path of each file by the key it is synced to.
+
+    """
+    files = {}
+    for root, _dirs, file_names in os.walk(directory, followlinks=True):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            key = os.path.relpath(path, directory).replace(os.sep, "/")
+            if not is_excluded(key, exclude):
+                files[key] = path
+    return files
+
+
+def list_objects(s3_client, bucket):
+    """List every object of a bucket.
+
+    Args:
+        s3_client (:class:`botocore.client.S3`): S3 client.
+        bucket (str): Name of the bucket.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Each object by its key.
+
+    """
+    objects = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = obj
+    return objects
+
+
+def _map(func, items, max_workers):
+    """Call a function with each item using a pool of threads.
+
+    Items are processed one at a time on python 2.
+
+    Returns:
+        List[Any]: Results in the order of the items.
+
+    """
+    if sys.version_info.major < 3 or max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(items))
+    ) as executor:
+        return list(executor.map(func, items))
+
+
+def sync_directory(
+    session,
+    directory,
+    bucket,
+    exclude=None,
+    cache_control=None,
+    max_concurrent_requests=MAX_CONCURRENT_REQUESTS,
+):
+    """Sync a directory to an S3 bucket.
+
+    The bucket is listed once. Files are uploaded if there is no object with
+    the same size and ETag and objects without a file are deleted. Requests
+    are made by a pool of threads sharing a single client.
+
+    Objects that are unchanged are not uploaded again, so a change to
+    ``cache_control`` only applies to objects that changed.
+
+    Args:
+        session (:class:`boto3.session.Session`): Session used to create the
+            S3 client.
+        directory (str): Directory to sync.
+        bucket (str): Name of the bucket.
+        exclude (Optional[List[str]]): Glob patterns of keys that are
+            neither uploaded nor deleted.
+        cache_control (Optional[List[Dict[str, str]]]): Rules used to set the
+            ``Cache-Control`` header of uploaded objects. See
+            :func:`get_cache_control`.
+        max_concurrent_requests (int): Number of requests made at a time.
+
+    Returns:
+        List[str]: Sorted keys of the objects uploaded or deleted.
+
+    """
+    s3_client = session.client(
+        "s3", config=Config(max_pool_connections=max_concurrent_requests)
+    )
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_CHUNKSIZE,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        use_threads=False,
+    )
+    local_files = find_local_files(directory, exclude)
+    objects = list_objects(s3_client, bucket)
+    LOGGER.verbose(
+        "syncing %s files to s3://%s/ (%s objects)",
+        len(local_files),
+        bucket,
+        len(objects),
+    )
+
+    def upload(key):
+        """Upload a file if it changed."""
+        path = local_files[key]
+        obj = objects.get(key)
+        if (
+            obj
+            and obj["Size"] == os.path.getsize(path)
+            and obj["ETag"].strip('"') == calculate_etag(path)
+        ):
+            return None
+        extra_args = {}
+        content_type = mimetypes.guess_type(path)[0]
+        if content_type:
+            extra_args["ContentType"] = content_type
+        cache_control_value = get_cache_control(key, cache_control)
+        if cache_control_value:
+            extra_args["CacheControl"] = cache_control_value
+        LOGGER.verbose("upload: %s to s3://%s/%s", path, bucket, key)
+        s3_client.upload_file(
+            path, bucket, key, ExtraArgs=extra_args or None, Config=transfer_config
+        )
+        return key
+
+    def delete(keys):
+        """Delete a batch of objects."""
+        LOGGER.verbose("deleting %s objects from s3://%s/", len(keys), bucket)
+        response = s3_client.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": key} for key in keys]}
+        )
+        failed = set()
+        for error in response.get("Errors", []):
+            LOGGER.error(
+                "failed to delete s3://%s/%s: %s",
+                bucket,
+                error["Key"],
+                error["Message"],
+            )
+            failed.add(error["Key"])
+        return [key for key in keys if key not in failed]
+
+    to_delete = sorted(
+        key
+        for key in objects
+        if key not in local_files and not is_excluded(key, exclude)
+    )
+    uploaded = [
+        key for key in _map(upload, sorted(local_files), max_concurrent_requests) if key
+    ]
+    deleted = [
+        key
+        for keys in _map(
+            delete,
+            [
+                to_delete[i : i + DELETE_BATCH_SIZE]
+                for i in range(0, len(to_delete), DELETE_BATCH_SIZE)
+            ],
+            max_concurrent_requests,
+        )
+        for key in keys
+    ]
+    LOGGER.info(
+        "synced s3://%s/: %s uploaded, %s deleted, %s unchanged",
+        bucket,
+        len(uploaded),
+        len(deleted),
+        len(local_files) - len(uploaded),
+    )
+    return sorted(uploaded + deleted)
@@ -4,16 +4,27 @@ import hashlib
 import json
 import logging
 import os
+import posixpath
 import time
+from collections import Counter
 from operator import itemgetter
 
 import yaml
+from six.moves.urllib.parse import quote
 
 from ...cfngin.lookups.handlers.output import OutputLookup
-from ...core.providers import aws
+from .s3_sync import MAX_CONCURRENT_REQUESTS, sync_directory
 
 LOGGER = logging.getLogger(__name__)
 
+# Maximum number of paths and of paths with wildcards CloudFront accepts in
+# progress for a distribution.
+INVALIDATION_MAX_PATHS = 3000
+INVALIDATION_MAX_WILDCARDS = 15
+# Default number of changed paths above which the whole distribution is
+# invalidated instead.
+INVALIDATION_THRESHOLD = 5000
+
 
 def get_archives_to_prune(archives, hook_data):
     """Return list of keys to delete.
@@ -46,6 +57,17 @@ def sync(context, provider, **kwargs):
         provider (:class:`runway.cfngin.providers.base.BaseProvider`):
             The provider instance.
 
+    Keyword Args:
+        cache_control (Optional[List[Dict[str, str]]]): Rules used to set the
+            ``Cache-Control`` header of uploaded files. Each has a ``pattern``
+            (glob matched against the key of the file) and the ``value`` of
+            the header. The first rule that matches is used.
+        invalidation_threshold (Optional[int]): Number of changed paths above
+            which ``distribution_path`` is invalidated instead of the paths
+            that changed. (*default:* ``5000``)
+        max_concurrent_requests (Optional[int]): Number of S3 requests made
+            at a time when syncing. (*default:* ``10``)
+
     """
     session = context.get_session()
     bucket_name = OutputLookup.handle(
@@ -54,34 +76,29 @@ def sync(context, provider, **kwargs):
     build_context = context.hook_data["staticsite"]
     invalidate_cache = False
 
-    extra_files = sync_extra_files(
+    changed = sync_extra_files(
         context,
         bucket_name,
         kwargs.get("extra_files", []),
         hash_tracking_parameter=build_context.get("hash_tracking_parameter"),
     )
 
-    if extra_files:
+    if changed:
         invalidate_cache = True
 
     if build_context["deploy_is_current"]:
         LOGGER.info("skipped upload; latest version already deployed")
     else:
-        # Using the awscli for s3 syncing is incredibly suboptimal, but on
-        # balance it's probably the most stable/efficient option for syncing
-        # the files until https://github.com/boto/boto3/issues/358 is resolved
-        sync_args = [
-            "s3",
-            "sync",
+        changed += sync_directory(
+            session,
             build_context["app_directory"],
-            "s3://%s/" % bucket_name,
-            "--delete",
-        ]
-
-        for extra_file in [f["name"] for f in kwargs.get("extra_files", [])]:
-            sync_args.extend(["--exclude", extra_file])
-
-        aws.cli(sync_args)
+            bucket_name,
+            exclude=[f["name"] for f in kwargs.get("extra_files", [])],
+            cache_control=kwargs.get("cache_control"),
+            max_concurrent_requests=int(
+                kwargs.get("max_concurrent_requests") or MAX_CONCURRENT_REQUESTS
+            ),
+        )
 
         invalidate_cache = True
 
@@ -90,6 +107,13 @@ def sync(context, provider, **kwargs):
 
     elif invalidate_cache:
         distribution = get_distribution_data(context, provider, **kwargs)
+        distribution["paths"] = get_invalidation_paths(
+            changed,
+            fallback=distribution["path"],
+            threshold=int(
+                kwargs.get("invalidation_threshold") or INVALIDATION_THRESHOLD
+            ),
+        )
         invalidate_distribution(session, **distribution)
 
     LOGGER.info("sync complete")
@@ -170,7 +194,85 @@ def get_distribution_data(context, provider, **kwargs):
     }
 
 
-def invalidate_distribution(session, identifier="", path="", domain="", **_):
+def _path_prefixes(path):
+    """Get the directories of a path that a wildcard can be added to.
+
+    For example, ``/a/b/c.js`` has ``/a/`` and ``/a/b/``.
+
+    """
+    return [path[: i + 1] for i, char in enumerate(path) if char == "/" and i]
+
+
+def collapse_invalidation_paths(
+    paths, max_paths=INVALIDATION_MAX_PATHS, max_wildcards=INVALIDATION_MAX_WILDCARDS,
+):
+    """Collapse invalidation paths into wildcards until they fit in a request.
+
+    While there are more than ``max_paths`` paths, the paths under a
+    directory are replaced by a wildcard (e.g. ``/static/*``). The deepest
+    directory whose paths are enough to fit is used, otherwise the directory
+    with the most paths.
+
+    Args:
+        paths (List[str]): Paths to invalidate.
+        max_paths (int): Maximum number of paths.
+        max_wildcards (int): Maximum number of paths with a wildcard.
+
+    Returns:
+        Optional[List[str]]: Sorted paths or ``None`` if they can't fit.
+
+    """
+    paths = set(paths)
+    wildcards = set()
+    while len(paths) + len(wildcards) > max_paths:
+        counts = Counter(prefix for path in paths for prefix in _path_prefixes(path))
+        if len(wildcards) >= max_wildcards or max(counts.values() or [0]) <= 1:
+            return None
+        excess = len(paths) + len(wildcards) - max_paths
+        sufficient = [prefix for prefix in counts if counts[prefix] > excess]
+        if sufficient:
+            prefix = min(sufficient, key=lambda p: (counts[p], -p.count("/"), p))
+        else:
+            prefix = max(counts, key=lambda p: (counts[p], p.count("/"), p))
+        paths = set(path for path in paths if not path.startswith(prefix))
+        wildcards = set(path for path in wildcards if not path.startswith(prefix))
+        wildcards.add(prefix + "*")
+    return sorted(paths | wildcards)
+
+
+def get_invalidation_paths(keys, fallback="/*", threshold=INVALIDATION_THRESHOLD):
+    """Get the paths of a distribution to invalidate for changed objects.
+
+    Keys are URL encoded. The directory of an ``index.html`` object is also
+    invalidated since it is served for the directory. If there are more
+    paths than CloudFront accepts in a request, they are collapsed into
+    wildcards (see :func:`collapse_invalidation_paths`).
+
+    Args:
+        keys (List[str]): Keys of the objects uploaded or deleted.
+        fallback (str): Path invalidated if no objects changed, if there are
+            more than ``threshold`` paths or if they can't be collapsed.
+        threshold (int): Number of paths above which ``fallback`` is
+            invalidated instead.
+
+    Returns:
+        List[str]: Paths to invalidate.
+
+    """
+    paths = set()
+    for key in keys:
+        path = "/" + quote(key, safe="/~")
+        paths.add(path)
+        if posixpath.basename(key) == "index.html":
+            paths.add(path[: -len("index.html")])
+    if not paths or len(paths) > threshold:
+        return [fallback]
+    return collapse_invalidation_paths(paths) or [fallback]
+
+
+def invalidate_distribution(
+    session, identifier="", path="", domain="", paths=None, **_
+):
     """Invalidate the current distribution.
 
     Args:
@@ -178,14 +280,22 @@ def invalidate_distribution(session, identifier="", path="", domain="", **_):
         identifier (string): The distribution id.
         path (string): The distribution path.
         domain (string): The distribution domain.
+        paths (Optional[List[str]]): Paths to invalidate instead of ``path``.
 
     """
-    LOGGER.info("invalidating CloudFront distribution: %s (%s)", identifier, domain)
+    paths = paths or [path]
+    LOGGER.info(
+        "invalidating %s path(s) of CloudFront distribution: %s (%s)",
+        len(paths),
+        identifier,
+        domain,
+    )
+    LOGGER.verbose("invalidating paths: %s", ", ".join(paths))
     cf_client = session.client("cloudfront")
     cf_client.create_invalidation(
         DistributionId=identifier,
         InvalidationBatch={
-            "Paths": {"Quantity": 1, "Items": [path]},
+            "Paths": {"Quantity": len(paths), "Items": paths},
             "CallerReference": str(time.time()),
         },
     )
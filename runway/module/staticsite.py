@@ -251,6 +251,10 @@ class StaticSite(RunwayModule):
                     "bucket_output_lookup": "%s::BucketName" % self.name,
                     "website_url": "%s::BucketWebsiteURL" % self.name,
                     "extra_files": self.user_options.get("extra_files", []),
+                    "cache_control": self.user_options.get("cache_control", []),
+                    "invalidation_threshold": self.user_options.get(
+                        "invalidation_threshold"
+                    ),
                     "cf_disabled": site_stack_variables["DisableCloudFront"],
                     "distributionid_output_lookup": "%s::CFDistributionId"
                     % (self.name),
@@ -26,6 +26,7 @@ from .cfngin.exceptions import (
     UnresolvedVariable,
     UnresolvedVariableValue,
 )
+from .cfngin.instrumentation import PROFILER
 from .cfngin.lookups.registry import CFNGIN_LOOKUP_HANDLERS
 from .lookups.handlers.base import LookupHandler  # noqa: F401 pylint: disable=W
 from .lookups.registry import RUNWAY_LOOKUP_HANDLERS
@@ -114,9 +115,10 @@ class Variable(object):
 
         """
         try:
-            self._value.resolve(
-                context, provider=provider, variables=variables, **kwargs
-            )
+            with PROFILER.phase("lookups"):
+                self._value.resolve(
+                    context, provider=provider, variables=variables, **kwargs
+                )
         except FailedLookup as err:
             raise FailedVariableLookup(self.name, err.lookup, err.error)
 
@@ -4,12 +4,15 @@ The below tests only cover the CLI.
 Runway's core logic has been mocked out to test on separately from the CLI.
 
 """
+import json
 import logging
 
 from click.testing import CliRunner
 from mock import patch
 
 from runway._cli import cli
+from runway.cfngin.cassette import CASSETTE
+from runway.cfngin.instrumentation import API_CALLS, LATENCY_BUCKETS, TRACER
 from runway.config import Config
 from runway.context import Context
 from runway.core import Runway
@@ -34,6 +37,83 @@ def test_deploy(mock_runway, cd_tmp_path, cp_config):
     assert len(inst.deploy.call_args.args[0]) == 1
 
 
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_deploy_options_api_stats(mock_runway, cd_tmp_path, cp_config):
+    """Test deploy options --api-stats and --api-stats-json."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    enabled = []
+    mock_runway.return_value.deploy.side_effect = lambda _: enabled.append(
+        API_CALLS.enabled
+    )
+    assert runner.invoke(cli, ["deploy"]).exit_code == 0
+    assert runner.invoke(cli, ["deploy", "--api-stats"]).exit_code == 0
+    assert runner.invoke(cli, ["deploy", "--api-stats-json", "api.json"]).exit_code == 0
+    assert enabled == [False, True, True]
+    assert json.loads((cd_tmp_path / "api.json").read_text()) == {
+        "latency_buckets": list(LATENCY_BUCKETS),
+        "operations": {},
+        "stacks": {},
+    }
+
+
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_deploy_options_record_replay_api(mock_runway, cd_tmp_path, cp_config):
+    """Test deploy options --record-api, --replay-api and --replay-api-latency."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    states = []
+    mock_runway.return_value.deploy.side_effect = lambda _: states.append(
+        CASSETTE.state
+    )
+    assert runner.invoke(cli, ["deploy", "--record-api", "api.json"]).exit_code == 0
+    assert json.loads((cd_tmp_path / "api.json").read_text()) == {
+        "interactions": [],
+        "version": 1,
+    }
+    assert (
+        runner.invoke(
+            cli, ["deploy", "--replay-api", "api.json", "--no-replay-api-latency"]
+        ).exit_code
+        == 0
+    )
+    assert states == [
+        {"latency": True, "mode": "record", "path": "api.json"},
+        {"latency": False, "mode": "replay", "path": "api.json"},
+    ]
+    assert not CASSETTE.mode
+
+    result = runner.invoke(
+        cli, ["deploy", "--record-api", "other.json", "--replay-api", "api.json"]
+    )
+    assert result.exit_code == 2
+    assert "mutually exclusive" in result.output
+
+
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_deploy_options_trace(mock_runway, cd_tmp_path, cp_config):
+    """Test deploy option --trace."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(cli, ["deploy", "--trace", "trace.json"]).exit_code == 0
+    mock_runway.return_value.deploy.assert_called_once()
+    assert not TRACER.enabled
+    events = json.loads((cd_tmp_path / "trace.json").read_text())["traceEvents"]
+    assert "load config" in [i["name"] for i in events]
+
+
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_deploy_options_cfngin_executor(mock_runway, cd_tmp_path, cp_config):
+    """Test deploy option --cfngin-executor."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(cli, ["deploy", "--cfngin-executor", "events"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_executor == "events"
+
+    assert runner.invoke(cli, ["deploy"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_executor is None
+
+
 @patch(MODULE + ".Runway", spec=Runway, spec_set=True)
 def test_deploy_options_ci(mock_runway, cd_tmp_path, cp_config):
     """Test deploy option --ci."""
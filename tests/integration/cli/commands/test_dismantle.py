@@ -11,6 +11,7 @@ from runway._cli.commands import destroy
 def test_dismantle(caplog, cd_tmp_path, cp_config, monkeypatch):
     """Test dismantle."""
     cp_config("min_required", cd_tmp_path)
+    (cd_tmp_path / "cassette.json").write_text(u"{}")
     caplog.set_level(logging.DEBUG, logger="runway.cli.commands.dismantle")
     mock_forward = MagicMock()
     monkeypatch.setattr("click.Context.forward", mock_forward)
@@ -24,6 +25,9 @@ def test_dismantle(caplog, cd_tmp_path, cp_config, monkeypatch):
             "--deploy-environment",
             "test",
             "--no-color",
+            "--replay-api",
+            "cassette.json",
+            "--no-replay-api-latency",
             "--tag",
             "tag1",
             "--tag",
@@ -34,10 +38,17 @@ def test_dismantle(caplog, cd_tmp_path, cp_config, monkeypatch):
     assert "forwarding to destroy..." in caplog.messages
     mock_forward.assert_called_once_with(
         destroy,
+        api_stats=False,
+        api_stats_json=None,
+        cfngin_executor=None,
         ci=True,
         debug=0,
         deploy_environment="test",
         no_color=True,
+        record_api=None,
+        replay_api="cassette.json",
+        replay_api_latency=False,
         tags=("tag1", "tag2"),
+        trace=None,
         verbose=False,
     )
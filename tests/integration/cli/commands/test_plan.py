@@ -4,12 +4,14 @@ The below tests only cover the CLI.
 Runway's core logic has been mocked out to test on separately from the CLI.
 
 """
+import json
 import logging
 
 from click.testing import CliRunner
 from mock import patch
 
 from runway._cli import cli
+from runway.cfngin.cassette import CASSETTE
 from runway.config import Config
 from runway.context import Context
 from runway.core import Runway
@@ -34,6 +36,31 @@ def test_plan(mock_runway, cd_tmp_path, cp_config):
     assert len(inst.plan.call_args.args[0]) == 1
 
 
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_plan_options_record_replay_api(mock_runway, cd_tmp_path, cp_config):
+    """Test plan options --record-api and --replay-api."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    modes = []
+    mock_runway.return_value.plan.side_effect = lambda _: modes.append(CASSETTE.mode)
+    assert runner.invoke(cli, ["plan", "--record-api", "api.json"]).exit_code == 0
+    assert json.loads((cd_tmp_path / "api.json").read_text())["interactions"] == []
+    assert runner.invoke(cli, ["plan", "--replay-api", "api.json"]).exit_code == 0
+    assert modes == ["record", "replay"]
+
+
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_plan_options_cfngin_executor(mock_runway, cd_tmp_path, cp_config):
+    """Test plan option --cfngin-executor."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(cli, ["plan", "--cfngin-executor", "events"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_executor == "events"
+
+    assert runner.invoke(cli, ["plan"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_executor is None
+
+
 @patch(MODULE + ".Runway", spec=Runway, spec_set=True)
 def test_plan_options_ci(mock_runway, cd_tmp_path, cp_config):
     """Test plan option --ci."""
@@ -63,6 +90,18 @@ def test_plan_options_deploy_environment(mock_runway, cd_tmp_path, cp_config):
     assert mock_runway.call_args.args[1].env.name == "deploy-environment-option"
 
 
+@patch(MODULE + ".Runway", spec=Runway, spec_set=True)
+def test_plan_options_fast_diff(mock_runway, cd_tmp_path, cp_config):
+    """Test plan option --fast-diff."""
+    cp_config("min_required", cd_tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(cli, ["plan", "--fast-diff"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_fast_diff is True
+
+    assert runner.invoke(cli, ["plan"]).exit_code == 0
+    assert mock_runway.call_args.args[1].env.cfngin_fast_diff is False
+
+
 @patch(MODULE + ".Runway", spec=Runway, spec_set=True)
 def test_plan_options_tag(mock_runway, caplog, cd_tmp_path, cp_config):
     """Test plan option --tag."""
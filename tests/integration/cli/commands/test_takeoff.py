@@ -23,6 +23,8 @@ def test_takeoff(caplog, cd_tmp_path, cp_config, monkeypatch):
             "--ci",
             "--deploy-environment",
             "test",
+            "--record-api",
+            "cassette.json",
             "--tag",
             "tag1",
             "--tag",
@@ -33,10 +35,17 @@ def test_takeoff(caplog, cd_tmp_path, cp_config, monkeypatch):
     assert "forwarding to deploy..." in caplog.messages
     mock_forward.assert_called_once_with(
         deploy,
+        api_stats=False,
+        api_stats_json=None,
+        cfngin_executor=None,
         ci=True,
         debug=0,
         deploy_environment="test",
         no_color=False,
+        record_api="cassette.json",
+        replay_api=None,
+        replay_api_latency=True,
         tags=("tag1", "tag2"),
+        trace=None,
         verbose=False,
     )
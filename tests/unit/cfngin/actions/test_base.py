@@ -1,16 +1,25 @@
 """Tests for runway.cfngin.actions.base."""
 # pylint: disable=no-self-use,protected-access,unused-argument
+import sys
 import unittest
 
 import botocore.exceptions
+import pytest
 from botocore.stub import ANY, Stubber
 from mock import MagicMock, PropertyMock, patch
 
-from runway.cfngin.actions.base import BaseAction
+from runway.cfngin.actions.base import (
+    STACK_POLL_TIME,
+    BaseAction,
+    build_walker,
+    deferrable,
+    get_wait_time,
+)
 from runway.cfngin.blueprints.base import Blueprint
 from runway.cfngin.plan import Graph, Plan, Step
-from runway.cfngin.providers.aws.default import Provider
+from runway.cfngin.providers.aws.default import AsyncStackStatusPoller, Provider
 from runway.cfngin.session_cache import get_session
+from runway.cfngin.status import COMPLETE, PENDING, SUBMITTED
 
 from ..factories import MockProviderBuilder, mock_context
 
@@ -33,6 +42,61 @@ class MockBlueprint(Blueprint):
         """Create template."""
 
 
+def test_build_walker_events():
+    """Test build_walker with the events executor."""
+    walker = build_walker(25, "events")
+    assert walker.deferred
+    assert walker.__self__.max_in_flight == 25
+    assert walker.__self__.max_workers == 10
+    assert build_walker(2, "events").__self__.max_workers == 2
+    assert not getattr(build_walker(2), "deferred", False)
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_build_walker_asyncio():
+    """Test build_walker with the asyncio executor."""
+    setup = MagicMock()
+    walker = build_walker(25, "asyncio", setup=setup)
+    assert walker.deferred
+    assert walker.__self__.max_in_flight == 25
+    assert walker.__self__.max_workers == 10
+    assert walker.__self__.setup is setup
+
+
+def test_deferrable():
+    """Test deferrable."""
+    action = MagicMock()
+    stack = MagicMock(fqn="stack-fqn")
+    waiter = action.build_provider.return_value.get_stack_waiter.return_value
+
+    @deferrable
+    def func(_self, _stack, **kwargs):
+        return kwargs["result"]
+
+    result = func(action, stack, deferred=True, result=SUBMITTED)
+    assert result == SUBMITTED
+    assert result is not SUBMITTED
+    assert result.waiter is waiter
+    assert SUBMITTED.waiter is None
+    action.build_provider.return_value.get_stack_waiter.assert_called_once_with(
+        "stack-fqn"
+    )
+
+    assert func(action, stack, result=SUBMITTED) is SUBMITTED
+    assert func(action, stack, deferred=True, result=COMPLETE) is COMPLETE
+
+
+def test_get_wait_time():
+    """Test get_wait_time."""
+    assert get_wait_time(PENDING) == 0
+    assert get_wait_time(SUBMITTED) == STACK_POLL_TIME
+    status = MagicMock(waiter=MagicMock())
+    status.waiter.done.is_set.return_value = False
+    assert get_wait_time(status) == STACK_POLL_TIME
+    status.waiter.done.is_set.return_value = True
+    assert get_wait_time(status) == 0
+
+
 class TestBaseAction(unittest.TestCase):
     """Tests for runway.cfngin.actions.base.BaseAction."""
 
@@ -198,6 +262,38 @@ class TestBaseAction(unittest.TestCase):
         self.assertEqual(BaseAction.DESCRIPTION, plan.description)
         self.assertTrue(plan.require_unlocked)
 
+    @patch(
+        "runway.cfngin.actions.base.BaseAction._stack_action", new_callable=PropertyMock
+    )
+    def test_generate_plan_targeted(self, mock_stack_action):
+        """Test generate plan only includes the targeted subgraph."""
+        mock_stack_action.return_value = MagicMock()
+        context = mock_context(
+            namespace="test",
+            extra_config_args={
+                "stacks": [
+                    {"name": "stack1", "required_by": ["stack3"]},
+                    {"name": "stack2", "requires": ["stack1"]},
+                    {"name": "stack3"},
+                ]
+            },
+            region=self.region,
+            stack_names=["stack2"],
+        )
+        action = BaseAction(
+            context=context,
+            provider_builder=MockProviderBuilder(self.provider, region=self.region),
+        )
+
+        plan = action._generate_plan()
+        self.assertEqual(
+            {"stack1": set(), "stack2": set(["stack1"])}, plan.graph.to_dict()
+        )
+        self.assertNotIn("stack3", context._stack_cache)
+
+        plan = action._generate_plan(reverse=True)
+        self.assertEqual({"stack2": set()}, plan.graph.to_dict())
+
     @patch(
         "runway.cfngin.context.Context._persistent_graph_tags",
         new_callable=PropertyMock,
@@ -300,6 +396,25 @@ class TestBaseAction(unittest.TestCase):
         self.assertEqual(BaseAction.DESCRIPTION, plan.description)
         self.assertFalse(plan.require_unlocked)
 
+    def test_use_event_loop(self):
+        """Test use_event_loop."""
+        builder = MagicMock()
+        action = BaseAction(
+            context=mock_context("mynamespace"), provider_builder=builder
+        )
+        loop = MagicMock()
+        with action.use_event_loop(loop):
+            factory = builder.set_stack_status_poller_factory.call_args[0][0]
+            poller = factory(self.provider.cloudformation)
+            self.assertIsInstance(poller, AsyncStackStatusPoller)
+            self.assertIs(poller.loop, loop)
+        builder.set_stack_status_poller_factory.assert_called_with(None)
+
+        # builders that can't set a poller factory are left alone
+        action.provider_builder = MockProviderBuilder(self.provider)
+        with action.use_event_loop(loop):
+            pass
+
     def test_stack_template_url(self):
         """Test stack template url."""
         context = mock_context("mynamespace")
@@ -11,6 +11,7 @@ from runway.cfngin.actions.build import (
     UsePreviousParameterValue,
     _handle_missing_parameters,
     _resolve_parameters,
+    stack_fingerprint,
 )
 from runway.cfngin.blueprints.variables.types import CFNString
 from runway.cfngin.context import Config, Context
@@ -19,16 +20,18 @@ from runway.cfngin.plan import Graph, Plan, Step
 from runway.cfngin.providers.aws.default import Provider
 from runway.cfngin.providers.base import BaseProvider
 from runway.cfngin.session_cache import get_session
+from runway.cfngin.stack import Stack
 from runway.cfngin.status import (
     COMPLETE,
     FAILED,
     PENDING,
     SKIPPED,
     SUBMITTED,
+    InputsUnchangedStatus,
     NotSubmittedStatus,
 )
 
-from ..factories import MockProviderBuilder, MockThreadingEvent
+from ..factories import MockProviderBuilder, MockThreadingEvent, generate_definition
 
 
 def mock_stack_parameters(parameters):
@@ -417,6 +420,69 @@ class TestLaunchStack(TestBuildAction):
         self.provider.update_stack.side_effect = StackDidNotChange
         self._advance("CREATE_COMPLETE", SKIPPED, "nochange")
 
+    @patch("runway.cfngin.actions.build.stack_fingerprint")
+    @patch(
+        "runway.cfngin.context.Context.stack_fingerprints_location",
+        new_callable=PropertyMock,
+    )
+    def test_launch_stack_fingerprint_unchanged(self, mock_location, mock_fingerprint):
+        """Test launch stack skipped when its inputs are unchanged."""
+        mock_location.return_value = {"Bucket": "test", "Key": "test"}
+        mock_fingerprint.return_value = "abc"
+        self.context._stack_fingerprints = {
+            "vpc": {"fingerprint": "abc", "outputs": {"Key": "val"}}
+        }
+        self.stack.force = False
+
+        self._advance("CREATE_COMPLETE", SKIPPED, InputsUnchangedStatus.reason)
+        self.stack.resolve.assert_called_once()
+        self.stack.set_outputs.assert_called_once_with({"Key": "val"})
+        self.provider.get_stack.assert_not_called()
+
+    @patch("runway.cfngin.actions.build.stack_fingerprint")
+    @patch(
+        "runway.cfngin.context.Context.stack_fingerprints_location",
+        new_callable=PropertyMock,
+    )
+    def test_launch_stack_fingerprint_changed(self, mock_location, mock_fingerprint):
+        """Test launch stack records the fingerprint once complete."""
+        mock_location.return_value = {"Bucket": "test", "Key": "test"}
+        mock_fingerprint.return_value = "def"
+        self.context._stack_fingerprints = {
+            "vpc": {"fingerprint": "abc", "outputs": {"Key": "val"}}
+        }
+        self.stack.force = False
+        self.stack.outputs = {"Key": "new"}
+
+        self._advance("CREATE_COMPLETE", SUBMITTED, "updating existing stack")
+        self.stack.resolve.assert_called_once()
+        self.assertEqual("abc", self.context.stack_fingerprints["vpc"]["fingerprint"])
+        self._advance("UPDATE_COMPLETE", COMPLETE, "updating existing stack")
+        self.assertEqual(
+            {"fingerprint": "def", "outputs": {"Key": "new"}},
+            self.context.stack_fingerprints["vpc"],
+        )
+        mock_fingerprint.assert_called_once()
+
+    @patch("runway.cfngin.actions.build.stack_fingerprint")
+    @patch(
+        "runway.cfngin.context.Context.stack_fingerprints_location",
+        new_callable=PropertyMock,
+    )
+    def test_launch_stack_fingerprint_locked(self, mock_location, mock_fingerprint):
+        """Test locked stacks are not skipped by their fingerprint."""
+        mock_location.return_value = {"Bucket": "test", "Key": "test"}
+        mock_fingerprint.return_value = "abc"
+        self.context._stack_fingerprints = {
+            "vpc": {"fingerprint": "abc", "outputs": {"Key": "val"}}
+        }
+        self.stack.force = False
+        self.stack.locked = True
+
+        self._advance("CREATE_COMPLETE", SKIPPED, "locked")
+        mock_fingerprint.assert_not_called()
+        self.provider.get_stack.assert_called_once()
+
     def test_launch_stack_update_rollback(self):
         """Test launch stack update rollback."""
         # initial status should be PENDING
@@ -458,6 +524,33 @@ class TestFunctions(unittest.TestCase):
         self.prov = MagicMock()
         self.blueprint = MagicMock()
 
+    def test_stack_fingerprint(self):
+        """Test stack_fingerprint."""
+        context = Context(config=Config({"namespace": "test"}))
+        subnets = {"PrivateSubnets": "10.0.0.0/24", "PublicSubnets": "10.0.1.0/24"}
+
+        def fingerprint(variables=None, upstream=None, **overrides):
+            stack = Stack(
+                definition=generate_definition("vpc", 1, **overrides),
+                context=context,
+                variables=dict(subnets, **variables or {}),
+            )
+            stack.resolve(context, MagicMock())
+            return stack_fingerprint(stack, upstream)
+
+        result = fingerprint()
+        self.assertEqual(64, len(result))
+        self.assertEqual(result, fingerprint())
+        self.assertNotEqual(result, fingerprint(variables={"InstanceType": "m5"}))
+        self.assertNotEqual(result, fingerprint(upstream={"other": "abc"}))
+        self.assertNotEqual(result, fingerprint(tags={"Key": "val"}))
+
+        with patch(
+            "tests.unit.cfngin.fixtures.mock_blueprints.VPC.create_template"
+        ) as mock_create_template:
+            self.assertNotEqual(result, fingerprint())
+        mock_create_template.assert_called_once()
+
     def test_resolve_parameters_unused_parameter(self):
         """Test resolve parameters unused parameter."""
         self.blueprint.get_parameter_definitions.return_value = {
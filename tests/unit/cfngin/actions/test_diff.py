@@ -1,7 +1,9 @@
 """Tests for runway.cfngin.actions.diff."""
 # pylint: disable=no-self-use,protected-access
+import json
 import logging
 import unittest
+from datetime import datetime
 from operator import attrgetter
 
 import pytest
@@ -10,12 +12,18 @@ from mock import MagicMock, patch
 
 from runway.cfngin.actions.diff import (
     Action,
+    DeployedStackFetcher,
     DictValue,
+    TemplateChange,
+    TemplateNode,
     diff_dictionaries,
     diff_parameters,
+    diff_templates,
+    format_template_diff,
 )
+from runway.cfngin.exceptions import StackDoesNotExist
 from runway.cfngin.providers.aws.default import Provider
-from runway.cfngin.status import SkippedStatus
+from runway.cfngin.status import COMPLETE, SUBMITTED, SkippedStatus
 
 from ..factories import MockProviderBuilder, MockThreadingEvent
 
@@ -110,6 +118,193 @@ class TestAction(object):
         mock_get_stack_changes.assert_called_once()
         assert result == expected
 
+    @pytest.mark.parametrize(
+        "executor, expected", [(None, "events"), ("threads", "threads")]
+    )
+    @patch(MODULE + ".build_walker")
+    def test_run_executor(self, mock_build_walker, executor, expected, cfngin_context):
+        """Test run releases steps while change sets are created by default."""
+        action = Action(context=cfngin_context, cancel=MockThreadingEvent())
+        plan = MagicMock()
+        with patch.object(action, "_generate_plan", return_value=plan):
+            action.run(executor=executor)
+        mock_build_walker.assert_called_once_with(
+            0, expected, setup=action.use_event_loop
+        )
+        plan.execute.assert_called_once_with(mock_build_walker.return_value)
+
+    def test_diff_stack_deferred(self, cfngin_context, monkeypatch):
+        """Test _diff_stack releases the step while the change set is created."""
+        cfngin_context.add_stubber("cloudformation")
+        provider = Provider(cfngin_context.get_session())
+        waiter = MagicMock()
+        mock_submit = MagicMock(return_value=waiter)
+        mock_get_changes = MagicMock(return_value={"Output": "changed"})
+        monkeypatch.setattr(provider, "submit_stack_changes", mock_submit)
+        monkeypatch.setattr(provider, "get_submitted_stack_changes", mock_get_changes)
+        stack = MagicMock()
+        stack.region = cfngin_context.region
+        stack.fqn = "test-stack"
+        stack.blueprint.rendered = "{}"
+        stack.locked = False
+        action = Action(
+            context=cfngin_context,
+            provider_builder=MockProviderBuilder(provider),
+            cancel=MockThreadingEvent(),
+        )
+
+        status = action._diff_stack(stack, deferred=True)
+        assert status == SUBMITTED
+        assert status.waiter is waiter
+        mock_submit.assert_called_once()
+        mock_get_changes.assert_not_called()
+
+        assert action._diff_stack(stack, status=status, deferred=True) == COMPLETE
+        mock_get_changes.assert_called_once_with(stack, waiter)
+        stack.set_outputs.assert_called_once_with({"Output": "changed"})
+        mock_submit.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "deployed_template, deployed_params, deployed_tags, matches",
+        [
+            ({"Resources": {}}, [("Param", "a")], {"tag": "val"}, True),
+            ({"Resources": {"x": {}}}, [("Param", "a")], {"tag": "val"}, False),
+            ({"Resources": {}}, [("Param", "b")], {"tag": "val"}, False),
+            ({"Resources": {}}, [("Param", "a")], {"tag": "other"}, False),
+        ],
+    )
+    def test_diff_stack_fast_diff(
+        self,
+        cfngin_context,
+        monkeypatch,
+        deployed_template,
+        deployed_params,
+        deployed_tags,
+        matches,
+    ):
+        """Test _diff_stack with fast_diff."""
+        stubber = cfngin_context.add_stubber("cloudformation")
+        provider = Provider(cfngin_context.get_session())
+        mock_get_stack_changes = MagicMock(return_value={"Output": "changed"})
+        monkeypatch.setattr(provider, "get_stack_changes", mock_get_stack_changes)
+        stack = MagicMock()
+        stack.region = cfngin_context.region
+        stack.fqn = "test-stack"
+        stack.blueprint.rendered = json.dumps({"Resources": {}})
+        stack.locked = False
+        stack.tags = {"tag": "val"}
+        stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    {
+                        "StackName": stack.fqn,
+                        "StackId": stack.fqn,
+                        "CreationTime": datetime(2015, 1, 1),
+                        "StackStatus": "UPDATE_COMPLETE",
+                        "Parameters": [
+                            {"ParameterKey": k, "ParameterValue": v}
+                            for k, v in deployed_params
+                        ],
+                        "Tags": [
+                            {"Key": k, "Value": v} for k, v in deployed_tags.items()
+                        ],
+                        "Outputs": [{"OutputKey": "Output", "OutputValue": "val"}],
+                    }
+                ]
+            },
+            {"StackName": stack.fqn},
+        )
+        stubber.add_response(
+            "get_template",
+            {"TemplateBody": json.dumps(deployed_template)},
+            {"StackName": stack.fqn},
+        )
+
+        action = Action(
+            context=cfngin_context,
+            provider_builder=MockProviderBuilder(provider),
+            cancel=MockThreadingEvent(),
+        )
+        monkeypatch.setattr(
+            action,
+            "build_parameters",
+            MagicMock(return_value=[{"ParameterKey": "Param", "ParameterValue": "a"}]),
+        )
+        action.deployed_stacks = DeployedStackFetcher()
+        with stubber:
+            assert action._diff_stack(stack) == COMPLETE
+        if matches:
+            mock_get_stack_changes.assert_not_called()
+            stack.set_outputs.assert_called_once_with({"Output": "val"})
+        else:
+            mock_get_stack_changes.assert_called_once()
+            stack.set_outputs.assert_called_once_with({"Output": "changed"})
+
+    def test_diff_stack_fast_diff_does_not_exist(self, cfngin_context, monkeypatch):
+        """Test _diff_stack with fast_diff for a stack that does not exist."""
+        stubber = cfngin_context.add_stubber("cloudformation")
+        provider = Provider(cfngin_context.get_session())
+        mock_get_stack_changes = MagicMock(return_value={})
+        monkeypatch.setattr(provider, "get_stack_changes", mock_get_stack_changes)
+        stack = MagicMock()
+        stack.region = cfngin_context.region
+        stack.fqn = "test-stack"
+        stack.blueprint.rendered = "{}"
+        stack.locked = False
+        stack.tags = {}
+        stubber.add_client_error(
+            "describe_stacks", service_message="Stack with id test-stack does not exist"
+        )
+
+        action = Action(
+            context=cfngin_context,
+            provider_builder=MockProviderBuilder(provider),
+            cancel=MockThreadingEvent(),
+        )
+        monkeypatch.setattr(action, "build_parameters", MagicMock(return_value=[]))
+        action.deployed_stacks = DeployedStackFetcher()
+        with stubber:
+            assert action._diff_stack(stack) == COMPLETE
+        mock_get_stack_changes.assert_called_once()
+
+
+class TestDeployedStackFetcher(object):
+    """Test runway.cfngin.actions.diff.DeployedStackFetcher."""
+
+    def test_get(self):
+        """Test get."""
+        provider = MagicMock()
+        provider.get_stack.side_effect = lambda fqn: {"StackName": fqn}
+        provider.get_stack_info.return_value = ('{"Resources": {}}', {"k": "v"})
+        fetcher = DeployedStackFetcher(max_workers=2)
+        pending = [fetcher.submit(provider, "stack-%s" % i) for i in range(5)]
+
+        assert fetcher.submit(provider, "stack-0") is pending[0]
+        result = fetcher.get(provider, "stack-4")
+        assert result.stack == {"StackName": "stack-4"}
+        assert result.template == {"Resources": {}}
+        assert result.parameters == {"k": "v"}
+        for obj in pending:
+            assert obj.result()
+        assert provider.get_stack.call_count == 5
+        workers = fetcher._workers
+        assert len(workers) == 2
+
+        fetcher.close()
+        assert not fetcher._workers
+        assert not any(worker.is_alive() for worker in workers)
+
+    def test_get_error(self):
+        """Test get raising an error."""
+        provider = MagicMock()
+        provider.get_stack.side_effect = StackDoesNotExist("stack")
+        fetcher = DeployedStackFetcher()
+
+        with pytest.raises(StackDoesNotExist):
+            fetcher.get(provider, "stack")
+        provider.get_stack_info.assert_not_called()
+
 
 class TestDictValueFormat(unittest.TestCase):
     """Tests for runway.cfngin.actions.diff.DictValue."""
@@ -185,6 +380,98 @@ class TestDiffDictionary(unittest.TestCase):
         self.assertEqual(len(changes), 0)
 
 
+class TestDiffTemplates(object):
+    """Tests for runway.cfngin.actions.diff.diff_templates."""
+
+    OLD = {
+        "Description": "old",
+        "Parameters": {"Param": {"Type": "String"}},
+        "Resources": {
+            "Bucket": {
+                "Type": "AWS::S3::Bucket",
+                "Properties": {
+                    "BucketName": "old",
+                    "Tags": [{"Key": "k", "Value": "v"}],
+                    "VersioningConfiguration": {"Status": "Enabled"},
+                },
+            },
+            "Removed": {"Type": "AWS::SNS::Topic"},
+            "Unchanged": {"Type": "AWS::SQS::Queue"},
+        },
+    }
+
+    def test_diff_templates(self):
+        """Test diff_templates."""
+        new = {
+            "Parameters": {"Param": {"Type": "String"}},
+            "Resources": {
+                "Added": {"Type": "AWS::SNS::Topic"},
+                "Bucket": {
+                    "Type": "AWS::S3::Bucket",
+                    "Properties": {
+                        "BucketName": "new",
+                        "Tags": [{"Key": "k", "Value": "new"}],
+                        "VersioningConfiguration": {"Status": "Enabled"},
+                        "WebsiteConfiguration": {},
+                    },
+                },
+                "Unchanged": {"Type": "AWS::SQS::Queue"},
+            },
+            "Outputs": {"Output": {"Value": "val"}},
+        }
+        assert diff_templates(self.OLD, new) == [
+            TemplateChange("Description", None, TemplateChange.REMOVED),
+            TemplateChange("Outputs", "Output", TemplateChange.ADDED),
+            TemplateChange("Resources", "Added", TemplateChange.ADDED),
+            TemplateChange(
+                "Resources",
+                "Bucket",
+                TemplateChange.MODIFIED,
+                [
+                    "Properties.BucketName",
+                    "Properties.Tags",
+                    "Properties.WebsiteConfiguration",
+                ],
+            ),
+            TemplateChange("Resources", "Removed", TemplateChange.REMOVED),
+        ]
+
+    def test_diff_templates_no_changes(self):
+        """Test diff_templates no changes."""
+        assert not diff_templates(self.OLD, dict(self.OLD))
+        assert not diff_templates(TemplateNode(self.OLD), TemplateNode(self.OLD))
+
+    def test_format_template_diff(self):
+        """Test format_template_diff."""
+        changes = diff_templates(
+            self.OLD, dict(self.OLD, Description="new", Resources={})
+        )
+        assert format_template_diff(changes) == "\n".join(
+            [
+                "~ Description",
+                "- Resources.Bucket",
+                "- Resources.Removed",
+                "- Resources.Unchanged",
+            ]
+        )
+
+    def test_template_node(self):
+        """Test TemplateNode."""
+        node = TemplateNode(self.OLD)
+        assert node == TemplateNode(dict(self.OLD))
+        assert node != TemplateNode(dict(self.OLD, Description="new"))
+        assert TemplateNode({"a": [1, 2]}) != TemplateNode({"a": [2, 1]})
+        assert TemplateNode({"a": "1"}) != TemplateNode({"a": 1})
+        assert TemplateNode({"a": [1]}) != TemplateNode({"a": "[1]"})
+        assert node.children["Resources"].children["Unchanged"] == TemplateNode(
+            {"Type": "AWS::SQS::Queue"}, TemplateNode.MERKLE_DEPTH
+        )
+        bucket = node.children["Resources"].children["Bucket"]
+        assert bucket.children["Properties"].children["Tags"].children[0] == (
+            TemplateNode({"Key": "k", "Value": "v"}, TemplateNode.MERKLE_DEPTH)
+        )
+
+
 class TestDiffParameters(unittest.TestCase):
     """Tests for runway.cfngin.actions.diff.diff_parameters."""
 
@@ -3,6 +3,7 @@
 import logging
 import os
 import os.path
+import pickle
 import random  # pylint: disable=syntax-error
 import sys
 import unittest
@@ -11,6 +12,8 @@ from zipfile import ZipFile
 
 import boto3
 import botocore
+import docker
+import formic
 import pytest
 from mock import ANY, MagicMock, patch
 from moto import mock_s3
@@ -19,14 +22,29 @@ from troposphere.awslambda import Code
 
 from runway.cfngin.config import Config
 from runway.cfngin.context import Context
-from runway.cfngin.exceptions import InvalidDockerizePipConfiguration
+from runway.cfngin.exceptions import InvalidDockerizePipConfiguration, PipError
 from runway.cfngin.hooks.aws_lambda import (
+    ZIP_DATE_TIME,
     ZIP_PERMS_MASK,
+    DockerPipBuilder,
     _calculate_hash,
+    _calculate_payload_hash,
+    _dependency_cache_key,
+    _find_files,
+    _handle_use_pipenv,
+    _install_dependencies,
+    _log_prefix,
+    _python_version,
+    _requirement_inputs,
+    _upload_code,
+    _upload_function,
+    _walk_pruned,
+    _zip_files,
     copydir,
     dockerized_pip,
     find_requirements,
     handle_requirements,
+    link_tree,
     select_bucket_region,
     should_use_docker,
     upload_lambda_functions,
@@ -364,6 +382,60 @@ class TestLambdaHooks(unittest.TestCase):
                     prefix="zipfile name should not be modified in " "repeated runs.",
                 )
 
+    @mock_s3
+    def test_skip_build(self):
+        """Test payloads already uploaded are not built again."""
+        with self.temp_directory_with_files() as temp_dir, patch(
+            "runway.cfngin.hooks.aws_lambda._zip_files", wraps=_zip_files
+        ) as mock_zip_files:
+            root = temp_dir.path + "/f1"
+            functions = {"MyFunction": {"path": root}}
+            self.s3.create_bucket(Bucket="test")
+
+            keys = set()
+            for force_rebuild in [False, False, True]:
+                code = self.run_hook(
+                    bucket="test", functions=functions, force_rebuild=force_rebuild
+                )["MyFunction"]
+                keys.add(code.S3Key)
+            assert mock_zip_files.call_count == 2
+            files = mock_zip_files.call_args[0][0]
+            assert keys == set(
+                ["lambda-MyFunction-{}.zip".format(_calculate_hash(files, root))]
+            )
+
+    @mock_s3
+    @pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+    def test_concurrent(self):
+        """Test payloads are built concurrently and uploaded."""
+        with self.temp_directory_with_files() as temp_dir:
+            functions = {
+                "Function{}".format(i): {"path": temp_dir.path + path}
+                for i, path in enumerate(["/f1", "/f2", "/f1/test"])
+            }
+            self.s3.create_bucket(Bucket="test")
+            # already uploaded; not built again
+            self.run_hook(
+                bucket="test", functions={"Function2": functions["Function2"]}
+            )
+
+            with patch(
+                "runway.cfngin.hooks.aws_lambda._upload_function"
+            ) as mock_upload_function:
+                results = self.run_hook(
+                    bucket="test",
+                    functions=functions,
+                    max_concurrent_builds=2,
+                    max_concurrent_uploads=2,
+                )
+            mock_upload_function.assert_not_called()
+        assert list(results) == ["Function0", "Function1", "Function2"]
+        self.assert_s3_zip_file_list(
+            "test", results["Function0"].S3Key, F1_FILES,
+        )
+        self.assert_s3_zip_file_list("test", results["Function1"].S3Key, ["f2.js"])
+        assert len(self.s3.list_objects(Bucket="test")["Contents"]) == 3
+
     def test_calculate_hash(self):
         """Test calculate hash."""
         with self.temp_directory_with_files() as temp_dir1:
@@ -541,22 +613,24 @@ class TestLambdaHooks(unittest.TestCase):
         ),
     )
     @patch("runway.cfngin.hooks.aws_lambda.copydir", MagicMock())
-    @patch(
-        "runway.cfngin.hooks.aws_lambda.handle_requirements",
-        MagicMock(return_value="./tests/requirements.txt"),
-    )
+    @patch("runway.cfngin.hooks.aws_lambda.handle_requirements")
     @patch("runway.cfngin.hooks.aws_lambda._find_files", MagicMock())
     @patch(
         "runway.cfngin.hooks.aws_lambda._zip_files",
-        MagicMock(return_value=("zip_contents", "content_hash")),
+        MagicMock(return_value=(MagicMock(), "content_hash")),
     )
     @patch("runway.cfngin.hooks.aws_lambda._upload_code", MagicMock())
     @patch("runway.cfngin.hooks.aws_lambda.sys")
-    def test_frozen(self, mock_sys, mock_proc):
+    def test_frozen(self, mock_sys, mock_handle_requirements, mock_proc):
         """Test building with pip when frozen."""
         mock_sys.frozen = True
         mock_sys.version_info = sys.version_info
-        with self.temp_directory_with_files() as temp_dir:
+        with self.temp_directory_with_files(
+            ALL_FILES + ("f1/requirements.txt",)
+        ) as temp_dir, patch.dict(os.environ, {"HOME": temp_dir.path}):
+            mock_handle_requirements.return_value = os.path.join(
+                temp_dir.path, "f1", "requirements.txt"
+            )
             self.run_hook(
                 functions={
                     "MyFunction": {
@@ -571,6 +645,266 @@ class TestLambdaHooks(unittest.TestCase):
         )
 
 
+class TestInstallDependencies(object):
+    """Test _install_dependencies."""
+
+    @staticmethod
+    def fake_pip_install(target, requirements_path, **_):
+        """Install the content of a requirements file as a package."""
+        with open(requirements_path) as stream:
+            package = stream.read().strip()
+        os.makedirs(os.path.join(target, package))
+        with open(os.path.join(target, package, "__init__.py"), "w") as stream:
+            stream.write("")
+
+    @patch("runway.cfngin.hooks.aws_lambda._pip_install")
+    def test_cache(self, mock_pip_install, tmp_path):
+        """Test dependencies are only installed when the key changes."""
+        mock_pip_install.side_effect = self.fake_pip_install
+        cache_root = tmp_path / "cache"
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(u"foo")
+
+        for i in range(2):
+            work_dir = tmp_path / "work{}".format(i)
+            work_dir.mkdir()
+            _install_dependencies(
+                str(tmp_path), str(work_dir), str(requirements), str(cache_root)
+            )
+            assert (work_dir / "foo" / "__init__.py").is_file()
+        assert mock_pip_install.call_count == 1
+        cached = list(cache_root.iterdir())
+        assert len(cached) == 1
+        if hasattr(os, "link"):
+            assert (cached[0] / "foo" / "__init__.py").stat().st_nlink == 3
+
+        requirements.write_text(u"bar")
+        work_dir = tmp_path / "work2"
+        work_dir.mkdir()
+        _install_dependencies(
+            str(tmp_path), str(work_dir), str(requirements), str(cache_root)
+        )
+        assert mock_pip_install.call_count == 2
+        assert (work_dir / "bar" / "__init__.py").is_file()
+        assert not (work_dir / "foo").exists()
+        assert len(list(cache_root.iterdir())) == 2
+
+    @patch("runway.cfngin.hooks.aws_lambda._pip_install")
+    def test_no_cache(self, mock_pip_install, tmp_path):
+        """Test installing without a cache."""
+        _install_dependencies(str(tmp_path), str(tmp_path), "requirements.txt")
+        mock_pip_install.assert_called_once_with(str(tmp_path), "requirements.txt")
+
+    @patch("runway.cfngin.hooks.aws_lambda._pip_install")
+    def test_failed(self, mock_pip_install, tmp_path):
+        """Test nothing is cached when the install fails."""
+        mock_pip_install.side_effect = PipError
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(u"foo")
+        cache_root = tmp_path / "cache"
+        with pytest.raises(PipError):
+            _install_dependencies(
+                str(tmp_path), str(tmp_path), str(requirements), str(cache_root)
+            )
+        assert not list(cache_root.iterdir())
+
+    def test_dependency_cache_key(self, tmp_path):
+        """Test _dependency_cache_key."""
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(u"foo")
+        key = _dependency_cache_key(str(tmp_path), str(requirements))
+        assert key == _dependency_cache_key(str(tmp_path), str(requirements))
+        keys = set(
+            [
+                key,
+                _dependency_cache_key(
+                    str(tmp_path), str(requirements), python_dontwritebytecode=True
+                ),
+                _dependency_cache_key(
+                    str(tmp_path),
+                    str(requirements),
+                    dockerize_pip=True,
+                    runtime="python3.8",
+                ),
+                _dependency_cache_key(
+                    str(tmp_path),
+                    str(requirements),
+                    dockerize_pip=True,
+                    runtime="python3.7",
+                ),
+            ]
+        )
+        (tmp_path / "Pipfile.lock").write_text(u"{}")
+        keys.add(_dependency_cache_key(str(tmp_path), str(requirements)))
+        assert len(keys) == 5
+
+    def test_dependency_cache_key_includes(self, tmp_path):
+        """Test included files and local archives are part of the key."""
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(
+            u"-r base.txt\n--constraint=constraints.txt\ndist/app-1.0.whl\n"
+        )
+        (tmp_path / "base.txt").write_text(u"foo\n-r requirements.txt  # loop\n")
+        (tmp_path / "constraints.txt").write_text(u"foo==1.0")
+        (tmp_path / "dist").mkdir()
+        (tmp_path / "dist" / "app-1.0.whl").write_bytes(b"wheel")
+        assert _requirement_inputs(str(requirements)) == [
+            str(tmp_path / "base.txt"),
+            str(tmp_path / "constraints.txt"),
+            str(tmp_path / "dist" / "app-1.0.whl"),
+        ]
+
+        keys = set([_dependency_cache_key(str(tmp_path), str(requirements))])
+        for name, content in [
+            ("base.txt", b"bar"),
+            ("constraints.txt", b"foo==2.0"),
+            ("dist/app-1.0.whl", b"new wheel"),
+        ]:
+            (tmp_path / name).write_bytes(content)
+            keys.add(_dependency_cache_key(str(tmp_path), str(requirements)))
+        assert len(keys) == 4
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "-e .",
+            "--editable ./lib",
+            "./lib",
+            "lib @ file:///tmp/does-not-exist",
+            "-f ./wheels",
+            "-r https://example.com/requirements.txt",
+        ],
+    )
+    def test_dependency_cache_key_not_cached(self, line, tmp_path):
+        """Test dependencies installed from local directories are not cached."""
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "wheels").mkdir()
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(u"foo\n" + line)
+        assert _dependency_cache_key(str(tmp_path), str(requirements)) is None
+
+    @patch("runway.cfngin.hooks.aws_lambda._pip_install")
+    def test_not_cached(self, mock_pip_install, tmp_path):
+        """Test dependencies that can't be cached are installed directly."""
+        requirements = tmp_path / "requirements.txt"
+        requirements.write_text(u"-e .")
+        cache_root = tmp_path / "cache"
+        _install_dependencies(
+            str(tmp_path), str(tmp_path / "work"), str(requirements), str(cache_root)
+        )
+        mock_pip_install.assert_called_once_with(
+            str(tmp_path / "work"), str(requirements)
+        )
+        assert not cache_root.exists()
+
+    def test_python_version(self):
+        """Test _python_version only includes the major and minor version."""
+        version = _python_version()
+        assert version.startswith("%s.%s " % sys.version_info[:2])
+        assert sys.platform in version
+        assert sys.version not in version
+
+
+class TestDockerPipBuilder(object):
+    """Test DockerPipBuilder."""
+
+    @staticmethod
+    def make_client(exit_code=0):
+        """Create a docker client without images or containers."""
+        client = MagicMock()
+        client.images.get.side_effect = docker.errors.ImageNotFound("not found")
+        client.containers.get.side_effect = docker.errors.NotFound("not found")
+        client.api.exec_create.return_value = {"Id": "exec-id"}
+        client.api.exec_start.return_value = [b"Successfully installed foo\n"]
+        client.api.exec_inspect.return_value = {"ExitCode": exit_code}
+        return client
+
+    def test_install(self, tmp_path):
+        """Test pip runs in one container for all payloads."""
+        client = self.make_client()
+        builder = DockerPipBuilder(str(tmp_path), pip_cache="cache", client=client)
+        assert not builder.can_install(str(tmp_path.parent))
+        for work_dir in ["a", "b"]:
+            assert builder.can_install(str(tmp_path / work_dir))
+            dockerized_pip(
+                str(tmp_path / work_dir),
+                runtime="python3.8",
+                docker_builder=builder,
+                python_dontwritebytecode=True,
+            )
+
+        client.images.pull.assert_called_once_with(
+            "lambci/lambda", tag="build-python3.8"
+        )
+        client.containers.run.assert_called_once()
+        run_kwargs = client.containers.run.call_args[1]
+        assert run_kwargs["image"] == "lambci/lambda:build-python3.8"
+        assert run_kwargs["labels"] == {DockerPipBuilder.LABEL: builder.builder_id}
+        assert [
+            (i["Source"], i["Target"], i["Type"]) for i in run_kwargs["mounts"]
+        ] == [
+            (str(tmp_path), "/var/runway", "bind"),
+            ("cache", "/var/runway_pip_cache", "volume"),
+        ]
+        assert [i[0][1][-1] for i in client.api.exec_create.call_args_list] == [
+            "/var/runway/a/requirements.txt",
+            "/var/runway/b/requirements.txt",
+        ]
+        assert client.api.exec_create.call_args[1]["environment"] == {
+            "PIP_CACHE_DIR": "/var/runway_pip_cache",
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+
+    def test_install_failed(self, tmp_path):
+        """Test pip exiting with an error."""
+        builder = DockerPipBuilder(str(tmp_path), client=self.make_client(1))
+        with pytest.raises(PipError):
+            builder.install(str(tmp_path), docker_image="alpine")
+
+    def test_pickle(self, tmp_path):
+        """Test builders can be passed to worker processes."""
+        builder = DockerPipBuilder(str(tmp_path), client=self.make_client())
+        builder.install(str(tmp_path), docker_image="alpine")
+        copy = pickle.loads(pickle.dumps(builder))
+        assert copy.builder_id == builder.builder_id
+        assert copy.used
+        assert not copy._client  # pylint: disable=protected-access
+
+    def test_close(self, tmp_path):
+        """Test the containers of a builder are removed."""
+        client = self.make_client()
+        builder = DockerPipBuilder(str(tmp_path), client=client)
+        builder.close()
+        client.containers.list.assert_not_called()
+
+        container = MagicMock()
+        client.containers.list.return_value = [container]
+        builder.used = True
+        builder.close()
+        client.containers.list.assert_called_once_with(
+            all=True,
+            filters={
+                "label": "{}={}".format(DockerPipBuilder.LABEL, builder.builder_id)
+            },
+        )
+        container.remove.assert_called_once_with(force=True)
+
+
+def test_link_tree(tmp_path):
+    """Test link_tree."""
+    source = tmp_path / "source"
+    (source / "lib").mkdir(parents=True)
+    (source / "lib" / "module.py").write_text(u"source")
+    (source / "existing.py").write_text(u"source")
+    destination = tmp_path / "destination"
+    destination.mkdir()
+    (destination / "existing.py").write_text(u"destination")
+
+    link_tree(str(source), str(destination))
+    assert (destination / "lib" / "module.py").read_text() == u"source"
+    assert (destination / "existing.py").read_text() == u"destination"
+
+
 class TestDockerizePip(object):
     """Test dockerize_pip."""
 
@@ -841,3 +1175,235 @@ def test_copydir():
         assert tmp_dir.read(("src", "lib", "example_file")) == example_file
         assert tmp_dir.read(("dest", "example_file")) == example_file
         assert tmp_dir.read(("dest", "lib", "example_file")) == example_file
+        if hasattr(os, "link"):
+            # hard linked
+            assert os.stat(os.path.join(dest_path, "example_file")).st_nlink == 2
+
+
+@patch("runway.cfngin.hooks.aws_lambda._clone_file", MagicMock(return_value=False))
+@patch("runway.cfngin.hooks.aws_lambda.os.link", MagicMock(side_effect=OSError))
+def test_copydir_copy(tmp_path):
+    """Test copydir copies files that can't be linked or cloned."""
+    (tmp_path / "src" / "lib").mkdir(parents=True)
+    (tmp_path / "src" / "lib" / "run.sh").write_text(u"#!/bin/sh")
+    (tmp_path / "src" / "lib" / "run.sh").chmod(0o755)
+    os.symlink("lib/run.sh", str(tmp_path / "src" / "link.sh"))
+
+    copydir(
+        str(tmp_path / "src"),
+        str(tmp_path / "dest"),
+        "**",
+        follow_symlinks=True,
+        files=["lib/run.sh", "link.sh"],
+    )
+    for file_name in ["lib/run.sh", "link.sh"]:
+        dest = tmp_path / "dest" / file_name
+        assert not dest.is_symlink()
+        assert dest.read_text() == u"#!/bin/sh"
+        assert dest.stat().st_nlink == 1
+        assert dest.stat().st_mode & 0o777 == 0o755
+
+
+def test_find_files_pruned(tmp_path):
+    """Test excluded directories are not walked."""
+    for file_name in [
+        "index.py",
+        "lib/a.py",
+        "lib/node_modules/a/index.js",
+        "node_modules/b/index.js",
+        "tests/test_a.py",
+        ".git/HEAD",
+    ]:
+        (tmp_path / file_name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / file_name).write_text(u"")
+    excludes = ["node_modules/", "/tests/**"]
+    excluded_dirs = [
+        i
+        for i in formic.FileSet(include="**", exclude=excludes).exclude.iter()
+        if i.all_files()
+    ]
+
+    walked = [
+        os.path.relpath(i[0], str(tmp_path))
+        for i in _walk_pruned(str(tmp_path), excluded_dirs)
+    ]
+    assert sorted(walked) == [".", "lib"]
+    assert sorted(_find_files(str(tmp_path), ["**"], excludes)) == sorted(
+        formic.FileSet(
+            directory=str(tmp_path), include=["**"], exclude=excludes
+        ).qualified_files(absolute=False)
+    )
+
+
+@patch("runway.cfngin.hooks.aws_lambda.subprocess")
+def test_handle_use_pipenv_hard_link(mock_subprocess, tmp_path):
+    """Test requirements of the package linked into the build are not changed."""
+    mock_subprocess.Popen.return_value.communicate.return_value = (b"", b"")
+    mock_subprocess.Popen.return_value.returncode = 0
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package" / "requirements.txt").write_text(u"foo")
+    (tmp_path / "build").mkdir()
+    copydir(str(tmp_path / "package"), str(tmp_path / "build"), "**")
+
+    assert _handle_use_pipenv(
+        str(tmp_path / "package"), str(tmp_path / "build")
+    ) == str(tmp_path / "build" / "requirements.txt")
+    assert (tmp_path / "package" / "requirements.txt").read_text() == u"foo"
+    assert (tmp_path / "package" / "requirements.txt").stat().st_nlink == 1
+
+
+def test_zip_files(tmp_path):
+    """Test _zip_files."""
+    files = ["./b.py", "./lib/a.py", "./run.sh"]
+    for file_name in files:
+        (tmp_path / file_name).parent.mkdir(exist_ok=True)
+        (tmp_path / file_name).write_bytes(file_name.encode() * 1000)
+    (tmp_path / "run.sh").chmod(0o700)
+
+    with patch("runway.cfngin.hooks.aws_lambda.ZIP_SPOOL_MAX_SIZE", 100):
+        zip_data, content_hash = _zip_files(reversed(files), str(tmp_path))
+    with zip_data:
+        assert zip_data._rolled  # moved to a file once larger than the max size
+        assert content_hash == _calculate_hash(files, str(tmp_path))
+        with ZipFile(StringIO(zip_data.read())) as zip_file:
+            assert zip_file.namelist() == ["b.py", "lib/a.py", "run.sh"]
+            assert zip_file.read("lib/a.py") == b"./lib/a.py" * 1000
+            assert [
+                (i.external_attr & ZIP_PERMS_MASK) >> 16 for i in zip_file.infolist()
+            ] == [0o644, 0o644, 0o755]
+
+
+@patch("runway.cfngin.hooks.aws_lambda._python_version", MagicMock(return_value="3"))
+def test_calculate_payload_hash(tmp_path):
+    """Test _calculate_payload_hash."""
+    (tmp_path / "index.py").write_text(u"source")
+    files = ["index.py"]
+    root = str(tmp_path)
+    assert _calculate_payload_hash(root, files) == _calculate_hash(files, root)
+
+    requirements_files = {"requirements.txt": True, "Pipfile": False}
+    (tmp_path / "requirements.txt").write_text(u"foo")
+    content_hash = _calculate_payload_hash(root, files, requirements_files)
+    assert content_hash != _calculate_hash(files, root)
+    assert content_hash == _calculate_payload_hash(root, files, requirements_files)
+    hashes = set(
+        [
+            content_hash,
+            _calculate_payload_hash(
+                root, files, requirements_files, python_exclude_bin_dir=True
+            ),
+            _calculate_payload_hash(
+                root, files, requirements_files, dockerize_pip=True, runtime="python3.8"
+            ),
+        ]
+    )
+    (tmp_path / "requirements.txt").write_text(u"bar")
+    hashes.add(_calculate_payload_hash(root, files, requirements_files))
+    (tmp_path / "index.py").write_text(u"changed")
+    hashes.add(_calculate_payload_hash(root, files, requirements_files))
+    (tmp_path / "requirements.txt").write_text(u"-r base.txt")
+    (tmp_path / "base.txt").write_text(u"foo")
+    hashes.add(_calculate_payload_hash(root, files, requirements_files))
+    (tmp_path / "base.txt").write_text(u"bar")
+    hashes.add(_calculate_payload_hash(root, files, requirements_files))
+    assert len(hashes) == 7
+
+    (tmp_path / "requirements.txt").write_text(u"-e .")
+    assert _calculate_payload_hash(root, files, requirements_files) is None
+
+
+def test_upload_function_unhashed():
+    """Test payloads that can't be hashed before building use the zip hash."""
+    s3_conn = MagicMock()
+    contents = MagicMock()
+    with patch(
+        "runway.cfngin.hooks.aws_lambda._prepare_payload",
+        return_value={"content_hash": None},
+    ), patch(
+        "runway.cfngin.hooks.aws_lambda._build_payload",
+        return_value=(contents, "zip_hash"),
+    ) as mock_build_payload:
+        code = _upload_function(
+            s3_conn, "bucket", "prefix/", "name", {}, False, "acl", "/"
+        )
+    mock_build_payload.assert_called_once()
+    assert code.S3Key == "prefix/lambda-name-zip_hash.zip"
+    # the same archive was already uploaded
+    s3_conn.head_object.assert_called_once_with(
+        Bucket="bucket", Key="prefix/lambda-name-zip_hash.zip"
+    )
+    s3_conn.upload_fileobj.assert_not_called()
+    contents.close.assert_called_once()
+
+
+def test_zip_files_reproducible(tmp_path):
+    """Test the same files are zipped to the same bytes in different checkouts."""
+    files = {"index.py": b"handler", "lib/a.py": b"a" * 1000, "run.sh": b"#!/bin/sh"}
+    archives = []
+    for checkout, order, file_mode, exec_mode, mtime in [
+        ("a", sorted, 0o600, 0o700, 1e9),
+        ("b", lambda i: sorted(i, reverse=True), 0o664, 0o775, 1.5e9),
+    ]:
+        root = tmp_path / checkout
+        for file_name in order(files):
+            (root / file_name).parent.mkdir(parents=True, exist_ok=True)
+            (root / file_name).write_bytes(files[file_name])
+            (root / file_name).chmod(exec_mode if file_name == "run.sh" else file_mode)
+            os.utime(str(root / file_name), (mtime, mtime))
+        zip_data, content_hash = _zip_files(order(files), str(root))
+        with zip_data:
+            archives.append((zip_data.read(), content_hash))
+
+    assert archives[0] == archives[1]
+    assert archives[0][1] == _calculate_hash(list(files), str(tmp_path / "a"))
+    with ZipFile(StringIO(archives[0][0])) as zip_file:
+        assert zip_file.namelist() == ["index.py", "lib/a.py", "run.sh"]
+        assert set(i.date_time for i in zip_file.infolist()) == set([ZIP_DATE_TIME])
+
+    # permissions are stored in the archive so they change the hash
+    (tmp_path / "a" / "run.sh").chmod(0o644)
+    assert _calculate_hash(list(files), str(tmp_path / "a")) != archives[0][1]
+
+
+def test_log_prefix(caplog):
+    """Test _log_prefix."""
+    caplog.set_level(logging.INFO, logger="runway.cfngin.hooks.aws_lambda")
+    logger = logging.getLogger("runway.cfngin.hooks.aws_lambda")
+    with _log_prefix("MyFunction"):
+        logger.info("building %s", "payload")
+    logger.info("done")
+    assert caplog.messages == ["MyFunction:building payload", "done"]
+
+
+def test_upload_code():
+    """Test _upload_code."""
+    s3_conn = MagicMock()
+    s3_conn.head_object.side_effect = botocore.exceptions.ClientError(
+        {"Error": {"Code": "404"}}, "HeadObject"
+    )
+    contents = StringIO(b"zip")
+    code = _upload_code(s3_conn, "bucket", "prefix/", "name", contents, "hash", "acl")
+    assert code.S3Key == "prefix/lambda-name-hash.zip"
+    s3_conn.upload_fileobj.assert_called_once_with(
+        contents,
+        "bucket",
+        "prefix/lambda-name-hash.zip",
+        ExtraArgs={"ACL": "acl", "ContentType": "application/zip"},
+    )
+
+    s3_conn.reset_mock()
+    s3_conn.head_object.side_effect = None
+    _upload_code(s3_conn, "bucket", "prefix/", "name", contents, "hash", "acl")
+    s3_conn.upload_fileobj.assert_not_called()
+
+    _upload_code(
+        s3_conn,
+        "bucket",
+        "prefix/",
+        "name",
+        contents,
+        "hash",
+        "acl",
+        check_exists=False,
+    )
+    s3_conn.upload_fileobj.assert_called_once()
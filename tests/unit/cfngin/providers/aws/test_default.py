@@ -6,6 +6,7 @@ import random
 import string
 import sys
 import threading
+import time
 import unittest
 from datetime import datetime
 
@@ -20,7 +21,11 @@ from runway.cfngin.providers.aws import default
 from runway.cfngin.providers.aws.default import (
     DEFAULT_CAPABILITIES,
     MAX_TAIL_RETRIES,
+    AsyncStackStatusPoller,
+    ChangeSetPoller,
     Provider,
+    ProviderBuilder,
+    StackStatusPoller,
     ask_for_approval,
     create_change_set,
     generate_cloudformation_args,
@@ -37,6 +42,7 @@ from runway.util import MutableMap
 if sys.version_info.major < 3:
     from pathlib2 import Path  # pylint: disable=E
 else:
+    import asyncio
     from pathlib import Path  # pylint: disable=E
 
 
@@ -346,6 +352,371 @@ class TestMethods(unittest.TestCase):
                     self.cfn, "FAKEID", try_count=2, sleep_time=0.1
                 )
 
+    def test_change_set_poller(self):
+        """Test ChangeSetPoller."""
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("CREATE_IN_PROGRESS"),
+            {"ChangeSetName": "FAKEID1"},
+        )
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("CREATE_COMPLETE"),
+            {"ChangeSetName": "FAKEID1"},
+        )
+        poller = ChangeSetPoller(self.cfn, sleep_time=0.01, max_calls_per_second=0)
+        with self.stubber:
+            response = poller.wait("FAKEID1")
+        self.assertEqual(response["Status"], "CREATE_COMPLETE")
+        self.stubber.assert_no_pending_responses()
+
+    def test_change_set_poller_multiple(self):
+        """Test ChangeSetPoller waiting on multiple change sets."""
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("CREATE_IN_PROGRESS"),
+            {"ChangeSetName": "FAKEID1"},
+        )
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("FAILED"),
+            {"ChangeSetName": "FAKEID2"},
+        )
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("CREATE_COMPLETE"),
+            {"ChangeSetName": "FAKEID1"},
+        )
+        poller = ChangeSetPoller(self.cfn, sleep_time=0.05, max_calls_per_second=0)
+        results = {}
+
+        def _wait(pending):
+            results[pending.change_set_id] = pending.result()["Status"]
+
+        with self.stubber:
+            threads = [
+                threading.Thread(target=_wait, args=(poller.submit(i),))
+                for i in ["FAKEID1", "FAKEID2"]
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(
+            results, {"FAKEID1": "CREATE_COMPLETE", "FAKEID2": "FAILED"},
+        )
+        self.stubber.assert_no_pending_responses()
+
+    def test_change_set_poller_did_not_stabilize(self):
+        """Test ChangeSetPoller raises ChangesetDidNotStabilize."""
+        for _ in range(2):
+            self.stubber.add_response(
+                "describe_change_set", generate_change_set_response("CREATE_PENDING")
+            )
+        poller = ChangeSetPoller(
+            self.cfn, try_count=2, sleep_time=0.01, max_calls_per_second=0
+        )
+        with self.stubber:
+            with self.assertRaises(exceptions.ChangesetDidNotStabilize):
+                poller.wait("FAKEID")
+
+    def test_change_set_poller_callback(self):
+        """Test ChangeSetPoller calls done callbacks."""
+        self.stubber.add_response(
+            "describe_change_set",
+            generate_change_set_response("CREATE_COMPLETE"),
+            {"ChangeSetName": "FAKEID1"},
+        )
+        poller = ChangeSetPoller(self.cfn, sleep_time=0.01, max_calls_per_second=0)
+        done = threading.Event()
+        with self.stubber:
+            pending = poller.submit("FAKEID1")
+            pending.add_done_callback(done.set)
+            self.assertTrue(done.wait(5))
+        called = []
+        pending.add_done_callback(lambda: called.append(True))
+        self.assertEqual(called, [True])
+
+    def test_change_set_poller_create(self):
+        """Test ChangeSetPoller.create waits for its budget."""
+        self.stubber.add_response(
+            "create_change_set",
+            {"Id": "CHANGESETID", "StackId": "STACKID"},
+            {"StackName": "stack", "ChangeSetName": "name"},
+        )
+        poller = ChangeSetPoller(self.cfn, max_creates_per_second=2)
+        poller.create_limit = MagicMock()
+        with self.stubber:
+            self.assertEqual(
+                poller.create(StackName="stack", ChangeSetName="name")["Id"],
+                "CHANGESETID",
+            )
+        poller.create_limit.acquire.assert_called_once_with()
+        self.assertIsNone(
+            ChangeSetPoller(self.cfn, max_creates_per_second=0).create_limit
+        )
+
+    def test_change_set_poller_client_error(self):
+        """Test ChangeSetPoller raises errors from the client."""
+        self.stubber.add_client_error("describe_change_set", "ValidationError")
+        poller = ChangeSetPoller(self.cfn, max_calls_per_second=0)
+        with self.stubber:
+            with self.assertRaises(ClientError):
+                poller.wait("FAKEID")
+
+    def test_stack_status_poller(self):
+        """Test StackStatusPoller."""
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="UPDATE_IN_PROGRESS"
+                    )
+                ]
+            },
+            {"StackName": "stack1"},
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="UPDATE_COMPLETE"
+                    )
+                ]
+            },
+            {"StackName": "stack1"},
+        )
+        poller = StackStatusPoller(self.cfn, interval=0.01, max_calls_per_second=0)
+        called = threading.Event()
+        with self.stubber:
+            pending = poller.submit("stack1")
+            self.assertIs(poller.submit("stack1"), pending)
+            pending.add_done_callback(called.set)
+            self.assertTrue(called.wait(5))
+        self.assertTrue(pending.done.is_set())
+        self.assertEqual(pending.status, "UPDATE_COMPLETE")
+        self.assertIsNone(pending.error)
+        self.stubber.assert_no_pending_responses()
+
+        # already done
+        callback = MagicMock()
+        pending.add_done_callback(callback)
+        callback.assert_called_once_with()
+
+    def test_stack_status_poller_submit_wakeup(self):
+        """Test StackStatusPoller checks stacks as soon as they are submitted."""
+        for stack_name, status in [
+            ("stack1", "UPDATE_IN_PROGRESS"),
+            ("stack2", "UPDATE_COMPLETE"),
+            ("stack1", "UPDATE_COMPLETE"),
+        ]:
+            self.stubber.add_response(
+                "describe_stacks",
+                {
+                    "Stacks": [
+                        generate_describe_stacks_stack(stack_name, stack_status=status)
+                    ]
+                },
+                {"StackName": stack_name},
+            )
+        poller = StackStatusPoller(self.cfn, interval=60, max_calls_per_second=0)
+        with self.stubber:
+            stack1 = poller.submit("stack1")
+            for _ in range(500):
+                if stack1.next_poll:
+                    break
+                time.sleep(0.01)
+            stack2 = poller.submit("stack2")
+            self.assertTrue(stack2.done.wait(5))
+            self.assertFalse(stack1.done.is_set())
+            with poller._lock:
+                stack1.next_poll = 0
+                poller._wakeup.set()
+            self.assertTrue(stack1.done.wait(5))
+        self.assertEqual(stack1.status, "UPDATE_COMPLETE")
+        self.assertEqual(stack2.status, "UPDATE_COMPLETE")
+        self.stubber.assert_no_pending_responses()
+
+    def test_stack_status_poller_batch(self):
+        """Test StackStatusPoller listing stacks."""
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="DELETE_COMPLETE"
+                    ),
+                    generate_describe_stacks_stack(
+                        "other", stack_status="UPDATE_IN_PROGRESS"
+                    ),
+                ]
+            },
+            {},
+        )
+        poller = StackStatusPoller(
+            self.cfn, interval=0.01, batch_threshold=2, max_calls_per_second=0
+        )
+        with self.stubber:
+            with poller._lock:  # submit both before the first poll
+                poller._pending["stack1"] = default._PendingStack("stack1")
+                poller._pending["stack2"] = default._PendingStack("stack2")
+            pending = list(poller._pending.values())
+            poller._run()
+        self.assertTrue(all(i.done.is_set() for i in pending))
+        self.assertEqual(pending[0].status, "DELETE_COMPLETE")
+        self.assertIsNone(pending[1].status)
+        self.stubber.assert_no_pending_responses()
+
+    def test_stack_status_poller_client_error(self):
+        """Test StackStatusPoller sets errors from the client."""
+        self.stubber.add_client_error("describe_stacks", "Throttling")
+        poller = StackStatusPoller(self.cfn, interval=0.01, max_calls_per_second=0)
+        with self.stubber:
+            pending = poller.submit("stack1")
+            self.assertTrue(pending.done.wait(5))
+        self.assertIsInstance(pending.error, ClientError)
+
+    @unittest.skipIf(sys.version_info.major < 3, "only supported by python 3")
+    def test_async_stack_status_poller(self):
+        """Test AsyncStackStatusPoller."""
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="CREATE_IN_PROGRESS"
+                    )
+                ]
+            },
+            {"StackName": "stack1"},
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="CREATE_COMPLETE"
+                    )
+                ]
+            },
+            {"StackName": "stack1"},
+        )
+        loop = asyncio.new_event_loop()
+        poller = AsyncStackStatusPoller(self.cfn, loop, interval=0.01)
+        with self.stubber:
+            pending = poller.submit("stack1")
+            self.assertIs(poller.submit("stack1"), pending)
+            done = loop.create_future()
+            pending.add_done_callback(
+                lambda: loop.call_soon_threadsafe(done.set_result, None)
+            )
+            loop.run_until_complete(asyncio.wait_for(done, 5))
+        loop.close()
+        self.assertEqual(pending.status, "CREATE_COMPLETE")
+        self.assertIsNone(pending.error)
+        self.stubber.assert_no_pending_responses()
+
+    @unittest.skipIf(sys.version_info.major < 3, "only supported by python 3")
+    def test_async_stack_status_poller_does_not_exist(self):
+        """Test AsyncStackStatusPoller with a stack that does not exist."""
+        self.stubber.add_client_error(
+            "describe_stacks",
+            service_message="Stack with id stack1 does not exist",
+            expected_params={"StackName": "stack1"},
+        )
+        loop = asyncio.new_event_loop()
+        poller = AsyncStackStatusPoller(self.cfn, loop, interval=0.01)
+        with self.stubber:
+            pending = poller.submit("stack1")
+            done = loop.create_future()
+            pending.add_done_callback(
+                lambda: loop.call_soon_threadsafe(done.set_result, None)
+            )
+            loop.run_until_complete(asyncio.wait_for(done, 5))
+        loop.close()
+        self.assertIsNone(pending.status)
+        self.assertIsNone(pending.error)
+
+    @unittest.skipIf(sys.version_info.major < 3, "only supported by python 3")
+    def test_async_stack_status_poller_batch(self):
+        """Test AsyncStackStatusPoller listing stacks."""
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack1", stack_status="UPDATE_COMPLETE"
+                    )
+                ],
+                "NextToken": "token",
+            },
+            {},
+        )
+        self.stubber.add_response(
+            "describe_stacks",
+            {
+                "Stacks": [
+                    generate_describe_stacks_stack(
+                        "stack2", stack_status="UPDATE_ROLLBACK_COMPLETE"
+                    )
+                ]
+            },
+            {"NextToken": "token"},
+        )
+        loop = asyncio.new_event_loop()
+        poller = AsyncStackStatusPoller(
+            self.cfn, loop, interval=0.01, batch_threshold=2
+        )
+        with self.stubber:
+            pending = [poller.submit("stack1"), poller.submit("stack2")]
+            done = loop.create_future()
+            pending[1].add_done_callback(
+                lambda: loop.call_soon_threadsafe(done.set_result, None)
+            )
+            loop.run_until_complete(asyncio.wait_for(done, 5))
+        loop.close()
+        self.assertEqual(pending[0].status, "UPDATE_COMPLETE")
+        self.assertEqual(pending[1].status, "UPDATE_ROLLBACK_COMPLETE")
+        self.stubber.assert_no_pending_responses()
+
+    @unittest.skipIf(sys.version_info.major < 3, "only supported by python 3")
+    def test_async_stack_status_poller_client_error(self):
+        """Test AsyncStackStatusPoller sets errors from the client."""
+        self.stubber.add_client_error("describe_stacks", "Throttling")
+        loop = asyncio.new_event_loop()
+        poller = AsyncStackStatusPoller(self.cfn, loop, interval=0.01)
+        with self.stubber:
+            pending = poller.submit("stack1")
+            done = loop.create_future()
+            pending.add_done_callback(
+                lambda: loop.call_soon_threadsafe(done.set_result, None)
+            )
+            loop.run_until_complete(asyncio.wait_for(done, 5))
+        loop.close()
+        self.assertIsInstance(pending.error, ClientError)
+
+    def test_provider_builder_stack_status_poller_factory(self):
+        """Test ProviderBuilder.set_stack_status_poller_factory."""
+        builder = ProviderBuilder(region="us-east-1")
+        factory = MagicMock()
+        existing = builder.build()
+        builder.set_stack_status_poller_factory(factory)
+        self.assertIs(existing.stack_status_poller, factory.return_value)
+        factory.assert_called_once_with(existing.cloudformation)
+
+        new = builder.build(region="us-west-2")
+        factory.assert_called_with(new.cloudformation)
+        self.assertIs(new.stack_status_poller, factory.return_value)
+
+        builder.set_stack_status_poller_factory(None)
+        self.assertIsInstance(existing.stack_status_poller, StackStatusPoller)
+        self.assertIsInstance(new.stack_status_poller, StackStatusPoller)
+        self.assertIsInstance(
+            builder.build(region="us-east-2").stack_status_poller, StackStatusPoller
+        )
+
     def test_create_change_set_stack_did_not_change(self):
         """Test create change set stack did not change."""
         self.stubber.add_response(
@@ -163,7 +163,7 @@ class TestCFNgin(object):
 
         mock_action.assert_called_once()
         mock_instance.execute.assert_called_once_with(
-            concurrency=0, force=True, tail=False
+            concurrency=0, executor=None, force=True, tail=False
         )
         patch_safehaven.assert_has_calls(
             [
@@ -212,7 +212,7 @@ class TestCFNgin(object):
         cfngin.plan()
 
         mock_action.assert_called_once()
-        mock_instance.execute.assert_called_once_with()
+        mock_instance.execute.assert_called_once_with(executor=None, fast_diff=False)
         patch_safehaven.assert_has_calls(
             [
                 call(environ=context.env_vars),
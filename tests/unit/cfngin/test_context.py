@@ -10,12 +10,17 @@ from botocore.stub import ANY, Stubber
 from mock import PropertyMock, patch
 
 from runway.cfngin.config import Config, load
-from runway.cfngin.context import Context, get_fqn
+from runway.cfngin.context import (
+    PERSISTENT_GRAPH_JOURNAL_COMPACT_AFTER,
+    Context,
+    get_fqn,
+)
 from runway.cfngin.exceptions import (
     PersistentGraphCannotLock,
     PersistentGraphCannotUnlock,
     PersistentGraphLockCodeMissmatch,
     PersistentGraphLocked,
+    PersistentGraphModified,
     PersistentGraphUnlocked,
 )
 from runway.cfngin.hooks.utils import handle_hooks
@@ -99,6 +104,56 @@ class TestContext(unittest.TestCase):
         context = Context(config=self.config)
         self.assertEqual(len(context.get_stacks()), 2)
 
+    def test_context_get_stack(self):
+        """Test context get stack only creates the requested stack."""
+        context = Context(config=self.config)
+        self.assertEqual(context.get_stack("stack2").name, "stack2")
+        self.assertEqual(list(context._stack_cache), ["stack2"])
+        self.assertIsNone(context.get_stack("stack3"))
+        self.assertIs(context.get_stack("stack2"), context.get_stacks()[1])
+
+    def test_context_get_targeted_stacks(self):
+        """Test context get targeted stacks."""
+        config = Config(
+            {
+                "namespace": "namespace",
+                "stacks": [
+                    {"name": "vpc", "required_by": ["app"]},
+                    {"name": "db", "variables": {"VpcId": "${output vpc::Id}"}},
+                    {"name": "app", "requires": ["db"]},
+                    {"name": "other", "requires": ["vpc"]},
+                    {"name": "unrelated"},
+                ],
+                "targets": [
+                    {"name": "backend", "requires": ["db"]},
+                    {"name": "all", "requires": ["app", "other"]},
+                ],
+            }
+        )
+        context = Context(config=config, stack_names=["app"])
+
+        self.assertEqual(context.get_required_names(["app"]), {"app", "db", "vpc"})
+        self.assertEqual(
+            [stack.name for stack in context.get_targeted_stacks()],
+            ["vpc", "db", "app"],
+        )
+        self.assertEqual(sorted(context._stack_cache), ["app", "db", "vpc"])
+        self.assertEqual(context.get_targeted_targets(), [])
+
+        context = Context(config=config, stack_names=["backend"])
+        self.assertEqual(
+            [stack.name for stack in context.get_targeted_stacks()], ["vpc", "db"]
+        )
+        self.assertEqual(
+            [target.name for target in context.get_targeted_targets()], ["backend"]
+        )
+
+    def test_context_get_targeted_stacks_not_targeted(self):
+        """Test context get targeted stacks without stack_names."""
+        context = Context(config=self.config)
+        self.assertEqual(context.get_targeted_stacks(), context.get_stacks())
+        self.assertEqual(context.get_targeted_targets(), context.get_targets())
+
     def test_context_get_stacks_dict_use_fqn(self):
         """Test context get stacks dict use fqn."""
         context = Context(config=self.config)
@@ -330,7 +385,7 @@ class TestContext(unittest.TestCase):
 
         stubber.add_response(
             "get_object",
-            {"Body": gen_s3_object_content(expected_content)},
+            {"Body": gen_s3_object_content(expected_content), "ETag": '"abc"'},
             expected_params,
         )
 
@@ -339,6 +394,76 @@ class TestContext(unittest.TestCase):
             self.assertIsInstance(context.persistent_graph, Graph)
             self.assertIsInstance(context._persistent_graph, Graph)
             self.assertEqual(expected_content, context.persistent_graph.to_dict())
+            self.assertEqual('"abc"', context._persistent_graph_etag)
+            stubber.assert_no_pending_responses()
+
+    def test_persistent_graph_journal(self):
+        """Return Graph from S3 object with journal deltas applied."""
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_journal=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        stubber = Stubber(context.s3_conn)
+        bucket = context.persistent_graph_location["Bucket"]
+        prefix = "persistent_graphs/test/test.journal/"
+        self.assertEqual(prefix, context.persistent_graph_journal_prefix)
+        expected_params = {"ResponseContentType": "application/json"}
+        expected_params.update(context.persistent_graph_location)
+        keys = [
+            prefix + "0000000001.json",
+            prefix + "0000000002.json",
+            prefix + "0000000003.json",
+        ]
+
+        stubber.add_response(
+            "get_object",
+            {
+                "Body": gen_s3_object_content({"stack1": [], "stack2": ["stack1"]}),
+                "ETag": '"abc"',
+            },
+            expected_params,
+        )
+        stubber.add_response(
+            "list_objects_v2",
+            {"Contents": [{"Key": keys[1]}, {"Key": keys[2]}, {"Key": keys[0]}]},
+            {"Bucket": bucket, "Prefix": prefix},
+        )
+        stubber.add_response(
+            "get_object",
+            {
+                "Body": gen_s3_object_content(
+                    {"base": '"old"', "remove": ["stack2"], "set": {}}
+                )
+            },
+            {"Bucket": bucket, "Key": keys[0]},
+        )
+        stubber.add_response(
+            "get_object",
+            {
+                "Body": gen_s3_object_content(
+                    {"base": '"abc"', "remove": [], "set": {"stack3": ["stack2"]}}
+                )
+            },
+            {"Bucket": bucket, "Key": keys[1]},
+        )
+        stubber.add_response(
+            "get_object",
+            {
+                "Body": gen_s3_object_content(
+                    {"base": '"abc"', "remove": ["stack1"], "set": {"stack2": []}}
+                )
+            },
+            {"Bucket": bucket, "Key": keys[2]},
+        )
+
+        with stubber:
+            expected = {"stack2": set(), "stack3": set(["stack2"])}
+            self.assertEqual(expected, context.persistent_graph.to_dict())
+            self.assertEqual(expected, context._persistent_graph_persisted)
+            self.assertEqual(keys, context._persistent_graph_journal)
+            self.assertTrue(context._persistent_graph_journal_stale)
             stubber.assert_no_pending_responses()
 
     def test_persistent_graph_no_object(self):
@@ -459,7 +584,7 @@ class TestContext(unittest.TestCase):
         context._persistent_graph = Graph.from_dict(graph_dict, context)
         stubber = Stubber(context.s3_conn)
         expected_params = {
-            "Body": json.dumps(graph_dict, indent=4),
+            "Body": json.dumps(graph_dict, separators=(",", ":")),
             "ServerSideEncryption": "AES256",
             "ACL": "bucket-owner-full-control",
             "ContentType": "application/json",
@@ -472,10 +597,40 @@ class TestContext(unittest.TestCase):
             {"TagSet": gen_tagset({context._persistent_graph_lock_tag: code})},
             context.persistent_graph_location,
         )
-        stubber.add_response("put_object", {}, expected_params)
+        stubber.add_response("put_object", {"ETag": '"abc"'}, expected_params)
+        stubber.add_response(
+            "head_object", {"ETag": '"abc"'}, context.persistent_graph_location
+        )
+        stubber.add_response("put_object", {"ETag": '"def"'}, expected_params)
 
         with stubber:
             self.assertIsNone(context.put_persistent_graph(code))
+            self.assertEqual('"abc"', context._persistent_graph_etag)
+            self.assertIsNone(context.put_persistent_graph(code))
+            self.assertEqual('"def"', context._persistent_graph_etag)
+            stubber.assert_no_pending_responses()
+
+    def test_put_persistent_graph_modified(self):
+        """Error raised when the object was modified by another session."""
+        code = "0000"
+        context = Context(config=self.persist_graph_config)
+        context._s3_bucket_verified = True
+        context._persistent_graph = Graph.from_dict({"stack1": []}, context)
+        context._persistent_graph_etag = '"abc"'
+        stubber = Stubber(context.s3_conn)
+
+        stubber.add_response(
+            "get_object_tagging",
+            {"TagSet": gen_tagset({context._persistent_graph_lock_tag: code})},
+            context.persistent_graph_location,
+        )
+        stubber.add_response(
+            "head_object", {"ETag": '"def"'}, context.persistent_graph_location
+        )
+
+        with stubber:
+            with self.assertRaises(PersistentGraphModified):
+                context.put_persistent_graph(code)
             stubber.assert_no_pending_responses()
 
     def test_put_persistent_graph_unlocked(self):
@@ -513,6 +668,249 @@ class TestContext(unittest.TestCase):
                 context.put_persistent_graph(code)
             stubber.assert_no_pending_responses()
 
+    def test_put_persistent_graph_journal(self):
+        """Only changes are written when using a journal."""
+        code = "0000"
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_journal=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        context._persistent_graph = Graph.from_dict(
+            {"stack1": [], "stack3": ["stack1"]}, context
+        )
+        context._persistent_graph_persisted = {
+            "stack1": set(),
+            "stack2": set(["stack1"]),
+        }
+        prefix = context.persistent_graph_journal_prefix
+        context._persistent_graph_journal = [prefix + "0000000009.json"]
+        context._persistent_graph_etag = '"abc"'
+        stubber = Stubber(context.s3_conn)
+
+        stubber.add_response(
+            "get_object_tagging",
+            {"TagSet": gen_tagset({context._persistent_graph_lock_tag: code})},
+            context.persistent_graph_location,
+        )
+        stubber.add_response(
+            "head_object", {"ETag": '"abc"'}, context.persistent_graph_location
+        )
+        stubber.add_response(
+            "put_object",
+            {},
+            {
+                "Body": '{"base":"\\"abc\\"","remove":["stack2"],'
+                '"set":{"stack3":["stack1"]}}',
+                "ServerSideEncryption": "AES256",
+                "ACL": "bucket-owner-full-control",
+                "ContentType": "application/json",
+                "Bucket": context.persistent_graph_location["Bucket"],
+                "Key": prefix + "0000000010.json",
+            },
+        )
+        stubber.add_response(
+            "head_object", {"ETag": '"abc"'}, context.persistent_graph_location
+        )
+
+        with stubber:
+            self.assertIsNone(context.put_persistent_graph(code))
+            self.assertIsNone(context.put_persistent_graph(code))  # no changes
+            stubber.assert_no_pending_responses()
+        self.assertEqual(
+            [prefix + "0000000009.json", prefix + "0000000010.json"],
+            context._persistent_graph_journal,
+        )
+        self.assertEqual(
+            {"stack1": set(), "stack3": set(["stack1"])},
+            context._persistent_graph_persisted,
+        )
+
+    def test_stack_fingerprints(self):
+        """Return stack fingerprints from S3 object."""
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_fingerprints=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        stubber = Stubber(context.s3_conn)
+        location = {
+            "Bucket": "cfngin-test",
+            "Key": "persistent_graphs/test/test.fingerprints.json",
+        }
+        self.assertEqual(location, context.stack_fingerprints_location)
+        expected = {"stack1": {"fingerprint": "abc", "outputs": {"Key": "val"}}}
+
+        stubber.add_response(
+            "get_object",
+            {"Body": gen_s3_object_content(expected)},
+            dict(location, ResponseContentType="application/json"),
+        )
+
+        with stubber:
+            self.assertEqual(expected, context.stack_fingerprints)
+            self.assertEqual(expected, context.stack_fingerprints)
+            stubber.assert_no_pending_responses()
+
+    def test_stack_fingerprints_disabled(self):
+        """No stack fingerprints are loaded unless enabled."""
+        context = Context(config=self.persist_graph_config)
+        context._s3_bucket_verified = True
+        self.assertEqual({}, context.stack_fingerprints_location)
+        self.assertEqual({}, context.stack_fingerprints)
+
+    def test_stack_fingerprints_no_such_key(self):
+        """Stack fingerprints are empty if the S3 object does not exist."""
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_fingerprints=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        stubber = Stubber(context.s3_conn)
+
+        stubber.add_client_error(
+            "get_object",
+            "NoSuchKey",
+            expected_params=dict(
+                context.stack_fingerprints_location,
+                ResponseContentType="application/json",
+            ),
+        )
+
+        with stubber:
+            self.assertEqual({}, context.stack_fingerprints)
+            stubber.assert_no_pending_responses()
+
+    def test_put_stack_fingerprints(self):
+        """Stack fingerprints of stacks in the config are uploaded."""
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_fingerprints=True)
+            )
+        )
+        context._stack_fingerprints = {
+            "removed": {"fingerprint": "abc", "outputs": {}},
+            "stack1": {"fingerprint": "def", "outputs": {"Key": "val"}},
+        }
+        stubber = Stubber(context.s3_conn)
+
+        stubber.add_response(
+            "put_object",
+            {},
+            dict(
+                context.stack_fingerprints_location,
+                Body='{"stack1":{"fingerprint":"def","outputs":{"Key":"val"}}}',
+                ServerSideEncryption="AES256",
+                ACL="bucket-owner-full-control",
+                ContentType="application/json",
+            ),
+        )
+
+        with stubber:
+            self.assertIsNone(context.put_stack_fingerprints())
+            stubber.assert_no_pending_responses()
+        self.assertEqual(["stack1"], list(context.stack_fingerprints))
+
+    def test_put_persistent_graph_journal_compact(self):
+        """Journal is compacted into the persistent graph object."""
+        code = "0000"
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_journal=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        graph_dict = {"stack1": [], "stack2": ["stack1"]}
+        context._persistent_graph = Graph.from_dict(graph_dict, context)
+        prefix = context.persistent_graph_journal_prefix
+        keys = [
+            "%s%010d.json" % (prefix, i)
+            for i in range(1, PERSISTENT_GRAPH_JOURNAL_COMPACT_AFTER + 1)
+        ]
+        context._persistent_graph_journal = list(keys)
+        stubber = Stubber(context.s3_conn)
+        expected_params = {
+            "Body": json.dumps(graph_dict, separators=(",", ":")),
+            "ServerSideEncryption": "AES256",
+            "ACL": "bucket-owner-full-control",
+            "ContentType": "application/json",
+            "Tagging": "{}={}".format(context._persistent_graph_lock_tag, code),
+        }
+        expected_params.update(context.persistent_graph_location)
+
+        stubber.add_response(
+            "get_object_tagging",
+            {"TagSet": gen_tagset({context._persistent_graph_lock_tag: code})},
+            context.persistent_graph_location,
+        )
+        stubber.add_response("put_object", {}, expected_params)
+        stubber.add_response(
+            "delete_objects",
+            {},
+            {
+                "Bucket": context.persistent_graph_location["Bucket"],
+                "Delete": {"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            },
+        )
+
+        with stubber:
+            self.assertIsNone(context.put_persistent_graph(code))
+            stubber.assert_no_pending_responses()
+        self.assertEqual([], context._persistent_graph_journal)
+        self.assertEqual(
+            {"stack1": set(), "stack2": set(["stack1"])},
+            context._persistent_graph_persisted,
+        )
+
+    def test_put_persistent_graph_journal_stale(self):
+        """Journal with deltas of another version of the object is compacted."""
+        code = "0000"
+        context = Context(
+            config=Config(
+                dict(self.persist_graph_raw_config, persistent_graph_journal=True)
+            )
+        )
+        context._s3_bucket_verified = True
+        graph_dict = {"stack1": []}
+        context._persistent_graph = Graph.from_dict(graph_dict, context)
+        keys = [context.persistent_graph_journal_prefix + "0000000001.json"]
+        context._persistent_graph_journal = list(keys)
+        context._persistent_graph_journal_stale = True
+        stubber = Stubber(context.s3_conn)
+        expected_params = {
+            "Body": json.dumps(graph_dict, separators=(",", ":")),
+            "ServerSideEncryption": "AES256",
+            "ACL": "bucket-owner-full-control",
+            "ContentType": "application/json",
+            "Tagging": "{}={}".format(context._persistent_graph_lock_tag, code),
+        }
+        expected_params.update(context.persistent_graph_location)
+
+        stubber.add_response(
+            "get_object_tagging",
+            {"TagSet": gen_tagset({context._persistent_graph_lock_tag: code})},
+            context.persistent_graph_location,
+        )
+        stubber.add_response("put_object", {"ETag": '"new"'}, expected_params)
+        stubber.add_response(
+            "delete_objects",
+            {},
+            {
+                "Bucket": context.persistent_graph_location["Bucket"],
+                "Delete": {"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            },
+        )
+
+        with stubber:
+            self.assertIsNone(context.put_persistent_graph(code))
+            stubber.assert_no_pending_responses()
+        self.assertEqual([], context._persistent_graph_journal)
+        self.assertFalse(context._persistent_graph_journal_stale)
+        self.assertEqual('"new"', context._persistent_graph_etag)
+
     def test_put_persistent_graph_empty(self):
         """Object deleted when persistent graph is empty."""
         code = "0000"
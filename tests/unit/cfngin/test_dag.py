@@ -1,9 +1,18 @@
 """Tests for runway.cfngin.dag."""
+import contextlib
+import sys
 import threading
 
 import pytest
 
-from runway.cfngin.dag import DAGValidationError, ThreadedWalker, UnlimitedSemaphore
+from runway.cfngin.dag import (
+    AsyncioWalker,
+    DAGValidationError,
+    Deferred,
+    EventWalker,
+    ThreadedWalker,
+    UnlimitedSemaphore,
+)
 
 
 def test_add_node(empty_dag):
@@ -37,6 +46,70 @@ def test_add_edge(empty_dag):
     assert dag.graph == {"a": set("b"), "b": set()}
 
 
+def test_add_edges(basic_dag):
+    """Test add edges."""
+    dag = basic_dag
+    dag.add_node("e")
+
+    dag.add_edges([("e", "a"), ("b", "c"), ("a", "b")])
+    assert dag.graph == {
+        "a": set(["b", "c"]),
+        "b": set(["c", "d"]),
+        "c": set(["d"]),
+        "d": set(),
+        "e": set(["a"]),
+    }
+
+
+def test_add_edges_cycle(basic_dag):
+    """Test add edges creating a cycle."""
+    dag = basic_dag
+    dag.add_node("e")
+
+    with pytest.raises(DAGValidationError):
+        dag.add_edges([("d", "e"), ("e", "a")])
+    assert dag.graph == {
+        "a": set(["b", "c"]),
+        "b": set(["d"]),
+        "c": set(["d"]),
+        "d": set(),
+        "e": set(),
+    }
+
+
+def test_add_edges_missing_node(basic_dag):
+    """Test add edges with a node that does not exist."""
+    with pytest.raises(KeyError):
+        basic_dag.add_edges([("a", "e")])
+    with pytest.raises(KeyError):
+        basic_dag.add_edges([("e", "a")])
+
+
+def test_copy(basic_dag):
+    """Test copy."""
+    dag = basic_dag.copy()
+    assert dag.graph == basic_dag.graph
+    dag.add_edge("b", "c")
+    assert basic_dag.graph["b"] == set(["d"])
+
+
+def test_merge(basic_dag, empty_dag):
+    """Test merge."""
+    dag = basic_dag
+    empty_dag.from_dict({"a": [], "d": ["a"], "e": ["f", "a"], "f": ["d"]})
+
+    dag.merge(empty_dag)
+    assert list(dag.graph) == ["a", "b", "c", "d", "e", "f"]
+    assert dag.graph == {
+        "a": set(["b", "c"]),
+        "b": set(["d"]),
+        "c": set(["d"]),
+        "d": set(),
+        "e": set(["a", "f"]),
+        "f": set(["d"]),
+    }
+
+
 def test_from_dict(empty_dag):
     """Test from dict."""
     dag = empty_dag
@@ -213,3 +286,203 @@ def test_threaded_walker(empty_dag):
 
     walker.walk(dag, walk_func)
     assert nodes == ["d", "c", "b", "a"] or nodes == ["d", "b", "c", "a"]
+
+
+class Waiter(object):
+    """Waiter that is done once ``set_done`` is called."""
+
+    def __init__(self):
+        """Instantiate class."""
+        self.callbacks = []
+        self.done = False
+        self.lock = threading.Lock()
+
+    def add_done_callback(self, func):
+        """Add a callback."""
+        with self.lock:
+            if not self.done:
+                self.callbacks.append(func)
+                return
+        func()
+
+    def set_done(self):
+        """Call callbacks."""
+        with self.lock:
+            self.done = True
+        for func in self.callbacks:
+            func()
+
+
+def test_event_walker(empty_dag):
+    """Test EventWalker."""
+    dag = empty_dag
+    dag.from_dict({"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []})
+
+    lock = threading.Lock()
+    nodes = []
+
+    def walk_func(node):
+        with lock:
+            nodes.append(node)
+        return True
+
+    EventWalker(max_workers=2).walk(dag, walk_func)
+    assert nodes == ["d", "c", "b", "a"] or nodes == ["d", "b", "c", "a"]
+
+
+def test_event_walker_deferred(empty_dag):
+    """Test EventWalker releases workers for deferred nodes."""
+    dag = empty_dag
+    dag.from_dict({"a": ["b", "c"], "b": [], "c": []})
+
+    lock = threading.Lock()
+    nodes = []
+    waiters = {"b": Waiter(), "c": Waiter()}
+
+    def resume(node):
+        with lock:
+            nodes.append(node + "-resumed")
+        if node == "c":
+            # c is only done once b has been resumed
+            threading.Timer(0.01, waiters["b"].set_done).start()
+        return True
+
+    def walk_func(node):
+        with lock:
+            nodes.append(node)
+        if node in waiters:
+            if len(nodes) == 2:
+                threading.Timer(0.01, waiters["c"].set_done).start()
+            return Deferred(waiters[node], lambda: resume(node))
+        return True
+
+    # a single worker can only start both b and c if it is released
+    EventWalker(max_workers=1).walk(dag, walk_func)
+    assert nodes[2:] == ["c-resumed", "b-resumed", "a"]
+    assert sorted(nodes[:2]) == ["b", "c"]
+
+
+def test_event_walker_max_in_flight(empty_dag):
+    """Test EventWalker max_in_flight."""
+    dag = empty_dag
+    dag.from_dict({"a": [], "b": [], "c": [], "d": []})
+
+    lock = threading.Lock()
+    state = {"in_flight": 0, "max": 0}
+
+    def resume():
+        with lock:
+            state["in_flight"] -= 1
+        return True
+
+    def walk_func(_node):
+        waiter = Waiter()
+        with lock:
+            state["in_flight"] += 1
+            state["max"] = max(state["max"], state["in_flight"])
+        threading.Timer(0.01, waiter.set_done).start()
+        return Deferred(waiter, resume)
+
+    EventWalker(max_workers=4, max_in_flight=2).walk(dag, walk_func)
+    assert state == {"in_flight": 0, "max": 2}
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_asyncio_walker(empty_dag):
+    """Test AsyncioWalker."""
+    dag = empty_dag
+    dag.from_dict({"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []})
+
+    lock = threading.Lock()
+    nodes = []
+    loops = []
+
+    @contextlib.contextmanager
+    def setup(loop):
+        loops.append(loop)
+        yield
+        loops.append(None)
+
+    def walk_func(node):
+        with lock:
+            nodes.append(node)
+        return True
+
+    AsyncioWalker(max_workers=2, setup=setup).walk(dag, walk_func)
+    assert nodes == ["d", "c", "b", "a"] or nodes == ["d", "b", "c", "a"]
+    assert loops[0].is_closed()
+    assert loops[1] is None
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_asyncio_walker_deferred(empty_dag):
+    """Test AsyncioWalker resumes deferred nodes."""
+    dag = empty_dag
+    dag.from_dict({"a": ["b", "c"], "b": [], "c": []})
+
+    lock = threading.Lock()
+    nodes = []
+    waiters = {"b": Waiter(), "c": Waiter()}
+
+    def resume(node):
+        with lock:
+            nodes.append(node + "-resumed")
+        if node == "c":
+            threading.Timer(0.01, waiters["b"].set_done).start()
+        return True
+
+    def walk_func(node):
+        with lock:
+            nodes.append(node)
+            if node in waiters and len(nodes) == 2:
+                threading.Timer(0.01, waiters["c"].set_done).start()
+        if node in waiters:
+            return Deferred(waiters[node], lambda: resume(node))
+        return True
+
+    AsyncioWalker(max_workers=1).walk(dag, walk_func)
+    assert nodes[2:] == ["c-resumed", "b-resumed", "a"]
+    assert sorted(nodes[:2]) == ["b", "c"]
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_asyncio_walker_max_in_flight(empty_dag):
+    """Test AsyncioWalker max_in_flight."""
+    dag = empty_dag
+    dag.from_dict({"a": [], "b": [], "c": [], "d": []})
+
+    lock = threading.Lock()
+    state = {"in_flight": 0, "max": 0}
+
+    def resume():
+        with lock:
+            state["in_flight"] -= 1
+        return True
+
+    def walk_func(_node):
+        waiter = Waiter()
+        with lock:
+            state["in_flight"] += 1
+            state["max"] = max(state["max"], state["in_flight"])
+        threading.Timer(0.01, waiter.set_done).start()
+        return Deferred(waiter, resume)
+
+    AsyncioWalker(max_workers=4, max_in_flight=2).walk(dag, walk_func)
+    assert state == {"in_flight": 0, "max": 2}
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_asyncio_walker_error(empty_dag):
+    """Test AsyncioWalker continues when a walk function raises an error."""
+    dag = empty_dag
+    dag.from_dict({"a": ["b"], "b": []})
+    nodes = []
+
+    def walk_func(node):
+        nodes.append(node)
+        if node == "b":
+            raise ValueError
+        return True
+
+    AsyncioWalker().walk(dag, walk_func)
+    assert nodes == ["b", "a"]
@@ -0,0 +1,320 @@
+"""Tests for runway.cfngin.instrumentation."""
+# pylint: disable=no-self-use,protected-access
+import json
+import logging
+import pstats
+import sys
+
+import pytest
+from mock import MagicMock, patch
+
+from runway.cfngin import instrumentation
+from runway.cfngin.instrumentation import (
+    API_CALLS,
+    LATENCY_BUCKETS,
+    PROFILER,
+    TRACER,
+    ApiCallRecorder,
+    Profiler,
+    Tracer,
+    _percentile,
+)
+from runway.cfngin.plan import Step
+from runway.cfngin.session_cache import get_session
+from runway.cfngin.status import COMPLETE, SUBMITTED
+
+if sys.version_info.major > 2:
+    import concurrent.futures
+
+MODULE = "runway.cfngin.instrumentation"
+EVENT = "after-call.cloudformation.DescribeStacks"
+
+
+def make_call(recorder, elapsed=0.2, status_code=200, retries=0, throttles=0):
+    """Simulate the events emitted for an API call."""
+    context = {}
+    with patch(MODULE + ".time") as mock_time:
+        mock_time.time.return_value = 100.0
+        recorder._before_call(context=context)
+        for _ in range(throttles):
+            recorder._needs_retry(
+                response=(
+                    MagicMock(status_code=400),
+                    {"Error": {"Code": "Throttling"}},
+                ),
+                request_dict={"context": context},
+            )
+        mock_time.time.return_value = 100.0 + elapsed
+        recorder._after_call(
+            EVENT,
+            context=context,
+            http_response=MagicMock(status_code=status_code),
+            parsed={"ResponseMetadata": {"RetryAttempts": retries}},
+        )
+
+
+def worker(name):
+    """Make an API call in a worker process."""
+    with API_CALLS.stack(name), TRACER.span(name), PROFILER.phase("modules"):
+        make_call(API_CALLS)
+    return name
+
+
+def busy(count):
+    """Use some CPU."""
+    return sum(i * i for i in range(count))
+
+
+def busy_calls(path):
+    """Get the number of calls to busy in a profile."""
+    stats = pstats.Stats(str(path)).stats
+    return sum(v[1] for k, v in stats.items() if k[2] == "busy")
+
+
+class TestApiCallRecorder(object):
+    """Tests for runway.cfngin.instrumentation.ApiCallRecorder."""
+
+    def test_record(self):
+        """Test recording calls."""
+        recorder = ApiCallRecorder()
+        make_call(recorder, elapsed=0.2, retries=1, throttles=1)
+        with recorder.stack("vpc"):
+            assert recorder.current_stack == "vpc"
+            make_call(recorder, elapsed=3, status_code=400)
+        assert not recorder.current_stack
+
+        stats = recorder.operations["cloudformation.DescribeStacks"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["retries"] == 1
+        assert stats["throttles"] == 1
+        assert stats["max"] == 3
+        assert stats["histogram"][LATENCY_BUCKETS.index(0.25)] == 1
+        assert stats["histogram"][LATENCY_BUCKETS.index(5.0)] == 1
+        assert recorder.stacks == {
+            "vpc": {"calls": 1, "errors": 1, "retries": 0, "throttles": 0, "time": 3}
+        }
+        assert _percentile(stats, 50) == 0.25
+        assert _percentile(stats, 90) == 3
+
+    def test_record_not_started(self):
+        """Test calls started before recording are ignored."""
+        recorder = ApiCallRecorder()
+        recorder._after_call(EVENT, context={}, parsed={})
+        recorder._after_call_error(EVENT, context=None, exception=ValueError())
+        assert not recorder.operations
+
+    def test_merge(self):
+        """Test merge."""
+        recorder = ApiCallRecorder()
+        make_call(recorder, elapsed=0.2)
+        other = ApiCallRecorder()
+        with other.stack("vpc"):
+            make_call(other, elapsed=1, retries=2)
+        recorder.merge(other.dump())
+        recorder.merge(other.dump())
+
+        stats = recorder.operations["cloudformation.DescribeStacks"]
+        assert stats["calls"] == 3
+        assert stats["retries"] == 4
+        assert stats["max"] == 1
+        assert sum(stats["histogram"]) == 3
+        assert recorder.stacks["vpc"]["calls"] == 2
+
+    def test_recording(self, caplog, tmp_path):
+        """Test recording."""
+        caplog.set_level(logging.INFO, logger=MODULE)
+        recorder = ApiCallRecorder()
+        with recorder.recording(enabled=False):
+            assert not recorder.enabled
+        assert not caplog.messages
+
+        json_path = tmp_path / "api.json"
+        with recorder.recording(json_path=str(json_path)):
+            assert recorder.enabled
+            with recorder.stack("vpc"):
+                make_call(recorder)
+        assert not recorder.enabled
+        assert caplog.messages[1].startswith(
+            "cloudformation.DescribeStacks                      1      0       0"
+        )
+        assert caplog.messages[3].startswith("vpc ")
+        data = json.loads(json_path.read_text())
+        assert data["operations"]["cloudformation.DescribeStacks"]["calls"] == 1
+        assert data["stacks"]["vpc"]["calls"] == 1
+
+    def test_register(self):
+        """Test register."""
+        recorder = ApiCallRecorder()
+        session = MagicMock()
+        recorder.register(session)
+        session.register.assert_not_called()
+        recorder.reset(enabled=True)
+        recorder.register(session)
+        assert session.register.call_count == 4
+
+    def test_get_session(self):
+        """Test sessions created by get_session are registered."""
+        with patch("runway.cfngin.session_cache.API_CALLS") as recorder:
+            session = get_session(region="us-east-1")
+        recorder.register.assert_called_once_with(session._session)
+
+    def test_step(self):
+        """Test calls made by a step are attributed to its stack."""
+        stack = MagicMock()
+        stack.name = "vpc"
+
+        def fn(_stack, status=None):
+            assert API_CALLS.current_stack == "vpc"
+            return COMPLETE
+
+        assert Step(stack, fn).run()
+        assert not API_CALLS.current_stack
+
+
+class TestTracer(object):
+    """Tests for runway.cfngin.instrumentation.Tracer."""
+
+    def test_span(self):
+        """Test span."""
+        tracer = Tracer()
+        with tracer.span("disabled"):
+            pass
+        tracer.reset(enabled=True)
+        with patch(MODULE + ".time") as mock_time:
+            mock_time.time.side_effect = [1.0, 1.5]
+            with tracer.span("render", "stack", stack="vpc"):
+                pass
+        assert tracer.events == [
+            {
+                "args": {"stack": "vpc"},
+                "cat": "stack",
+                "dur": 500000,
+                "name": "render",
+                "ph": "X",
+                "pid": tracer.events[0]["pid"],
+                "tid": tracer.events[0]["tid"],
+                "ts": 1000000,
+            }
+        ]
+
+    def test_api_calls(self):
+        """Test a span is added for each API call."""
+        tracer = Tracer()
+        tracer._after_call(EVENT, context={})
+        tracer.reset(enabled=True)
+        context = {"client_region": "us-east-1"}
+        tracer._before_call(context=context)
+        tracer._after_call(
+            EVENT, context=context, http_response=MagicMock(status_code=400)
+        )
+        assert len(tracer.events) == 1
+        assert tracer.events[0]["name"] == "cloudformation.DescribeStacks"
+        assert tracer.events[0]["cat"] == "aws"
+        assert tracer.events[0]["args"] == {"region": "us-east-1", "status": "400"}
+
+        session = MagicMock()
+        tracer.register(session)
+        assert session.register.call_count == 3
+
+    def test_tracing(self, tmp_path):
+        """Test tracing."""
+        tracer = Tracer()
+        with tracer.tracing():
+            assert not tracer.enabled
+
+        path = tmp_path / "trace.json"
+        with tracer.tracing(str(path)):
+            assert tracer.enabled
+            with tracer.span("outer"):
+                with tracer.span("inner"):
+                    pass
+        assert not tracer.enabled
+        data = json.loads(path.read_text())
+        assert data["displayTimeUnit"] == "ms"
+        events = data["traceEvents"]
+        assert [i["name"] for i in events] == [
+            "process_name",
+            "thread_name",
+            "outer",
+            "inner",
+        ]
+        assert events[0]["args"] == {"name": "runway"}
+        assert events[1]["args"] == {"name": "MainThread"}
+
+    def test_step(self):
+        """Test spans recorded for a step."""
+        stack = MagicMock()
+        stack.name = "vpc"
+        statuses = [SUBMITTED, COMPLETE]
+        step = Step(stack, lambda _stack, status=None: statuses.pop(0))
+        TRACER.reset(enabled=True)
+        try:
+            with patch("runway.cfngin.plan.time"):
+                assert step.run()
+            assert [(i["name"], i.get("args")) for i in TRACER.events] == [
+                ("vpc", {"status": "submitted"}),
+                ("vpc", {"status": "complete"}),
+                ("wait", {"stack": "vpc"}),
+            ]
+        finally:
+            TRACER.reset()
+
+
+class TestProfiler(object):
+    """Tests for runway.cfngin.instrumentation.Profiler."""
+
+    def test_phase(self, caplog, tmp_path):
+        """Test profiling phases."""
+        caplog.set_level(logging.INFO, logger=MODULE)
+        profiler = Profiler()
+        with profiler.phase("config"):
+            busy(10)
+        assert not profiler._stats
+
+        profiler.start(str(tmp_path / "profile"))
+        with profiler.phase("modules"):
+            with profiler.phase("lookups"):
+                busy(1000)
+            busy(10)
+        with profiler.phase("lookups"):
+            busy(1000)
+        profiler.stop()
+        profiler.stop()  # does nothing once stopped
+
+        assert not profiler.enabled
+        assert sorted(i.name for i in (tmp_path / "profile").iterdir()) == [
+            "lookups.pstats",
+            "modules.pstats",
+        ]
+        # nested phases are exclusive
+        assert busy_calls(tmp_path / "profile" / "lookups.pstats") == 2
+        assert busy_calls(tmp_path / "profile" / "modules.pstats") == 1
+        assert caplog.messages[0].startswith("profile of lookups (")
+        assert caplog.messages[1].split() == ["tottime", "cumtime", "calls", "function"]
+
+
+@pytest.mark.skipif(sys.version_info.major < 3, reason="only supported by python 3")
+def test_submit(tmp_path):
+    """Test data recorded by worker processes is merged."""
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=2)
+    try:
+        PROFILER.start(str(tmp_path))
+        with API_CALLS.recording(), TRACER.tracing(str(tmp_path / "trace.json")):
+            make_call(API_CALLS)
+            futures = [instrumentation.submit(executor, worker, i) for i in "ab"]
+            assert [instrumentation.result(i) for i in futures] == ["a", "b"]
+            assert API_CALLS.operations["cloudformation.DescribeStacks"]["calls"] == 3
+            assert sorted(API_CALLS.stacks) == ["a", "b"]
+            assert sorted(i["name"] for i in TRACER.events) == ["a", "b"]
+            assert len(PROFILER._worker_profiles["modules"]) == 2
+        PROFILER.stop()
+        assert len(list(tmp_path.glob("modules.*.pstats"))) == 2
+
+        future = instrumentation.submit(executor, worker, "c")
+        assert instrumentation.result(future) == "c"
+    finally:
+        executor.shutdown()
+        API_CALLS.reset()
+        PROFILER.reset()
+        TRACER.reset()
@@ -1,26 +1,31 @@
 """Tests for runway.cfngin.plan."""
 # pylint: disable=protected-access,unused-argument
+import copy
 import json
 import os
 import shutil
+import sys
 import tempfile
+import threading
+import time
 import unittest
 
 import mock
 
 from runway.cfngin.context import Config, Context
-from runway.cfngin.dag import walk
+from runway.cfngin.dag import AsyncioWalker, Deferred, EventWalker, walk
 from runway.cfngin.exceptions import (
     CancelExecution,
     GraphError,
     PersistentGraphLocked,
+    PersistentGraphModified,
     PlanFailed,
 )
 from runway.cfngin.lookups.registry import (
     register_lookup_handler,
     unregister_lookup_handler,
 )
-from runway.cfngin.plan import Graph, Plan, Step
+from runway.cfngin.plan import Graph, PersistentGraphWriter, Plan, Step, merge_graphs
 from runway.cfngin.stack import Stack
 from runway.cfngin.status import COMPLETE, FAILED, SKIPPED, SUBMITTED
 from runway.cfngin.util import stack_template_key_name
@@ -58,6 +63,30 @@ class TestStep(unittest.TestCase):
         self.assertNotEqual(self.step.status, False)
         self.assertNotEqual(self.step.status, "banana")
 
+    def test_run_deferred(self):
+        """Test run_deferred."""
+        waiter = mock.MagicMock()
+        calls = []
+
+        def fn(_stack, status=None, deferred=False):
+            calls.append(deferred)
+            if status == SUBMITTED:
+                return COMPLETE
+            result = copy.copy(SUBMITTED)
+            result.waiter = waiter
+            return result
+
+        self.step.fn = fn
+        result = self.step.run_deferred()
+        self.assertIsInstance(result, Deferred)
+        self.assertIs(result.waiter, waiter)
+        self.assertTrue(self.step.submitted)
+        self.assertFalse(self.step.done)
+
+        self.assertTrue(result.resume())
+        self.assertTrue(self.step.completed)
+        self.assertEqual(calls, [True, True])
+
     def test_from_stack_name(self):
         """Return step from step name."""
         context = mock_context()
@@ -133,6 +162,184 @@ class TestGraph(unittest.TestCase):
         self.assertEqual([step.name for step in self.steps], list(graph.steps.keys()))
         self.assertEqual(self.graph_dict_expected, graph.to_dict())
 
+    def test_from_steps_partial(self):
+        """Test from_steps with only part of the config."""
+        stack = Stack(
+            definition=generate_definition("vpc", 3, required_by=["vpc.4"]),
+            context=self.context,
+        )
+        steps = [Step(stack, fn=None)]
+        with self.assertRaises(GraphError):
+            Graph.from_steps(steps)
+        self.assertEqual({"vpc.3": set()}, Graph.from_steps(steps, True).to_dict())
+
+    def test_merge(self):
+        """Test merge."""
+        graph = Graph.from_steps(self.steps)
+        other_steps = Step.from_persistent_graph(
+            {"stack1": [], "stack3": ["stack1"], "stack4": ["stack3"]}, self.context
+        )
+        other = Graph.from_steps(other_steps)
+
+        self.assertIs(graph, graph.merge(other))
+        self.assertEqual(
+            ["stack1", "stack2", "stack3", "stack4"], list(graph.steps.keys())
+        )
+        self.assertIs(self.steps[0], graph.steps["stack1"])
+        self.assertIs(other_steps[1], graph.steps["stack3"])
+        self.assertEqual(
+            {
+                "stack1": set(),
+                "stack2": set(["stack1"]),
+                "stack3": set(["stack1"]),
+                "stack4": set(["stack3"]),
+            },
+            graph.to_dict(),
+        )
+
+    def test_merge_graphs(self):
+        """Test merge_graphs."""
+        graph = Graph.from_steps(self.steps)
+        other = Graph.from_dict({"stack3": ["stack1"], "stack1": []}, self.context)
+
+        result = merge_graphs(graph, other)
+        self.assertEqual(
+            {"stack1": set(), "stack2": set(["stack1"]), "stack3": set(["stack1"])},
+            result.to_dict(),
+        )
+        self.assertEqual(self.graph_dict_expected, graph.to_dict())
+        self.assertEqual(["stack1", "stack2"], list(graph.steps.keys()))
+
+
+class TestPersistentGraphWriter(unittest.TestCase):
+    """Tests for runway.cfngin.plan.PersistentGraphWriter."""
+
+    def test_close_uploads_pending(self):
+        """Pending changes are uploaded by close."""
+        context = mock.MagicMock()
+        writer = PersistentGraphWriter(context, "0000", delay=60)
+        writer.schedule()
+        writer.schedule()
+        self.assertTrue(writer.pending)
+
+        writer.close()
+        context.put_persistent_graph.assert_called_once_with("0000")
+        self.assertFalse(writer.pending)
+        self.assertEqual(1, writer.uploads)
+
+    def test_close_nothing_pending(self):
+        """No upload is made when nothing was scheduled."""
+        context = mock.MagicMock()
+        writer = PersistentGraphWriter(context, "0000")
+        writer.close()
+        context.put_persistent_graph.assert_not_called()
+
+    def test_schedule_coalesces(self):
+        """Requests made while waiting or uploading are coalesced."""
+        context = mock.MagicMock()
+        uploading = threading.Event()
+        release = threading.Event()
+
+        def put_persistent_graph(_lock_code):
+            uploading.set()
+            release.wait(5)
+
+        context.put_persistent_graph.side_effect = put_persistent_graph
+        writer = PersistentGraphWriter(context, "0000", delay=0.01)
+        for _ in range(10):
+            writer.schedule()
+        self.assertTrue(uploading.wait(5))
+        for _ in range(10):
+            writer.schedule()  # made while an upload is in flight
+        release.set()
+        time.sleep(0.1)
+        writer.close()
+        self.assertEqual(2, context.put_persistent_graph.call_count)
+        self.assertEqual(2, writer.uploads)
+
+    def test_schedule_max_delay(self):
+        """Uploads are not postponed past max_delay by new requests."""
+        context = mock.MagicMock()
+        writer = PersistentGraphWriter(context, "0000", delay=60, max_delay=0.05)
+        writer.schedule()
+        time.sleep(0.2)
+        context.put_persistent_graph.assert_called_once_with("0000")
+        writer.close()
+        context.put_persistent_graph.assert_called_once_with("0000")
+
+    def test_upload_error(self):
+        """Changes that fail to upload are retried by the next upload."""
+        context = mock.MagicMock()
+        context.put_persistent_graph.side_effect = [ValueError("failed"), None]
+        writer = PersistentGraphWriter(context, "0000", delay=0.01)
+        writer.schedule()
+        time.sleep(0.2)
+
+        self.assertFalse(writer.pending)
+        self.assertEqual(2, context.put_persistent_graph.call_count)
+        self.assertEqual(1, writer.uploads)
+        writer.close()
+        self.assertEqual(2, context.put_persistent_graph.call_count)
+
+    def test_upload_error_backoff(self):
+        """Consecutive failed uploads wait longer before being retried."""
+        context = mock.MagicMock()
+        calls = []
+
+        def put_persistent_graph(_lock_code):
+            calls.append(time.time())
+            if len(calls) < 3:
+                raise ValueError("failed")
+
+        context.put_persistent_graph.side_effect = put_persistent_graph
+        writer = PersistentGraphWriter(context, "0000", delay=0.02)
+        writer.schedule()
+        time.sleep(0.5)
+        writer.close()
+
+        self.assertEqual(3, len(calls))
+        self.assertGreaterEqual(calls[1] - calls[0], 0.04)
+        self.assertGreaterEqual(calls[2] - calls[1], 0.08)
+        self.assertEqual(1, writer.uploads)
+
+    def test_upload_fatal_error(self):
+        """Errors that retrying can't fix stop uploads and are raised by close."""
+        context = mock.MagicMock()
+        context.put_persistent_graph.side_effect = PersistentGraphModified(
+            "expected", "actual"
+        )
+        writer = PersistentGraphWriter(context, "0000", delay=0.01)
+        writer.schedule()
+        time.sleep(0.2)
+        writer.schedule()
+        time.sleep(0.1)
+        context.put_persistent_graph.assert_called_once_with("0000")
+        with self.assertRaises(PersistentGraphModified):
+            writer.close()
+        context.put_persistent_graph.assert_called_once_with("0000")
+
+        writer = PersistentGraphWriter(context, "0000", delay=0.01)
+        writer.schedule()
+        time.sleep(0.2)
+        with mock.patch("runway.cfngin.plan.LOGGER") as mock_logger:
+            writer.close(raise_errors=False)
+        mock_logger.error.assert_called_once()
+
+    def test_close_error(self):
+        """Errors from the final upload are raised by close unless suppressed."""
+        context = mock.MagicMock()
+        context.put_persistent_graph.side_effect = ValueError("failed")
+        writer = PersistentGraphWriter(context, "0000", delay=60)
+        writer.schedule()
+        with self.assertRaises(ValueError):
+            writer.close()
+
+        writer = PersistentGraphWriter(context, "0000", delay=60)
+        writer.schedule()
+        with mock.patch("runway.cfngin.plan.LOGGER") as mock_logger:
+            writer.close(raise_errors=False)
+        mock_logger.error.assert_called_once()
+
 
 class TestPlan(unittest.TestCase):
     """Tests for runway.cfngin.plan.Plan."""
@@ -240,6 +447,33 @@ class TestPlan(unittest.TestCase):
         self.assertEqual(set(["vpc.1"]), result_graph_dict.get("bastion.1"))
         self.assertIsNone(result_graph_dict.get("namespace-removed.1"))
 
+    def test_execute_plan_persist_error(self):
+        """Test upload errors do not replace an error raised by the walk."""
+        context = Context(config=self.config)
+        context.put_persistent_graph = mock.MagicMock(
+            side_effect=ValueError("upload failed")
+        )
+        vpc = Stack(definition=generate_definition("vpc", 1), context=context)
+        bastion = Stack(
+            definition=generate_definition("bastion", 1, requires=[vpc.name]),
+            context=context,
+        )
+        context._persistent_graph = Graph.from_steps([])
+
+        def _launch_stack(stack, status=None):
+            if stack.name == bastion.name:
+                raise KeyboardInterrupt
+            return COMPLETE
+
+        graph = Graph.from_steps(
+            [Step(vpc, _launch_stack), Step(bastion, _launch_stack)]
+        )
+        plan = Plan(description="Test", graph=graph, context=context)
+        plan.context._persistent_graph_lock_code = plan.lock_code
+        with self.assertRaises(KeyboardInterrupt):
+            plan.execute(walk)
+        context.put_persistent_graph.assert_called_once_with(plan.lock_code)
+
     def test_execute_plan_no_persist(self):
         """Test execute plan with no persistent graph."""
         context = Context(config=self.config)
@@ -266,6 +500,81 @@ class TestPlan(unittest.TestCase):
         self.assertEqual(calls, ["namespace-vpc.1", "namespace-bastion.1"])
         context.put_persistent_graph.assert_not_called()
 
+    @unittest.skipIf(sys.version_info.major < 3, "only supported by python 3")
+    def test_execute_plan_asyncio_walker(self):
+        """Test execute plan with AsyncioWalker."""
+        vpc = Stack(definition=generate_definition("vpc", 1), context=self.context)
+        bastion = Stack(
+            definition=generate_definition("bastion", 1, requires=[vpc.name]),
+            context=self.context,
+        )
+
+        calls = []
+
+        def _launch_stack(stack, status=None, deferred=False):
+            calls.append((stack.fqn, deferred))
+            if status == SUBMITTED:
+                return COMPLETE
+            result = copy.copy(SUBMITTED)
+            result.waiter = mock.MagicMock()
+            result.waiter.add_done_callback.side_effect = lambda func: func()
+            return result
+
+        graph = Graph.from_steps(
+            [Step(vpc, _launch_stack), Step(bastion, _launch_stack)]
+        )
+        plan = Plan(description="Test", graph=graph)
+
+        plan.execute(AsyncioWalker().walk)
+
+        self.assertEqual(
+            calls,
+            [
+                ("namespace-vpc.1", True),
+                ("namespace-vpc.1", True),
+                ("namespace-bastion.1", True),
+                ("namespace-bastion.1", True),
+            ],
+        )
+        self.assertTrue(all(step.completed for step in plan.steps))
+
+    def test_execute_plan_event_walker(self):
+        """Test execute plan with EventWalker."""
+        vpc = Stack(definition=generate_definition("vpc", 1), context=self.context)
+        bastion = Stack(
+            definition=generate_definition("bastion", 1, requires=[vpc.name]),
+            context=self.context,
+        )
+
+        calls = []
+
+        def _launch_stack(stack, status=None, deferred=False):
+            calls.append((stack.fqn, deferred))
+            if status == SUBMITTED:
+                return COMPLETE
+            result = copy.copy(SUBMITTED)
+            result.waiter = mock.MagicMock()
+            result.waiter.add_done_callback.side_effect = lambda func: func()
+            return result
+
+        graph = Graph.from_steps(
+            [Step(vpc, _launch_stack), Step(bastion, _launch_stack)]
+        )
+        plan = Plan(description="Test", graph=graph)
+
+        plan.execute(EventWalker(max_workers=2).walk)
+
+        self.assertEqual(
+            calls,
+            [
+                ("namespace-vpc.1", True),
+                ("namespace-vpc.1", True),
+                ("namespace-bastion.1", True),
+                ("namespace-bastion.1", True),
+            ],
+        )
+        self.assertTrue(all(step.completed for step in plan.steps))
+
     def test_execute_plan_locked(self):
         """Test execute plan locked.
 
@@ -0,0 +1,223 @@
+"""Tests for runway.cfngin.rate_limit."""
+# pylint: disable=no-self-use,protected-access
+import logging
+
+from mock import MagicMock, patch
+
+from runway.cfngin.rate_limit import (
+    INITIAL_RATE,
+    MIN_RATE,
+    RATE_DECREASE,
+    THROTTLE_COOLDOWN,
+    RateLimiter,
+    TokenBucket,
+)
+from runway.cfngin.session_cache import get_session
+
+MODULE = "runway.cfngin.rate_limit"
+
+
+class FakeClock(object):
+    """Clock that only moves when told to."""
+
+    def __init__(self):
+        """Instantiate class."""
+        self.now = 100.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+    def sleep(self, seconds):
+        """Move the clock forward."""
+        self.now += seconds
+
+
+def response(status_code=200, code=None):
+    """Generate the response passed to needs-retry handlers."""
+    parsed = {"Error": {"Code": code}} if code else {}
+    return (MagicMock(status_code=status_code), parsed)
+
+
+class TestTokenBucket(object):
+    """Tests for runway.cfngin.rate_limit.TokenBucket."""
+
+    def test_acquire(self):
+        """Test acquire."""
+        clock = FakeClock()
+        sleep = MagicMock(side_effect=clock.sleep)
+        bucket = TokenBucket(rate=2, clock=clock, sleep=sleep)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0.5
+        assert bucket.acquire() == 0.5
+        assert sleep.call_count == 2
+        clock.sleep(10)  # the bucket only holds one second of tokens
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0.5
+        assert bucket.stats() == {
+            "rate": 2,
+            "requests": 6,
+            "throttles": 0,
+            "waited": 1.5,
+        }
+
+    def test_aimd(self):
+        """Test the rate increasing and decreasing."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, max_rate=11, clock=clock)
+
+        for _ in range(10):
+            bucket.on_success()
+        assert 10.4 < bucket.rate < 10.5
+        for _ in range(100):
+            bucket.on_success()
+        assert bucket.rate == 11
+
+        bucket.on_throttle()
+        assert bucket.rate == 11 * RATE_DECREASE
+        bucket.on_throttle()  # within the cooldown
+        assert bucket.rate == 11 * RATE_DECREASE
+        clock.sleep(THROTTLE_COOLDOWN)
+        for _ in range(10):
+            bucket.on_throttle()
+            clock.sleep(THROTTLE_COOLDOWN)
+        assert bucket.rate == MIN_RATE
+        assert bucket.throttles == 12
+
+
+class TestRateLimiter(object):
+    """Tests for runway.cfngin.rate_limit.RateLimiter."""
+
+    def test_get_bucket(self):
+        """Test get_bucket."""
+        limiter = RateLimiter(rate=5)
+        bucket = limiter.get_bucket("default", "us-east-1", "cloudformation")
+        assert bucket.rate == 5
+        assert bucket is limiter.get_bucket("default", "us-east-1", "cloudformation")
+        assert bucket is not limiter.get_bucket(
+            "default", "us-west-2", "cloudformation"
+        )
+        assert bucket is not limiter.get_bucket("other", "us-east-1", "cloudformation")
+
+    def test_get_bucket_service_max_rate(self):
+        """Test buckets are capped by the max rate of their service."""
+        limiter = RateLimiter(rate=5, services={"cloudformation": 2, "sts": 20})
+        bucket = limiter.get_bucket("default", "us-east-1", "cloudformation")
+        assert bucket.rate == 2
+        assert bucket.max_rate == 2
+        assert limiter.get_bucket("default", "us-east-1", "sts").max_rate == 20
+
+    def test_get_bucket_default_services(self):
+        """Test lookup and hook clients are limited by default."""
+        limiter = RateLimiter()
+        ssm = limiter.get_bucket("default", "us-east-1", "ssm")
+        assert ssm.rate == INITIAL_RATE
+        assert ssm.max_rate == 40
+        route53 = limiter.get_bucket("default", "us-east-1", "route53")
+        assert route53.rate == route53.max_rate == 5
+        assert "s3" not in limiter.services
+
+    def test_handlers(self):
+        """Test before-sign and needs-retry handlers."""
+        limiter = RateLimiter(rate=5)
+        bucket = limiter.get_bucket("default", "us-east-1", "cloudformation")
+        request_dict = {"context": {"client_region": "us-east-1"}}
+
+        limiter._before_sign(
+            "default",
+            "before-sign.cloudformation.DescribeStacks",
+            request=MagicMock(context=request_dict["context"]),
+        )
+        assert bucket.requests == 1
+
+        event = "needs-retry.cloudformation.DescribeStacks"
+        limiter._needs_retry(
+            "default", event, response=response(), request_dict=request_dict
+        )
+        assert bucket.rate > 5
+        limiter._needs_retry(
+            "default",
+            event,
+            response=response(400, "Throttling"),
+            request_dict=request_dict,
+        )
+        limiter._needs_retry(
+            "default", event, response=response(429), request_dict=request_dict
+        )
+        assert bucket.throttles == 2
+        assert bucket.rate < 5
+        rate = bucket.rate
+        limiter._needs_retry(
+            "default",
+            event,
+            response=response(400, "ValidationError"),
+            request_dict=request_dict,
+        )
+        limiter._needs_retry("default", event, response=None, request_dict=request_dict)
+        limiter._needs_retry(
+            "default",
+            event,
+            response=response(400, "LimitExceededException"),
+            request_dict=request_dict,
+        )
+        assert bucket.rate == rate
+        assert bucket.throttles == 2
+
+    def test_handlers_service_not_limited(self):
+        """Test calls to services that are not limited are ignored."""
+        limiter = RateLimiter(rate=5)
+        request_dict = {"context": {"client_region": "us-east-1"}}
+        limiter._before_sign(
+            "default",
+            "before-sign.s3.PutObject",
+            request=MagicMock(context=request_dict["context"]),
+        )
+        limiter._needs_retry(
+            "default",
+            "needs-retry.s3.PutObject",
+            response=response(503, "SlowDown"),
+            request_dict=request_dict,
+        )
+        assert not limiter.stats()
+
+    def test_log_summary(self, caplog):
+        """Test log_summary."""
+        caplog.set_level(logging.DEBUG, logger=MODULE)
+        limiter = RateLimiter(rate=5)
+        limiter.get_bucket("default", "us-east-1", "s3").acquire()
+        since = limiter.stats()
+        bucket = limiter.get_bucket("default", "us-east-1", "cloudformation")
+        bucket.acquire()
+        bucket.on_throttle()
+
+        limiter.log_summary(since=since)
+        assert caplog.record_tuples == [
+            (
+                MODULE,
+                logging.INFO,
+                "cloudformation (us-east-1): 1 API calls, 1 throttled, 0.0s "
+                "waited; rate limit 2.5 calls/second",
+            )
+        ]
+
+    def test_register(self):
+        """Test register."""
+        session = MagicMock()
+        RateLimiter(rate=0).register(session, "default")
+        RateLimiter(rate=5, services={}).register(session, "default")
+        session.register.assert_not_called()
+        RateLimiter(rate=5).register(session, "default")
+        assert [i[0][0] for i in session.register.call_args_list] == [
+            "before-sign",
+            "needs-retry",
+        ]
+
+    def test_get_session(self):
+        """Test sessions created by get_session are registered."""
+        with patch("runway.cfngin.session_cache.RATE_LIMITER") as limiter:
+            session = get_session(
+                region="us-east-1", access_key="AKIATEST", secret_key="secret"
+            )
+        limiter.register.assert_called_once_with(session._session, "AKIATEST")
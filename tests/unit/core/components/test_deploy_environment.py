@@ -149,6 +149,30 @@ class TestDeployEnvironment(object):
         assert not obj.ci
         assert "CI" not in obj.vars
 
+    def test_cfngin_executor(self):
+        """Test cfngin_executor."""
+        obj = DeployEnvironment(environ={})
+
+        assert obj.cfngin_executor is None
+
+        obj.cfngin_executor = "events"
+        assert obj.cfngin_executor == "events"
+        assert obj.vars["RUNWAY_CFNGIN_EXECUTOR"] == "events"
+
+    def test_cfngin_fast_diff(self):
+        """Test cfngin_fast_diff."""
+        obj = DeployEnvironment(environ={})
+
+        assert not obj.cfngin_fast_diff
+
+        obj.cfngin_fast_diff = True
+        assert obj.cfngin_fast_diff
+        assert obj.vars["RUNWAY_CFNGIN_FAST_DIFF"] == "1"
+
+        obj.cfngin_fast_diff = False
+        assert not obj.cfngin_fast_diff
+        assert "RUNWAY_CFNGIN_FAST_DIFF" not in obj.vars
+
     def test_debug(self):
         """Test debug."""
         obj = DeployEnvironment(environ={})
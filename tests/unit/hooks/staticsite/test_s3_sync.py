@@ -0,0 +1,151 @@
+"""Test runway.hooks.staticsite.s3_sync."""
+# pylint: disable=no-self-use
+import hashlib
+
+from botocore.stub import ANY
+
+from runway.hooks.staticsite.s3_sync import (
+    calculate_etag,
+    find_local_files,
+    get_cache_control,
+    sync_directory,
+)
+
+
+def test_calculate_etag(tmp_path):
+    """Test calculate_etag."""
+    small = tmp_path / "small"
+    small.write_bytes(b"abc")
+    assert calculate_etag(str(small), chunksize=4) == hashlib.md5(b"abc").hexdigest()
+
+    large = tmp_path / "large"
+    large.write_bytes(b"abcdefghij")
+    parts = b"".join(hashlib.md5(i).digest() for i in [b"abcd", b"efgh", b"ij"])
+    assert calculate_etag(str(large), chunksize=4) == (
+        hashlib.md5(parts).hexdigest() + "-3"
+    )
+
+
+def test_get_cache_control():
+    """Test get_cache_control."""
+    rules = [
+        {"pattern": "*.html", "value": "no-cache"},
+        {"pattern": "static/*", "value": "max-age=31536000"},
+        {"pattern": "*", "value": "max-age=60"},
+    ]
+    assert get_cache_control("index.html", rules) == "no-cache"
+    assert get_cache_control("static/app.js", rules) == "max-age=31536000"
+    assert get_cache_control("favicon.ico", rules) == "max-age=60"
+    assert not get_cache_control("index.html")
+
+
+def test_find_local_files(tmp_path):
+    """Test find_local_files."""
+    (tmp_path / "static").mkdir()
+    (tmp_path / "static" / "app.js").write_text(u"")
+    (tmp_path / "index.html").write_text(u"")
+    (tmp_path / "config.json").write_text(u"")
+    assert find_local_files(str(tmp_path), exclude=["config.json"]) == {
+        "index.html": str(tmp_path / "index.html"),
+        "static/app.js": str(tmp_path / "static" / "app.js"),
+    }
+
+
+class TestSyncDirectory(object):
+    """Test runway.hooks.staticsite.s3_sync.sync_directory."""
+
+    def test_sync_directory(self, cfngin_context, tmp_path):
+        """Test only changed files are uploaded and extraneous keys deleted."""
+        (tmp_path / "changed.css").write_bytes(b"new")
+        (tmp_path / "index.html").write_bytes(b"<html></html>")
+        (tmp_path / "unchanged.js").write_bytes(b"js")
+        (tmp_path / "config.json").write_bytes(b"{}")
+        s3_stub = cfngin_context.add_stubber("s3")
+        s3_stub.add_response(
+            "list_objects_v2",
+            {
+                "Contents": [
+                    {
+                        "Key": "changed.css",
+                        "Size": 3,
+                        "ETag": '"%s"' % hashlib.md5(b"old").hexdigest(),
+                    },
+                    {"Key": "config.json", "Size": 2, "ETag": '"etag"'},
+                    {"Key": "stale.txt", "Size": 1, "ETag": '"etag"'},
+                    {
+                        "Key": "unchanged.js",
+                        "Size": 2,
+                        "ETag": '"%s"' % hashlib.md5(b"js").hexdigest(),
+                    },
+                ]
+            },
+            {"Bucket": "bucket"},
+        )
+        s3_stub.add_response(
+            "put_object",
+            {},
+            {
+                "Bucket": "bucket",
+                "Key": "changed.css",
+                "Body": ANY,
+                "ContentType": "text/css",
+            },
+        )
+        s3_stub.add_response(
+            "put_object",
+            {},
+            {
+                "Bucket": "bucket",
+                "Key": "index.html",
+                "Body": ANY,
+                "CacheControl": "no-cache",
+                "ContentType": "text/html",
+            },
+        )
+        s3_stub.add_response(
+            "delete_objects",
+            {"Deleted": [{"Key": "stale.txt"}]},
+            {"Bucket": "bucket", "Delete": {"Objects": [{"Key": "stale.txt"}]}},
+        )
+
+        with s3_stub as stub:
+            assert sync_directory(
+                cfngin_context.get_session(),
+                str(tmp_path),
+                "bucket",
+                exclude=["config.json"],
+                cache_control=[{"pattern": "*.html", "value": "no-cache"}],
+                max_concurrent_requests=1,
+            ) == ["changed.css", "index.html", "stale.txt"]
+            stub.assert_no_pending_responses()
+
+    def test_delete_batches(self, cfngin_context, tmp_path):
+        """Test extraneous keys are deleted in batches of 1000."""
+        keys = ["%04d" % i for i in range(1001)]
+        s3_stub = cfngin_context.add_stubber("s3")
+        s3_stub.add_response(
+            "list_objects_v2",
+            {"Contents": [{"Key": key, "Size": 1, "ETag": '"etag"'} for key in keys]},
+            {"Bucket": "bucket"},
+        )
+        for batch in [keys[:1000], keys[1000:]]:
+            s3_stub.add_response(
+                "delete_objects",
+                {},
+                {
+                    "Bucket": "bucket",
+                    "Delete": {"Objects": [{"Key": key} for key in batch]},
+                },
+            )
+
+        with s3_stub as stub:
+            assert (
+                sync_directory(
+                    cfngin_context.get_session(),
+                    str(tmp_path),
+                    "bucket",
+                    max_concurrent_requests=1,
+                )
+                == keys
+            )
+            stub.assert_no_pending_responses()
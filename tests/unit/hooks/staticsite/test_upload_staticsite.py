@@ -9,8 +9,11 @@ from botocore.stub import ANY
 from runway.hooks.staticsite.upload_staticsite import (
     auto_detect_content_type,
     calculate_hash_of_extra_files,
+    collapse_invalidation_paths,
     get_content,
     get_content_type,
+    get_invalidation_paths,
+    invalidate_distribution,
     sync_extra_files,
 )
 
@@ -287,3 +290,63 @@ class TestSyncExtraFiles(object):
             ) == ["test"]
             s3_stub.assert_no_pending_responses()
             ssm_stub.assert_no_pending_responses()
+
+
+class TestInvalidationPaths(object):
+    """Test paths invalidated for changed objects."""
+
+    def test_get_invalidation_paths(self):
+        """Test get_invalidation_paths."""
+        assert get_invalidation_paths(
+            ["docs/index.html", "index.html", "my file*.js"]
+        ) == ["/", "/docs/", "/docs/index.html", "/index.html", "/my%20file%2A.js"]
+        assert get_invalidation_paths([], fallback="/site/*") == ["/site/*"]
+        assert get_invalidation_paths(["a.js", "b.js"], threshold=1) == ["/*"]
+
+    def test_collapse_invalidation_paths(self):
+        """Test collapse_invalidation_paths."""
+        paths = ["/a.js", "/static/js/1.js", "/static/js/2.js", "/static/css/1.css"]
+        assert collapse_invalidation_paths(paths, max_paths=4) == sorted(paths)
+        # the deepest directory with enough paths is used
+        assert collapse_invalidation_paths(paths, max_paths=3) == [
+            "/a.js",
+            "/static/css/1.css",
+            "/static/js/*",
+        ]
+        assert collapse_invalidation_paths(paths, max_paths=2) == [
+            "/a.js",
+            "/static/*",
+        ]
+        assert not collapse_invalidation_paths(paths, max_paths=1)
+        assert not collapse_invalidation_paths(paths, max_paths=3, max_wildcards=0)
+
+    def test_get_invalidation_paths_collapsed(self):
+        """Test paths are collapsed or the fallback is used if they can't be."""
+        keys = ["static/%s.js" % i for i in range(3001)]
+        assert get_invalidation_paths(keys) == ["/static/*"]
+        keys = ["%s.js" % i for i in range(3001)]
+        assert get_invalidation_paths(keys) == ["/*"]
+
+    def test_invalidate_distribution(self, cfngin_context):
+        """Test invalidate_distribution."""
+        cf_stub = cfngin_context.add_stubber("cloudfront")
+        cf_stub.add_response(
+            "create_invalidation",
+            {},
+            {
+                "DistributionId": "id",
+                "InvalidationBatch": {
+                    "Paths": {"Quantity": 2, "Items": ["/", "/index.html"]},
+                    "CallerReference": ANY,
+                },
+            },
+        )
+
+        with cf_stub as stub:
+            assert invalidate_distribution(
+                cfngin_context.get_session(),
+                identifier="id",
+                path="/*",
+                paths=["/", "/index.html"],
+            )
+            stub.assert_no_pending_responses()